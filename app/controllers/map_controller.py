@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QUrl, QVariant, QJsonValue, QJsonDocument
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
@@ -18,10 +19,18 @@ from PyQt5.QtWebChannel import QWebChannel
 
 from app.models.location_data import LocationDataModel, Location
 from app.plugins.geocoding_helper import GeocodingHelper
+from app.core.geo.cluster_index import ClusterIndex
+from app.core.geo.heatmap import HeatmapPyramid
 from app.core.path_utils import get_resource_path
 
 logger = logging.getLogger(__name__)
 
+# Markers per QWebChannel message when shipping markers to the page
+MARKER_CHUNK_SIZE = 10000
+
+# Queued heatmap changes applied to the tiles without waiting for a redraw
+HEATMAP_FLUSH_SIZE = 50000
+
 class MapController(QObject):
     """
     Controller for map operations
@@ -38,6 +47,10 @@ class MapController(QObject):
     # Additional signals expected by UI
     markersUpdated = pyqtSignal(int)  # Emits count of markers after updates
     mapLayerChanged = pyqtSignal(str)  # Emits name of the current map layer
+    # Bulk marker transfer, consumed by the page over the web channel
+    markerChunkReady = pyqtSignal('QVariantMap')  # Columnar chunk of added/changed markers
+    markersRemoved = pyqtSignal('QVariantList')  # Marker numbers to remove
+    clustersReady = pyqtSignal('QVariantMap')  # Columnar clusters for the current viewport
     
     def __init__(self, web_view: QWebEngineView):
         """
@@ -50,7 +63,11 @@ class MapController(QObject):
         self.web_view = web_view
         self.location_model = None
         self.markers = {}  # Dictionary of marker IDs to location IDs
-        self.marker_details: List[Dict[str, Any]] = []  # Details for export (lat/lng/title,...)
+        self._location_markers: Dict[str, str] = {}  # Location ID -> marker ID
+        self._marker_locations: Dict[str, Location] = {}  # Location ID -> location shown
+        self._marker_signatures: Dict[str, Tuple] = {}  # Location ID -> shipped (lat, lng, time, source)
+        self._adhoc_locations: Dict[str, Location] = {}  # Markers not backed by the model (search results)
+        self._bridge_ready = False  # Page has connected to the web channel signals
         self.selected_marker_id = None
         self.marker_counter = 0
         self.web_channel = QWebChannel()
@@ -82,6 +99,19 @@ class MapController(QObject):
         self._date_to = None
         # Geocoding helper for text -> coordinates search
         self._geocoder = GeocodingHelper()
+        
+        # Heatmap tiles, only kept while the layer is on; marker changes are
+        # queued and applied in one batch when drawn
+        self._heatmap = HeatmapPyramid()
+        self._heatmap_enabled = False
+        self._heatmap_points: Dict[str, Tuple[float, float]] = {}  # location ID -> (lat, lng)
+        self._heatmap_pending: List[Tuple[float, float, int]] = []  # (lat, lng, +1/-1)
+        self._viewport: Optional[Tuple[float, float, float, float, int]] = None  # (south, west, north, east, zoom)
+        
+        # Server-side clustering: only the viewport's clusters and lone points reach the page
+        self._cluster_index = ClusterIndex()
+        self._server_clustering = True
+        self._clusters_payload: Optional[Dict[str, Any]] = None  # Last clusters sent
 
     # ---- Methods expected by UI (minimal implementations) ----
     def update_visible_plugins(self, plugin_name: str, visible: bool) -> None:
@@ -113,7 +143,8 @@ class MapController(QObject):
                 self.mapLoaded.emit(False)
                 return
                 
-            # Load map HTML file
+            # Load map HTML file; the new page has to reconnect to the channel
+            self._bridge_ready = False
             self.web_view.load(QUrl.fromLocalFile(str(map_path)))
             
             # Connect signals
@@ -147,6 +178,7 @@ class MapController(QObject):
             
             # Set up custom JS handler for map events
             self._setup_js_handlers()
+            self._apply_clustering_mode()
             
             # Set map default location
             self.set_view(self.default_lat, self.default_lng, self.default_zoom)
@@ -179,6 +211,9 @@ class MapController(QObject):
             var lng = center.lng;
             var zoom = map.getZoom();
             mapController.handleMapMove(lat, lng, zoom);
+            var bounds = map.getBounds();
+            mapController.handleViewportChange(bounds.getSouth(), bounds.getWest(),
+                                               bounds.getNorth(), bounds.getEast(), zoom);
         });
         
         // Marker click handler - set globally for access from creepyAI object
@@ -209,19 +244,24 @@ class MapController(QObject):
         """
         if self.location_model:
             # Disconnect old model signals
-            self.location_model.locationAdded.disconnect(self.add_location_marker)
-            self.location_model.locationRemoved.disconnect(self.remove_location_marker)
-            self.location_model.locationUpdated.disconnect(self.update_location_marker)
-            self.location_model.locationsCleared.disconnect(self.clear_markers)
+            self.location_model.locationsAdded.disconnect(self._on_locations_added)
+            self.location_model.locationsRemoved.disconnect(self._on_locations_removed)
+            self.location_model.locationsUpdated.disconnect(self._on_locations_updated)
+            self.location_model.locationsCleared.disconnect(self._on_locations_cleared)
         
         self.location_model = model
         
+        # Rebuild the cluster index and heatmap from the new model
+        self._cluster_index.clear()
+        self._reset_heatmap()
+        
         if model:
-            # Connect to model signals
-            model.locationAdded.connect(self.add_location_marker)
-            model.locationRemoved.connect(self.remove_location_marker)
-            model.locationUpdated.connect(self.update_location_marker)
-            model.locationsCleared.connect(self.clear_markers)
+            # Connect to the coalesced model signals (one call per batch)
+            model.locationsAdded.connect(self._on_locations_added)
+            model.locationsRemoved.connect(self._on_locations_removed)
+            model.locationsUpdated.connect(self._on_locations_updated)
+            model.locationsCleared.connect(self._on_locations_cleared)
+            self._index_locations(model.get_all_locations())
             
             # Add markers for all locations in the model
             self.display_all_locations()
@@ -231,66 +271,224 @@ class MapController(QObject):
         if not self.map_ready or not self.location_model:
             return
         
-        # Clear existing markers
-        self.clear_markers()
-        
-        # Add markers for all locations
-        for location in self.location_model.get_all_locations():
-            self.add_location_marker(location)
-        
-        # Fit map to show all markers
-        self.fit_bounds()
+        if self._server_clustering:
+            self._refresh_clusters()
+            self.fit_bounds()
+        else:
+            self.sync_markers(self.location_model.get_all_locations(), fit=True)
+        self._refresh_heatmap()
     
-    def add_location_marker(self, location: Location) -> None:
-        """
-        Add a marker for a location
-        
-        Args:
-            location: Location to add marker for
-        """
-        if not self.map_ready:
+    # ------------------------------------------------------------------
+    # Model change handlers
+    # ------------------------------------------------------------------
+    def _index_locations(self, locations: List[Location]) -> None:
+        """Add or move locations in the cluster index and heatmap"""
+        if not locations:
             return
-        
-        marker_id = f"marker_{self.marker_counter}"
-        self.marker_counter += 1
-        
-        # Save mapping from marker ID to location ID
-        self.markers[marker_id] = location.id
-        
-        # Create marker options
+        self._cluster_index.add(
+            [loc.id for loc in locations],
+            [loc.latitude for loc in locations],
+            [loc.longitude for loc in locations],
+        )
+        for location in locations:
+            self._queue_heatmap_point(location.id, location.latitude, location.longitude)
+    
+    def _on_locations_added(self, locations: List[Location]) -> None:
+        self._index_locations(locations)
+        if self._server_clustering:
+            self._refresh_clusters()
+        else:
+            self.add_location_markers(locations)
+        self._refresh_heatmap()
+    
+    def _on_locations_removed(self, location_ids: List[str]) -> None:
+        self._cluster_index.remove(location_ids)
+        for location_id in location_ids:
+            self._queue_heatmap_point(location_id, None, None)
+        if self._server_clustering:
+            self._refresh_clusters()
+        else:
+            self.remove_location_markers(location_ids)
+        self._refresh_heatmap()
+    
+    def _on_locations_updated(self, locations: List[Location]) -> None:
+        self._index_locations(locations)
+        if self._server_clustering:
+            self._refresh_clusters()
+        self.update_location_markers(locations)
+        self._refresh_heatmap()
+    
+    def _on_locations_cleared(self) -> None:
+        self._cluster_index.clear()
+        self._reset_heatmap()
+        self.clear_markers()
+    
+    @property
+    def marker_details(self) -> List[Dict[str, Any]]:
+        """Details of the markers on the map, for export (lat/lng/title,...)"""
+        return [
+            self._marker_options(self._location_markers[location_id], location)
+            for location_id, location in self._marker_locations.items()
+        ]
+    
+    def _marker_options(self, marker_id: str, location: Location) -> Dict[str, Any]:
+        """Build the full description of a marker"""
         marker_options = {
             "id": marker_id,
             "lat": location.latitude,
             "lng": location.longitude,
             "title": f"{location.source} - {location.timestamp.strftime('%Y-%m-%d %H:%M:%S') if hasattr(location.timestamp, 'strftime') else ''}",
-            "popup": f"<strong>{location.source}</strong><br>{location.address or ''}<br>{location.context or ''}",
+            "popup": self._marker_popup_html(location),
             "source": location.source,
             "timestamp": location.timestamp.isoformat() if hasattr(location.timestamp, 'isoformat') else None
         }
         
-        # Set icon based on source
-        if location.source:
-            source_lower = location.source.lower()
+        icon = self._icon_for_source(location.source)
+        if icon:
+            marker_options["icon"] = icon
+        return marker_options
+    
+    @staticmethod
+    def _marker_popup_html(location: Location) -> str:
+        return f"<strong>{location.source}</strong><br>{location.address or ''}<br>{location.context or ''}"
+    
+    @staticmethod
+    def _icon_for_source(source: str) -> str:
+        """Icon name for a source, or empty for the default icon"""
+        if source:
+            source_lower = source.lower()
             for social_media in ["facebook", "twitter", "instagram", "linkedin", "snapchat", "tiktok", "pinterest"]:
                 if social_media in source_lower:
-                    marker_options["icon"] = social_media
-                    break
+                    return social_media
+        return ""
+    
+    @staticmethod
+    def _marker_signature(location: Location) -> Tuple:
+        """What the page was sent for a location; a change means re-shipping it"""
+        timestamp = location.timestamp.timestamp() if hasattr(location.timestamp, 'timestamp') else None
+        return (location.latitude, location.longitude, timestamp, location.source)
+    
+    @staticmethod
+    def _marker_number(marker_id: str) -> int:
+        return int(marker_id.rsplit("_", 1)[1])
+    
+    # ------------------------------------------------------------------
+    # Bulk marker transfer
+    # ------------------------------------------------------------------
+    def _ship_markers(self, location_ids: List[str], fit: bool = False) -> None:
+        """
+        Send markers to the page in columnar chunks, one channel message each
         
-        # Add marker to map
-        js_code = f"""
-        window.creepyAI = window.creepyAI || {{}};
-        if (window.creepyAI.addMarker) {{
-            window.creepyAI.addMarker({json.dumps(marker_options)});
-        }}
+        A chunk holds parallel ``ids``/``lat``/``lng``/``time``/``source``
+        arrays (``source`` indexes the chunk's ``sources``/``icons`` tables)
+        so the page can load them into typed arrays. Markers whose number is
+        already on the page are replaced.
         """
-        page = self.web_view.page()
-        if page:
-            page.runJavaScript(js_code)
-        # Track details for export
-        try:
-            self.marker_details.append(marker_options)
-        except Exception:
-            pass
+        if not self._bridge_ready or not location_ids:
+            return
+        
+        for start in range(0, len(location_ids), MARKER_CHUNK_SIZE):
+            chunk_ids = location_ids[start:start + MARKER_CHUNK_SIZE]
+            numbers, lats, lngs, times, source_refs = [], [], [], [], []
+            sources: Dict[str, int] = {}
+            for location_id in chunk_ids:
+                lat, lng, timestamp, source = self._marker_signatures[location_id]
+                numbers.append(self._marker_number(self._location_markers[location_id]))
+                lats.append(lat)
+                lngs.append(lng)
+                times.append(timestamp)
+                source_refs.append(sources.setdefault(source or "", len(sources)))
+            
+            self.markerChunkReady.emit({
+                "ids": numbers,
+                "lat": np.round(np.asarray(lats, dtype=np.float64), 6).tolist(),
+                "lng": np.round(np.asarray(lngs, dtype=np.float64), 6).tolist(),
+                "time": times,
+                "source": source_refs,
+                "sources": list(sources),
+                "icons": [self._icon_for_source(source) for source in sources],
+                "fit": fit and start + MARKER_CHUNK_SIZE >= len(location_ids),
+            })
+    
+    def _place_markers(self, locations: List[Location]) -> List[str]:
+        """Record markers for locations; returns the IDs the page needs to (re)draw"""
+        changed = []
+        for location in locations:
+            signature = self._marker_signature(location)
+            marker_id = self._location_markers.get(location.id)
+            if marker_id is None:
+                marker_id = f"marker_{self.marker_counter}"
+                self.marker_counter += 1
+                # Save mapping from marker ID to location ID
+                self.markers[marker_id] = location.id
+                self._location_markers[location.id] = marker_id
+            elif self._marker_signatures.get(location.id) == signature:
+                self._marker_locations[location.id] = location
+                continue
+            
+            self._marker_locations[location.id] = location
+            self._marker_signatures[location.id] = signature
+            changed.append(location.id)
+        return changed
+    
+    def _drop_markers(self, location_ids) -> List[int]:
+        """Forget markers for locations; returns the marker numbers to remove"""
+        removed = []
+        for location_id in location_ids:
+            marker_id = self._location_markers.pop(location_id, None)
+            if marker_id is None:
+                continue
+            # Remove from our markers dictionary
+            del self.markers[marker_id]
+            self._marker_locations.pop(location_id, None)
+            self._marker_signatures.pop(location_id, None)
+            self._adhoc_locations.pop(location_id, None)
+            removed.append(self._marker_number(marker_id))
+        return removed
+    
+    def sync_markers(self, locations: List[Location], fit: bool = False) -> None:
+        """
+        Make the map show exactly these locations (plus search markers)
+        
+        Only markers that were added, removed or moved since the last sync
+        are sent to the page.
+        
+        Args:
+            locations: Locations that should have markers
+            fit: Fit the map to the markers once they have arrived
+        """
+        wanted = {location.id: location for location in locations}
+        wanted.update(self._adhoc_locations)
+        
+        removed = self._drop_markers([loc_id for loc_id in self._location_markers if loc_id not in wanted])
+        changed = self._place_markers(list(wanted.values()))
+        
+        if removed and self._bridge_ready:
+            self.markersRemoved.emit(removed)
+        self._ship_markers(changed, fit=fit)
+        if fit and not changed:
+            self.fit_bounds()
+    
+    def add_location_marker(self, location: Location) -> None:
+        """
+        Add a marker for a location
+        
+        Args:
+            location: Location to add marker for
+        """
+        self.add_location_markers([location])
+    
+    def add_location_markers(self, locations: List[Location]) -> None:
+        """
+        Add markers for several locations
+        
+        Args:
+            locations: Locations to add markers for
+        """
+        if not self.map_ready or not locations:
+            return
+        
+        self._ship_markers(self._place_markers(locations))
     
     def remove_location_marker(self, location_id: str) -> None:
         """
@@ -299,30 +497,21 @@ class MapController(QObject):
         Args:
             location_id: ID of location to remove marker for
         """
+        self.remove_location_markers([location_id])
+    
+    def remove_location_markers(self, location_ids: List[str]) -> None:
+        """
+        Remove the markers of several locations
+        
+        Args:
+            location_ids: IDs of locations to remove markers for
+        """
         if not self.map_ready:
             return
         
-        # Find marker ID for this location
-        marker_id = None
-        for m_id, loc_id in self.markers.items():
-            if loc_id == location_id:
-                marker_id = m_id
-                break
-        
-        if marker_id:
-            # Remove marker from map
-            js_code = f"""
-            window.creepyAI = window.creepyAI || {{}};
-            if (window.creepyAI.removeMarker) {{
-                window.creepyAI.removeMarker("{marker_id}");
-            }}
-            """
-            page = self.web_view.page()
-            if page:
-                page.runJavaScript(js_code)
-            
-            # Remove from our markers dictionary
-            del self.markers[marker_id]
+        removed = self._drop_markers(location_ids)
+        if removed and self._bridge_ready:
+            self.markersRemoved.emit(removed)
     
     def update_location_marker(self, location: Location) -> None:
         """
@@ -331,56 +520,95 @@ class MapController(QObject):
         Args:
             location: Updated location
         """
+        self.update_location_markers([location])
+    
+    def update_location_markers(self, locations: List[Location]) -> None:
+        """
+        Update the markers of several locations; unchanged markers are not resent
+        
+        Args:
+            locations: Updated locations
+        """
         if not self.map_ready:
             return
         
-        # Find marker ID for this location
-        marker_id = None
-        for m_id, loc_id in self.markers.items():
-            if loc_id == location.id:
-                marker_id = m_id
-                break
+        changed = self._place_markers([loc for loc in locations if loc.id in self._location_markers])
+        self._ship_markers(changed)
+    
+    def clear_markers(self) -> None:
+        """
+        Clear all markers from the map
         
-        if marker_id:
-            # Update marker on map
-            marker_options = {
-                "id": marker_id,
-                "lat": location.latitude,
-                "lng": location.longitude,
-                "title": f"{location.source} - {location.timestamp.strftime('%Y-%m-%d %H:%M:%S') if hasattr(location.timestamp, 'strftime') else ''}",
-                "popup": f"<strong>{location.source}</strong><br>{location.address or ''}<br>{location.context or ''}",
-                "source": location.source
+        The marker bookkeeping is cleared even while the map is not ready,
+        so ``marker_details`` and later syncs never see stale markers; only
+        the page update is skipped.
+        """
+        if self.map_ready:
+            js_code = """
+            window.creepyAI = window.creepyAI || {};
+            if (window.creepyAI.clearMarkers) {
+                window.creepyAI.clearMarkers();
             }
-            
-            js_code = f"""
-            window.creepyAI = window.creepyAI || {{}};
-            if (window.creepyAI.updateMarker) {{
-                window.creepyAI.updateMarker({json.dumps(marker_options)});
-            }}
             """
             page = self.web_view.page()
             if page:
                 page.runJavaScript(js_code)
+        
+        # Clear our markers dictionary
+        self.markers = {}
+        self._location_markers = {}
+        self._marker_locations = {}
+        self._marker_signatures = {}
+        self._adhoc_locations = {}
+        self.marker_counter = 0
+        self._send_clusters(None)
+        self._refresh_heatmap()
     
-    def clear_markers(self) -> None:
-        """Clear all markers from the map"""
-        if not self.map_ready:
+    # ------------------------------------------------------------------
+    # Server-side clustering
+    # ------------------------------------------------------------------
+    def _refresh_markers(self) -> None:
+        """Bring the page's markers in line with the model"""
+        if self._server_clustering:
+            self._refresh_clusters()
+        elif self.location_model:
+            self.sync_markers(self.location_model.get_all_locations())
+    
+    def _refresh_clusters(self) -> None:
+        """Show the clusters and lone points inside the current viewport"""
+        if not self._server_clustering or self._viewport is None or not self.location_model:
             return
         
-        js_code = """
-        window.creepyAI = window.creepyAI || {};
-        if (window.creepyAI.clearMarkers) {
-            window.creepyAI.clearMarkers();
-        }
+        result = self._cluster_index.query(*self._viewport)
+        singles = [self.location_model.get_location(location_id) for location_id in result.point_ids]
+        self.sync_markers([location for location in singles if location is not None])
+        self._send_clusters({
+            "keys": [f"{result.zoom}:{key}" for key in result.cluster_keys.tolist()],
+            "lat": np.round(result.cluster_lats, 6).tolist(),
+            "lng": np.round(result.cluster_lons, 6).tolist(),
+            "count": result.cluster_counts.tolist(),
+        })
+    
+    def _send_clusters(self, payload: Optional[Dict[str, Any]]) -> None:
+        """Replace the clusters on the page (None removes them all)"""
+        if payload is None:
+            if self._clusters_payload is None:
+                return
+            payload = {"keys": [], "lat": [], "lng": [], "count": []}
+        self._clusters_payload = payload if payload["keys"] else None
+        if self._bridge_ready:
+            self.clustersReady.emit(payload)
+    
+    def _apply_clustering_mode(self) -> None:
+        js_code = f"""
+        window.creepyAI = window.creepyAI || {{}};
+        if (window.creepyAI.setServerClustering) {{
+            window.creepyAI.setServerClustering({str(self._server_clustering).lower()});
+        }}
         """
         page = self.web_view.page()
         if page:
             page.runJavaScript(js_code)
-        
-        # Clear our markers dictionary
-        self.markers = {}
-        self.marker_details = []
-        self.marker_counter = 0
     
     def set_view(self, lat: float, lng: float, zoom: int = 14) -> None:
         """
@@ -409,6 +637,20 @@ class MapController(QObject):
         if not self.map_ready:
             return
         
+        bounds = self._cluster_index.bounds() if self._server_clustering else None
+        if bounds is not None:
+            # The page only holds the current viewport's markers
+            js_code = f"""
+            window.creepyAI = window.creepyAI || {{}};
+            if (window.creepyAI.fitToBounds) {{
+                window.creepyAI.fitToBounds({bounds[0]}, {bounds[1]}, {bounds[2]}, {bounds[3]});
+            }}
+            """
+            page = self.web_view.page()
+            if page:
+                page.runJavaScript(js_code)
+            return
+        
         js_code = """
         window.creepyAI = window.creepyAI || {};
         if (window.creepyAI.fitBounds) {
@@ -429,12 +671,7 @@ class MapController(QObject):
         if not self.map_ready:
             return
         
-        # Find marker ID for this location
-        marker_id = None
-        for m_id, loc_id in self.markers.items():
-            if loc_id == location_id:
-                marker_id = m_id
-                break
+        marker_id = self._location_markers.get(location_id)
         
         if marker_id:
             # Select marker on map
@@ -450,6 +687,11 @@ class MapController(QObject):
             
             # Store selected marker ID
             self.selected_marker_id = marker_id
+        elif self._server_clustering and self.location_model:
+            # Folded into a cluster or off screen: zoom in until it stands alone
+            location = self.location_model.get_location(location_id)
+            if location is not None:
+                self.set_view(location.latitude, location.longitude, self._cluster_index.max_zoom + 1)
     
     def deselect_marker(self) -> None:
         """Deselect any selected marker"""
@@ -499,6 +741,13 @@ class MapController(QObject):
         Args:
             enabled: Whether to enable heatmap
         """
+        if enabled != self._heatmap_enabled:
+            self._heatmap_enabled = enabled
+            # The tiles are dropped while the layer is off and rebuilt when it comes back
+            if enabled:
+                self._rebuild_heatmap()
+            else:
+                self._reset_heatmap()
         if not self.map_ready:
             return
         
@@ -511,27 +760,107 @@ class MapController(QObject):
         page = self.web_view.page()
         if page:
             page.runJavaScript(js_code)
+        self._refresh_heatmap()
     
-    def toggle_clustering(self, enabled: bool) -> None:
+    def _reset_heatmap(self) -> None:
+        """Forget the heatmap tiles and any queued changes"""
+        self._heatmap.clear()
+        self._heatmap_points = {}
+        self._heatmap_pending = []
+    
+    def _rebuild_heatmap(self) -> None:
+        """Build the heatmap tiles from scratch out of the model's locations"""
+        self._reset_heatmap()
+        if self.location_model:
+            for record in self.location_model.iter_records():
+                self._queue_heatmap_point(record['id'], record['latitude'], record['longitude'])
+    
+    def _queue_heatmap_point(self, location_id: str, lat: Optional[float], lng: Optional[float]) -> None:
         """
-        Toggle marker clustering
+        Record a location's new heatmap position (None to remove it)
+        
+        Nothing is recorded while the heatmap is off. The queue is applied
+        once it reaches ``HEATMAP_FLUSH_SIZE`` changes, so it stays bounded
+        while there is no viewport to draw.
         
         Args:
-            enabled: Whether to enable clustering
+            location_id: ID of the location
+            lat: New latitude, or None if the location was removed
+            lng: New longitude, or None if the location was removed
         """
-        if not self.map_ready:
+        if not self._heatmap_enabled:
             return
+        previous = self._heatmap_points.pop(location_id, None)
+        if previous is not None:
+            self._heatmap_pending.append((previous[0], previous[1], -1))
+        if lat is not None and lng is not None:
+            self._heatmap_points[location_id] = (lat, lng)
+            self._heatmap_pending.append((lat, lng, 1))
+        if len(self._heatmap_pending) >= HEATMAP_FLUSH_SIZE:
+            self._flush_heatmap()
+    
+    def _flush_heatmap(self) -> None:
+        """Apply queued heatmap changes to the tile pyramid in one batch"""
+        if not self._heatmap_pending:
+            return
+        pending, self._heatmap_pending = self._heatmap_pending, []
+        added = [(lat, lng) for lat, lng, sign in pending if sign > 0]
+        removed = [(lat, lng) for lat, lng, sign in pending if sign < 0]
+        if removed:
+            lats, lngs = zip(*removed)
+            self._heatmap.remove_points(lats, lngs)
+        if added:
+            lats, lngs = zip(*added)
+            self._heatmap.add_points(lats, lngs)
+    
+    def _refresh_heatmap(self) -> None:
+        """Send the heatmap cells for the current viewport to the map"""
+        if not self.map_ready or not self._heatmap_enabled or self._viewport is None:
+            return
+        
+        self._flush_heatmap()
+        lats, lngs, counts = self._heatmap.cells_in_bounds(*self._viewport)
+        if len(counts):
+            intensities = counts / counts.max()
+            points = [[round(lat, 6), round(lng, 6), round(weight, 4)]
+                      for lat, lng, weight in zip(lats.tolist(), lngs.tolist(), intensities.tolist())]
+        else:
+            points = []
         
         js_code = f"""
         window.creepyAI = window.creepyAI || {{}};
-        if (window.creepyAI.toggleClustering) {{
-            window.creepyAI.toggleClustering({str(enabled).lower()});
+        if (window.creepyAI.setHeatmapData) {{
+            window.creepyAI.setHeatmapData({json.dumps(points)});
         }}
         """
         page = self.web_view.page()
         if page:
             page.runJavaScript(js_code)
     
+    def toggle_clustering(self, enabled: bool) -> None:
+        """
+        Toggle marker clustering
+        
+        Enabled clustering is computed in Python for the current viewport;
+        disabled clustering sends every marker to the page, which clusters
+        them itself.
+        
+        Args:
+            enabled: Whether to enable clustering
+        """
+        enabled = bool(enabled)
+        if enabled == self._server_clustering:
+            return
+        self._server_clustering = enabled
+        if not self.map_ready:
+            return
+        
+        self._apply_clustering_mode()
+        if not enabled:
+            self._send_clusters(None)
+        self._refresh_markers()
+        self._emit_markers_updated()
+    
     def show_path(self, show: bool = True, 
                  location_ids: Optional[List[str]] = None,
                  color: str = "#3388ff") -> None:
@@ -596,13 +925,11 @@ class MapController(QObject):
             page.runJavaScript(js_code)
 
     def update_map_markers(self) -> None:
-        """Placeholder: refresh marker display based on model and filters."""
+        """Refresh marker display based on the model, sending only the differences."""
         try:
             if not self.map_ready:
                 return
-            # For now, simply re-display all markers if a model exists
-            if self.location_model:
-                self.display_all_locations()
+            self._refresh_markers()
             self._emit_markers_updated()
         except Exception as e:
             logger.warning(f"update_map_markers error: {e}")
@@ -638,6 +965,7 @@ class MapController(QObject):
             location = Location(latitude=lat, longitude=lon, source="Search", context=term)
             # Ensure map is ready before adding
             if self.map_ready:
+                self._adhoc_locations[location.id] = location
                 self.add_location_marker(location)
                 # Center the map on the result with a reasonable zoom
                 self.set_view(lat, lon, zoom=12)
@@ -671,7 +999,11 @@ class MapController(QObject):
     def _emit_markers_updated(self) -> None:
         """Emit markersUpdated with current marker count."""
         try:
-            count = len(self.markers) if isinstance(self.markers, dict) else 0
+            if self._server_clustering and self.location_model is not None:
+                # Most locations are folded into clusters rather than drawn
+                count = len(self._cluster_index) + len(self._adhoc_locations)
+            else:
+                count = len(self.markers) if isinstance(self.markers, dict) else 0
             self.markersUpdated.emit(count)
         except Exception:
             pass
@@ -691,6 +1023,57 @@ class MapController(QObject):
             logger.debug(f"Marker clicked: {marker_id} (location {location_id})")
             self.locationSelected.emit(location_id)
     
+    @pyqtSlot(str, result=str)
+    def markerPopup(self, marker_id: str) -> str:
+        """
+        Popup HTML for a marker, requested by the page when it is opened
+        
+        Args:
+            marker_id: ID of the marker
+        """
+        location = self._marker_locations.get(self.markers.get(marker_id, ""))
+        return self._marker_popup_html(location) if location else ""
+    
+    @pyqtSlot()
+    def handleBridgeReady(self) -> None:
+        """
+        Handle the page connecting to the web channel signals
+        
+        The page starts without markers, so everything known is sent.
+        """
+        # Record the model's markers without shipping them twice
+        self._bridge_ready = False
+        self._refresh_markers()
+        self._bridge_ready = True
+        self._ship_markers(list(self._location_markers), fit=not self._server_clustering)
+        if self._clusters_payload is not None:
+            self.clustersReady.emit(self._clusters_payload)
+        if self._server_clustering:
+            self.fit_bounds()
+        self._emit_markers_updated()
+    
+    @pyqtSlot(str, result=int)
+    def handleClusterExpand(self, cluster_id: str) -> int:
+        """
+        Handle a click on a server-side cluster
+        
+        Args:
+            cluster_id: Cluster key sent with clustersReady ("zoom:key")
+            
+        Returns:
+            Zoom level at which the cluster splits apart
+        """
+        try:
+            zoom, key = (int(part) for part in cluster_id.split(":", 1))
+        except ValueError:
+            logger.warning(f"Invalid cluster id: {cluster_id}")
+            return -1
+        
+        members = self._cluster_index.cluster_members(zoom, key)
+        if members:
+            self.clusterSelected.emit(members)
+        return self._cluster_index.expansion_zoom(zoom, key)
+    
     @pyqtSlot(list)
     def handleClusterClick(self, marker_ids: List[str]) -> None:
         """
@@ -733,6 +1116,22 @@ class MapController(QObject):
         logger.debug(f"Map moved to {lat}, {lng} (zoom {zoom})")
         self.mapMoved.emit(lat, lng, zoom)
     
+    @pyqtSlot(float, float, float, float, int)
+    def handleViewportChange(self, south: float, west: float, north: float, east: float, zoom: int) -> None:
+        """
+        Handle a change of the visible map area from JavaScript
+        
+        Args:
+            south: Southern edge latitude
+            west: Western edge longitude
+            north: Northern edge latitude
+            east: Eastern edge longitude
+            zoom: Zoom level
+        """
+        self._viewport = (south, west, north, east, zoom)
+        self._refresh_clusters()
+        self._refresh_heatmap()
+    
     def _handle_js_console(self, level: int, message: str, line_number: int, source_id: str) -> None:
         """
         Handle JavaScript console messages
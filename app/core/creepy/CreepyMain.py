@@ -220,15 +220,13 @@ class CreepyAIMain(QMainWindow):
         try:
             self.ui.pluginListWidget.clear()
             
-            plugins = self.plugin_manager.get_all_plugins()
-            
-            # Group plugins by category
+            # Listing reads catalog metadata; plugins are only loaded when run
             by_category = {}
-            for name, plugin in plugins.items():
+            for name in self.plugin_manager.get_all_plugins():
                 category = self.plugin_manager.get_category(name)
                 if category not in by_category:
                     by_category[category] = []
-                by_category[category].append((name, plugin))
+                by_category[category].append(name)
             
             # Add plugins by category
             for category in sorted(by_category.keys()):
@@ -241,14 +239,14 @@ class CreepyAIMain(QMainWindow):
                 self.ui.pluginListWidget.addItem(category_item)
                 
                 # Add plugins in this category
-                for name, plugin in sorted(by_category[category]):
+                for name in sorted(by_category[category]):
                     # Create list widget item
                     item = QListWidgetItem(f"  {name}")
                     item.setData(Qt.UserRole, name)  # Store actual plugin name
                     
                     # Add plugin info as tooltip
-                    if hasattr(plugin, 'get_info'):
-                        info = plugin.get_info()
+                    info = self.plugin_manager.get_plugin_info(name)
+                    if info is not None:
                         tooltip = f"{info.get('name', name)} v{info.get('version', '1.0')}\n"
                         tooltip += f"Category: {category}\n"
                         tooltip += f"Author: {info.get('author', 'Unknown')}\n"
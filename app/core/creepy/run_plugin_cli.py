@@ -59,7 +59,7 @@ def parse_arguments():
     parser.add_argument('-l', '--list', action='store_true', 
                       help='List all available plugins')
     parser.add_argument('-p', '--plugin', 
-                      help='Plugin to run')
+                      help='Plugin to run, or several separated by commas to run them concurrently')
     parser.add_argument('-t', '--target', 
                       help='Target for the plugin to work with')
     parser.add_argument('-o', '--output', 
@@ -73,6 +73,9 @@ def parse_arguments():
     parser.add_argument('--to-date', 
                       help='End date filter (YYYY-MM-DD)')
     
+    parser.add_argument('--timeout', type=float,
+                      help='Per-plugin timeout in seconds when running several plugins')
+    
     # Extra arguments that can be passed to plugins
     parser.add_argument('--args', nargs='+',
                       help='Additional arguments passed to the plugin as key=value pairs')
@@ -373,12 +376,18 @@ def load_and_run_plugin(plugin_manager, plugin_id: str, target: str,
     
     start_time = datetime.now()
     
-    # Call with or without extra arguments
+    # Call with or without extra arguments; without them the locations are
+    # read batch by batch so progress shows while the plugin is working
     if extra_args:
         logger.debug(f"Passing extra arguments to plugin: {extra_args}")
         locations = plugin.collect_locations(target, date_from=date_from, date_to=date_to, **extra_args)
     else:
-        locations = plugin.collect_locations(target, date_from=date_from, date_to=date_to)
+        from app.plugins.base_plugin import iter_plugin_locations
+        
+        locations = []
+        for batch in iter_plugin_locations(plugin, target, date_from, date_to):
+            locations.extend(batch)
+            print_info(f"{plugin.name}: +{len(batch)} locations ({len(locations)} total)")
         
     execution_time = (datetime.now() - start_time).total_seconds()
     
@@ -387,6 +396,61 @@ def load_and_run_plugin(plugin_manager, plugin_id: str, target: str,
     
     return locations
 
+def load_and_run_plugins(plugin_manager, plugin_ids: List[str], target: str,
+                         date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                         timeout: Optional[float] = None) -> List[Any]:
+    """
+    Load several plugins and collect from them concurrently.
+    
+    Args:
+        plugin_manager: Instance of PluginsManager
+        plugin_ids: IDs of the plugins to run
+        target: Target for the plugins to process
+        date_from: Optional start date filter
+        date_to: Optional end date filter
+        timeout: Optional per-plugin timeout in seconds
+        
+    Returns:
+        List of location results from every plugin that produced any
+        
+    Raises:
+        ValueError: If a plugin can't be loaded or is not configured
+    """
+    from app.plugins.orchestrator import CollectionJob, CollectionOrchestrator
+    
+    jobs = []
+    for plugin_id in plugin_ids:
+        validate_plugin_id(plugin_id)
+        if 'dummy' in plugin_id.lower():
+            raise ValueError("Cannot run dummy test plugins")
+        plugin = plugin_manager.load_plugin(plugin_id)
+        if not plugin:
+            raise ValueError(f"Plugin '{plugin_id}' could not be loaded")
+        configured, message = plugin.is_configured()
+        if not configured:
+            raise ValueError(f"Plugin '{plugin_id}' is not configured: {message}")
+        jobs.append(CollectionJob(plugin_id, plugin, mode="thread", timeout=timeout))
+    
+    locations: List[Any] = []
+    
+    def on_batch(plugin_id: str, batch: List[Any]) -> None:
+        locations.extend(batch)
+        print_info(f"{plugin_id}: +{len(batch)} locations ({len(locations)} total)")
+    
+    orchestrator = CollectionOrchestrator()
+    orchestrator.subscribe(on_batch)
+    print_info(f"Collecting locations for target: {target} from {len(jobs)} plugins")
+    reports = orchestrator.run(jobs, target, date_from, date_to)
+    
+    for plugin_id, report in reports.items():
+        summary = f"{plugin_id}: {report.status}, {report.points} locations in {report.wall_time:.2f} seconds"
+        if report.status == "completed":
+            print_success(summary)
+        else:
+            print_warning(f"{summary} ({report.error})" if report.error else summary)
+    
+    return locations
+
 def list_available_plugins(plugin_manager) -> int:
     """
     List all available plugins.
@@ -440,15 +504,28 @@ def run_specific_plugin(plugin_manager, args) -> int:
         # Parse date filters
         date_from, date_to = get_date_filters(args.from_date, args.to_date)
         
-        # Run the plugin
-        locations = load_and_run_plugin(
-            plugin_manager,
-            args.plugin,
-            args.target,
-            date_from,
-            date_to,
-            extra_args
-        )
+        plugin_ids = [plugin_id.strip() for plugin_id in args.plugin.split(',') if plugin_id.strip()]
+        if len(plugin_ids) > 1:
+            if extra_args:
+                print_warning("--args is ignored when running several plugins")
+            locations = load_and_run_plugins(
+                plugin_manager,
+                plugin_ids,
+                args.target,
+                date_from,
+                date_to,
+                args.timeout
+            )
+        else:
+            # Run the plugin
+            locations = load_and_run_plugin(
+                plugin_manager,
+                args.plugin,
+                args.target,
+                date_from,
+                date_to,
+                extra_args
+            )
         
         # Display sample locations
         display_location_samples(locations)
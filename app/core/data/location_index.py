@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Secondary indexes for location collections
+Keeps a time-sorted key array for range queries, an interned source column,
+tag postings, a sorted grid-cell array for bounding boxes and the timeline
+histograms, all maintained incrementally as locations are added, replaced
+and removed. Inserts are buffered and merged
+into the sorted arrays on the next query; removals are tombstoned and swept
+out once they outnumber the live entries, so neither costs a full re-sort.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.data.timeline import TimelineAggregator, wall_seconds
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Grid cell size for bounding-box lookups, in degrees
+GRID_CELL_DEGREES = 0.1
+
+_NO_WALL_TIME = np.iinfo(np.int64).min
+
+
+def timestamp_key(value: Optional[datetime]) -> float:
+    """
+    Sortable seconds for a datetime, or NaN when missing
+
+    Naive datetimes are counted from a naive epoch and aware ones from UTC,
+    so a collection that only uses one kind keeps its natural order.
+    """
+    if value is None:
+        return float("nan")
+    if value.tzinfo is None:
+        return (value - _EPOCH).total_seconds()
+    return (value - _EPOCH.replace(tzinfo=timezone.utc)).total_seconds()
+
+
+class _SortedSlots:
+    """Slots ordered by a numeric key, with buffered inserts"""
+
+    def __init__(self, dtype):
+        self._dtype = dtype
+        self.keys = np.empty(0, dtype=dtype)
+        self.slots = np.empty(0, dtype=np.int64)
+        self._pending_keys: List = []
+        self._pending_slots: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots) + len(self._pending_slots)
+
+    def add(self, key, slot: int) -> None:
+        self._pending_keys.append(key)
+        self._pending_slots.append(slot)
+        # Merging costs a pass over the sorted arrays, so let the buffer grow with them
+        if len(self._pending_slots) >= max(4096, len(self.slots)):
+            self.flush()
+
+    def flush(self) -> None:
+        """Merge buffered inserts into the sorted arrays"""
+        if not self._pending_slots:
+            return
+        keys = np.asarray(self._pending_keys, dtype=self._dtype)
+        slots = np.asarray(self._pending_slots, dtype=np.int64)
+        self._pending_keys, self._pending_slots = [], []
+
+        order = np.argsort(keys, kind="stable")
+        keys, slots = keys[order], slots[order]
+        positions = np.searchsorted(self.keys, keys, side="right")
+        self.keys = np.insert(self.keys, positions, keys)
+        self.slots = np.insert(self.slots, positions, slots)
+
+    def compact(self, alive: np.ndarray) -> None:
+        """Drop entries whose slot is no longer alive"""
+        self.flush()
+        keep = alive[self.slots]
+        self.keys = self.keys[keep]
+        self.slots = self.slots[keep]
+
+    def between(self, low, high) -> np.ndarray:
+        """Slots with ``low <= key <= high`` in key order"""
+        self.flush()
+        start = np.searchsorted(self.keys, low, side="left")
+        end = np.searchsorted(self.keys, high, side="right")
+        return self.slots[start:end]
+
+    def between_many(self, lows: np.ndarray, highs: np.ndarray) -> np.ndarray:
+        """Slots inside any of several inclusive key ranges"""
+        self.flush()
+        starts = np.searchsorted(self.keys, lows, side="left")
+        ends = np.searchsorted(self.keys, highs, side="right")
+        lengths = np.maximum(ends - starts, 0)
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # Expand the [start, end) runs into one gather index
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.slots[offsets + np.arange(total)]
+
+
+class LocationIndex:
+    """Time, source, tag and bounding-box indexes keyed by location ID"""
+
+    def __init__(self, cell_degrees: float = GRID_CELL_DEGREES):
+        """
+        Args:
+            cell_degrees: Grid cell size used for bounding-box lookups
+        """
+        self._cell_degrees = cell_degrees
+        self._columns = int(np.ceil(360.0 / cell_degrees))
+        self._rows = int(np.ceil(180.0 / cell_degrees))
+        self.timeline = TimelineAggregator()
+        self.version = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every location"""
+        self.timeline.clear()
+        self.version += 1
+        self._slots: Dict[Hashable, int] = {}
+        self._ids: List[Optional[Hashable]] = []
+        self._tags_of: List[Tuple[str, ...]] = []
+        self._free: List[int] = []
+        self._retired: List[int] = []  # Removed slots still referenced by the sorted arrays
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._times = np.empty(0, dtype=np.float64)
+        self._walls = np.empty(0, dtype=np.int64)  # Wall-clock seconds as counted by the timeline
+        self._source_codes = np.empty(0, dtype=np.int32)  # -1 for no source
+        self._alive = np.empty(0, dtype=bool)
+
+        self._by_time = _SortedSlots(np.float64)
+        self._by_cell = _SortedSlots(np.int64)
+        # Sources are interned into a code column; tags, being sparse, get postings
+        self._source_names: List[str] = []
+        self._source_lookup: Dict[str, int] = {}
+        self._source_counts: Dict[str, int] = {}
+        self._tags: Dict[str, Dict[int, None]] = {}
+        self._posting_arrays: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, location_id: Hashable) -> bool:
+        return location_id in self._slots
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, location_id: Hashable, latitude: float, longitude: float,
+            timestamp: Optional[datetime] = None, source: str = "",
+            tags: Iterable[str] = ()) -> None:
+        """
+        Index a location, replacing any entry with the same ID
+
+        Args:
+            location_id: Location ID
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            timestamp: When the location was recorded
+            source: Source name
+            tags: Tags attached to the location
+        """
+        if location_id in self._slots:
+            self.remove(location_id)
+
+        slot = self._allocate(location_id)
+        tags = tuple(dict.fromkeys(tags)) if tags else ()
+        self._tags_of[slot] = tags
+        self._lats[slot] = latitude
+        self._lons[slot] = longitude
+        key = timestamp_key(timestamp)
+        self._times[slot] = key
+        self._alive[slot] = True
+        self.version += 1
+
+        wall = wall_seconds(timestamp)
+        self._walls[slot] = _NO_WALL_TIME if wall is None else wall
+        if wall is not None:
+            self.timeline.add(wall)
+
+        if not np.isnan(key):
+            self._by_time.add(key, slot)
+        cell = self._cell(latitude, longitude)
+        if cell is not None:
+            self._by_cell.add(cell, slot)
+        if source:
+            code = self._source_lookup.get(source)
+            if code is None:
+                code = self._source_lookup[source] = len(self._source_names)
+                self._source_names.append(source)
+            self._source_codes[slot] = code
+            self._source_counts[source] = self._source_counts.get(source, 0) + 1
+            self._posting_arrays.pop(("source", source), None)
+        else:
+            self._source_codes[slot] = -1
+        for tag in tags:
+            self._post(self._tags, "tag", tag, slot)
+
+    def remove(self, location_id: Hashable) -> bool:
+        """
+        Drop a location from every index
+
+        Returns:
+            False if the location was not indexed
+        """
+        slot = self._slots.pop(location_id, None)
+        if slot is None:
+            return False
+
+        code = int(self._source_codes[slot])
+        if code >= 0:
+            source = self._source_names[code]
+            self._source_counts[source] -= 1
+            if not self._source_counts[source]:
+                del self._source_counts[source]
+            self._posting_arrays.pop(("source", source), None)
+            self._source_codes[slot] = -1
+        for tag in self._tags_of[slot]:
+            self._unpost(self._tags, "tag", tag, slot)
+        if self._walls[slot] != _NO_WALL_TIME:
+            self.timeline.remove(int(self._walls[slot]))
+        self._ids[slot] = None
+        self._tags_of[slot] = ()
+        self._alive[slot] = False
+        self.version += 1
+        self._retired.append(slot)
+
+        if len(self._retired) > max(1024, len(self._slots)):
+            self._compact()
+        return True
+
+    def _allocate(self, location_id: Hashable) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = location_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(location_id)
+            self._tags_of.append(())
+            if slot >= len(self._alive):
+                self._grow(max(1024, 2 * len(self._alive)))
+        self._slots[location_id] = slot
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - len(self._alive)
+        self._lats = np.concatenate((self._lats, np.zeros(extra)))
+        self._lons = np.concatenate((self._lons, np.zeros(extra)))
+        self._times = np.concatenate((self._times, np.zeros(extra)))
+        self._walls = np.concatenate((self._walls, np.zeros(extra, dtype=np.int64)))
+        self._source_codes = np.concatenate((self._source_codes, np.full(extra, -1, dtype=np.int32)))
+        self._alive = np.concatenate((self._alive, np.zeros(extra, dtype=bool)))
+
+    def _compact(self) -> None:
+        """Sweep removed slots out of the sorted arrays so they can be reused"""
+        self._by_time.compact(self._alive)
+        self._by_cell.compact(self._alive)
+        self._free.extend(self._retired)
+        self._retired = []
+
+    def _post(self, postings, kind: str, term: str, slot: int) -> None:
+        postings.setdefault(term, {})[slot] = None
+        self._posting_arrays.pop((kind, term), None)
+
+    def _unpost(self, postings, kind: str, term: str, slot: int) -> None:
+        members = postings.get(term)
+        if members is None:
+            return
+        members.pop(slot, None)
+        if not members:
+            del postings[term]
+        self._posting_arrays.pop((kind, term), None)
+
+    def _cell(self, latitude: float, longitude: float) -> Optional[int]:
+        if not (np.isfinite(latitude) and np.isfinite(longitude)):
+            return None
+        row = min(self._rows - 1, max(0, int((latitude + 90.0) // self._cell_degrees)))
+        column = min(self._columns - 1, max(0, int((longitude + 180.0) // self._cell_degrees)))
+        return row * self._columns + column
+
+    # ------------------------------------------------------------------
+    # Term lookups
+    # ------------------------------------------------------------------
+    def sources(self) -> Dict[str, int]:
+        """Number of locations per source"""
+        return dict(self._source_counts)
+
+    def tags(self) -> Dict[str, int]:
+        """Number of locations per tag"""
+        return {tag: len(members) for tag, members in self._tags.items()}
+
+    def _posting_slots(self, postings, kind: str, term: str) -> np.ndarray:
+        cached = self._posting_arrays.get((kind, term))
+        if cached is None:
+            members = postings.get(term, {})
+            cached = np.fromiter(members, dtype=np.int64, count=len(members))
+            self._posting_arrays[(kind, term)] = cached
+        return cached
+
+    def _source_slots(self, source: str) -> np.ndarray:
+        cached = self._posting_arrays.get(("source", source))
+        if cached is None:
+            code = self._source_lookup.get(source)
+            if code is None or source not in self._source_counts:
+                cached = np.empty(0, dtype=np.int64)
+            else:
+                cached = np.flatnonzero(self._source_codes == code)
+            self._posting_arrays[("source", source)] = cached
+        return cached
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def ids_for_source(self, source: str) -> List[Hashable]:
+        """IDs of the locations from a source, in index order"""
+        return self._to_ids(self._source_slots(source))
+
+    def ids_for_tag(self, tag: str) -> List[Hashable]:
+        """IDs of the locations carrying a tag, in insertion order"""
+        return self._to_ids(self._posting_slots(self._tags, "tag", tag))
+
+    def ids_in_time_range(self, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> List[Hashable]:
+        """IDs of the locations recorded between two inclusive bounds, oldest first"""
+        return self._to_ids(self._time_slots(start, end))
+
+    def ids_in_bounds(self, min_lat: float, min_lon: float,
+                      max_lat: float, max_lon: float) -> List[Hashable]:
+        """IDs of the locations inside a latitude/longitude box"""
+        return self._to_ids(np.sort(self._bounds_slots(min_lat, min_lon, max_lat, max_lon)))
+
+    def query(self, source: Optional[str] = None, tag: Optional[str] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              bounds: Optional[Sequence[float]] = None) -> List[Hashable]:
+        """
+        IDs matching every given criterion
+
+        Args:
+            source: Source name
+            tag: Tag
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (inclusive)
+            bounds: (min_lat, min_lon, max_lat, max_lon)
+
+        Returns:
+            Matching IDs, oldest first when a time range is given
+        """
+        timed = start is not None or end is not None
+        candidates: List[np.ndarray] = []
+        if timed:
+            candidates.append(self._time_slots(start, end))
+        if source is not None:
+            candidates.append(self._source_slots(source))
+        if tag is not None:
+            candidates.append(self._posting_slots(self._tags, "tag", tag))
+        if bounds is not None:
+            candidates.append(self._bounds_slots(*bounds))
+        if not candidates:
+            return [location_id for location_id in self._ids if location_id is not None]
+
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            if not len(result):
+                break
+            member = np.zeros(len(self._alive), dtype=bool)
+            member[other] = True
+            result = result[member[result]]
+        if timed:
+            result = result[np.argsort(self._times[result], kind="stable")]
+        else:
+            result = np.sort(result)
+        return self._to_ids(result)
+
+    def _time_slots(self, start: Optional[datetime], end: Optional[datetime]) -> np.ndarray:
+        low = -np.inf if start is None else timestamp_key(start)
+        high = np.inf if end is None else timestamp_key(end)
+        slots = self._by_time.between(low, high)
+        return slots[self._alive[slots]]
+
+    def _bounds_slots(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        if min_lat > max_lat or min_lon > max_lon or not self._slots:
+            return np.empty(0, dtype=np.int64)
+
+        first = self._cell(max(min_lat, -90.0), max(min_lon, -180.0))
+        last = self._cell(min(max_lat, 90.0), min(max_lon, 180.0))
+        first_row, first_column = divmod(first, self._columns)
+        last_row, last_column = divmod(last, self._columns)
+        rows = np.arange(first_row, last_row + 1, dtype=np.int64)
+        if len(rows) * (last_column - first_column + 1) >= len(self._by_cell):
+            # Box covers more cells than there are points: scan the columns
+            lats, lons = self._lats, self._lons
+            inside = self._alive & (lats >= min_lat) & (lats <= max_lat)
+            inside &= (lons >= min_lon) & (lons <= max_lon)
+            return np.flatnonzero(inside)
+
+        slots = self._by_cell.between_many(rows * self._columns + first_column,
+                                           rows * self._columns + last_column)
+        slots = slots[self._alive[slots]]
+        lats, lons = self._lats[slots], self._lons[slots]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return slots[inside]
+
+    def _to_ids(self, slots: np.ndarray) -> List[Hashable]:
+        ids = self._ids
+        return [ids[slot] for slot in slots.tolist()]
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Columnar storage for large location collections
+Coordinates and timestamps are kept in NumPy columns, sources are interned
+into small integer codes and optional per-location fields (metadata,
+geocoding, photos, notes, ...) are only allocated for the rows that have
+them. Callers get lightweight view objects on demand; the store keeps a
+weak reference to each live view so that removing a row hands the view a
+copy of its data instead of leaving it pointing at a reused slot.
+"""
+
+import threading
+import weakref
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Timestamps are stored as microseconds from the epoch; this marks "no timestamp"
+MISSING_TIME = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Fields held in columns; anything else is an optional extra
+CORE_FIELDS = ("id", "latitude", "longitude", "timestamp", "source", "context")
+
+
+class LocationStore:
+    """Struct-of-arrays table of locations with on-demand row views"""
+
+    def __init__(self, view_factory: Callable[["LocationStore", int], Any]):
+        """
+        Args:
+            view_factory: Creates the view object for a row; views must
+                support weak references and expose ``_store``/``_row`` and
+                a ``_detach(record)`` method
+        """
+        self._view_factory = view_factory
+        # Held while the containers are swapped for new ones, so that
+        # ``column`` on another thread never pairs old ones with new ones
+        self._swap_lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every row, detaching live views"""
+        for row in list(getattr(self, "_views", {})):
+            self._detach_view(row)
+        with self._swap_lock:
+            self._reset_containers()
+
+    def _reset_containers(self) -> None:
+        self._ids: List[Optional[Hashable]] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._times = np.empty(0, dtype=np.int64)
+        self._zones = np.empty(0, dtype=np.int16)  # Index into _zone_names, -1 for naive
+        self._sources = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._contexts: List[Optional[str]] = []
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        self._source_names: List[str] = []
+        self._source_codes: Dict[str, int] = {}
+        self._zone_names: List[tzinfo] = []
+        self._zone_codes: Dict[tzinfo, int] = {}
+        self._views: Dict[int, _ViewRef] = {}
+        self._views_peak = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, location_id: Hashable) -> bool:
+        return location_id in self._rows
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+    def row_of(self, location_id: Hashable) -> Optional[int]:
+        """Row holding a location ID, or None"""
+        return self._rows.get(location_id)
+
+    def rows(self) -> Iterator[int]:
+        """Live rows in insertion order"""
+        return iter(self._rows.values())
+
+    def ids(self) -> List[Hashable]:
+        """Live location IDs in insertion order"""
+        return list(self._rows)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Add a row
+
+        Args:
+            record: Core fields plus any extras; an ID already present is
+                rejected
+
+        Returns:
+            The new row
+        """
+        location_id = record["id"]
+        if location_id in self._rows:
+            raise KeyError(f"Duplicate location ID: {location_id}")
+        row = len(self._ids)
+        if row >= len(self._alive):
+            self._grow(max(1024, 2 * len(self._alive)))
+        self._ids.append(location_id)
+        self._contexts.append(None)
+        self._rows[location_id] = row
+        self._alive[row] = True
+        self.write(row, record)
+        return row
+
+    def write(self, row: int, record: Dict[str, Any]) -> None:
+        """Overwrite a row's fields (the ID stays the same)"""
+        self._lats[row] = record["latitude"]
+        self._lons[row] = record["longitude"]
+        self._set_time(row, record.get("timestamp"))
+        self._sources[row] = self._source_code(record.get("source") or "")
+        self._contexts[row] = record.get("context") or None
+        extras = {
+            name: value for name, value in record.items()
+            if name not in CORE_FIELDS and value is not None
+        }
+        if extras:
+            self._extras[row] = extras
+        else:
+            self._extras.pop(row, None)
+
+    def delete(self, row: int) -> None:
+        """Remove a row; a live view keeps a detached copy of its data"""
+        self._detach_view(row)
+        location_id = self._ids[row]
+        del self._rows[location_id]
+        self._ids[row] = None
+        self._contexts[row] = None
+        self._extras.pop(row, None)
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead > max(1024, len(self._rows)):
+            self._compact()
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """All fields of a row as a plain dictionary"""
+        record = {name: self.get(row, name) for name in CORE_FIELDS}
+        record.update(self._extras.get(row, {}))
+        return record
+
+    def _grow(self, capacity: int) -> None:
+        with self._swap_lock:
+            self._grow_columns(capacity)
+
+    def _grow_columns(self, capacity: int) -> None:
+        extra = capacity - len(self._alive)
+        self._lats = np.concatenate((self._lats, np.zeros(extra)))
+        self._lons = np.concatenate((self._lons, np.zeros(extra)))
+        self._times = np.concatenate((self._times, np.zeros(extra, dtype=np.int64)))
+        self._zones = np.concatenate((self._zones, np.zeros(extra, dtype=np.int16)))
+        self._sources = np.concatenate((self._sources, np.zeros(extra, dtype=np.int32)))
+        self._alive = np.concatenate((self._alive, np.zeros(extra, dtype=bool)))
+
+    def _compact(self) -> None:
+        """Squeeze out deleted rows, keeping insertion order"""
+        count = len(self._ids)
+        keep = np.flatnonzero(self._alive[:count])
+        remap = np.full(count, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        kept = keep.tolist()
+        ids = [self._ids[row] for row in kept]
+        columns = {name: getattr(self, name)[keep]
+                   for name in ("_lats", "_lons", "_times", "_zones", "_sources", "_alive")}
+        contexts = [self._contexts[row] for row in kept]
+        rows = {location_id: row for row, location_id in enumerate(ids)}
+        extras = {int(remap[row]): extras for row, extras in self._extras.items()}
+        with self._swap_lock:
+            for name, column in columns.items():
+                setattr(self, name, column)
+            self._ids, self._contexts, self._rows, self._extras = ids, contexts, rows, extras
+
+        views = {}
+        for row, ref in list(self._views.items()):
+            view = ref()
+            if view is not None and view._store is self and view._row == row:
+                view._row = ref.row = int(remap[row])
+                views[view._row] = ref
+        self._views = views
+        self._dead = 0
+
+    # ------------------------------------------------------------------
+    # Fields
+    # ------------------------------------------------------------------
+    def get(self, row: int, name: str) -> Any:
+        """Read one field of a row; missing extras read as None"""
+        if name == "latitude":
+            return float(self._lats[row])
+        if name == "longitude":
+            return float(self._lons[row])
+        if name == "timestamp":
+            return self._get_time(row)
+        if name == "source":
+            return self._source_names[self._sources[row]]
+        if name == "context":
+            return self._contexts[row] or ""
+        if name == "id":
+            return self._ids[row]
+        extras = self._extras.get(row)
+        return extras.get(name) if extras else None
+
+    def set(self, row: int, name: str, value: Any) -> None:
+        """Write one field of a row; setting an extra to None drops it"""
+        if name == "latitude":
+            self._lats[row] = value
+        elif name == "longitude":
+            self._lons[row] = value
+        elif name == "timestamp":
+            self._set_time(row, value)
+        elif name == "source":
+            self._sources[row] = self._source_code(value or "")
+        elif name == "context":
+            self._contexts[row] = value or None
+        elif name == "id":
+            if value != self._ids[row]:
+                if value in self._rows:
+                    raise KeyError(f"Duplicate location ID: {value}")
+                del self._rows[self._ids[row]]
+                self._rows[value] = row
+                self._ids[row] = value
+        elif value is None:
+            extras = self._extras.get(row)
+            if extras:
+                extras.pop(name, None)
+                if not extras:
+                    del self._extras[row]
+        else:
+            self._extras.setdefault(row, {})[name] = value
+
+    def _source_code(self, source: str) -> int:
+        code = self._source_codes.get(source)
+        if code is None:
+            code = len(self._source_names)
+            self._source_names.append(source)
+            self._source_codes[source] = code
+        return code
+
+    def _set_time(self, row: int, value: Optional[datetime]) -> None:
+        if value is None:
+            self._times[row] = MISSING_TIME
+            self._zones[row] = -1
+        elif value.tzinfo is None:
+            self._times[row] = (value - _EPOCH) // _MICROSECOND
+            self._zones[row] = -1
+        else:
+            zone = value.tzinfo
+            code = self._zone_codes.get(zone)
+            if code is None:
+                code = len(self._zone_names)
+                self._zone_names.append(zone)
+                self._zone_codes[zone] = code
+            self._times[row] = (value - _EPOCH_UTC) // _MICROSECOND
+            self._zones[row] = code
+
+    def _get_time(self, row: int) -> Optional[datetime]:
+        micros = int(self._times[row])
+        if micros == MISSING_TIME:
+            return None
+        zone = int(self._zones[row])
+        if zone < 0:
+            return _EPOCH + timedelta(microseconds=micros)
+        return (_EPOCH_UTC + timedelta(microseconds=micros)).astimezone(self._zone_names[zone])
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    def live_rows(self) -> np.ndarray:
+        """Live rows in insertion order, as an array"""
+        return np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+
+    def coordinates(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitude and longitude columns for some rows"""
+        return self._lats[rows], self._lons[rows]
+
+    def column(self, location_ids: Sequence[Hashable], name: str) -> np.ndarray:
+        """
+        One field of several locations, as an array
+
+        Reads the containers as they were when the call started (compaction
+        swaps in new ones, under a lock, rather than rewriting them), so a
+        worker thread can gather sort keys while the owning thread keeps
+        changing rows.
+
+        Args:
+            location_ids: Location IDs; unknown ones read as missing
+            name: Field name
+
+        Returns:
+            Float array for coordinates and timestamps (sortable seconds as
+            in ``location_index.timestamp_key``, NaN when missing), object
+            array (None when missing) for everything else
+        """
+        with self._swap_lock:
+            rows_of, times, sources = self._rows, self._times, self._sources
+            contexts, extras = self._contexts, self._extras
+            columns = {"latitude": self._lats, "longitude": self._lons}
+            source_names = list(self._source_names)
+
+        rows = np.fromiter((rows_of.get(location_id, -1) for location_id in location_ids),
+                           dtype=np.int64, count=len(location_ids))
+        # Rows appended after the columns were captured fall outside them
+        rows[rows >= min(len(times), len(contexts))] = -1
+        found = rows >= 0
+        if name in columns or name == "timestamp":
+            values = np.full(len(rows), np.nan)
+            if name == "timestamp":
+                micros = times[rows[found]]
+                seconds = micros / 1e6
+                seconds[micros == MISSING_TIME] = np.nan
+                values[found] = seconds
+            else:
+                values[found] = columns[name][rows[found]]
+            return values
+
+        values = np.empty(len(rows), dtype=object)
+        if name == "source":
+            names = np.empty(len(source_names), dtype=object)
+            names[:] = source_names
+            values[found] = names[sources[rows[found]]]
+        elif name == "context":
+            values[:] = [contexts[row] or "" if row >= 0 else None for row in rows.tolist()]
+        elif name == "id":
+            values[found] = np.asarray(location_ids, dtype=object)[found]
+        else:
+            values[:] = [(extras.get(row) or {}).get(name) if row >= 0 else None for row in rows.tolist()]
+        return values
+
+    def source_names(self) -> List[str]:
+        """Interned source names (the values of the source codes)"""
+        return list(self._source_names)
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+    def view(self, row: int) -> Any:
+        """The view object for a row, reusing a live one when possible"""
+        ref = self._views.get(row)
+        view = ref() if ref is not None else None
+        if view is None or view._store is not self or view._row != row:
+            view = self._view_factory(self, row)
+            self.bind(row, view)
+        return view
+
+    def bind(self, row: int, view: Any) -> None:
+        """Make an object the view of a row, detaching the previous one"""
+        ref = self._views.get(row)
+        previous = ref() if ref is not None else None
+        if previous is not None and previous is not view:
+            self._detach_view(row)
+        view._store = self
+        view._row = row
+        self._views[row] = _ViewRef(view, self._view_released, row)
+        self._views_peak = max(self._views_peak, len(self._views))
+
+    def _detach_view(self, row: int) -> None:
+        ref = self._views.pop(row, None)
+        view = ref() if ref is not None else None
+        if view is not None and view._store is self and view._row == row:
+            view._detach(self.record(row))
+
+    def _view_released(self, ref: "_ViewRef") -> None:
+        if self._views.get(ref.row) is ref:
+            del self._views[ref.row]
+            if self._views_peak > 1024 and len(self._views) < self._views_peak // 8:
+                # Dicts never shrink on their own; drop the space a burst of views left behind
+                self._views = dict(self._views)
+                self._views_peak = len(self._views)
+
+
+class _ViewRef(weakref.ref):
+    """Weak reference to a view that remembers its row"""
+
+    __slots__ = ("row",)
+
+    def __new__(cls, view, callback, row):
+        return super().__new__(cls, view, callback)
+
+    def __init__(self, view, callback, row):
+        super().__init__(view, callback)
+        self.row = row
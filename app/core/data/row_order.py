@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sorted row orders for virtual list and table models
+A ``RowOrder`` is the permutation a view shows: the IDs of the rows that
+passed the filter, sorted by one key. It is built in one vectorised pass
+(on a worker thread, through ``OrderBuilder``) and then kept current by
+inserting and removing entries at their sorted positions. Changes are
+planned as runs of adjacent display rows so an item model can announce
+each run with a single begin/end insert or remove call.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Applying a run copies the whole order, so past this many runs a model is
+# better off resetting than announcing each run
+MAX_RUNS = 64
+
+
+class RowRun(NamedTuple):
+    """Adjacent display rows inserted or removed together"""
+    first: int  # Display row of the first entry
+    count: int
+    ids: np.ndarray  # In display order
+    keys: np.ndarray
+
+
+def _as_array(values: Iterable[Any]) -> np.ndarray:
+    """Numbers as a numeric array, anything else (strings, IDs) as an object array"""
+    if isinstance(values, np.ndarray):
+        return values
+    values = list(values)
+    array = np.asarray(values) if values else np.empty(0, dtype=np.float64)
+    if array.ndim == 1 and array.dtype.kind in "iuf":
+        return array
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class RowOrder:
+    """IDs kept sorted by a key, shown ascending or descending"""
+
+    def __init__(self, ids: Iterable[Hashable] = (), keys: Optional[Iterable[Any]] = None,
+                 descending: bool = False):
+        """
+        Args:
+            ids: Row IDs in their natural order
+            keys: Sort key of each ID; None keeps the natural order
+            descending: Show the largest keys first
+        """
+        ids = _as_array(ids)
+        if keys is None:
+            keys = np.arange(len(ids), dtype=np.float64)
+        keys = _as_array(keys)
+        if len(keys) != len(ids):
+            raise ValueError("ids and keys must have the same length")
+        order = np.argsort(keys, kind="stable")
+        # Stored ascending; descending orders only change how rows map to positions
+        self._ids = ids[order]
+        self._keys = keys[order]
+        self.descending = descending
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _position(self, row: int) -> int:
+        return len(self._ids) - 1 - row if self.descending else row
+
+    def id_at(self, row: int) -> Hashable:
+        """ID shown at a display row"""
+        value = self._ids[self._position(row)]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def key_at(self, row: int) -> Any:
+        """Sort key of the entry at a display row"""
+        value = self._keys[self._position(row)]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def ids(self) -> List[Hashable]:
+        """Every ID in display order"""
+        ids = self._ids[::-1] if self.descending else self._ids
+        return ids.tolist()
+
+    def _adopt(self, ids: Iterable[Hashable], keys: Iterable[Any]):
+        ids, keys = _as_array(ids), _as_array(keys)
+        if len(ids) != len(keys):
+            raise ValueError("ids and keys must have the same length")
+        if not len(self._ids) and len(ids):
+            # An empty order takes its types from the first entries
+            self._ids = self._ids.astype(ids.dtype)
+            self._keys = self._keys.astype(keys.dtype)
+        return ids, keys
+
+    def _positions_of(self, ids: Iterable[Hashable]) -> np.ndarray:
+        if self._ids.dtype != object:
+            return np.flatnonzero(np.isin(self._ids, _as_array(ids)))
+        wanted = set(ids)
+        if not wanted:
+            return np.empty(0, dtype=np.int64)
+        return np.fromiter(
+            (position for position, value in enumerate(self._ids.tolist()) if value in wanted),
+            dtype=np.int64,
+        )
+
+    def rows_of(self, ids: Iterable[Hashable]) -> np.ndarray:
+        """Display rows of the given IDs that are present, ascending"""
+        positions = self._positions_of(ids)
+        if self.descending:
+            return (len(self._ids) - 1 - positions)[::-1]
+        return positions
+
+    # ------------------------------------------------------------------
+    # Incremental changes
+    # ------------------------------------------------------------------
+    def plan_insert(self, ids: Iterable[Hashable], keys: Iterable[Any]) -> List[RowRun]:
+        """
+        Split new entries into runs of adjacent display rows
+
+        Returns:
+            Runs in ascending display order; applying them one after the
+            other with ``apply_insert`` keeps every run's ``first`` valid
+        """
+        ids, keys = self._adopt(ids, keys)
+        if not len(ids):
+            return []
+        order = np.argsort(keys, kind="stable")
+        ids, keys = ids[order], keys[order]
+        # Final positions once everything is in
+        final = np.searchsorted(self._keys, keys, side="right") + np.arange(len(keys))
+        if self.descending:
+            final = len(self._ids) + len(keys) - 1 - final
+            ids, keys, final = ids[::-1], keys[::-1], final[::-1]
+        breaks = np.flatnonzero(np.diff(final) != 1) + 1
+        runs = []
+        for chunk in np.split(np.arange(len(final)), breaks):
+            runs.append(RowRun(int(final[chunk[0]]), len(chunk), ids[chunk], keys[chunk]))
+        return runs
+
+    def apply_insert(self, run: RowRun) -> None:
+        """Insert one run planned by ``plan_insert``"""
+        ids, keys = run.ids, run.keys
+        if self.descending:
+            position = len(self._ids) - run.first
+            ids, keys = ids[::-1], keys[::-1]
+        else:
+            position = run.first
+        self._ids = np.insert(self._ids, position, ids)
+        self._keys = np.insert(self._keys, position, keys)
+
+    def plan_remove(self, ids: Iterable[Hashable]) -> List[RowRun]:
+        """
+        Find the display runs held by some IDs; absent IDs are ignored
+
+        Returns:
+            Runs in descending display order, so applying them one after
+            the other with ``apply_remove`` keeps every run's ``first`` valid
+        """
+        rows = self.rows_of(ids)
+        if not len(rows):
+            return []
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        runs = []
+        for chunk in reversed(np.split(rows, breaks)):
+            start, stop = self._span(int(chunk[0]), len(chunk))
+            ids, keys = self._ids[start:stop], self._keys[start:stop]
+            if self.descending:
+                ids, keys = ids[::-1], keys[::-1]
+            runs.append(RowRun(int(chunk[0]), len(chunk), ids, keys))
+        return runs
+
+    def _span(self, first: int, count: int):
+        """Internal [start, stop) holding some adjacent display rows"""
+        if self.descending:
+            return len(self._ids) - first - count, len(self._ids) - first
+        return first, first + count
+
+    def apply_remove(self, run: RowRun) -> None:
+        """Remove one run planned by ``plan_remove``"""
+        start, stop = self._span(run.first, run.count)
+        self._ids = np.delete(self._ids, np.s_[start:stop])
+        self._keys = np.delete(self._keys, np.s_[start:stop])
+
+    def insert(self, ids: Iterable[Hashable], keys: Iterable[Any]) -> None:
+        """Insert entries at their sorted positions in one pass"""
+        ids, keys = self._adopt(ids, keys)
+        if not len(ids):
+            return
+        order = np.argsort(keys, kind="stable")
+        ids, keys = ids[order], keys[order]
+        positions = np.searchsorted(self._keys, keys, side="right")
+        self._ids = np.insert(self._ids, positions, ids)
+        self._keys = np.insert(self._keys, positions, keys)
+
+    def remove(self, ids: Iterable[Hashable]) -> int:
+        """Remove entries by ID in one pass; returns how many were present"""
+        positions = self._positions_of(ids)
+        if len(positions):
+            self._ids = np.delete(self._ids, positions)
+            self._keys = np.delete(self._keys, positions)
+        return len(positions)
+
+
+class OrderBuilder:
+    """Builds row orders on a worker thread, dropping superseded results"""
+
+    def __init__(self, deliver: Callable[[int, Optional[RowOrder]], None]):
+        """
+        Args:
+            deliver: Called on the worker thread with the request number
+                and the built order (None if the build failed); Qt models
+                pass a signal's ``emit`` so the result reaches their thread
+        """
+        self._deliver = deliver
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="row-order")
+        self._lock = threading.Lock()
+        self._latest = 0
+
+    def submit(self, build: Callable[[], RowOrder]) -> int:
+        """
+        Queue a build; any earlier request still queued is skipped
+
+        Returns:
+            The request number ``deliver`` will be called with
+        """
+        with self._lock:
+            self._latest += 1
+            request = self._latest
+        self._executor.submit(self._run, request, build)
+        return request
+
+    def is_current(self, request: int) -> bool:
+        """Whether no newer build has been requested since"""
+        return request == self._latest
+
+    def _run(self, request: int, build: Callable[[], RowOrder]) -> None:
+        if not self.is_current(request):
+            return
+        try:
+            order = build()
+        except Exception:
+            logger.exception("Failed to build row order")
+            order = None
+        if self.is_current(request):
+            self._deliver(request, order)
+
+    def shutdown(self) -> None:
+        """Stop the worker thread once the running build finishes"""
+        with self._lock:
+            self._latest += 1
+        self._executor.shutdown(wait=False)
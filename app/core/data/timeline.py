@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Timeline histograms for location collections
+Timestamps are kept as wall-clock epoch seconds and binned with NumPy for
+each grouping the timeline offers. Additions and removals are buffered and
+folded into the stored histograms the next time one is read, so a refresh
+after a batch of new points costs a pass over the batch, not the whole
+collection. Results are cached until the data changes again.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+GROUPINGS = ("day", "week", "month", "year", "hour", "weekday")
+
+# Groupings whose bins repeat, with the number of bins
+CYCLIC_BINS = {"hour": 24, "weekday": 7}
+
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def wall_seconds(value: Optional[datetime]) -> Optional[int]:
+    """Seconds from the epoch of a datetime's wall-clock reading, ignoring its time zone"""
+    if value is None:
+        return None
+    return (value.replace(tzinfo=None) - _EPOCH) // timedelta(seconds=1)
+
+
+def bin_seconds(seconds: np.ndarray, grouping: str) -> np.ndarray:
+    """
+    Bin wall-clock seconds
+
+    Args:
+        seconds: Epoch seconds
+        grouping: One of ``GROUPINGS``
+
+    Returns:
+        Integer bins: days/ISO weeks/months/years since the epoch, hour of
+        day (0-23) or day of week (0 = Monday)
+    """
+    days = np.floor_divide(np.asarray(seconds, dtype=np.int64), _SECONDS_PER_DAY)
+    if grouping == "day":
+        return days
+    if grouping == "week":
+        # 1970-01-01 was a Thursday, so Monday-based weeks start three days earlier
+        return np.floor_divide(days + 3, 7)
+    if grouping == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    if grouping == "year":
+        return days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+    if grouping == "hour":
+        return np.floor_divide(np.asarray(seconds, dtype=np.int64), 3600) % 24
+    if grouping == "weekday":
+        return (days + 3) % 7
+    raise ValueError(f"Unknown timeline grouping: {grouping}")
+
+
+def bin_label(grouping: str, value: int) -> str:
+    """Display label of a bin produced by ``bin_seconds``"""
+    value = int(value)
+    if grouping == "day":
+        return (_EPOCH_DATE + timedelta(days=value)).strftime("%Y-%m-%d")
+    if grouping == "week":
+        year, week, _ = (_EPOCH_DATE + timedelta(days=value * 7 - 3)).isocalendar()
+        return f"{year}-W{week:02d}"
+    if grouping == "month":
+        year, month = divmod(value, 12)
+        return f"{1970 + year:04d}-{month + 1:02d}"
+    if grouping == "year":
+        return str(1970 + value)
+    if grouping == "hour":
+        return f"{value:02d}:00"
+    if grouping == "weekday":
+        return DAY_NAMES[value]
+    raise ValueError(f"Unknown timeline grouping: {grouping}")
+
+
+class TimelineAggregator:
+    """Multiset of wall-clock timestamps with per-grouping histograms"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every timestamp"""
+        # grouping -> (sorted bins, counts)
+        self._histograms: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            grouping: (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)) for grouping in GROUPINGS
+        }
+        self._pending: List[int] = []  # Seconds to fold in
+        self._signs: List[int] = []  # +1 added / -1 removed
+        self._cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.total = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def add(self, seconds: int) -> None:
+        """Count one timestamp (wall-clock epoch seconds)"""
+        self._pending.append(seconds)
+        self._signs.append(1)
+        self.total += 1
+        self._changed()
+
+    def remove(self, seconds: int) -> None:
+        """Uncount a timestamp previously added"""
+        self._pending.append(seconds)
+        self._signs.append(-1)
+        self.total -= 1
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._cache = {}
+        if len(self._pending) >= 65536:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        seconds = np.asarray(self._pending, dtype=np.int64)
+        signs = np.asarray(self._signs, dtype=np.int64)
+        self._pending, self._signs = [], []
+        self._fold(seconds, signs)
+
+    def _fold(self, seconds: np.ndarray, signs: np.ndarray) -> None:
+        for grouping in GROUPINGS:
+            old_bins, old_counts = self._histograms[grouping]
+            bins, inverse = np.unique(
+                np.concatenate((old_bins, bin_seconds(seconds, grouping))), return_inverse=True
+            )
+            counts = np.bincount(
+                inverse, weights=np.concatenate((old_counts, signs)), minlength=len(bins)
+            ).astype(np.int64)
+            keep = counts > 0
+            self._histograms[grouping] = (bins[keep], counts[keep])
+
+    def histogram(self, grouping: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Counts per bin for a grouping
+
+        Args:
+            grouping: One of ``GROUPINGS``
+
+        Returns:
+            Tuple of (bins, counts) in bin order. Cyclic groupings (hour of
+            day, day of week) list every bin, the others only occupied ones.
+        """
+        if grouping not in self._histograms:
+            raise ValueError(f"Unknown timeline grouping: {grouping}")
+        cached = self._cache.get(grouping)
+        if cached is not None:
+            return cached
+
+        self._flush()
+        bins, counts = self._histograms[grouping]
+        size = CYCLIC_BINS.get(grouping)
+        if size is not None:
+            dense = np.zeros(size, dtype=np.int64)
+            dense[bins] = counts
+            bins, counts = np.arange(size, dtype=np.int64), dense
+        bins.setflags(write=False)
+        counts.setflags(write=False)
+        self._cache[grouping] = (bins, counts)
+        return bins, counts
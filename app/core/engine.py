@@ -9,10 +9,12 @@ unexpected errors and emitting structured logging messages.
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
 if TYPE_CHECKING:  # pragma: no cover - imported for type checking only
+    from app.plugins.orchestrator import PluginRunReport
     from app.plugins.plugin_manager import PluginManager
 
 
@@ -118,6 +120,25 @@ class Engine:
             logger.exception("Error executing plugin '%s': %s", plugin_name, exc)
             return None
 
+    def collect_locations(self, plugin_names: Iterable[str], target: str,
+                          date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                          **kwargs: Any) -> Dict[str, "PluginRunReport"]:
+        """Collect locations from several plugins concurrently.
+
+        Keyword arguments (``on_batch``, ``timeout``, ``orchestrator``) are
+        passed to :meth:`PluginManager.collect_from_plugins`.
+        """
+
+        if self.plugin_manager is None:
+            logger.error("Plugin manager not initialised")
+            return {}
+
+        try:
+            return self.plugin_manager.collect_from_plugins(plugin_names, target, date_from, date_to, **kwargs)
+        except Exception as exc:
+            logger.exception("Error collecting locations from plugins: %s", exc)
+            return {}
+
     def set_plugin_manager(self, manager: "PluginManager") -> None:
         """Inject a pre-configured plugin manager instance."""
 
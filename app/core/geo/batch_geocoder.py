@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch geocoding for CreepyAI.
+Normalises and deduplicates addresses, answers what it can from the cache and
+offline lookups, then spreads the remaining misses over the configured
+providers, each throttled by its own token bucket.
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_address(address: str) -> str:
+    """Canonical form used to deduplicate address queries"""
+    return _WHITESPACE.sub(' ', address).strip().strip(',').strip().lower()
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            stop: Event that aborts the wait when set
+
+        Returns:
+            True once a token was taken, False if ``stop`` was set first
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+@dataclass
+class GeocodeProvider:
+    """
+    An online geocoding backend and its rate limit
+
+    ``limiter`` shares a bucket with other requests to the same service
+    (e.g. reverse lookups); without one the provider gets its own.
+    """
+
+    name: str
+    geocode: Callable[[str], Optional[Coordinates]]
+    rate_per_second: float = 1.0
+    burst: float = 1.0
+    limiter: Optional[TokenBucket] = None
+
+
+class BatchGeocoder:
+    """Geocode many addresses while issuing one request per unique query"""
+
+    def __init__(self, providers: Iterable[GeocodeProvider], cache=None,
+                 offline_lookup: Optional[Callable[[str], Optional[Coordinates]]] = None):
+        """
+        Args:
+            providers: Online providers, tried in order for each query
+            cache: Optional store with ``get_forward(query)`` and
+                ``set_forward(query, lat, lon)`` (e.g. ``GeocodeCache``)
+            offline_lookup: Optional callable answering queries locally
+                (coordinate parsing, offline gazetteers, ...)
+        """
+        self.providers: List[GeocodeProvider] = list(providers)
+        self.cache = cache
+        self.offline_lookup = offline_lookup
+        self._buckets = [p.limiter or TokenBucket(p.rate_per_second, p.burst) for p in self.providers]
+        self.stats: Dict[str, int] = {}
+
+    def geocode_many(self, addresses: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """
+        Geocode a collection of addresses
+
+        Args:
+            addresses: Address strings; duplicates are resolved once
+
+        Returns:
+            Mapping of every input address to ``(lat, lon)`` or ``(None, None)``
+        """
+        originals: Dict[str, List[str]] = {}
+        for address in addresses:
+            if not address:
+                continue
+            originals.setdefault(normalize_address(address), []).append(address)
+
+        results: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        # Every spelling is passed on so cache entries keyed by one of them are found
+        spellings = (address for group in originals.values() for address in group)
+        for query, coords in self.iter_geocode(spellings):
+            for address in originals[query]:
+                results[address] = coords if coords else (None, None)
+        return results
+
+    def iter_geocode(self, queries: Iterable[str]) -> Iterator[Tuple[str, Optional[Coordinates]]]:
+        """
+        Yield ``(normalized_query, coordinates)`` pairs as they are resolved
+
+        Cache and offline answers come first, online results follow in
+        completion order. Closing the iterator early stops the provider workers.
+
+        Args:
+            queries: Address strings; they are normalised and deduplicated
+        """
+        self.stats = {'unique': 0, 'cache_hits': 0, 'offline_hits': 0, 'online_hits': 0, 'failures': 0}
+        seen: Set[str] = set()
+        misses: Dict[str, None] = {}  # Ordered set
+
+        for raw in queries:
+            if not raw:
+                continue
+            query = normalize_address(raw)
+            if not query:
+                continue
+            if query in seen:
+                coords = self._legacy_lookup(query, raw) if query in misses else None
+                if coords is not None:
+                    del misses[query]
+                    yield query, coords
+                continue
+            seen.add(query)
+            self.stats['unique'] += 1
+
+            coords = self._local_lookup(query)
+            if coords is None:
+                coords = self._legacy_lookup(query, raw)
+            if coords is not None:
+                yield query, coords
+            else:
+                misses[query] = None
+
+        if not misses:
+            return
+        if not self.providers:
+            self.stats['failures'] += len(misses)
+            for query in misses:
+                yield query, None
+            return
+
+        yield from self._resolve_online(list(misses))
+
+    def _local_lookup(self, query: str) -> Optional[Coordinates]:
+        """Answer a query from the cache or offline tables"""
+        if self.cache is not None:
+            cached = self.cache.get_forward(query)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        if self.offline_lookup is not None:
+            try:
+                coords = self.offline_lookup(query)
+            except Exception as e:
+                logger.debug(f"Offline lookup failed for '{query}': {e}")
+                coords = None
+            if coords is not None:
+                self.stats['offline_hits'] += 1
+                if self.cache is not None:
+                    self.cache.set_forward(query, coords[0], coords[1])
+                return coords
+
+        return None
+
+    def _legacy_lookup(self, query: str, raw: str) -> Optional[Coordinates]:
+        """
+        Find a cache entry stored under the query as typed rather than normalised
+
+        Entries migrated from the old per-file cache are keyed that way; a hit
+        is copied to the normalised key so the next lookup finds it directly.
+        """
+        if self.cache is None or raw == query:
+            return None
+        cached = self.cache.get_forward(raw)
+        if cached is None:
+            return None
+        self.stats['cache_hits'] += 1
+        self.cache.set_forward(query, cached[0], cached[1])
+        return cached
+
+    def _resolve_online(self, misses: List[str]) -> Iterator[Tuple[str, Optional[Coordinates]]]:
+        """Fan misses out over provider workers and yield results as they finish"""
+        stop = threading.Event()
+        inboxes = [queue.Queue() for _ in self.providers]
+        results: "queue.Queue[Tuple[str, int, Optional[Coordinates]]]" = queue.Queue()
+        pending = [0] * len(self.providers)
+        tried: Dict[str, Set[int]] = {}
+
+        def worker(index: int) -> None:
+            provider = self.providers[index]
+            bucket = self._buckets[index]
+            while True:
+                query = inboxes[index].get()
+                if query is None or stop.is_set():
+                    return
+                coords = None
+                if bucket.acquire(stop):
+                    try:
+                        coords = provider.geocode(query)
+                    except Exception as e:
+                        logger.debug(f"Geocoding provider {provider.name} failed for '{query}': {e}")
+                results.put((query, index, coords))
+
+        def dispatch(query: str) -> bool:
+            # Prefer the untried provider with the shortest expected wait
+            candidates = [i for i in range(len(self.providers)) if i not in tried[query]]
+            if not candidates:
+                return False
+            index = min(candidates, key=lambda i: (pending[i] + 1) / self.providers[i].rate_per_second)
+            tried[query].add(index)
+            pending[index] += 1
+            inboxes[index].put(query)
+            return True
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"geocode-{p.name}", daemon=True)
+            for i, p in enumerate(self.providers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for query in misses:
+                tried[query] = set()
+                dispatch(query)
+
+            outstanding = len(misses)
+            while outstanding:
+                query, index, coords = results.get()
+                pending[index] -= 1
+                if coords is None and dispatch(query):
+                    continue
+
+                outstanding -= 1
+                if coords is None:
+                    self.stats['failures'] += 1
+                else:
+                    self.stats['online_hits'] += 1
+                    if self.cache is not None:
+                        self.cache.set_forward(query, coords[0], coords[1])
+                yield query, coords
+        finally:
+            stop.set()
+            for inbox in inboxes:
+                inbox.put(None)
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hierarchical marker clustering for CreepyAI
+Points are grouped into square cells of roughly ``radius`` pixels at every
+zoom level, in the spirit of supercluster. The cells are aligned to one global
+grid so each cell splits into exactly four at the next zoom, which makes the
+hierarchy exact and lets every level be updated incrementally with a couple
+of vectorised passes. A viewport query touches a single level and returns
+only the clusters and lone points inside it, so the number of features sent
+to the map is bounded by the screen size rather than the dataset size.
+Beyond the deepest level points are shown on their own, except that points
+at exactly the same position stay one cluster, and a viewport still too
+dense for that is answered from the deepest level.
+"""
+
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.geo.heatmap import lat_cell_range, lon_cell_ranges, mercator_fractions, unproject
+
+
+class ViewportClusters(NamedTuple):
+    """Result of ``ClusterIndex.query``"""
+    zoom: int
+    cluster_lats: np.ndarray
+    cluster_lons: np.ndarray
+    cluster_counts: np.ndarray
+    cluster_keys: np.ndarray  # Pass back to cluster_members / expansion_zoom
+    point_ids: List[Hashable]  # Points shown on their own
+
+
+class ClusterIndex:
+    """Per-zoom cluster cells over a changing set of points"""
+
+    def __init__(self, radius: int = 60, tile_size: int = 256, min_zoom: int = 0, max_zoom: int = 16,
+                 max_points: int = 2000):
+        """
+        Args:
+            radius: Approximate cluster cell size in pixels
+            tile_size: Map tile size in pixels
+            min_zoom: Shallowest zoom level clustered
+            max_zoom: Deepest zoom level clustered; deeper zooms show every
+                point, merging only points at the same position
+            max_points: Most features a query deeper than ``max_zoom``
+                returns; a denser viewport gets the ``max_zoom`` clusters
+        """
+        if not 0 <= min_zoom <= max_zoom <= 24:
+            raise ValueError("zoom levels must satisfy 0 <= min_zoom <= max_zoom <= 24")
+        if max_points < 1:
+            raise ValueError("max_points must be positive")
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.max_points = max_points
+        # Cells per axis at zoom 0; doubles with every zoom level
+        self._base_cells = max(1, int(round(tile_size / float(radius))))
+
+        # zoom -> (sorted cell keys, counts, sum of x, sum of y, sum of slots)
+        empty = self._empty_level()
+        self._levels: Dict[int, Tuple[np.ndarray, ...]] = {
+            zoom: empty for zoom in range(min_zoom, max_zoom + 1)
+        }
+
+        # Point slots; freed slots are reused
+        self._slots: Dict[Hashable, int] = {}
+        self._ids: List[Optional[Hashable]] = []
+        self._free: List[int] = []
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._gx = np.empty(0, dtype=np.int64)  # Cell at max_zoom
+        self._gy = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, point_id: Hashable) -> bool:
+        return point_id in self._slots
+
+    @staticmethod
+    def _empty_level() -> Tuple[np.ndarray, ...]:
+        return (np.empty(0, dtype=np.int64),) + tuple(np.empty(0, dtype=np.float64) for _ in range(4))
+
+    def cells_per_axis(self, zoom: int) -> int:
+        """Number of cluster cells across the world at a zoom level"""
+        return self._base_cells << zoom
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, ids: Sequence[Hashable], lats: Sequence[float], lons: Sequence[float]) -> None:
+        """
+        Add points, replacing any that are already indexed under the same ID
+
+        Args:
+            ids: Point identifiers (location IDs)
+            lats: Latitudes in degrees
+            lons: Longitudes in degrees
+        """
+        ids = list(ids)
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        if len(ids) != len(lats) or len(ids) != len(lons):
+            raise ValueError("ids, lats and lons must have the same length")
+
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        keep = [i for i, ok in enumerate(valid.tolist()) if ok]
+        existing = [ids[i] for i in keep if ids[i] in self._slots]
+        if existing:
+            self.remove(existing)
+        if not keep:
+            return
+
+        slots = np.fromiter((self._allocate(ids[i]) for i in keep), dtype=np.int64, count=len(keep))
+        lats, lons = lats[keep], lons[keep]
+        x, y = mercator_fractions(lats, lons)
+        cells = self.cells_per_axis(self.max_zoom)
+        gx = np.clip((x * cells).astype(np.int64), 0, cells - 1)
+        gy = np.clip((y * cells).astype(np.int64), 0, cells - 1)
+
+        self._lats[slots] = lats
+        self._lons[slots] = lons
+        self._gx[slots] = gx
+        self._gy[slots] = gy
+        self._alive[slots] = True
+        self._update_levels(slots, 1)
+
+    def remove(self, ids: Sequence[Hashable]) -> None:
+        """Remove points by ID; unknown IDs are ignored"""
+        slots = [self._slots.pop(point_id) for point_id in ids if point_id in self._slots]
+        if not slots:
+            return
+        slots = np.asarray(slots, dtype=np.int64)
+        self._update_levels(slots, -1)
+        self._alive[slots] = False
+        for slot in slots.tolist():
+            self._ids[slot] = None
+            self._free.append(slot)
+
+    def clear(self) -> None:
+        """Remove every point"""
+        empty = self._empty_level()
+        self._levels = {zoom: empty for zoom in self._levels}
+        self._slots.clear()
+        self._ids = []
+        self._free = []
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._gx = np.empty(0, dtype=np.int64)
+        self._gy = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self.version += 1
+
+    def _allocate(self, point_id: Hashable) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = point_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(point_id)
+            if slot >= len(self._alive):
+                self._grow(max(1024, 2 * len(self._alive)))
+        self._slots[point_id] = slot
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - len(self._alive)
+        self._lats = np.concatenate((self._lats, np.zeros(extra)))
+        self._lons = np.concatenate((self._lons, np.zeros(extra)))
+        self._gx = np.concatenate((self._gx, np.zeros(extra, dtype=np.int64)))
+        self._gy = np.concatenate((self._gy, np.zeros(extra, dtype=np.int64)))
+        self._alive = np.concatenate((self._alive, np.zeros(extra, dtype=bool)))
+
+    def _update_levels(self, slots: np.ndarray, sign: int) -> None:
+        gx, gy = self._gx[slots], self._gy[slots]
+        cells = self.cells_per_axis(self.max_zoom)
+        x = (gx + 0.5) / cells
+        y = (gy + 0.5) / cells
+        weights = np.full(len(slots), float(sign))
+
+        for zoom, level in self._levels.items():
+            shift = self.max_zoom - zoom
+            keys = (gy >> shift) * self.cells_per_axis(zoom) + (gx >> shift)
+            self._levels[zoom] = self._merge(
+                level, keys, weights, weights * x, weights * y, weights * slots
+            )
+        self.version += 1
+
+    @staticmethod
+    def _merge(level, keys, counts, sum_x, sum_y, sum_slots):
+        """
+        Add signed per-point contributions to a level, dropping empty cells
+
+        Only the cells the points fall in are touched: cells already in the
+        level are updated in place and new ones are inserted at their
+        sorted position, so a batch costs no sort of the whole level.
+        """
+        cell_keys, inverse = np.unique(keys, return_inverse=True)
+        added = [
+            np.bincount(inverse, weights=values, minlength=len(cell_keys))
+            for values in (counts, sum_x, sum_y, sum_slots)
+        ]
+        level_keys, columns = level[0], list(level[1:])
+
+        position = np.searchsorted(level_keys, cell_keys)
+        found = position < len(level_keys)
+        found[found] = level_keys[position[found]] == cell_keys[found]
+        at = position[found]
+        for column, values in zip(columns, added):
+            column[at] += values[found]
+        columns[0][at] = np.rint(columns[0][at])
+        columns[3][at] = np.rint(columns[3][at])
+
+        # Removed points only ever empty cells, added points only create them
+        emptied = at[columns[0][at] <= 0]
+        if len(emptied):
+            level_keys = np.delete(level_keys, emptied)
+            columns = [np.delete(column, emptied) for column in columns]
+        missing = ~found
+        if missing.any():
+            where = position[missing]
+            level_keys = np.insert(level_keys, where, cell_keys[missing])
+            columns = [np.insert(column, where, values[missing]) for column, values in zip(columns, added)]
+        return (level_keys, *columns)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def query(self, south: float, west: float, north: float, east: float, zoom: float) -> ViewportClusters:
+        """
+        Clusters and lone points inside a viewport
+
+        Args:
+            south, west, north, east: Viewport bounds in degrees; longitudes
+                outside [-180, 180] (a wrapped map) are normalised
+            zoom: Map zoom level
+
+        Returns:
+            ViewportClusters; cells holding a single point are reported in
+            ``point_ids`` instead of as clusters
+        """
+        zoom = max(int(zoom), self.min_zoom)
+        if zoom > self.max_zoom:
+            result = self._query_points(south, west, north, east, zoom)
+            if result is not None:
+                return result
+            zoom = self.max_zoom
+
+        keys, counts, sum_x, sum_y, sum_slots = self._levels[zoom]
+        cells = self.cells_per_axis(zoom)
+        gy, gx = np.divmod(keys, cells)
+        y_min, y_max = lat_cell_range(south, north, cells)
+        mask = (gy >= y_min) & (gy <= y_max)
+        lon_mask = np.zeros_like(mask)
+        for first, last in lon_cell_ranges(west, east, cells):
+            lon_mask |= (gx >= first) & (gx <= last)
+        mask &= lon_mask
+
+        single = mask & (counts == 1)
+        multi = mask & (counts > 1)
+        point_ids = [self._ids[slot] for slot in sum_slots[single].astype(np.int64).tolist()]
+
+        lats, lons = unproject(sum_x[multi] / counts[multi], sum_y[multi] / counts[multi])
+        return ViewportClusters(zoom, lats, lons, counts[multi].astype(np.int64), keys[multi], point_ids)
+
+    def _query_points(self, south, west, north, east, zoom) -> Optional[ViewportClusters]:
+        """
+        Points inside a viewport deeper than ``max_zoom``, or None if there
+        are more than ``max_points`` positions to show
+
+        Points at the same position never separate, so each such group is a
+        cluster keyed by the slot of one of its points.
+        """
+        lats, lons = self._lats, self._lons
+        mask = self._alive & (lats >= south) & (lats <= north)
+        if east - west < 360.0:
+            west = (west + 180.0) % 360.0 - 180.0
+            east = (east + 180.0) % 360.0 - 180.0
+            if west <= east:
+                mask &= (lons >= west) & (lons <= east)
+            else:
+                mask &= (lons >= west) | (lons <= east)
+        slots = np.flatnonzero(mask)
+        _, first, counts = np.unique(
+            np.stack((lats[slots], lons[slots]), axis=1), axis=0, return_index=True, return_counts=True
+        )
+        if len(first) > self.max_points:
+            return None
+        single = counts == 1
+        shared = slots[first[~single]]
+        return ViewportClusters(
+            zoom, lats[shared], lons[shared], counts[~single].astype(np.int64), shared,
+            [self._ids[slot] for slot in slots[first[single]].tolist()],
+        )
+
+    def _member_slots(self, zoom: int, key: int) -> np.ndarray:
+        if zoom > self.max_zoom:
+            key = int(key)
+            if not 0 <= key < len(self._alive) or not self._alive[key]:
+                return np.empty(0, dtype=np.int64)
+            return np.flatnonzero(
+                self._alive & (self._lats == self._lats[key]) & (self._lons == self._lons[key])
+            )
+        shift = self.max_zoom - zoom
+        cells = self.cells_per_axis(zoom)
+        cy, cx = divmod(int(key), cells)
+        mask = self._alive & ((self._gx >> shift) == cx) & ((self._gy >> shift) == cy)
+        return np.flatnonzero(mask)
+
+    def cluster_members(self, zoom: int, key: int) -> List[Hashable]:
+        """IDs of the points in a cluster returned by ``query``"""
+        return [self._ids[slot] for slot in self._member_slots(zoom, key).tolist()]
+
+    def expansion_zoom(self, zoom: int, key: int) -> int:
+        """
+        Lowest zoom level at which a cluster splits into several features;
+        points at one position never split, so ``zoom`` itself is returned
+        for a cluster from deeper than ``max_zoom``
+        """
+        if zoom > self.max_zoom:
+            return zoom
+        slots = self._member_slots(zoom, key)
+        gx, gy = self._gx[slots], self._gy[slots]
+        for deeper in range(zoom + 1, self.max_zoom + 1):
+            shift = self.max_zoom - deeper
+            cells = np.unique((gy >> shift) * self.cells_per_axis(deeper) + (gx >> shift))
+            if len(cells) > 1:
+                return deeper
+        return self.max_zoom + 1
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """(south, west, north, east) of all points, or None when empty"""
+        if not self._slots:
+            return None
+        lats, lons = self._lats[self._alive], self._lons[self._alive]
+        return float(lats.min()), float(lons.min()), float(lats.max()), float(lons.max())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent geocoding cache for CreepyAI.
+Forward and reverse lookups share one indexed SQLite file, fronted by an
+in-memory LRU, with TTL and size-based eviction.
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+from typing import Tuple, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = 'geocache.sqlite3'
+
+FORWARD = 'forward'
+REVERSE = 'reverse'
+
+# Run TTL/size eviction after this many writes rather than on every insert
+_EVICTION_INTERVAL = 1000
+
+
+def forward_key(query: str) -> str:
+    """Cache key for an address query (same hash the old per-file cache used)."""
+    return md5(query.encode('utf-8')).hexdigest()
+
+
+def reverse_key(lat: float, lon: float) -> str:
+    """Cache key for a coordinate pair, rounded to ~0.1 m."""
+    return f"{float(lat):.6f},{float(lon):.6f}"
+
+
+class GeocodeCache:
+    """Thread-safe single-file store for geocoding results"""
+
+    def __init__(self, path: str, memory_size: int = 10000,
+                 ttl: Optional[float] = 90 * 24 * 3600, max_entries: int = 1000000):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite file to store results in
+            memory_size: Number of entries kept in the in-memory LRU
+            ttl: Seconds before an entry expires, or None to keep entries forever
+            max_entries: Entries kept on disk before the least recently used are evicted
+        """
+        self.path = path
+        self.memory_size = max(0, memory_size)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._writes_since_eviction = 0
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_geocode_cache_accessed ON geocode_cache(accessed_at)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS geocode_cache_meta (name TEXT PRIMARY KEY, value TEXT)')
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Typed helpers
+    # ------------------------------------------------------------------
+    def get_forward(self, query: str) -> Optional[Tuple[float, float]]:
+        """Return cached coordinates for an address query"""
+        payload = self.get(FORWARD, forward_key(query))
+        if payload is None:
+            return None
+        return float(payload['lat']), float(payload['lon'])
+
+    def set_forward(self, query: str, lat: float, lon: float) -> None:
+        """Store coordinates for an address query"""
+        self.set(FORWARD, forward_key(query), {'lat': lat, 'lon': lon})
+
+    def get_reverse(self, lat: float, lon: float) -> Optional[str]:
+        """Return the cached address for a coordinate pair"""
+        payload = self.get(REVERSE, reverse_key(lat, lon))
+        if payload is None:
+            return None
+        return payload.get('address')
+
+    def set_reverse(self, lat: float, lon: float, address: str) -> None:
+        """Store the address for a coordinate pair"""
+        self.set(REVERSE, reverse_key(lat, lon), {'address': address})
+
+    # ------------------------------------------------------------------
+    # Generic access
+    # ------------------------------------------------------------------
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cache entry
+
+        Args:
+            kind: Entry kind (``FORWARD`` or ``REVERSE``)
+            key: Entry key
+
+        Returns:
+            Stored payload, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((kind, key))
+            if entry is not None:
+                payload, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end((kind, key))
+                    self._counters['memory_hits'] += 1
+                    return payload
+                del self._memory[(kind, key)]
+
+            try:
+                row = self._conn.execute(
+                    "SELECT payload, created_at FROM geocode_cache WHERE kind = ? AND key = ?",
+                    (kind, key)
+                ).fetchone()
+                if row is None:
+                    self._counters['misses'] += 1
+                    return None
+
+                if self._is_expired(row[1], now):
+                    self._conn.execute("DELETE FROM geocode_cache WHERE kind = ? AND key = ?", (kind, key))
+                    self._conn.commit()
+                    self._counters['expired'] += 1
+                    self._counters['misses'] += 1
+                    return None
+
+                self._conn.execute(
+                    "UPDATE geocode_cache SET accessed_at = ? WHERE kind = ? AND key = ?",
+                    (now, kind, key)
+                )
+                self._conn.commit()
+                payload = json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                logger.debug(f"Error reading from geocode cache: {e}")
+                self._counters['misses'] += 1
+                return None
+
+            self._counters['disk_hits'] += 1
+            self._remember(kind, key, payload, row[1])
+            return payload
+
+    def set(self, kind: str, key: str, payload: Dict[str, Any]) -> None:
+        """
+        Store a cache entry, replacing any existing one
+
+        Args:
+            kind: Entry kind (``FORWARD`` or ``REVERSE``)
+            key: Entry key
+            payload: JSON-serialisable result
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (kind, key, payload, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, json.dumps(payload), now, now)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Error writing to geocode cache: {e}")
+                return
+
+            self._remember(kind, key, payload, now)
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= _EVICTION_INTERVAL:
+                self.evict()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def evict(self) -> int:
+        """
+        Drop expired entries and trim the store to ``max_entries``
+
+        Returns:
+            Number of entries removed from disk
+        """
+        with self._lock:
+            self._writes_since_eviction = 0
+            removed = 0
+            try:
+                if self.ttl is not None:
+                    cursor = self._conn.execute(
+                        "DELETE FROM geocode_cache WHERE created_at < ?", (time.time() - self.ttl,)
+                    )
+                    removed += max(cursor.rowcount, 0)
+                    self._counters['expired'] += max(cursor.rowcount, 0)
+
+                count = self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    cursor = self._conn.execute(
+                        "DELETE FROM geocode_cache WHERE rowid IN "
+                        "(SELECT rowid FROM geocode_cache ORDER BY accessed_at LIMIT ?)",
+                        (overflow,)
+                    )
+                    removed += max(cursor.rowcount, 0)
+                    self._counters['evicted'] += max(cursor.rowcount, 0)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Geocode cache eviction failed: {e}")
+
+            if removed:
+                # Cheaper than tracking which keys went; the LRU refills on demand
+                self._memory.clear()
+            return removed
+
+    def migrate_file_cache(self, directory: str) -> int:
+        """
+        Import a legacy ``<md5>.json`` per-query cache directory once
+
+        Imported files are deleted; the migration is recorded so later calls
+        are no-ops.
+
+        Args:
+            directory: Directory holding the legacy JSON files
+
+        Returns:
+            Number of entries imported
+        """
+        marker = f"migrated:{os.path.abspath(directory)}"
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM geocode_cache_meta WHERE name = ?", (marker,)).fetchone():
+                return 0
+            if not os.path.isdir(directory):
+                return 0
+
+            rows = []
+            migrated_files = []
+            for entry in os.scandir(directory):
+                name = entry.name
+                if not entry.is_file() or not name.endswith('.json') or len(name) != 37:
+                    continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    mtime = entry.stat().st_mtime
+                    rows.append((FORWARD, name[:-5], json.dumps({'lat': float(data['lat']), 'lon': float(data['lon'])}),
+                                 mtime, mtime))
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.debug(f"Skipping unreadable geocode cache file {name}: {e}")
+                    continue
+                migrated_files.append(entry.path)
+
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO geocode_cache (kind, key, payload, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache_meta (name, value) VALUES (?, ?)",
+                    (marker, str(len(rows)))
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.error(f"Failed to migrate geocode cache from {directory}: {e}")
+                return 0
+
+            for path in migrated_files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            if rows:
+                logger.info(f"Migrated {len(rows)} geocode cache entries from {directory}")
+            return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+            stats['memory_entries'] = len(self._memory)
+            try:
+                stats['disk_entries'] = self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+            except sqlite3.Error:
+                stats['disk_entries'] = None
+            return stats
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, kind: str, key: str, payload: Dict[str, Any], created_at: float) -> None:
+        """Put an entry in the in-memory LRU"""
+        if not self.memory_size:
+            return
+        self._memory[(kind, key)] = (payload, created_at)
+        self._memory.move_to_end((kind, key))
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
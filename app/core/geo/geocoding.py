@@ -8,15 +8,16 @@ This module provides functions for converting between addresses and coordinates.
 
 import os
 import logging
-import json
 import requests
-import time
-from typing import Tuple, Dict, Any, Optional, List
+from typing import Tuple, Dict, Any, Optional, List, Iterable
 from pathlib import Path
 import geopy
 from geopy.geocoders import Nominatim, GoogleV3
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 
+from app.core.geo.batch_geocoder import BatchGeocoder, GeocodeProvider, TokenBucket
+from app.core.geo.geocode_cache import GeocodeCache, CACHE_FILENAME
+
 logger = logging.getLogger(__name__)
 
 # Cache directory for geocoding results
@@ -41,21 +42,26 @@ class GeocodingHelper:
         self.provider = provider
         self.use_cache = use_cache
         self.cache_dir = cache_dir or CACHE_DIR
+        self.cache: Optional[GeocodeCache] = None
         
-        # Create cache directory
-        if self.use_cache and not os.path.exists(self.cache_dir):
+        if self.use_cache:
             try:
                 os.makedirs(self.cache_dir, exist_ok=True)
+                self.cache = GeocodeCache(os.path.join(self.cache_dir, CACHE_FILENAME))
+                # Fold any legacy one-file-per-query entries into the store
+                self.cache.migrate_file_cache(self.cache_dir)
             except Exception as e:
-                logger.error(f"Failed to create cache directory: {e}")
+                logger.error(f"Failed to open geocoding cache: {e}")
                 self.use_cache = False
+                self.cache = None
         
         # Initialize geocoder
         self.geocoder = self._create_geocoder()
         
-        # Rate limiting settings
-        self.last_request_time = 0
+        # Rate limiting settings; forward and reverse lookups share the bucket
         self.min_delay = 1.0  # seconds between requests
+        self.rate_limiter = TokenBucket(self._provider_rate())
+        self._batch_geocoder: Optional[BatchGeocoder] = None
     
     def _create_geocoder(self):
         """Create geocoder based on provider"""
@@ -69,81 +75,87 @@ class GeocodingHelper:
             # Fallback to Nominatim
             return Nominatim(user_agent="CreepyAI/1.0")
     
-    def _get_cache_file(self, query: str) -> str:
-        """Get cache file path for a query"""
-        # Create a safe filename from the query
-        from hashlib import md5
-        safe_filename = md5(query.encode('utf-8')).hexdigest() + '.json'
-        return os.path.join(self.cache_dir, safe_filename)
-    
     def _get_from_cache(self, query: str) -> Optional[Tuple[float, float]]:
         """Get geocoding results from cache"""
-        if not self.use_cache:
-            return None
-            
-        cache_file = self._get_cache_file(query)
-        if not os.path.exists(cache_file):
+        if not self.cache:
             return None
-            
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if 'lat' in data and 'lon' in data:
-                    return float(data['lat']), float(data['lon'])
-        except Exception as e:
-            logger.debug(f"Error reading from cache: {e}")
-            
-        return None
+        return self.cache.get_forward(query)
     
     def _save_to_cache(self, query: str, lat: float, lon: float) -> None:
         """Save geocoding results to cache"""
-        if not self.use_cache:
-            return
-            
-        cache_file = self._get_cache_file(query)
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({'lat': lat, 'lon': lon}, f)
-        except Exception as e:
-            logger.debug(f"Error writing to cache: {e}")
+        if self.cache:
+            self.cache.set_forward(query, lat, lon)
+    
+    def _get_reverse_from_cache(self, lat: float, lon: float) -> Optional[str]:
+        """Get a reverse geocoding result from cache"""
+        if not self.cache:
+            return None
+        return self.cache.get_reverse(lat, lon)
+    
+    def _save_reverse_to_cache(self, lat: float, lon: float, address: str) -> None:
+        """Save a reverse geocoding result to cache"""
+        if self.cache:
+            self.cache.set_reverse(lat, lon, address)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return geocoding cache hit/miss statistics"""
+        return self.cache.stats() if self.cache else {}
     
     def geocode(self, address: str) -> Tuple[Optional[float], Optional[float]]:
         """
         Convert an address to coordinates
         
+        A single-address ``geocode_many``, so both share the cache keys,
+        rate limits and provider fallbacks.
+        
         Args:
             address: Address or location name
             
         Returns:
             Tuple of (latitude, longitude) or (None, None) if geocoding fails
         """
-        # Check cache first
-        cached = self._get_from_cache(address)
-        if cached:
-            return cached
-            
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_delay:
-            time.sleep(self.min_delay - time_since_last)
-            
-        # Geocode
-        try:
-            location = self.geocoder.geocode(address, timeout=10)
-            self.last_request_time = time.time()
+        return self.geocode_many([address]).get(address, (None, None))
+    
+    def geocode_many(self, addresses: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """
+        Convert many addresses to coordinates, querying each unique address once
+        
+        Addresses are normalised and deduplicated and answered from the cache
+        first; the remaining misses are spread across the configured providers,
+        each rate limited by its own token bucket.
+        
+        Args:
+            addresses: Addresses or location names
             
+        Returns:
+            Mapping of each address to (latitude, longitude), or (None, None)
+            where geocoding failed
+        """
+        if self._batch_geocoder is None:
+            self._batch_geocoder = BatchGeocoder(self._geocode_providers(), cache=self.cache)
+        return self._batch_geocoder.geocode_many(addresses)
+    
+    def _geocode_providers(self) -> List[GeocodeProvider]:
+        """Online providers used by ``geocode_many``"""
+        return [GeocodeProvider(self.provider, self._provider_lookup(self.geocoder),
+                                rate_per_second=self._provider_rate(), limiter=self.rate_limiter)]
+    
+    def _provider_rate(self) -> float:
+        return 1.0 / self.min_delay if self.min_delay > 0 else 100.0
+    
+    @staticmethod
+    def _provider_lookup(geocoder):
+        """Wrap a geopy geocoder as a ``query -> (lat, lon)`` callable"""
+        def lookup(query: str) -> Optional[Tuple[float, float]]:
+            try:
+                location = geocoder.geocode(query, timeout=10)
+            except (GeocoderTimedOut, GeocoderUnavailable) as e:
+                logger.warning(f"Geocoding service unavailable: {e}")
+                return None
             if location:
-                # Save to cache
-                self._save_to_cache(address, location.latitude, location.longitude)
                 return location.latitude, location.longitude
-                
-        except (GeocoderTimedOut, GeocoderUnavailable) as e:
-            logger.warning(f"Geocoding service unavailable: {e}")
-        except Exception as e:
-            logger.error(f"Error geocoding address '{address}': {e}")
-            
-        return None, None
+            return None
+        return lookup
     
     def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
         """
@@ -156,28 +168,20 @@ class GeocodingHelper:
         Returns:
             Address string or None if geocoding fails
         """
-        query = f"{lat},{lon}"
-        
         # Check cache first
-        cached = self._get_from_cache(query)
-        if cached and isinstance(cached, str):
+        cached = self._get_reverse_from_cache(lat, lon)
+        if cached:
             return cached
             
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_delay:
-            time.sleep(self.min_delay - time_since_last)
-            
         # Reverse geocode
         try:
+            self.rate_limiter.acquire()
             location = self.geocoder.reverse((lat, lon), timeout=10)
-            self.last_request_time = time.time()
             
             if location:
                 address = location.address
                 # Save to cache
-                self._save_to_cache(query, address)
+                self._save_reverse_to_cache(lat, lon, address)
                 return address
                 
         except (GeocoderTimedOut, GeocoderUnavailable) as e:
@@ -224,44 +228,17 @@ class EnhancedGeocodingHelper(GeocodingHelper):
             except Exception as e:
                 logger.warning(f"Failed to initialize fallback geocoder {provider}: {e}")
     
-    def geocode(self, address: str) -> Tuple[Optional[float], Optional[float]]:
+    def _geocode_providers(self) -> List[GeocodeProvider]:
         """
-        Convert an address to coordinates using primary and fallback providers
+        Primary plus fallback providers, each with its own rate limit
         
-        Args:
-            address: Address or location name
-            
-        Returns:
-            Tuple of (latitude, longitude) or (None, None) if geocoding fails
+        ``geocode`` goes through these too, so a miss on the primary
+        provider is retried on each fallback in turn.
         """
-        # First try with primary geocoder
-        result = super().geocode(address)
-        if result[0] is not None and result[1] is not None:
-            return result
-            
-        # If primary fails, try fallbacks
-        for provider, geocoder in self.fallback_geocoders.items():
-            try:
-                logger.debug(f"Trying fallback geocoder {provider} for '{address}'")
-                
-                # Rate limiting
-                current_time = time.time()
-                time_since_last = current_time - self.last_request_time
-                if time_since_last < self.min_delay:
-                    time.sleep(self.min_delay - time_since_last)
-                
-                location = geocoder.geocode(address, timeout=10)
-                self.last_request_time = time.time()
-                
-                if location:
-                    # Save to cache
-                    self._save_to_cache(address, location.latitude, location.longitude)
-                    return location.latitude, location.longitude
-                    
-            except Exception as e:
-                logger.debug(f"Fallback geocoder {provider} failed for '{address}': {e}")
-                
-        return None, None
+        providers = super()._geocode_providers()
+        for name, geocoder in self.fallback_geocoders.items():
+            providers.append(GeocodeProvider(name, self._provider_lookup(geocoder), rate_per_second=self._provider_rate()))
+        return providers
 
 # Singleton instances for easy import
 default_geocoder = GeocodingHelper()
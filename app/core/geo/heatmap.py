@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-resolution heatmap tiles for CreepyAI
+Points are binned in one vectorised pass into a pyramid of slippy-map tiles
+(the same z/x/y scheme as the base map), each split into ``bins`` x ``bins``
+cells. Tiles are stored sparsely and only the tiles touched by added or
+removed points are rewritten, so the map can request just the cells in its
+current viewport.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Web Mercator cannot represent the poles
+MAX_MERCATOR_LAT = 85.0511287798066
+
+TileKey = Tuple[int, int, int]  # (zoom, x, y)
+
+
+def mercator_fractions(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Project degrees to Web Mercator fractions of the world, in [0, 1]"""
+    lat_r = np.radians(np.clip(lats, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (np.asarray(lons, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat_r) + 1.0 / np.cos(lat_r)) / math.pi) / 2.0
+    return x, y
+
+
+def unproject(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of ``mercator_fractions``"""
+    lons = x * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * y))))
+    return lats, lons
+
+
+def lat_cell_range(south: float, north: float, cells_per_axis: int) -> Tuple[int, int]:
+    """Inclusive y index range covering a latitude band"""
+    _, y = mercator_fractions(np.array([north, south]), np.zeros(2))
+    y_min = int(np.clip(np.floor(y[0] * cells_per_axis), 0, cells_per_axis - 1))
+    y_max = int(np.clip(np.floor(y[1] * cells_per_axis), 0, cells_per_axis - 1))
+    return y_min, y_max
+
+
+def lon_cell_ranges(west: float, east: float, cells_per_axis: int) -> List[Tuple[int, int]]:
+    """Inclusive x index ranges for a longitude span, split at the antimeridian"""
+    if east - west >= 360.0:
+        return [(0, cells_per_axis - 1)]
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+
+    def index(lon):
+        return int(min(cells_per_axis - 1, max(0, math.floor((lon + 180.0) / 360.0 * cells_per_axis))))
+
+    if west <= east:
+        return [(index(west), index(east))]
+    return [(index(west), cells_per_axis - 1), (0, index(east))]
+
+
+class HeatmapPyramid:
+    """Sparse per-zoom heatmap tiles, updated incrementally"""
+
+    def __init__(self, max_zoom: int = 16, min_zoom: int = 0, bins: int = 32):
+        """
+        Args:
+            max_zoom: Deepest zoom level kept; deeper requests reuse it
+            min_zoom: Shallowest zoom level kept
+            bins: Cells per tile side (256 px tiles with 32 bins give 8 px cells)
+        """
+        if not 0 <= min_zoom <= max_zoom <= 24:
+            raise ValueError("zoom levels must satisfy 0 <= min_zoom <= max_zoom <= 24")
+        self.max_zoom = max_zoom
+        self.min_zoom = min_zoom
+        self.bins = bins
+        # zoom -> {(x, y): (sorted cell indices, counts)}
+        self._tiles: Dict[int, Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]] = {
+            zoom: {} for zoom in range(min_zoom, max_zoom + 1)
+        }
+        self.total = 0
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add_points(self, lats: Iterable[float], lons: Iterable[float]) -> Set[TileKey]:
+        """
+        Bin points into every zoom level
+
+        Returns:
+            Keys of the tiles that changed
+        """
+        return self._update(lats, lons, 1)
+
+    def remove_points(self, lats: Iterable[float], lons: Iterable[float]) -> Set[TileKey]:
+        """
+        Remove previously added points
+
+        Returns:
+            Keys of the tiles that changed
+        """
+        return self._update(lats, lons, -1)
+
+    def clear(self) -> None:
+        """Drop all tiles"""
+        for tiles in self._tiles.values():
+            tiles.clear()
+        self.total = 0
+        self.version += 1
+
+    def _update(self, lats, lons, sign: int) -> Set[TileKey]:
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        lats, lons = lats[valid], lons[valid]
+        if not len(lats):
+            return set()
+
+        # Global cell coordinates at the deepest zoom; shallower levels are shifts of these
+        cells_per_axis = (1 << self.max_zoom) * self.bins
+        x, y = mercator_fractions(lats, lons)
+        gx = np.clip((x * cells_per_axis).astype(np.int64), 0, cells_per_axis - 1)
+        gy = np.clip((y * cells_per_axis).astype(np.int64), 0, cells_per_axis - 1)
+
+        cells_per_tile = self.bins * self.bins
+        changed: Set[TileKey] = set()
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            shift = self.max_zoom - zoom
+            tx, cx = np.divmod(gx >> shift, self.bins)
+            ty, cy = np.divmod(gy >> shift, self.bins)
+            keys = (tx * (1 << zoom) + ty) * cells_per_tile + cy * self.bins + cx
+            keys, counts = np.unique(keys, return_counts=True)
+
+            tile_ids = keys // cells_per_tile
+            starts = np.flatnonzero(np.r_[True, tile_ids[1:] != tile_ids[:-1]])
+            ends = np.r_[starts[1:], len(keys)]
+            tiles = self._tiles[zoom]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                tile_x, tile_y = divmod(int(tile_ids[start]), 1 << zoom)
+                cells = (keys[start:end] % cells_per_tile).astype(np.int32)
+                self._merge_tile(tiles, (tile_x, tile_y), cells, counts[start:end] * sign)
+                changed.add((zoom, tile_x, tile_y))
+
+        self.total = max(0, self.total + sign * len(lats))
+        self.version += 1
+        return changed
+
+    @staticmethod
+    def _merge_tile(tiles, key, cells: np.ndarray, counts: np.ndarray) -> None:
+        existing = tiles.get(key)
+        if existing is not None:
+            cells = np.concatenate((existing[0], cells))
+            counts = np.concatenate((existing[1], counts))
+            cells, inverse = np.unique(cells, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        keep = counts > 0
+        if keep.any():
+            tiles[key] = (cells[keep], counts[keep])
+        else:
+            tiles.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def tile_zoom(self, zoom: int) -> int:
+        """Zoom level of the stored tiles used for a map zoom"""
+        return min(max(int(zoom), self.min_zoom), self.max_zoom)
+
+    def tile(self, zoom: int, x: int, y: int) -> Optional[np.ndarray]:
+        """Dense ``bins`` x ``bins`` count grid (row = y) for a tile, or None if empty"""
+        entry = self._tiles.get(zoom, {}).get((x, y))
+        if entry is None:
+            return None
+        grid = np.zeros(self.bins * self.bins, dtype=np.int64)
+        grid[entry[0]] = entry[1]
+        return grid.reshape(self.bins, self.bins)
+
+    def tiles_in_bounds(self, south: float, west: float, north: float, east: float,
+                        zoom: int) -> Dict[TileKey, np.ndarray]:
+        """Dense grids for the non-empty tiles overlapping a viewport"""
+        zoom = self.tile_zoom(zoom)
+        return {
+            (zoom, x, y): self.tile(zoom, x, y)
+            for x, y in self._tile_keys_in_bounds(south, west, north, east, zoom)
+        }
+
+    def cells_in_bounds(self, south: float, west: float, north: float, east: float,
+                        zoom: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Occupied cells inside a viewport
+
+        Args:
+            south, west, north, east: Viewport bounds in degrees; longitudes
+                outside [-180, 180] (a wrapped map) are normalised
+            zoom: Map zoom level
+
+        Returns:
+            Tuple of (cell centre latitudes, longitudes, counts)
+        """
+        zoom = self.tile_zoom(zoom)
+        cells_per_axis = (1 << zoom) * self.bins
+        lon_ranges = lon_cell_ranges(west, east, cells_per_axis)
+        y_min, y_max = lat_cell_range(south, north, cells_per_axis)
+
+        gx_parts, gy_parts, count_parts = [], [], []
+        for x, y in self._tile_keys_in_bounds(south, west, north, east, zoom):
+            cells, counts = self._tiles[zoom][(x, y)]
+            cy, cx = np.divmod(cells.astype(np.int64), self.bins)
+            gx = x * self.bins + cx
+            gy = y * self.bins + cy
+            mask = (gy >= y_min) & (gy <= y_max)
+            lon_mask = np.zeros_like(mask)
+            for first, last in lon_ranges:
+                lon_mask |= (gx >= first) & (gx <= last)
+            mask &= lon_mask
+            gx_parts.append(gx[mask])
+            gy_parts.append(gy[mask])
+            count_parts.append(counts[mask])
+
+        if not gx_parts:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty, np.empty(0, dtype=np.int64)
+        gx = np.concatenate(gx_parts)
+        gy = np.concatenate(gy_parts)
+        lats, lons = unproject((gx + 0.5) / cells_per_axis, (gy + 0.5) / cells_per_axis)
+        return lats, lons, np.concatenate(count_parts)
+
+    def _tile_keys_in_bounds(self, south, west, north, east, zoom):
+        tiles = self._tiles[zoom]
+        if not tiles:
+            return []
+        ranges = lon_cell_ranges(west, east, 1 << zoom)
+        y_min, y_max = lat_cell_range(south, north, 1 << zoom)
+
+        area = sum(last - first + 1 for first, last in ranges) * (y_max - y_min + 1)
+        if area > len(tiles):
+            candidates = tiles.keys()
+        else:
+            candidates = [(x, y) for first, last in ranges
+                          for x in range(first, last + 1) for y in range(y_min, y_max + 1)]
+        return sorted(
+            (x, y) for x, y in candidates
+            if (x, y) in tiles and y_min <= y <= y_max
+            and any(first <= x <= last for first, last in ranges)
+        )
@@ -0,0 +1,529 @@
+    #!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Any, Optional, Iterable
+import math
+
+from app.core.geo import geodesy
+
+try:
+    from sklearn.cluster import DBSCAN, KMeans
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+    logging.warning("scikit-learn not available, advanced clustering will be disabled")
+
+logger = logging.getLogger(__name__)
+
+class LocationCluster:
+    """Represents a cluster of geographic locations with common attributes"""
+    
+    def __init__(self, locations=None, center=None, radius=None, start_time=None, end_time=None):
+        self.locations = locations or []
+        self.center = center  # (latitude, longitude)
+        self.radius = radius  # in meters
+        self.start_time = start_time
+        self.end_time = end_time
+        self.metadata = {}
+        # Running coordinate sums behind the centre; None until recalculate() has run
+        self._sums = None
+    
+    def add_location(self, location):
+        """
+        Add a location to the cluster
+        
+        The centre and time span are updated in O(1). The radius becomes an
+        upper bound (old radius plus centre drift, or the new point's distance);
+        call recalculate() for the exact value.
+        """
+        self.locations.append(location)
+        if not self._has_running_sums(len(self.locations) - 1):
+            self.recalculate()
+            return
+        
+        lat, lon = location['latitude'], location['longitude']
+        count, lat_sum, lon_sum = self._sums
+        count, lat_sum, lon_sum = count + 1, lat_sum + lat, lon_sum + lon
+        self._sums = (count, lat_sum, lon_sum)
+        
+        old_center = self.center
+        self.center = (lat_sum / count, lon_sum / count)
+        drift = geodesy.haversine_scalar(old_center[0], old_center[1], self.center[0], self.center[1])
+        self.radius = max(self.radius + drift,
+                          geodesy.haversine_scalar(self.center[0], self.center[1], lat, lon))
+        self._extend_time_span(location.get('timestamp'), location.get('timestamp'))
+    
+    def recalculate(self):
+        """Recalculate cluster properties based on contained locations"""
+        if not self.locations:
+            self._sums = None
+            return
+        
+        # Calculate center as mean of lat/lng
+        lats = np.fromiter((loc['latitude'] for loc in self.locations), dtype=np.float64, count=len(self.locations))
+        lngs = np.fromiter((loc['longitude'] for loc in self.locations), dtype=np.float64, count=len(self.locations))
+        self._sums = (len(self.locations), float(lats.sum()), float(lngs.sum()))
+        self.center = (self._sums[1] / len(lats), self._sums[2] / len(lats))
+        
+        # Calculate radius as max distance from center to any point
+        self.radius = float(geodesy.haversine_to_point(self.center[0], self.center[1], lats, lngs).max())
+        
+        # Calculate time span
+        times = [loc.get('timestamp') for loc in self.locations 
+                if loc.get('timestamp') is not None]
+        if times:
+            self.start_time = min(times)
+            self.end_time = max(times)
+    
+    def merge(self, other_cluster):
+        """
+        Merge another cluster into this one
+        
+        Like add_location, the combined centre is exact and the radius an
+        upper bound derived from both clusters' radii.
+        """
+        own_count = len(self.locations)
+        other_count = len(other_cluster.locations)
+        self.locations.extend(other_cluster.locations)
+        if not (self._has_running_sums(own_count) and other_cluster._has_running_sums(other_count)):
+            self.recalculate()
+            return
+        if not other_count:
+            return
+        
+        count = own_count + other_count
+        lat_sum = self._sums[1] + other_cluster._sums[1]
+        lon_sum = self._sums[2] + other_cluster._sums[2]
+        self._sums = (count, lat_sum, lon_sum)
+        
+        centers = (self.center, other_cluster.center)
+        radii = (self.radius, other_cluster.radius)
+        self.center = (lat_sum / count, lon_sum / count)
+        self.radius = max(
+            radius + geodesy.haversine_scalar(center[0], center[1], self.center[0], self.center[1])
+            for center, radius in zip(centers, radii)
+        )
+        self._extend_time_span(other_cluster.start_time, other_cluster.end_time)
+    
+    def _has_running_sums(self, count):
+        """Whether the running sums still describe the first ``count`` locations"""
+        return self._sums is not None and self._sums[0] == count and count > 0
+    
+    def _extend_time_span(self, start_time, end_time):
+        if start_time is not None and (self.start_time is None or start_time < self.start_time):
+            self.start_time = start_time
+        if end_time is not None and (self.end_time is None or end_time > self.end_time):
+            self.end_time = end_time
+    
+    def to_dict(self):
+        """Convert cluster to dictionary representation"""
+        return {
+            'center': self.center,
+            'radius': self.radius,
+            'count': len(self.locations),
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'metadata': self.metadata,
+            'locations': self.locations
+        }
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great circle distance between two points 
+    on the earth (specified in decimal degrees)
+    """
+    return geodesy.haversine_scalar(lat1, lon1, lat2, lon2)
+
+class _GridIndex:
+    """
+    Hash grid over lat/lon for fixed-radius neighbour queries
+    
+    Cells are ``cell_m`` tall; candidates from the cells overlapping a
+    query's bounding box are confirmed with haversine.
+    """
+    
+    def __init__(self, cell_m):
+        self.cell_deg = math.degrees(cell_m / geodesy.EARTH_RADIUS_M)
+        self.lats = np.empty(0, dtype=np.float64)
+        self.lngs = np.empty(0, dtype=np.float64)
+        self._rows: Dict[int, Dict[int, List[int]]] = {}
+    
+    def __len__(self):
+        return len(self.lats)
+    
+    def add(self, lats, lngs):
+        """Index a batch of points; they get consecutive indices after existing ones"""
+        start = len(self.lats)
+        self.lats = np.concatenate((self.lats, geodesy.as_coordinate_array(lats)))
+        self.lngs = np.concatenate((self.lngs, geodesy.as_coordinate_array(lngs)))
+        rows = np.floor(self.lats[start:] / self.cell_deg).astype(np.int64).tolist()
+        cols = np.floor(self.lngs[start:] / self.cell_deg).astype(np.int64).tolist()
+        for index, (row, col) in enumerate(zip(rows, cols), start):
+            self._rows.setdefault(row, {}).setdefault(col, []).append(index)
+    
+    def query(self, lat, lng, radius_m):
+        """Indices of indexed points within ``radius_m`` of a point, in index order"""
+        min_lat, min_lng, max_lat, max_lng = geodesy.bbox_for_radius(lat, lng, radius_m)
+        if min_lng <= max_lng:
+            col_ranges = [(math.floor(min_lng / self.cell_deg), math.floor(max_lng / self.cell_deg))]
+        else:
+            col_ranges = [(math.floor(min_lng / self.cell_deg), math.floor(180.0 / self.cell_deg)),
+                          (math.floor(-180.0 / self.cell_deg), math.floor(max_lng / self.cell_deg))]
+        
+        candidates: List[int] = []
+        for row in range(math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg) + 1):
+            cells = self._rows.get(row)
+            if not cells:
+                continue
+            for first, last in col_ranges:
+                if last - first + 1 <= len(cells):
+                    for col in range(first, last + 1):
+                        candidates.extend(cells.get(col, ()))
+                else:
+                    # Wide spans (near the poles) are cheaper to scan by occupied cell
+                    for col, members in cells.items():
+                        if first <= col <= last:
+                            candidates.extend(members)
+        
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.array(candidates, dtype=np.int64)
+        candidates.sort()
+        distances = geodesy.haversine_to_point(lat, lng, self.lats[candidates], self.lngs[candidates])
+        return candidates[distances <= radius_m]
+
+def _coordinate_arrays(locations):
+    lats = np.fromiter((loc['latitude'] for loc in locations), dtype=np.float64, count=len(locations))
+    lngs = np.fromiter((loc['longitude'] for loc in locations), dtype=np.float64, count=len(locations))
+    return lats, lngs
+
+def cluster_locations_dbscan(locations, eps=100, min_samples=5):
+    """
+    Cluster locations using DBSCAN algorithm
+    
+    Distances are great-circle distances: with scikit-learn the points go
+    through a haversine BallTree, otherwise through IncrementalClusterer.
+    
+    Args:
+        locations: List of location dictionaries with 'latitude' and 'longitude'
+        eps: Maximum distance (meters) between points in the same cluster
+        min_samples: Minimum number of points to form a cluster
+    
+    Returns:
+        List of LocationCluster objects
+    """
+    if not locations:
+        return []
+    
+    if not SKLEARN_AVAILABLE:
+        logger.debug("scikit-learn not available, using grid-indexed DBSCAN")
+        clusterer = IncrementalClusterer(eps=eps, min_samples=min_samples)
+        clusterer.add_locations(locations)
+        return clusterer.clusters()
+    
+    # The haversine metric works on (lat, lon) in radians and eps in radians of arc
+    lats, lngs = _coordinate_arrays(locations)
+    coords = np.radians(np.column_stack((lats, lngs)))
+    
+    db = DBSCAN(eps=eps / geodesy.EARTH_RADIUS_M, min_samples=min_samples,
+                algorithm='ball_tree', metric='haversine')
+    labels = db.fit_predict(coords)
+    
+    # Create clusters from results
+    clusters = []
+    unique_labels = set(labels)
+    
+    for label in sorted(unique_labels):
+        # Skip noise points (label == -1)
+        if label == -1:
+            continue
+            
+        # Get all points in this cluster
+        cluster_indices = np.where(labels == label)[0]
+        cluster_locations = [locations[i] for i in cluster_indices]
+        
+        # Create cluster
+        cluster = LocationCluster(locations=cluster_locations)
+        cluster.recalculate()
+        clusters.append(cluster)
+    
+    return clusters
+
+def cluster_locations_simple(locations, distance_threshold=100):
+    """
+    Simple clustering algorithm for locations based on distance
+    
+    Args:
+        locations: List of location dictionaries with 'latitude' and 'longitude'
+        distance_threshold: Maximum distance (meters) between points in the same cluster
+    
+    Returns:
+        List of LocationCluster objects
+    """
+    if not locations:
+        return []
+    
+    index = _GridIndex(distance_threshold)
+    index.add(*_coordinate_arrays(locations))
+    
+    clusters = []
+    processed = np.zeros(len(locations), dtype=bool)
+    
+    for i, location in enumerate(locations):
+        if processed[i]:
+            continue
+        
+        # Find all unprocessed locations within the threshold of this one
+        nearby = index.query(index.lats[i], index.lngs[i], distance_threshold)
+        nearby = nearby[~processed[nearby]]
+        processed[nearby] = True
+        processed[i] = True
+        
+        # The seed location comes first, followed by its neighbours in input order
+        cluster_locations = [location] + [locations[j] for j in nearby.tolist() if j != i]
+        
+        cluster = LocationCluster(locations=cluster_locations)
+        cluster.recalculate()
+        clusters.append(cluster)
+    
+    return clusters
+
+class IncrementalClusterer:
+    """
+    DBSCAN that absorbs new locations without re-clustering old ones
+    
+    Adding points can only create core points and join clusters, never split
+    them, so clusters are kept as a union-find over core points. Each batch
+    costs neighbour queries for the new points and for points it promotes to
+    core. Border points stay with the first cluster that reached them.
+    """
+    
+    def __init__(self, eps=100, min_samples=5):
+        """
+        Args:
+            eps: Maximum distance (meters) between neighbouring points
+            min_samples: Neighbours (including the point itself) that make a core point
+        """
+        self.eps = eps
+        self.min_samples = min_samples
+        self.locations: List[Dict[str, Any]] = []
+        self._index = _GridIndex(eps)
+        self._neighbour_counts: List[int] = []
+        self._core: List[bool] = []
+        # Union-find parent for core points, -1 otherwise
+        self._parent: List[int] = []
+        # Core point a border point is attached to, -1 for core and noise points
+        self._attached: List[int] = []
+        self._clusters: Dict[int, LocationCluster] = {}
+    
+    def add_locations(self, locations: Iterable[Dict[str, Any]]) -> List[LocationCluster]:
+        """
+        Add a batch of locations and update the clustering
+        
+        Args:
+            locations: Location dictionaries with 'latitude' and 'longitude'
+        
+        Returns:
+            Clusters that were created or changed by this batch
+        """
+        locations = list(locations)
+        if not locations:
+            return []
+        
+        start = len(self.locations)
+        self.locations.extend(locations)
+        self._index.add(*_coordinate_arrays(locations))
+        added = len(locations)
+        self._neighbour_counts.extend([0] * added)
+        self._core.extend([False] * added)
+        self._parent.extend([-1] * added)
+        self._attached.extend([-1] * added)
+        
+        # Count neighbours; pairs among the new points are seen from both sides
+        neighbours: Dict[int, np.ndarray] = {}
+        promoted = []
+        for i in range(start, len(self.locations)):
+            found = self._neighbours(i)
+            neighbours[i] = found
+            self._neighbour_counts[i] = len(found)
+            for j in found[found < start].tolist():
+                self._neighbour_counts[j] += 1
+                if self._neighbour_counts[j] == self.min_samples:
+                    promoted.append(j)
+        promoted.extend(i for i in range(start, len(self.locations))
+                        if self._neighbour_counts[i] >= self.min_samples)
+        for p in promoted:
+            self._core[p] = True
+        
+        touched = set()
+        for p in promoted:
+            if self._attached[p] >= 0:
+                # A border point turning core already sits in its cluster
+                self._parent[p] = self._find(self._attached[p])
+                self._attached[p] = -1
+            else:
+                self._parent[p] = p
+                cluster = LocationCluster()
+                cluster.add_location(self.locations[p])
+                self._clusters[p] = cluster
+            
+            found = neighbours.get(p)
+            if found is None:
+                found = self._neighbours(p)
+            for j in found.tolist():
+                if j == p:
+                    continue
+                if self._core[j]:
+                    # Core neighbours promoted later in this batch union when they are reached
+                    if self._parent[j] >= 0:
+                        self._union(p, j)
+                elif self._attached[j] < 0:
+                    self._attach(j, p)
+            touched.add(p)
+        
+        # New border points next to core points that were already core
+        for i in range(start, len(self.locations)):
+            if self._core[i] or self._attached[i] >= 0:
+                continue
+            for j in neighbours[i].tolist():
+                if self._core[j]:
+                    self._attach(i, j)
+                    touched.add(j)
+                    break
+        
+        return [self._clusters[root] for root in {self._find(p) for p in touched}]
+    
+    def clusters(self) -> List[LocationCluster]:
+        """Return the current clusters"""
+        return list(self._clusters.values())
+    
+    def labels(self) -> np.ndarray:
+        """DBSCAN-style labels for every location added so far (-1 is noise)"""
+        roots = {root: label for label, root in enumerate(self._clusters)}
+        labels = np.full(len(self.locations), -1, dtype=np.int64)
+        for i in range(len(self.locations)):
+            if self._core[i]:
+                labels[i] = roots[self._find(i)]
+            elif self._attached[i] >= 0:
+                labels[i] = roots[self._find(self._attached[i])]
+        return labels
+    
+    def _neighbours(self, i):
+        return self._index.query(self._index.lats[i], self._index.lngs[i], self.eps)
+    
+    def _attach(self, border, core):
+        self._attached[border] = core
+        self._clusters[self._find(core)].add_location(self.locations[border])
+    
+    def _find(self, i):
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+    
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        # Merge the smaller cluster's locations into the larger one
+        if len(self._clusters[root_a].locations) < len(self._clusters[root_b].locations):
+            root_a, root_b = root_b, root_a
+        self._clusters[root_a].merge(self._clusters.pop(root_b))
+        self._parent[root_b] = root_a
+
+def generate_location_heatmap(locations, resolution=100):
+    """
+    Generate a heatmap of locations
+    
+    This is a single fixed grid over the data's bounds; the map uses the
+    zoomable tiles of app.core.geo.heatmap.HeatmapPyramid instead.
+    
+    Args:
+        locations: List of location dictionaries with 'latitude' and 'longitude'
+        resolution: Resolution of the heatmap grid
+        
+    Returns:
+        Dictionary with heatmap data
+    """
+    if not locations:
+        return {'grid': [], 'bounds': None}
+    
+    lats, lngs = _coordinate_arrays(locations)
+    
+    # Find bounds
+    min_lat, max_lat = float(lats.min()), float(lats.max())
+    min_lng, max_lng = float(lngs.min()), float(lngs.max())
+    
+    # Add padding
+    lat_padding = (max_lat - min_lat) * 0.1 or 0.01
+    lng_padding = (max_lng - min_lng) * 0.1 or 0.01
+    
+    min_lat -= lat_padding
+    max_lat += lat_padding
+    min_lng -= lng_padding
+    max_lng += lng_padding
+    
+    # Create grid
+    lat_step = (max_lat - min_lat) / resolution
+    lng_step = (max_lng - min_lng) / resolution
+    
+    # Count locations in each grid cell in one pass
+    lat_idx = np.clip(((lats - min_lat) / lat_step).astype(np.int64), 0, resolution - 1)
+    lng_idx = np.clip(((lngs - min_lng) / lng_step).astype(np.int64), 0, resolution - 1)
+    grid = np.bincount(lat_idx * resolution + lng_idx, minlength=resolution * resolution)
+    
+    return {
+        'grid': grid.reshape(resolution, resolution).tolist(),
+        'bounds': {
+            'min_lat': min_lat,
+            'max_lat': max_lat,
+            'min_lng': min_lng,
+            'max_lng': max_lng,
+        }
+    }
+
+def identify_significant_locations(clusters, min_duration=timedelta(hours=1), min_visits=3):
+    """
+    Identify significant locations from clusters
+    
+    Args:
+        clusters: List of LocationCluster objects
+        min_duration: Minimum duration to consider a location significant
+        min_visits: Minimum number of visits to consider a location significant
+        
+    Returns:
+        List of significant LocationCluster objects
+    """
+    significant = []
+    
+    for cluster in clusters:
+        # Skip clusters without time information
+        if not cluster.start_time or not cluster.end_time:
+            continue
+        
+        # Calculate total duration
+        duration = cluster.end_time - cluster.start_time
+        
+        # Count visits (separated by at least 6 hours)
+        visits = 1
+        last_time = cluster.locations[0].get('timestamp')
+        
+        for loc in sorted(cluster.locations, key=lambda x: x.get('timestamp', 0)):
+            time = loc.get('timestamp')
+            if time and last_time and (time - last_time).total_seconds() > 6 * 3600:
+                visits += 1
+                last_time = time
+        
+        if duration >= min_duration or visits >= min_visits:
+            cluster.metadata['visits'] = visits
+            cluster.metadata['duration'] = duration
+            cluster.metadata['significant'] = True
+            significant.append(cluster)
+    
+    return significant
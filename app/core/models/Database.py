@@ -2,29 +2,159 @@ import sqlite3
 import json
 import os
 import logging
+import math
+import queue
 import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from itertools import islice
+from typing import List, Dict, Any, Optional, Union, Iterable, Iterator, Callable, Sequence, Set, Tuple
 from contextlib import contextmanager
 
+from app.core.geo import geodesy
+
 logger = logging.getLogger(__name__)
 
+# Column order used by bulk ingestion; tuple rows must follow it.
+LOCATION_COLUMNS = ('target_id', 'latitude', 'longitude', 'date', 'source',
+                    'source_type', 'confidence', 'context')
+
+# Column order of rows returned by the location queries
+LOCATION_ROW_FIELDS = ('id',) + LOCATION_COLUMNS + ('created_at',)
+_CONTEXT_INDEX = LOCATION_ROW_FIELDS.index('context')
+_LOCATION_SELECT = f"SELECT {', '.join(LOCATION_ROW_FIELDS)} FROM locations"
+
+_LOCATION_INSERT_SQL = (
+    "INSERT INTO locations (target_id, latitude, longitude, date, source, source_type, confidence, context, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Secondary indexes on the locations table, dropped and rebuilt around bulk loads
+_LOCATION_INDEXES = {
+    'idx_locations_target_id': 'CREATE INDEX IF NOT EXISTS idx_locations_target_id ON locations(target_id)',
+    'idx_locations_coordinates': 'CREATE INDEX IF NOT EXISTS idx_locations_coordinates ON locations(latitude, longitude)',
+    'idx_locations_date': 'CREATE INDEX IF NOT EXISTS idx_locations_date ON locations(date)',
+}
+
+_EMPTY_CONTEXT = '{}'
+
+# R*Tree virtual table mirroring location coordinates, kept in sync by triggers
+_SPATIAL_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS locations_rtree "
+    "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+)
+_SPATIAL_BACKFILL_SQL = (
+    "INSERT OR REPLACE INTO locations_rtree (id, min_lat, max_lat, min_lon, max_lon) "
+    "SELECT id, latitude, latitude, longitude, longitude FROM locations WHERE id > ?"
+)
+_SPATIAL_TRIGGERS = {
+    'locations_rtree_insert': '''
+        CREATE TRIGGER IF NOT EXISTS locations_rtree_insert AFTER INSERT ON locations BEGIN
+            INSERT OR REPLACE INTO locations_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END
+    ''',
+    'locations_rtree_update': '''
+        CREATE TRIGGER IF NOT EXISTS locations_rtree_update AFTER UPDATE OF latitude, longitude ON locations BEGIN
+            UPDATE locations_rtree
+            SET min_lat = new.latitude, max_lat = new.latitude, min_lon = new.longitude, max_lon = new.longitude
+            WHERE id = new.id;
+        END
+    ''',
+    'locations_rtree_delete': '''
+        CREATE TRIGGER IF NOT EXISTS locations_rtree_delete AFTER DELETE ON locations BEGIN
+            DELETE FROM locations_rtree WHERE id = old.id;
+        END
+    ''',
+}
+
+# Columns accepted by search_locations' order_by
+_LOCATION_ORDER_FIELDS = frozenset((
+    'id', 'target_id', 'latitude', 'longitude', 'date', 'source',
+    'source_type', 'confidence', 'created_at',
+))
+
+_MAX_SEARCH_RADIUS_M = math.pi * geodesy.EARTH_RADIUS_M  # Half the circumference covers the globe
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
+    """Great-circle distance in metres, registered as the SQL function ``haversine_m``."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    return geodesy.haversine_scalar(lat1, lon1, lat2, lon2)
+
+
+def _longitude_ranges(min_lon: float, max_lon: float) -> List[Tuple[float, float]]:
+    """Split a longitude interval that crosses the antimeridian into two."""
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+class _WaitStats:
+    """Accumulates how long callers waited to acquire a connection."""
+    
+    def __init__(self):
+        self._guard = threading.Lock()
+        self.acquisitions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, waited: float):
+        with self._guard:
+            self.acquisitions += 1
+            self.total_wait += waited
+            if waited > self.max_wait:
+                self.max_wait = waited
+    
+    def snapshot(self) -> Dict[str, float]:
+        with self._guard:
+            return {
+                'acquisitions': self.acquisitions,
+                'total_wait_seconds': self.total_wait,
+                'max_wait_seconds': self.max_wait,
+                'mean_wait_seconds': self.total_wait / self.acquisitions if self.acquisitions else 0.0,
+            }
+
+
 class Database:
-    """Handles database operations for CreepyAI."""
+    """
+    Handles database operations for CreepyAI.
+    
+    Writes go through a single writer connection serialised by a lock. Reads
+    borrow one of up to ``max_readers`` read-only connections, so with WAL
+    enabled they run concurrently with each other and with the writer. A read
+    that finds every pooled reader busy for ``reader_timeout`` seconds (say,
+    behind paged generators that were never finished) opens a temporary
+    connection instead of waiting forever.
+    """
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, max_readers: int = 4, reader_timeout: float = 5.0):
         """Initialize the database."""
         self.db_path = db_path or os.path.join(os.path.expanduser("~"), ".creepyai", "creepyai.db")
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self._conn = None
-        self._lock = threading.RLock()  # Thread-safe database access
+        self._lock = threading.RLock()  # Serialises use of the writer connection
+        self._has_rtree = False
+        self._closed = False
+        self._max_readers = max(1, max_readers)
+        self._readers = queue.LifoQueue()  # Idle read-only connections
+        self._reader_count = 0
+        self._reader_timeout = reader_timeout
+        self._temporary_readers: Set[int] = set()  # ids of readers opened past the pool limit
+        self._reader_guard = threading.Lock()
+        self._writer_waits = _WaitStats()
+        self._reader_waits = _WaitStats()
         self._connect()
         self._setup_tables()
     
     @contextmanager
     def _get_connection(self):
-        """Get a thread-safe database connection."""
+        """Get a cursor on the writer connection, committing on success."""
+        started = time.perf_counter()
         with self._lock:
+            self._writer_waits.record(time.perf_counter() - started)
+            cursor = None
             try:
                 if self._conn is None:
                     self._connect()
@@ -41,16 +171,124 @@ class Database:
             finally:
                 if cursor:
                     cursor.close()
+    
+    @contextmanager
+    def _read_connection(self):
+        """
+        Borrow a cursor on a pooled read-only connection.
+        
+        Nothing is committed; each SELECT runs in its own implicit read
+        transaction against the latest committed snapshot.
+        """
+        started = time.perf_counter()
+        conn = self._acquire_reader()
+        self._reader_waits.record(time.perf_counter() - started)
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except sqlite3.Error as e:
+            logger.error(f"Database read error: {str(e)}")
+            raise
+        finally:
+            cursor.close()
+            self._release_reader(conn)
+    
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take an idle reader, opening a new one while under the pool limit."""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._reader_guard:
+            can_open = self._reader_count < self._max_readers
+            if can_open:
+                self._reader_count += 1
+        if can_open:
+            try:
+                return self._open_connection(read_only=True)
+            except sqlite3.Error:
+                with self._reader_guard:
+                    self._reader_count -= 1
+                raise
+
+        try:
+            return self._readers.get(timeout=self._reader_timeout)
+        except queue.Empty:
+            pass
+
+        logger.warning(f"All {self._max_readers} pooled readers busy for {self._reader_timeout}s; "
+                       "opening a temporary read connection")
+        conn = self._open_connection(read_only=True)
+        with self._reader_guard:
+            self._temporary_readers.add(id(conn))
+        return conn
+    
+    def _release_reader(self, conn: sqlite3.Connection):
+        """Return a reader to the pool, or close it if it was temporary or the database was closed."""
+        with self._reader_guard:
+            temporary = id(conn) in self._temporary_readers
+            self._temporary_readers.discard(id(conn))
+        if temporary or self._closed:
+            conn.close()
+            return
+        self._readers.put(conn)
+                    
+    @contextmanager
+    def _bulk_writer(self):
+        """
+        Hold the writer connection for the duration of a bulk load.
+        
+        Other writers queue behind the load, but readers use their own
+        connections and keep working against the last committed snapshot.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._writer_waits.record(time.perf_counter() - started)
+            if self._conn is None:
+                self._connect()
+            yield self._conn
+                    
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection to the database file."""
+        # Enable URI mode to allow options for connection
+        mode = 'ro' if read_only else 'rwc'
+        conn = sqlite3.connect(f"file:{self.db_path}?mode={mode}",
+                               uri=True,
+                               timeout=30.0,  # Wait for concurrent writers instead of failing
+                               check_same_thread=False,  # Will handle thread safety with our own lock
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None if read_only else '')
+        conn.row_factory = sqlite3.Row
+        conn.create_function('haversine_m', 4, _haversine_m, deterministic=True)
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = 10000")
+        return conn
+    
+    def get_lock_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Report how long callers have waited for database connections.
+        
+        Returns:
+            dict: ``writer`` and ``reader`` wait statistics (acquisition count,
+            total, max and mean wait in seconds) plus reader pool usage
+        """
+        metrics = {
+            'writer': self._writer_waits.snapshot(),
+            'reader': self._reader_waits.snapshot(),
+        }
+        metrics['reader']['open_connections'] = self._reader_count
+        metrics['reader']['max_connections'] = self._max_readers
+        return metrics
                     
     def _connect(self):
         """Connect to the SQLite database."""
         try:
-            # Enable URI mode to allow options for connection
-            self._conn = sqlite3.connect(f"file:{self.db_path}?mode=rwc", 
-                                        uri=True,
-                                        check_same_thread=False,  # Will handle thread safety with our own lock
-                                        detect_types=sqlite3.PARSE_DECLTYPES)
-            self._conn.row_factory = sqlite3.Row
+            self._conn = self._open_connection()
             
             # Enable foreign keys
             with self._get_connection() as cursor:
@@ -141,16 +379,34 @@ class Database:
                 
                 # Create indices for better performance
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_targets_project_id ON targets(project_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_locations_target_id ON locations(target_id)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_sources_target_id ON sources(target_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_locations_coordinates ON locations(latitude, longitude)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_locations_date ON locations(date)')
+                for statement in _LOCATION_INDEXES.values():
+                    cursor.execute(statement)
+                
+                self._setup_spatial_index(cursor)
                 
                 logger.info("Database tables created successfully")
         except sqlite3.Error as e:
             logger.error(f"Database setup error: {str(e)}")
             raise
     
+    def _setup_spatial_index(self, cursor):
+        """Create the locations R*Tree and its sync triggers, backfilling existing rows."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'locations_rtree'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute(_SPATIAL_TABLE_SQL)
+        except sqlite3.OperationalError as e:
+            # SQLite built without the R*Tree module; spatial queries fall back to table scans
+            logger.warning(f"R*Tree spatial index unavailable: {str(e)}")
+            return
+
+        for statement in _SPATIAL_TRIGGERS.values():
+            cursor.execute(statement)
+        if not exists:
+            cursor.execute(_SPATIAL_BACKFILL_SQL, (0,))
+        self._has_rtree = True
+
     def create_project(self, name: str, description: str = "", settings: Optional[Dict] = None) -> Optional[int]:
         """
         Create a new project.
@@ -242,33 +498,139 @@ class Database:
         Returns:
             int: Number of locations added
         """
-        now = datetime.now().isoformat()
-        added_count = 0
-        
         try:
-            with self._get_connection() as cursor:
-                for location in locations:
-                    cursor.execute(
-                        "INSERT INTO locations (target_id, latitude, longitude, date, source, source_type, confidence, context, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            location.get('target_id'),
-                            location.get('latitude'),
-                            location.get('longitude'),
-                            location.get('date'),
-                            location.get('source'),
-                            location.get('source_type'),
-                            location.get('confidence'),
-                            json.dumps(location.get('context', {})),
-                            now
-                        )
-                    )
-                    added_count += 1
-                    
-            return added_count
+            stats = self.bulk_insert_locations(locations, atomic=True)
+            return stats['rows']
         except sqlite3.Error as e:
             logger.error(f"Failed to add batch locations: {str(e)}")
             return 0
 
+    def bulk_insert_locations(self, rows: Iterable[Union[Dict[str, Any], Sequence[Any]]],
+                              chunk_size: int = 10000,
+                              drop_indexes: bool = False,
+                              atomic: bool = False,
+                              progress_callback: Optional[Callable[[int, float], None]] = None) -> Dict[str, Any]:
+        """
+        Stream locations into the database using chunked ``executemany`` calls.
+        
+        Rows are consumed lazily, so ``rows`` may be a generator over an
+        arbitrarily large import. Each row is either a location dictionary (as
+        accepted by ``add_batch_locations``) or a sequence ordered like
+        ``LOCATION_COLUMNS``; ``context`` may be a dict or pre-encoded JSON.
+        
+        The load runs on its own writer connection so readers are not blocked
+        behind it. Unless ``atomic`` is set, every chunk is committed on its own
+        which keeps the WAL small and makes progress visible to readers.
+        
+        Args:
+            rows: Iterable of location rows
+            chunk_size: Number of rows sent per ``executemany`` call
+            drop_indexes: Drop secondary location indexes (and the R*Tree insert
+                trigger) during the load and rebuild them afterwards; worth it
+                for loads of millions of rows
+            atomic: Insert everything in a single transaction
+            progress_callback: Called with ``(rows_inserted, rows_per_second)``
+                after every chunk
+            
+        Returns:
+            dict: ``rows``, ``chunks``, ``seconds`` and ``rows_per_second``
+            
+        Raises:
+            sqlite3.Error: If the load fails; the current transaction is rolled back.
+                Dropped indexes are rebuilt either way, and a failure to
+                rebuild them is only raised when the load itself succeeded
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        now = datetime.now().isoformat()
+        prepared = (self._prepare_location_row(row, now) for row in rows)
+        inserted = 0
+        chunks = 0
+        started = time.perf_counter()
+
+        rebuild_spatial = drop_indexes and self._has_rtree
+        last_id = None  # Highest id before the load; rows above it get R*Tree entries
+        completed = False
+
+        with self._bulk_writer() as conn:
+            try:
+                if drop_indexes:
+                    for name in _LOCATION_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                    if rebuild_spatial:
+                        # Fill the R*Tree in one pass afterwards instead of row by row
+                        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM locations").fetchone()[0]
+                        conn.execute("DROP TRIGGER IF EXISTS locations_rtree_insert")
+                    conn.commit()
+
+                while True:
+                    chunk = list(islice(prepared, chunk_size))
+                    if not chunk:
+                        break
+                    conn.executemany(_LOCATION_INSERT_SQL, chunk)
+                    if not atomic:
+                        conn.commit()
+                    inserted += len(chunk)
+                    chunks += 1
+                    if progress_callback:
+                        elapsed = time.perf_counter() - started
+                        progress_callback(inserted, inserted / elapsed if elapsed > 0 else 0.0)
+                conn.commit()
+                completed = True
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Bulk location insert failed after {inserted} rows: {str(e)}")
+                raise
+            finally:
+                if drop_indexes:
+                    try:
+                        for statement in _LOCATION_INDEXES.values():
+                            conn.execute(statement)
+                        if rebuild_spatial:
+                            if last_id is not None:
+                                conn.execute(_SPATIAL_BACKFILL_SQL, (last_id,))
+                            conn.execute(_SPATIAL_TRIGGERS['locations_rtree_insert'])
+                        conn.commit()
+                    except sqlite3.Error as e:
+                        conn.rollback()
+                        if completed:
+                            raise
+                        # Don't mask the error that stopped the load
+                        logger.error(f"Rebuilding location indexes after a failed load failed: {str(e)}")
+
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Bulk inserted {inserted} locations in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        return {
+            'rows': inserted,
+            'chunks': chunks,
+            'seconds': elapsed,
+            'rows_per_second': rate,
+        }
+
+    @staticmethod
+    def _prepare_location_row(location: Union[Dict[str, Any], Sequence[Any]], created_at: str) -> Tuple[Any, ...]:
+        """Convert a location dict or column-ordered sequence into an insert tuple."""
+        if isinstance(location, dict):
+            get = location.get
+            target_id, latitude, longitude, date, source, source_type, confidence, context = (
+                get('target_id'), get('latitude'), get('longitude'), get('date'),
+                get('source'), get('source_type'), get('confidence'), get('context'),
+            )
+        else:
+            values = tuple(location)
+            if len(values) < len(LOCATION_COLUMNS):
+                values += (None,) * (len(LOCATION_COLUMNS) - len(values))
+            target_id, latitude, longitude, date, source, source_type, confidence, context = values[:8]
+
+        if not context:
+            context = _EMPTY_CONTEXT
+        elif not isinstance(context, str):
+            context = json.dumps(context)
+
+        return (target_id, latitude, longitude, date, source, source_type, confidence, context, created_at)
+
     def add_source(self, target_id: int, source_url: str, source_type: str,
                   source_date: Optional[str] = None, content_hash: Optional[str] = None, 
                   data: Optional[Dict] = None) -> Optional[int]:
@@ -336,7 +698,7 @@ class Database:
         """
         try:
             now = datetime.now().isoformat()
-            with self._get_connection() as cursor:
+            with self._read_connection() as cursor:
                 cursor.execute(
                     "SELECT content, headers, expiry FROM cache WHERE url = ? AND (expiry IS NULL OR expiry > ?)",
                     (url, now)
@@ -362,7 +724,7 @@ class Database:
             list: List of project dictionaries
         """
         try:
-            with self._get_connection() as cursor:
+            with self._read_connection() as cursor:
                 cursor.execute("SELECT * FROM projects ORDER BY updated_at DESC")
                 return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
@@ -380,7 +742,7 @@ class Database:
             list: List of target dictionaries
         """
         try:
-            with self._get_connection() as cursor:
+            with self._read_connection() as cursor:
                 cursor.execute("SELECT * FROM targets WHERE project_id = ?", (project_id,))
                 targets = [dict(row) for row in cursor.fetchall()]
                 
@@ -410,34 +772,11 @@ class Database:
         Returns:
             list: List of location dictionaries
         """
+        query, params = self._locations_query(target_id, start_date, end_date, limit)
         try:
-            with self._get_connection() as cursor:
-                query = "SELECT * FROM locations WHERE target_id = ?"
-                params = [target_id]
-                
-                if start_date:
-                    query += " AND date >= ?"
-                    params.append(start_date)
-                    
-                if end_date:
-                    query += " AND date <= ?"
-                    params.append(end_date)
-                    
-                query += " ORDER BY date DESC"
-                
-                if limit:
-                    query += " LIMIT ?"
-                    params.append(limit)
-                
+            with self._read_connection() as cursor:
                 cursor.execute(query, params)
-                locations = [dict(row) for row in cursor.fetchall()]
-                
-                # Convert JSON context
-                for location in locations:
-                    if 'context' in location and location['context']:
-                        location['context'] = json.loads(location['context'])
-                        
-                return locations
+                return [self._row_to_location(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Failed to get locations: {str(e)}")
             return []
@@ -451,66 +790,334 @@ class Database:
             
         Returns:
             list: List of location dictionaries
+            
+        Raises:
+            ValueError: If ``order_by`` is not a locations column or
+                ``order_dir`` is not ASC/DESC
         """
+        query, params = self._search_query(search_params)
         try:
-            query = "SELECT * FROM locations WHERE 1=1"
-            params = []
-            
-            # Filter by target_id if provided
-            if 'target_id' in search_params:
-                query += " AND target_id = ?"
-                params.append(search_params['target_id'])
-            
-            # Filter by date range
-            if 'start_date' in search_params:
-                query += " AND date >= ?"
-                params.append(search_params['start_date'])
-                
-            if 'end_date' in search_params:
-                query += " AND date <= ?"
-                params.append(search_params['end_date'])
-                
-            # Filter by source
-            if 'source' in search_params:
-                query += " AND source LIKE ?"
-                params.append(f"%{search_params['source']}%")
-                
-            # Filter by coordinates range
-            if all(k in search_params for k in ['min_lat', 'max_lat', 'min_lon', 'max_lon']):
-                query += " AND latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?"
-                params.extend([
-                    search_params['min_lat'],
-                    search_params['max_lat'],
-                    search_params['min_lon'],
-                    search_params['max_lon']
-                ])
-                
-            # Order by
-            order_by = search_params.get('order_by', 'date')
-            order_dir = search_params.get('order_dir', 'DESC')
-            query += f" ORDER BY {order_by} {order_dir}"
-            
-            # Limit
-            if 'limit' in search_params:
-                query += " LIMIT ?"
-                params.append(search_params['limit'])
-                
-            with self._get_connection() as cursor:
+            with self._read_connection() as cursor:
                 cursor.execute(query, params)
-                locations = [dict(row) for row in cursor.fetchall()]
-                
-                # Convert JSON context
-                for location in locations:
-                    if 'context' in location and location['context']:
-                        location['context'] = json.loads(location['context'])
-                        
-                return locations
+                return [self._row_to_location(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Failed to search locations: {str(e)}")
             return []
 
+    def iter_location_pages(self, target_id: int,
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            limit: Optional[int] = None,
+                            page_size: int = 5000,
+                            as_tuples: bool = False,
+                            decode_context: bool = False) -> Iterator[List[Any]]:
+        """
+        Stream locations for a target in pages of at most ``page_size`` rows.
+        
+        Streaming variant of ``get_locations`` for exports and clustering over
+        large targets: only one page is materialised at a time. A pooled reader
+        is held until the generator is exhausted or closed, and all pages come
+        from the same read snapshot.
+        
+        Args:
+            target_id: Target ID
+            start_date: Start date for filtering
+            end_date: End date for filtering
+            limit: Maximum number of locations to return
+            page_size: Rows fetched per page
+            as_tuples: Yield plain tuples ordered like ``LOCATION_ROW_FIELDS``
+                instead of dictionaries
+            decode_context: Parse the JSON ``context`` column; when False it is
+                passed through as a string
+            
+        Yields:
+            list: A page of location dictionaries or tuples
+            
+        Raises:
+            ValueError: If ``page_size`` is not positive
+            sqlite3.Error: If the query fails part way through
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        query, params = self._locations_query(target_id, start_date, end_date, limit)
+        return self._iter_pages(query, params, page_size, as_tuples, decode_context)
+
+    def iter_search_pages(self, search_params: Dict[str, Any],
+                          page_size: int = 5000,
+                          as_tuples: bool = False,
+                          decode_context: bool = False) -> Iterator[List[Any]]:
+        """
+        Stream ``search_locations`` results in pages of at most ``page_size`` rows.
+        
+        Args:
+            search_params: Dictionary with search parameters
+            page_size: Rows fetched per page
+            as_tuples: Yield plain tuples ordered like ``LOCATION_ROW_FIELDS``
+            decode_context: Parse the JSON ``context`` column
+            
+        Yields:
+            list: A page of location dictionaries or tuples
+            
+        Raises:
+            ValueError: If ``page_size`` or the ordering parameters are invalid
+            sqlite3.Error: If the query fails part way through
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        query, params = self._search_query(search_params)
+        return self._iter_pages(query, params, page_size, as_tuples, decode_context)
+
+    def _iter_pages(self, query: str, params: List[Any], page_size: int,
+                    as_tuples: bool, decode_context: bool) -> Iterator[List[Any]]:
+        """Run a locations query and yield its rows page by page."""
+        with self._read_connection() as cursor:
+            if as_tuples:
+                cursor.row_factory = None
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                if as_tuples:
+                    if decode_context:
+                        rows = [self._decode_tuple_context(row) for row in rows]
+                    yield rows
+                else:
+                    yield [self._row_to_location(row, decode_context) for row in rows]
+
+    @staticmethod
+    def _decode_tuple_context(row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        """Return a copy of a tuple row with its context JSON decoded."""
+        context = row[_CONTEXT_INDEX]
+        if not context:
+            return row
+        return row[:_CONTEXT_INDEX] + (json.loads(context),) + row[_CONTEXT_INDEX + 1:]
+
+    @staticmethod
+    def _locations_query(target_id: int, start_date: Optional[str], end_date: Optional[str],
+                         limit: Optional[int]) -> Tuple[str, List[Any]]:
+        """Build the SQL behind ``get_locations``."""
+        query = f"{_LOCATION_SELECT} WHERE target_id = ?"
+        params: List[Any] = [target_id]
+        
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+            
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+            
+        query += " ORDER BY date DESC"
+        
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+
+    def _search_query(self, search_params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Build the SQL behind ``search_locations``."""
+        query = f"{_LOCATION_SELECT} WHERE 1=1"
+        params: List[Any] = []
+        
+        # Filter by target_id if provided
+        if 'target_id' in search_params:
+            query += " AND target_id = ?"
+            params.append(search_params['target_id'])
+        
+        # Filter by date range
+        if 'start_date' in search_params:
+            query += " AND date >= ?"
+            params.append(search_params['start_date'])
+            
+        if 'end_date' in search_params:
+            query += " AND date <= ?"
+            params.append(search_params['end_date'])
+            
+        # Filter by source
+        if 'source' in search_params:
+            query += " AND source LIKE ?"
+            params.append(f"%{search_params['source']}%")
+            
+        # Filter by coordinates range
+        if all(k in search_params for k in ['min_lat', 'max_lat', 'min_lon', 'max_lon']):
+            bbox_sql, bbox_params = self._bbox_filter(
+                search_params['min_lat'], search_params['min_lon'],
+                search_params['max_lat'], search_params['max_lon']
+            )
+            query += f" AND {bbox_sql}"
+            params.extend(bbox_params)
+            
+        # Order by
+        order_by = search_params.get('order_by', 'date')
+        order_dir = str(search_params.get('order_dir', 'DESC')).upper()
+        if order_by not in _LOCATION_ORDER_FIELDS:
+            raise ValueError(f"Invalid order_by field: {order_by!r}")
+        if order_dir not in ('ASC', 'DESC'):
+            raise ValueError(f"Invalid order_dir: {order_dir!r}")
+        query += f" ORDER BY {order_by} {order_dir}"
+        
+        # Limit
+        if 'limit' in search_params:
+            query += " LIMIT ?"
+            params.append(search_params['limit'])
+        return query, params
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                   target_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get locations inside a bounding box using the R*Tree index.
+        
+        A box with ``min_lon > max_lon`` is treated as crossing the antimeridian.
+        
+        Args:
+            min_lat: Southern edge
+            min_lon: Western edge
+            max_lat: Northern edge
+            max_lon: Eastern edge
+            target_id: Restrict results to one target
+            limit: Maximum number of locations to return
+            
+        Returns:
+            list: List of location dictionaries
+        """
+        bbox_sql, params = self._bbox_filter(min_lat, min_lon, max_lat, max_lon)
+        query = f"{_LOCATION_SELECT} WHERE {bbox_sql}"
+        if target_id is not None:
+            query += " AND target_id = ?"
+            params.append(target_id)
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        try:
+            with self._read_connection() as cursor:
+                cursor.execute(query, params)
+                return [self._row_to_location(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to query bounding box: {str(e)}")
+            return []
+
+    def query_radius(self, latitude: float, longitude: float, radius_m: float,
+                     target_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get locations within ``radius_m`` metres of a point, nearest first.
+        
+        Candidates come from the R*Tree using the circle's bounding box and are
+        then filtered by exact great-circle distance.
+        
+        Args:
+            latitude: Centre latitude
+            longitude: Centre longitude
+            radius_m: Search radius in metres
+            target_id: Restrict results to one target
+            limit: Maximum number of locations to return
+            
+        Returns:
+            list: Location dictionaries with an added ``distance_m`` key
+        """
+        min_lat, min_lon, max_lat, max_lon = geodesy.bbox_for_radius(latitude, longitude, radius_m)
+        bbox_sql, bbox_params = self._bbox_filter(min_lat, min_lon, max_lat, max_lon)
+        query = (
+            f"SELECT {', '.join(LOCATION_ROW_FIELDS)}, haversine_m(?, ?, latitude, longitude) AS distance_m FROM locations "
+            f"WHERE {bbox_sql} AND distance_m <= ?"
+        )
+        params: List[Any] = [latitude, longitude, *bbox_params, radius_m]
+        if target_id is not None:
+            query += " AND target_id = ?"
+            params.append(target_id)
+        query += " ORDER BY distance_m"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        try:
+            with self._read_connection() as cursor:
+                cursor.execute(query, params)
+                return [self._row_to_location(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to query radius: {str(e)}")
+            return []
+
+    def query_k_nearest(self, latitude: float, longitude: float, k: int,
+                        target_id: Optional[int] = None,
+                        initial_radius_m: float = 1000.0,
+                        max_radius_m: float = _MAX_SEARCH_RADIUS_M) -> List[Dict[str, Any]]:
+        """
+        Get the ``k`` locations nearest to a point.
+        
+        Runs radius queries with a growing radius until ``k`` hits are found;
+        anything outside the final radius is further away than every hit, so
+        the result is exact.
+        
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Number of neighbours to return
+            target_id: Restrict results to one target
+            initial_radius_m: First search radius in metres
+            max_radius_m: Stop growing the radius beyond this distance
+            
+        Returns:
+            list: Up to ``k`` location dictionaries with ``distance_m``, nearest first
+        """
+        if k < 1:
+            return []
+
+        radius = max(initial_radius_m, 1.0)
+        while True:
+            radius = min(radius, max_radius_m)
+            locations = self.query_radius(latitude, longitude, radius, target_id=target_id, limit=k)
+            if len(locations) >= k or radius >= max_radius_m:
+                return locations
+            radius *= 4
+
+    def _bbox_filter(self, min_lat: float, min_lon: float,
+                     max_lat: float, max_lon: float) -> Tuple[str, List[Any]]:
+        """Build a WHERE fragment selecting locations inside a bounding box."""
+        lon_ranges = _longitude_ranges(min_lon, max_lon)
+        lon_sql = " OR ".join("longitude BETWEEN ? AND ?" for _ in lon_ranges)
+        exact_sql = f"latitude BETWEEN ? AND ? AND ({lon_sql})"
+        exact_params: List[Any] = [min_lat, max_lat]
+        for lon_range in lon_ranges:
+            exact_params.extend(lon_range)
+
+        if not self._has_rtree:
+            return exact_sql, exact_params
+
+        # The R*Tree stores 32-bit floats rounded outwards, so it yields a
+        # superset of candidates that the exact predicate then trims
+        rtree_sql = " OR ".join(
+            "(max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?)" for _ in lon_ranges
+        )
+        rtree_params: List[Any] = []
+        for west, east in lon_ranges:
+            rtree_params.extend((min_lat, max_lat, west, east))
+
+        return (
+            f"id IN (SELECT id FROM locations_rtree WHERE {rtree_sql}) AND {exact_sql}",
+            rtree_params + exact_params,
+        )
+
+    @staticmethod
+    def _row_to_location(row: sqlite3.Row, decode_context: bool = True) -> Dict[str, Any]:
+        """Convert a locations row into a dictionary, optionally decoding its context."""
+        location = dict(row)
+        if decode_context and location.get('context'):
+            location['context'] = json.loads(location['context'])
+        return location
+
     def close(self):
-        """Close the database connection."""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
+        """Close the writer connection and every idle reader."""
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._reader_guard:
+            self._reader_count = 0
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
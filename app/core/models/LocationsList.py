@@ -6,7 +6,13 @@ import os
 import datetime
 import logging
 from typing import List, Dict, Optional
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+import numpy as np
+from PyQt5.QtCore import Qt, QVariant
+
+from app.core.data.location_index import timestamp_key
+from app.core.data.row_order import RowOrder
+from app.core.models.row_order_model import RowOrderModel
 
 logger = logging.getLogger(__name__)
 
@@ -29,27 +35,30 @@ class Location:
         string_to_hash = f"{self.latitude}{self.longitude}{self.datetime}{self.plugin}"
         self.id = hashlib.md5(string_to_hash.encode()).hexdigest()
 
-class LocationsTableModel(QAbstractTableModel):
+class LocationsTableModel(RowOrderModel):
     """
     Table model for displaying a list of locations.
+    
+    Rows are positions in the list, shown through a sort permutation that is
+    computed on a worker thread; the list itself is never reordered.
     """
 
     def __init__(self, locations_list, parent=None):
         super(LocationsTableModel, self).__init__(parent)
         self.locations = locations_list
         self.headers = ['Date', 'Plugin', 'Location']
-
-    def rowCount(self, parent=None):
-        return len(self.locations)
+        self._sort_column = -1
+        self._descending = False
+        self._reset(RowOrder(np.arange(len(self.locations))))
 
     def columnCount(self, parent=None):
         return len(self.headers)
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self.locations)):
+        if not index.isValid() or not (0 <= index.row() < self._fetched):
             return QVariant()
 
-        location = self.locations[index.row()]
+        location = self.locations[self._order.id_at(index.row())]
         column = index.column()
 
         if role == Qt.DisplayRole:
@@ -85,34 +94,57 @@ class LocationsTableModel(QAbstractTableModel):
             return self.headers[section]
         return QVariant()
     
+    @staticmethod
+    def _sort_key(location, column):
+        if column == 0:
+            return timestamp_key(location.datetime)
+        if column == 1:
+            return location.plugin or ""
+        return location.shortName or ""
+    
     def sort(self, column, order):
         """Sort table by given column and order."""
-        self.beginResetModel()
-        if column == 0:
-            self.locations.sort(key=lambda x: x.datetime, reverse=(order == Qt.DescendingOrder))
-        elif column == 1:
-            self.locations.sort(key=lambda x: x.plugin, reverse=(order == Qt.DescendingOrder))
-        elif column == 2:
-            self.locations.sort(key=lambda x: x.shortName, reverse=(order == Qt.DescendingOrder))
-        self.endResetModel()
+        descending = order == Qt.DescendingOrder
+        if column == self._sort_column and not self.is_loading:
+            self._descending = descending
+            self._reverse(descending)
+            return
+        self._sort_column, self._descending = column, descending
+        if column not in (0, 1, 2):
+            self._reset(RowOrder(np.arange(len(self.locations)), descending=descending))
+            return
+        
+        locations = list(self.locations)
+        key = self._sort_key
+        self._build(lambda: RowOrder(
+            np.arange(len(locations)), [key(location, column) for location in locations], descending
+        ))
+    
+    def _replay(self, kind, payload):
+        if kind == "added":
+            self._order.insert([payload], [self._key_of(payload)])
+        
+    def _key_of(self, position):
+        if self._sort_column in (0, 1, 2):
+            return self._sort_key(self.locations[position], self._sort_column)
+        return float(position)
         
     def addLocation(self, location):
         """Add a location to the model."""
-        self.beginInsertRows(QModelIndex(), len(self.locations), len(self.locations))
+        position = len(self.locations)
         self.locations.append(location)
-        self.endInsertRows()
+        if not self._defer("added", position):
+            self._insert([position], [self._key_of(position)])
         
     def clear(self):
         """Clear all locations from the model."""
-        self.beginResetModel()
         self.locations = []
-        self.endResetModel()
+        self._reset(RowOrder(np.arange(0), descending=self._descending))
         
     def getLocation(self, row):
         """Get location at specified row."""
-        if 0 <= row < len(self.locations):
-            return self.locations[row]
-        return None
+        position = self.row_id(row)
+        return self.locations[position] if position is not None else None
 
 class LocationsList:
     """Class for managing a list of locations"""
@@ -258,13 +290,20 @@ class LocationsList:
         if not self._locations:
             return 0
             
-        from utilities import GeneralUtilities
+        import numpy as np
+        from app.core.geo.geodesy import within_radius
         
-        for loc in self._locations:
-            distance = GeneralUtilities.calcDistance(lat, lon, loc.latitude, loc.longitude)
-            loc.visible = distance <= radius
+        lats = np.fromiter((loc.latitude for loc in self._locations), dtype=np.float64, count=len(self._locations))
+        lons = np.fromiter((loc.longitude for loc in self._locations), dtype=np.float64, count=len(self._locations))
+        # Radius is in kilometres, as with GeneralUtilities.calcDistance
+        inside, _ = within_radius(lat, lon, lats, lons, radius * 1000.0)
+        visible = np.zeros(len(self._locations), dtype=bool)
+        visible[inside] = True
+        
+        for loc, is_visible in zip(self._locations, visible.tolist()):
+            loc.visible = is_visible
             
-        return sum(1 for loc in self._locations if loc.visible)
+        return len(inside)
     
     def clear_filters(self):
         """Clear all filters, making all locations visible"""
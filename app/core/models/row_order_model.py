@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Base class for virtual table models backed by a RowOrder
+Subclasses describe how to build the order (the filtered, sorted row IDs)
+and how to draw a row; this class builds orders on a worker thread, hands
+rows to views in batches through ``canFetchMore``/``fetchMore`` and turns
+insertions and removals into per-run row signals. Changes that arrive
+while an order is being built are queued and replayed onto it.
+"""
+
+import logging
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, pyqtSignal
+
+from app.core.data.row_order import MAX_RUNS, OrderBuilder, RowOrder
+
+logger = logging.getLogger(__name__)
+
+# Rows handed to the view per fetchMore()
+FETCH_BATCH = 2000
+
+
+class RowOrderModel(QAbstractTableModel):
+    """Table model showing the rows of a RowOrder"""
+
+    # Built orders arrive from the worker thread through this (queued) signal
+    _orderReady = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super(RowOrderModel, self).__init__(parent)
+        self._order = RowOrder()
+        self._fetched = 0
+        self._request: Optional[int] = None
+        self._pending_changes: List[Tuple[str, Any]] = []
+        self._builder = OrderBuilder(self._orderReady.emit)
+        self._orderReady.connect(self._install_order)
+
+    # ------------------------------------------------------------------
+    # Qt model interface
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        """Rows fetched so far"""
+        return 0 if parent.isValid() else self._fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_BATCH, len(self._order) - self._fetched)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+    @property
+    def is_loading(self) -> bool:
+        """Whether an order is still being built"""
+        return self._request is not None
+
+    def total_count(self) -> int:
+        """Rows in the order, fetched or not"""
+        return len(self._order)
+
+    def row_id(self, row: int) -> Optional[Hashable]:
+        """ID shown at a row"""
+        if 0 <= row < len(self._order):
+            return self._order.id_at(row)
+        return None
+
+    def _build(self, build: Callable[[], RowOrder]) -> None:
+        """Replace the order with one built on the worker thread"""
+        self._pending_changes = []
+        self._request = self._builder.submit(build)
+
+    def _defer(self, kind: str, payload: Any) -> bool:
+        """Queue a change for the order being built; False when none is"""
+        if self._request is None:
+            return False
+        self._pending_changes.append((kind, payload))
+        return True
+
+    def _replay(self, kind: str, payload: Any) -> None:
+        """Apply a queued change to a freshly built order without signals"""
+
+    def _install_order(self, request: int, order: Optional[RowOrder]) -> None:
+        if request != self._request or not self._builder.is_current(request):
+            return
+        self._request = None
+        changes, self._pending_changes = self._pending_changes, []
+        if order is None:
+            return
+
+        self.beginResetModel()
+        self._order = order
+        for kind, payload in changes:
+            self._replay(kind, payload)
+        self._fetched = min(len(self._order), FETCH_BATCH)
+        self.endResetModel()
+
+    def _reset(self, order: RowOrder) -> None:
+        self._request = None
+        self._pending_changes = []
+        self.beginResetModel()
+        self._order = order
+        self._fetched = min(len(order), FETCH_BATCH)
+        self.endResetModel()
+
+    def _reverse(self, descending: bool) -> None:
+        """Flip the sort direction without rebuilding"""
+        self.beginResetModel()
+        self._order.descending = descending
+        self._fetched = min(len(self._order), FETCH_BATCH)
+        self.endResetModel()
+
+    # ------------------------------------------------------------------
+    # Incremental changes
+    # ------------------------------------------------------------------
+    def _insert(self, ids: List[Hashable], keys: List[Any]) -> None:
+        """Insert rows at their sorted positions, announcing each visible run"""
+        if not ids:
+            return
+        runs = self._order.plan_insert(ids, keys)
+        if len(runs) > MAX_RUNS:
+            complete = self._fetched == len(self._order)
+            self.beginResetModel()
+            self._order.insert(ids, keys)
+            if complete:
+                self._fetched = len(self._order)
+            self.endResetModel()
+            return
+
+        for run in runs:
+            complete = self._fetched == len(self._order)
+            if run.first < self._fetched or (complete and run.first == self._fetched):
+                self.beginInsertRows(QModelIndex(), run.first, run.first + run.count - 1)
+                self._order.apply_insert(run)
+                self._fetched += run.count
+                self.endInsertRows()
+            else:
+                # Past the fetched rows; fetchMore() will reveal it
+                self._order.apply_insert(run)
+
+    def _remove(self, ids: List[Hashable]) -> None:
+        """Remove rows by ID, announcing each visible run"""
+        if not ids:
+            return
+        runs = self._order.plan_remove(ids)
+        if len(runs) > MAX_RUNS:
+            self.beginResetModel()
+            self._order.remove(ids)
+            self._fetched = min(self._fetched, len(self._order))
+            self.endResetModel()
+            return
+
+        for run in runs:
+            visible = min(run.first + run.count, self._fetched) - run.first
+            if visible > 0:
+                self.beginRemoveRows(QModelIndex(), run.first, run.first + visible - 1)
+                self._order.apply_remove(run)
+                self._fetched -= visible
+                self.endRemoveRows()
+            else:
+                self._order.apply_remove(run)
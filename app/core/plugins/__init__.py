@@ -7,7 +7,7 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from app.plugins.catalog import PluginCatalog, PluginDescriptor
+from app.plugins.catalog import LazyPluginMap, PluginCatalog, PluginDescriptor
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,7 @@ class PluginManager:
     """Manages loading and running of CreepyAI plugins"""
     
     def __init__(self):
-        self.plugins: Dict[str, Any] = {}
+        self.plugins: LazyPluginMap = self._new_registry()
         self.plugin_dirs: List[str] = []
         self.categories: Dict[str, str] = {}
         self.failed_plugins: Dict[str, str] = {}
@@ -63,7 +63,7 @@ class PluginManager:
     def discover_plugins(self, *, force_refresh: bool = False):
         """Discover all available plugins in the plugin directories."""
 
-        self.plugins = {}
+        self.plugins = self._new_registry()
         self.categories = {}
         self.failed_plugins = {}
 
@@ -76,14 +76,9 @@ class PluginManager:
                 self.failed_plugins[descriptor.identifier] = descriptor.load_error
                 continue
 
-            try:
-                plugin_instance = descriptor.instantiate()
-                self._ensure_required_methods(plugin_instance)
-                self.plugins[descriptor.identifier] = plugin_instance
-                self.categories[descriptor.identifier] = descriptor.category
-            except Exception as exc:  # pragma: no cover - safe guard
-                message = f"{type(exc).__name__}: {exc}"
-                self.failed_plugins[descriptor.identifier] = message
+            # Instantiated on first lookup
+            self.plugins.defer(descriptor.identifier, descriptor)
+            self.categories[descriptor.identifier] = descriptor.category
 
         logger.info(
             "Discovered %s plugins (%s failed) across %s categories",
@@ -93,6 +88,15 @@ class PluginManager:
         )
         return self.plugins
 
+    def _new_registry(self) -> LazyPluginMap:
+        return LazyPluginMap(on_load=self._ensure_required_methods, on_error=self._record_failure)
+
+    def _record_failure(self, name: str, message: str) -> None:
+        """Note a plugin that failed to instantiate on first lookup"""
+        logger.error(f"Failed to instantiate plugin {name}: {message}")
+        self.failed_plugins[name] = message
+        self.categories.pop(name, None)
+
     def _ensure_catalog_cache_path(self) -> Path:
         if self._catalog_cache_path is None:
             cache_dir = Path.home() / ".creepyai" / "cache"
@@ -130,17 +134,28 @@ class PluginManager:
                 plugin_instance.run = lambda *args, **kwargs: {"error": "Method not implemented"}
     
     def get_plugin(self, name):
-        """Get a plugin by name"""
+        """Get a plugin by name, instantiating it if needed"""
         return self.plugins.get(name)
     
     def get_all_plugins(self):
         """Get all discovered plugins"""
         return self.plugins
     
+    def get_plugin_info(self, name):
+        """Get a plugin's metadata without instantiating it"""
+        if name not in self.plugins:
+            return None
+        return self.plugins.info(name)
+    
     def get_plugins_by_category(self, category):
         """Get all plugins in a specific category"""
-        return {name: plugin for name, plugin in self.plugins.items()
-                if self.categories.get(name) == category}
+        plugins = {}
+        for name in self.plugins:
+            if self.categories.get(name) == category:
+                plugin = self.plugins.get(name)
+                if plugin is not None:
+                    plugins[name] = plugin
+        return plugins
 
     def get_categories(self):
         """Get all available plugin categories"""
@@ -8,6 +8,7 @@ import logging
 from typing import List, Dict, Any, Optional
 
 from app.models.location_data import LocationDataModel, Location
+from app.exporters.csv_exporter import export_csv
 from app.exporters.gpx_exporter import export_gpx
 from app.exporters.kml_exporter import export_kml
 
@@ -25,13 +26,11 @@ class DataPipeline:
             if format_type.lower() == 'json':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                for loc_data in data:
-                    location = Location.from_dict(loc_data)
-                    self.location_model.add_location(location)
+                self.location_model.add_locations([Location.from_dict(loc_data) for loc_data in data])
                 return True
             elif format_type.lower() == 'csv':
                 import csv
-                with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                with open(file_path, 'r', newline='', encoding='utf-8') as f, self.location_model.batch():
                     reader = csv.DictReader(f)
                     for row in reader:
                         location = Location(
@@ -54,28 +53,13 @@ class DataPipeline:
         """Export data to a file"""
         try:
             if format_type.lower() == 'json':
-                locations = self.location_model.get_all_locations()
-                data = [loc.to_dict() for loc in locations]
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                return True
+                return self.location_model.save_to_file(file_path)
             elif format_type.lower() == 'csv':
-                import csv
-                locations = self.location_model.get_all_locations()
-                with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['id', 'latitude', 'longitude', 'timestamp', 'source', 'context', 'address'])
-                    for loc in locations:
-                        writer.writerow([
-                            loc.id, loc.latitude, loc.longitude,
-                            loc.timestamp.isoformat() if loc.timestamp else '',
-                            loc.source, loc.context, loc.address
-                        ])
-                return True
-            elif format_type.lower() == 'kml':
-                return export_kml(self.location_model.get_all_locations(), file_path)
+                return export_csv(self.location_model, file_path)
+            elif format_type.lower() in ('kml', 'kmz'):
+                return export_kml(self.location_model, file_path)
             elif format_type.lower() == 'gpx':
-                return export_gpx(self.location_model.get_all_locations(), file_path)
+                return export_gpx(self.location_model, file_path)
             else:
                 logger.error(f"Unsupported export format: {format_type}")
                 return False
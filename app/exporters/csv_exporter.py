@@ -0,0 +1,43 @@
+"""
+CSV Exporter for CreepyAI
+Exports location data to CSV format
+"""
+
+import logging
+from typing import Any, Callable, Optional
+
+from app.exporters.streaming import (
+    LOCATION_CSV_COLUMNS, ProgressMeter, location_csv_rows, open_output, write_csv,
+)
+
+logger = logging.getLogger(__name__)
+
+def export_csv(locations: Any, output_path: str,
+               progress_callback: Optional[Callable[[int, float], None]] = None,
+               compression: Optional[str] = None) -> bool:
+    """
+    Export locations to a CSV file with the ``LOCATION_CSV_COLUMNS`` columns
+    
+    Args:
+        locations: Locations to export: a list of Location objects, a
+            ``LocationDataModel``, or pages from ``Database.iter_location_pages``
+        output_path: Path to save the CSV file; a ``.gz`` path is gzip-compressed
+        progress_callback: Called with ``(rows_written, rows_per_second)``
+        compression: ``"gzip"`` or ``"none"`` to override the extension
+        
+    Returns:
+        True if export was successful, False otherwise
+    """
+    try:
+        progress = ProgressMeter(progress_callback)
+        with open_output(output_path, compression) as stream:
+            write_csv(location_csv_rows(locations), stream, LOCATION_CSV_COLUMNS, progress)
+        progress.finish()
+        
+        logger.info(f"CSV export of {progress.count} locations completed successfully to {output_path} "
+                    f"({progress.per_second:.0f} locations/s)")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error exporting to CSV: {e}", exc_info=True)
+        return False
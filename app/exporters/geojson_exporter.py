@@ -0,0 +1,44 @@
+"""
+GeoJSON Exporter for CreepyAI
+Exports location data to GeoJSON format
+"""
+
+import logging
+from typing import Any, Callable, Optional
+
+from app.exporters.streaming import ProgressMeter, open_output, write_geojson
+
+logger = logging.getLogger(__name__)
+
+def export_geojson(locations: Any, output_path: str,
+                   progress_callback: Optional[Callable[[int, float], None]] = None,
+                   compression: Optional[str] = None) -> bool:
+    """
+    Export locations to a GeoJSON FeatureCollection
+    
+    Features are serialised in chunks as the locations are read, so the
+    collection is never held in memory.
+    
+    Args:
+        locations: Locations to export: a list of Location objects, a
+            ``LocationDataModel``, or pages from ``Database.iter_location_pages``
+        output_path: Path to save the GeoJSON file; a ``.gz`` path is gzip-compressed
+        progress_callback: Called with ``(features_written, features_per_second)``
+        compression: ``"gzip"`` or ``"none"`` to override the extension
+        
+    Returns:
+        True if export was successful, False otherwise
+    """
+    try:
+        progress = ProgressMeter(progress_callback)
+        with open_output(output_path, compression) as stream:
+            write_geojson(locations, stream, progress)
+        progress.finish()
+        
+        logger.info(f"GeoJSON export of {progress.count} locations completed successfully to {output_path} "
+                    f"({progress.per_second:.0f} locations/s)")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error exporting to GeoJSON: {e}", exc_info=True)
+        return False
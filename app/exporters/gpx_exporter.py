@@ -3,165 +3,209 @@ GPX Exporter for CreepyAI
 Exports location data to GPX format
 """
 
-import os
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-import xml.dom.minidom
+import math
+from array import array
+from typing import Any, Callable, Dict, Optional, TextIO
+from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
 
-from app.models.location_data import Location
+import numpy as np
+
+from app.exporters.streaming import (
+    XML_INDENT, ExportRecord, ProgressMeter, count_hint, iter_records, open_output,
+    utc_time, write_element,
+)
 
 logger = logging.getLogger(__name__)
 
-def export_gpx(locations: List[Location], output_path: str, 
-              include_context: bool = True, pretty_print: bool = True) -> bool:
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _seconds(timestamp: Optional[datetime]) -> float:
+    """Seconds since the epoch; naive timestamps are taken as UTC and untimed points lead"""
+    if timestamp is None:
+        return -math.inf
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH).total_seconds()
+
+
+class _TrackBuffer:
+    """Track points of one source as packed columns (time, lat, lon, elevation)"""
+
+    def __init__(self):
+        self.times = array('d')
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.elevations = array('d')
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def add(self, record: ExportRecord) -> None:
+        altitude = record.metadata.get('altitude')
+        self.times.append(_seconds(record.timestamp))
+        self.latitudes.append(record.latitude)
+        self.longitudes.append(record.longitude)
+        self.elevations.append(math.nan if altitude is None else float(altitude))
+
+    def points(self):
+        """Track point elements, oldest first"""
+        times = np.frombuffer(self.times, dtype=np.float64)
+        for index in np.argsort(times, kind='stable').tolist():
+            trkpt = ET.Element('trkpt', lat=str(self.latitudes[index]), lon=str(self.longitudes[index]))
+            seconds = self.times[index]
+            if seconds != -math.inf:
+                time_elem = ET.SubElement(trkpt, 'time')
+                time_elem.text = datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            elevation = self.elevations[index]
+            if elevation == elevation:
+                ET.SubElement(trkpt, 'ele').text = str(elevation)
+            yield trkpt
+
+
+def _waypoint(record: ExportRecord, include_context: bool) -> ET.Element:
+    wpt = ET.Element('wpt', lat=str(record.latitude), lon=str(record.longitude))
+
+    # Name based on source and timestamp
+    name_text = record.source or "Unknown"
+    if record.timestamp:
+        name_text += f" - {record.timestamp.strftime('%Y-%m-%d %H:%M')}"
+    ET.SubElement(wpt, 'name').text = name_text
+
+    if record.timestamp:
+        ET.SubElement(wpt, 'time').text = utc_time(record.timestamp)
+
+    # Source as symbol
+    ET.SubElement(wpt, 'sym').text = record.source or "Waypoint"
+
+    altitude = record.metadata.get('altitude')
+    if altitude is not None:
+        ET.SubElement(wpt, 'ele').text = str(altitude)
+
+    # Context as description if requested
+    if include_context and record.context:
+        ET.SubElement(wpt, 'desc').text = record.context
+
+    # Address as comment if available
+    if record.address:
+        ET.SubElement(wpt, 'cmt').text = record.address
+    return wpt
+
+
+def write_gpx(locations: Any, stream: TextIO, include_context: bool = True,
+              pretty_print: bool = True, progress: Optional[ProgressMeter] = None,
+              count: Optional[int] = None) -> int:
+    """
+    Write a GPX document, one waypoint per location followed by a track
+
+    Waypoints are written in the order the locations arrive. The track has a
+    segment per source with more than one point, in time order; only packed
+    coordinates and times are kept for it while the waypoints stream out.
+
+    Args:
+        locations: Locations in any form ``streaming.iter_records`` accepts
+        stream: Text stream to write to
+        include_context: Whether to include context information
+        pretty_print: Whether to indent the XML output
+        progress: Advanced per waypoint
+        count: Number of locations for the description, if known up front
+
+    Returns:
+        Number of waypoints written
+    """
+    newline = "\n" if pretty_print else ""
+    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    stream.write('<gpx version="1.1" creator="CreepyAI" xmlns="http://www.topografix.com/GPX/1/1" '
+                 'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                 'xsi:schemaLocation="http://www.topografix.com/GPX/1/1 '
+                 'http://www.topografix.com/GPX/1/1/gpx.xsd">')
+
+    # Metadata
+    if count is None:
+        count = count_hint(locations)
+    metadata = ET.Element('metadata')
+    ET.SubElement(metadata, 'name').text = "CreepyAI Export"
+    desc = ET.SubElement(metadata, 'desc')
+    desc.text = "Location data exported from CreepyAI"
+    if count is not None:
+        desc.text += f" with {count} points"
+    author = ET.SubElement(metadata, 'author')
+    ET.SubElement(author, 'name').text = "CreepyAI"
+    ET.SubElement(metadata, 'time').text = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    write_element(stream, metadata, 1, pretty_print)
+
+    # Waypoints stream out; track points wait in their source's buffer
+    tracks: Dict[str, _TrackBuffer] = {}
+    written = 0
+    for record in iter_records(locations):
+        write_element(stream, _waypoint(record, include_context), 1, pretty_print)
+        source = record.source or "Unknown"
+        track = tracks.get(source)
+        if track is None:
+            track = tracks[source] = _TrackBuffer()
+        track.add(record)
+        written += 1
+        if progress:
+            progress.advance()
+
+    # Track segments by source, for sources with multiple locations
+    indent = XML_INDENT if pretty_print else ""
+    stream.write(newline + indent + '<trk>')
+    name = ET.Element('name')
+    name.text = "CreepyAI Track"
+    write_element(stream, name, 2, pretty_print)
+    for track in tracks.values():
+        if len(track) < 2:
+            continue
+        stream.write(newline + indent * 2 + '<trkseg>')
+        for trkpt in track.points():
+            write_element(stream, trkpt, 3, pretty_print)
+        stream.write(newline + indent * 2 + '</trkseg>')
+    stream.write(newline + indent + '</trk>' + newline + '</gpx>\n')
+    return written
+
+
+def export_gpx(locations: Any, output_path: str,
+               include_context: bool = True, pretty_print: bool = True,
+               progress_callback: Optional[Callable[[int, float], None]] = None,
+               compression: Optional[str] = None) -> bool:
     """
     Export locations to a GPX file
-    
+
+    The document is written as the locations are read. A list is sorted
+    by timestamp first; a ``LocationDataModel`` is read oldest first; other
+    iterables (such as ``Database.iter_location_pages``) are written in the
+    order they yield.
+
     Args:
-        locations: List of Location objects to export
-        output_path: Path to save the GPX file
+        locations: Locations to export
+        output_path: Path to save the GPX file; a ``.gz`` path is gzip-compressed
         include_context: Whether to include context information
         pretty_print: Whether to format the XML output
-        
+        progress_callback: Called with ``(waypoints_written, waypoints_per_second)``
+        compression: ``"gzip"`` or ``"none"`` to override the extension
+
     Returns:
         True if export was successful, False otherwise
     """
     try:
-        # Create the root GPX element with namespaces
-        gpx = ET.Element('gpx', 
-                        version="1.1", 
-                        creator="CreepyAI", 
-                        xmlns="http://www.topografix.com/GPX/1/1",
-                        xmlns_xsi="http://www.w3.org/2001/XMLSchema-instance",
-                        xsi_schemaLocation="http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd")
-        
-        # Add metadata
-        metadata = ET.SubElement(gpx, 'metadata')
-        
-        name = ET.SubElement(metadata, 'name')
-        name.text = f"CreepyAI Export"
-        
-        desc = ET.SubElement(metadata, 'desc')
-        desc.text = f"Location data exported from CreepyAI with {len(locations)} points"
-        
-        author = ET.SubElement(metadata, 'author')
-        author_name = ET.SubElement(author, 'name')
-        author_name.text = "CreepyAI"
-        
-        time = ET.SubElement(metadata, 'time')
-        time.text = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        # Sort locations by timestamp if available
-        sorted_locations = sorted(
-            locations,
-            key=lambda loc: loc.timestamp if hasattr(loc, 'timestamp') and loc.timestamp else datetime.min
-        )
-        
-        # Group locations by source
-        source_locations = {}
-        for location in sorted_locations:
-            source = location.source if hasattr(location, 'source') and location.source else "Unknown"
-            if source not in source_locations:
-                source_locations[source] = []
-            source_locations[source].append(location)
-        
-        # Add individual waypoints for each location
-        for location in sorted_locations:
-            wpt = ET.SubElement(gpx, 'wpt',
-                               lat=str(location.latitude),
-                               lon=str(location.longitude))
-            
-            # Add name based on source and timestamp
-            wpt_name = ET.SubElement(wpt, 'name')
-            name_text = location.source if hasattr(location, 'source') and location.source else "Unknown"
-            
-            # Add timestamp to name if available
-            if hasattr(location, 'timestamp') and location.timestamp and isinstance(location.timestamp, datetime):
-                name_text += f" - {location.timestamp.strftime('%Y-%m-%d %H:%M')}"
-            
-            wpt_name.text = name_text
-            
-            # Add timestamp if available
-            if hasattr(location, 'timestamp') and location.timestamp and isinstance(location.timestamp, datetime):
-                time_elem = ET.SubElement(wpt, 'time')
-                time_elem.text = location.timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
-            
-            # Add source as symbol
-            symbol = ET.SubElement(wpt, 'sym')
-            symbol.text = location.source if hasattr(location, 'source') and location.source else "Waypoint"
-            
-            # Add elevation if available
-            if hasattr(location, 'metadata') and hasattr(location.metadata, 'altitude') and location.metadata.altitude is not None:
-                ele = ET.SubElement(wpt, 'ele')
-                ele.text = str(location.metadata.altitude)
-            
-            # Add context as description if requested
-            if include_context and hasattr(location, 'context') and location.context:
-                desc_elem = ET.SubElement(wpt, 'desc')
-                desc_elem.text = location.context
-                
-            # Add address as comment if available
-            if hasattr(location, 'address') and location.address:
-                cmt = ET.SubElement(wpt, 'cmt')
-                cmt.text = location.address
-        
-        # Create track segments by source
-        trk = ET.SubElement(gpx, 'trk')
-        trk_name = ET.SubElement(trk, 'name')
-        trk_name.text = "CreepyAI Track"
-        
-        # Create track segments for each source
-        for source, locs in source_locations.items():
-            # Only create a track segment if there are multiple locations from the same source
-            if len(locs) > 1:
-                trkseg = ET.SubElement(trk, 'trkseg')
-                
-                # Sort locations by timestamp
-                sorted_source_locs = sorted(
-                    locs,
-                    key=lambda loc: loc.timestamp if hasattr(loc, 'timestamp') and loc.timestamp else datetime.min
-                )
-                
-                # Add track points
-                for location in sorted_source_locs:
-                    trkpt = ET.SubElement(trkseg, 'trkpt',
-                                        lat=str(location.latitude),
-                                        lon=str(location.longitude))
-                    
-                    # Add timestamp if available
-                    if hasattr(location, 'timestamp') and location.timestamp and isinstance(location.timestamp, datetime):
-                        time_elem = ET.SubElement(trkpt, 'time')
-                        time_elem.text = location.timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
-                    
-                    # Add elevation if available
-                    if hasattr(location, 'metadata') and hasattr(location.metadata, 'altitude') and location.metadata.altitude is not None:
-                        ele = ET.SubElement(trkpt, 'ele')
-                        ele.text = str(location.metadata.altitude)
-        
-        # Convert to string
-        xml_str = ET.tostring(gpx, encoding='utf-8', method='xml')
-        
-        # Pretty print if requested
-        if pretty_print:
-            dom = xml.dom.minidom.parseString(xml_str)
-            pretty_xml = dom.toprettyxml(indent='  ')
-            
-            # Remove the xml declaration (as it's added by toprettyxml)
-            pretty_xml_lines = pretty_xml.splitlines()[1:]
-            clean_pretty_xml = "\n".join(pretty_xml_lines)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-                f.write(clean_pretty_xml)
-        else:
-            with open(output_path, 'wb') as f:
-                f.write(xml_str)
-        
-        logger.info(f"GPX export completed successfully to {output_path}")
+        count = count_hint(locations)
+        if isinstance(locations, list):
+            locations = sorted(iter_records(locations), key=lambda record: _seconds(record.timestamp))
+        elif hasattr(locations, 'iter_records'):
+            locations = locations.iter_records(oldest_first=True)
+
+        progress = ProgressMeter(progress_callback)
+        with open_output(output_path, compression) as stream:
+            write_gpx(locations, stream, include_context, pretty_print, progress, count)
+        progress.finish()
+
+        logger.info(f"GPX export of {progress.count} locations completed successfully to {output_path} "
+                    f"({progress.per_second:.0f} locations/s)")
         return True
-        
+
     except Exception as e:
         logger.error(f"Error exporting to GPX: {e}", exc_info=True)
         return False
@@ -3,154 +3,163 @@ KML Exporter for CreepyAI
 Exports location data to KML format
 """
 
-import os
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Optional, TextIO
 from datetime import datetime
-import xml.dom.minidom
 import xml.etree.ElementTree as ET
 
-from app.models.location_data import Location
+from app.exporters.streaming import (
+    XML_INDENT, ExportRecord, ProgressMeter, count_hint, iter_records, open_output,
+    utc_time, write_element,
+)
 
 logger = logging.getLogger(__name__)
 
-def export_kml(locations: List[Location], output_path: str, 
-              include_context: bool = True, pretty_print: bool = True) -> bool:
+# Placemark icon colour per source
+COLORS = {
+    "Facebook": "7F0000FF",  # Red
+    "Instagram": "7F00FFFF",  # Yellow
+    "Twitter": "7F00FF00",  # Green
+    "LinkedIn": "7FFF0000",  # Blue
+    "Snapchat": "7FFF00FF",  # Purple
+    "TikTok": "7F00FFFF",  # Yellow
+    "Default": "7F0000FF",  # Red
+}
+
+
+def _style(source: str, color: str) -> ET.Element:
+    style = ET.Element('Style', id=f"{source.lower()}-style")
+
+    # Icon style
+    icon_style = ET.SubElement(style, 'IconStyle')
+    ET.SubElement(icon_style, 'color').text = color
+    ET.SubElement(icon_style, 'scale').text = "1.0"
+    icon = ET.SubElement(icon_style, 'Icon')
+    ET.SubElement(icon, 'href').text = "http://maps.google.com/mapfiles/kml/paddle/red-circle.png"
+
+    # Label style
+    label_style = ET.SubElement(style, 'LabelStyle')
+    ET.SubElement(label_style, 'color').text = "FFFFFFFF"  # White
+    ET.SubElement(label_style, 'scale').text = "0.8"
+    return style
+
+
+def _placemark(record: ExportRecord, include_context: bool) -> ET.Element:
+    placemark = ET.Element('Placemark')
+
+    # Name
+    source_name = record.source or "Unknown Source"
+    name = ET.SubElement(placemark, 'name')
+    if record.timestamp:
+        name.text = f"{source_name} - {record.timestamp.strftime('%Y-%m-%d %H:%M')}"
+    else:
+        name.text = source_name
+
+    # Description (HTML, escaped by the serialiser as KML allows)
+    desc_text = ""
+    if include_context and record.context:
+        desc_text += f"<p>{record.context}</p>"
+    if record.address:
+        desc_text += f"<p>Address: {record.address}</p>"
+    for key, value in record.metadata.items():
+        if value and key not in ('properties', 'tags') and not key.startswith('_'):
+            desc_text += f"<p>{key.replace('_', ' ').title()}: {value}</p>"
+    tags = record.metadata.get('tags')
+    if tags:
+        desc_text += f"<p>Tags: {', '.join(tags)}</p>"
+    ET.SubElement(placemark, 'description').text = desc_text
+
+    # Timestamp
+    if record.timestamp:
+        timestamp = ET.SubElement(placemark, 'TimeStamp')
+        ET.SubElement(timestamp, 'when').text = utc_time(record.timestamp)
+
+    # Style reference based on source
+    source_key = record.source if record.source in COLORS else "Default"
+    ET.SubElement(placemark, 'styleUrl').text = f"#{source_key.lower()}-style"
+
+    # Point geometry
+    point = ET.SubElement(placemark, 'Point')
+    ET.SubElement(point, 'coordinates').text = f"{record.longitude},{record.latitude},0"
+    return placemark
+
+
+def write_kml(locations: Any, stream: TextIO, include_context: bool = True,
+              pretty_print: bool = True, progress: Optional[ProgressMeter] = None) -> int:
+    """
+    Write a KML document placemark by placemark
+
+    Args:
+        locations: Locations in any form ``streaming.iter_records`` accepts
+        stream: Text stream to write to
+        include_context: Whether to include context information
+        pretty_print: Whether to indent the XML output
+        progress: Advanced per placemark
+
+    Returns:
+        Number of placemarks written
+    """
+    newline, indent = ("\n", XML_INDENT) if pretty_print else ("", "")
+    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    stream.write('<kml xmlns="http://www.opengis.net/kml/2.2">' + newline + indent + '<Document>')
+
+    count = count_hint(locations)
+    name = ET.Element('name')
+    name.text = f"CreepyAI Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    write_element(stream, name, 2, pretty_print)
+    description = ET.Element('description')
+    description.text = "Location data exported from CreepyAI"
+    if count is not None:
+        description.text += f" with {count} points"
+    write_element(stream, description, 2, pretty_print)
+
+    for source, color in COLORS.items():
+        write_element(stream, _style(source, color), 2, pretty_print)
+
+    written = 0
+    for record in iter_records(locations):
+        write_element(stream, _placemark(record, include_context), 2, pretty_print)
+        written += 1
+        if progress:
+            progress.advance()
+
+    stream.write(newline + indent + '</Document>' + newline + '</kml>\n')
+    return written
+
+
+def export_kml(locations: Any, output_path: str,
+               include_context: bool = True, pretty_print: bool = True,
+               progress_callback: Optional[Callable[[int, float], None]] = None,
+               compression: Optional[str] = None) -> bool:
     """
     Export locations to a KML file
-    
+
+    The document is written as the locations are read, so any iterable
+    works: a list of Location objects, a ``LocationDataModel``, or pages
+    from ``Database.iter_location_pages``.
+
     Args:
-        locations: List of Location objects to export
-        output_path: Path to save the KML file
+        locations: Locations to export
+        output_path: Path to save the KML file; a ``.kmz`` path is written
+            as a KMZ archive and a ``.gz`` path gzip-compressed
         include_context: Whether to include context information
         pretty_print: Whether to format the XML output
-        
+        progress_callback: Called with ``(placemarks_written, placemarks_per_second)``
+        compression: ``"kmz"``, ``"gzip"`` or ``"none"`` to override the extension
+
     Returns:
         True if export was successful, False otherwise
     """
     try:
-        # Create the root KML element
-        kml = ET.Element('kml', xmlns="http://www.opengis.net/kml/2.2")
-        
-        # Create document
-        document = ET.SubElement(kml, 'Document')
-        
-        # Add document name
-        doc_name = ET.SubElement(document, 'name')
-        doc_name.text = f"CreepyAI Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        
-        # Add document description
-        doc_desc = ET.SubElement(document, 'description')
-        doc_desc.text = f"Location data exported from CreepyAI with {len(locations)} points"
-        
-        # Define styles for different sources
-        styles = {}
-        colors = {
-            "Facebook": "7F0000FF", # Red
-            "Instagram": "7F00FFFF", # Yellow
-            "Twitter": "7F00FF00",  # Green
-            "LinkedIn": "7FFF0000",  # Blue
-            "Snapchat": "7FFF00FF",  # Purple
-            "TikTok": "7F00FFFF",   # Yellow
-            "Default": "7F0000FF"    # Red
-        }
-        
-        # Create styles
-        for source, color in colors.items():
-            style = ET.SubElement(document, 'Style', id=f"{source.lower()}-style")
-            
-            # Icon style
-            icon_style = ET.SubElement(style, 'IconStyle')
-            icon_color = ET.SubElement(icon_style, 'color')
-            icon_color.text = color
-            icon_scale = ET.SubElement(icon_style, 'scale')
-            icon_scale.text = "1.0"
-            
-            icon = ET.SubElement(icon_style, 'Icon')
-            href = ET.SubElement(icon, 'href')
-            href.text = "http://maps.google.com/mapfiles/kml/paddle/red-circle.png"
-            
-            # Label style
-            label_style = ET.SubElement(style, 'LabelStyle')
-            label_color = ET.SubElement(label_style, 'color')
-            label_color.text = "FFFFFFFF"  # White
-            label_scale = ET.SubElement(label_style, 'scale')
-            label_scale.text = "0.8"
-            
-            styles[source] = f"{source.lower()}-style"
-        
-        # Add each location as a placemark
-        for location in locations:
-            placemark = ET.SubElement(document, 'Placemark')
-            
-            # Add name
-            name = ET.SubElement(placemark, 'name')
-            source_name = location.source or "Unknown Source"
-            if hasattr(location, 'timestamp') and location.timestamp:
-                if isinstance(location.timestamp, datetime):
-                    name.text = f"{source_name} - {location.timestamp.strftime('%Y-%m-%d %H:%M')}"
-                else:
-                    name.text = f"{source_name} - {str(location.timestamp)}"
-            else:
-                name.text = source_name
-            
-            # Add description
-            description = ET.SubElement(placemark, 'description')
-            desc_text = ""
-            
-            if include_context and hasattr(location, 'context') and location.context:
-                desc_text += f"<p>{location.context}</p>"
-            
-            if hasattr(location, 'address') and location.address:
-                desc_text += f"<p>Address: {location.address}</p>"
-            
-            # Add any other metadata
-            if hasattr(location, 'metadata') and location.metadata:
-                for key, value in location.metadata.__dict__.items():
-                    if value and key not in ['properties', 'tags'] and not key.startswith('_'):
-                        desc_text += f"<p>{key.replace('_', ' ').title()}: {value}</p>"
-            
-            # Add tags if available
-            if hasattr(location, 'metadata') and hasattr(location.metadata, 'tags') and location.metadata.tags:
-                desc_text += f"<p>Tags: {', '.join(location.metadata.tags)}</p>"
-            
-            description.text = f"<![CDATA[{desc_text}]]>" if desc_text else ""
-            
-            # Add timestamp
-            if hasattr(location, 'timestamp') and location.timestamp and isinstance(location.timestamp, datetime):
-                timestamp = ET.SubElement(placemark, 'TimeStamp')
-                when = ET.SubElement(timestamp, 'when')
-                when.text = location.timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
-            
-            # Add style reference based on source
-            source_key = location.source if location.source in styles else "Default"
-            style_url = ET.SubElement(placemark, 'styleUrl')
-            style_url.text = f"#{styles[source_key]}"
-            
-            # Add point geometry
-            point = ET.SubElement(placemark, 'Point')
-            coordinates = ET.SubElement(point, 'coordinates')
-            coordinates.text = f"{location.longitude},{location.latitude},0"
-        
-        # Convert to string
-        tree = ET.ElementTree(kml)
-        xml_str = ET.tostring(kml, encoding='utf-8', method='xml')
-        
-        # Pretty print if requested
-        if pretty_print:
-            dom = xml.dom.minidom.parseString(xml_str)
-            pretty_xml = dom.toprettyxml(indent='  ')
-            
-            # The xml.dom.minidom adds an XML declaration, which we want to keep
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(pretty_xml)
-        else:
-            with open(output_path, 'wb') as f:
-                f.write(xml_str)
-        
-        logger.info(f"KML export completed successfully to {output_path}")
+        progress = ProgressMeter(progress_callback)
+        with open_output(output_path, compression) as stream:
+            write_kml(locations, stream, include_context, pretty_print, progress)
+        progress.finish()
+
+        logger.info(f"KML export of {progress.count} locations completed successfully to {output_path} "
+                    f"({progress.per_second:.0f} locations/s)")
         return True
-        
+
     except Exception as e:
         logger.error(f"Error exporting to KML: {e}", exc_info=True)
         return False
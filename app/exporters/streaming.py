@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming building blocks shared by the exporters
+Exports are written while they are read: locations come from any iterable
+(Location objects, store records, database rows or pages of them, or a
+LocationDataModel), each one is serialised on its own and written through a
+buffered, optionally gzip or KMZ compressed, text stream, so memory use does
+not grow with the size of the export.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import secrets
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Bytes buffered before the output file (or compressor) is written to
+WRITE_BUFFER = 1 << 20
+
+# JSON array items serialised per write
+JSON_CHUNK = 1000
+
+# Items between two progress reports
+PROGRESS_EVERY = 5000
+
+# Indentation of pretty-printed XML
+XML_INDENT = "  "
+
+# Columns of the plain location CSV export
+LOCATION_CSV_COLUMNS = ("id", "latitude", "longitude", "timestamp", "source", "context", "address")
+
+
+class ExportRecord(NamedTuple):
+    """The fields of one location that the exporters write"""
+    id: Any
+    latitude: float
+    longitude: float
+    timestamp: Optional[datetime]
+    source: str
+    context: str
+    address: str
+    metadata: Dict[str, Any]  # Metadata fields by name; empty when there is none
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    # Database rows may carry their context decoded
+    return json.dumps(value, default=str)
+
+
+def _metadata_fields(metadata: Any) -> Dict[str, Any]:
+    if not metadata:
+        return {}
+    if isinstance(metadata, dict):
+        return metadata
+    if hasattr(metadata, "to_dict"):
+        return metadata.to_dict()
+    return {key: value for key, value in vars(metadata).items() if not key.startswith("_")}
+
+
+def _from_mapping(record: Dict[str, Any]) -> ExportRecord:
+    timestamp = record.get("timestamp")
+    if timestamp is None:
+        timestamp = record.get("date")  # Database rows
+    return ExportRecord(
+        record.get("id"),
+        float(record["latitude"]),
+        float(record["longitude"]),
+        _as_datetime(timestamp),
+        record.get("source") or "",
+        _as_text(record.get("context")),
+        record.get("address") or "",
+        _metadata_fields(record.get("metadata")),
+    )
+
+
+def to_record(location: Any) -> ExportRecord:
+    """
+    Read the exported fields of one location
+
+    Args:
+        location: A Location (detached or a store view), a record or
+            database row dictionary, or any object with location attributes
+
+    Returns:
+        The location as an ExportRecord
+    """
+    if isinstance(location, ExportRecord):
+        return location
+    if isinstance(location, dict):
+        return _from_mapping(location)
+    if hasattr(location, "_record"):
+        # Reads the row as stored; going through the metadata property
+        # would allocate metadata for every view that has none
+        return _from_mapping(location._record())
+    return _from_mapping({
+        name: getattr(location, name, None)
+        for name in ("id", "latitude", "longitude", "timestamp", "source",
+                     "context", "address", "metadata")
+    })
+
+
+def iter_records(locations: Any) -> Iterator[ExportRecord]:
+    """
+    Stream the locations of any supported source as ExportRecords
+
+    Args:
+        locations: An iterable of locations or of pages (lists) of them, such
+            as ``Database.iter_location_pages``, or an object with an
+            ``iter_records()`` method such as ``LocationDataModel``
+
+    Yields:
+        One ExportRecord per location
+    """
+    if hasattr(locations, "iter_records"):
+        locations = locations.iter_records()
+    for item in locations:
+        if isinstance(item, list):
+            for location in item:
+                yield to_record(location)
+        else:
+            yield to_record(item)
+
+
+def count_hint(locations: Any) -> Optional[int]:
+    """Number of locations a source holds, if it can tell without being read"""
+    if hasattr(locations, "get_location_count"):
+        return locations.get_location_count()
+    if isinstance(locations, (list, tuple)) and not any(isinstance(item, list) for item in locations[:1]):
+        return len(locations)
+    return None
+
+
+class ProgressMeter:
+    """Counts exported items and reports ``(count, items_per_second)``"""
+
+    def __init__(self, callback: Optional[Callable[[int, float], None]] = None,
+                 every: int = PROGRESS_EVERY):
+        """
+        Args:
+            callback: Called every ``every`` items and once more at the end
+            every: Items between two reports
+        """
+        self.callback = callback
+        self.every = max(1, every)
+        self.count = 0
+        self._next = self.every
+        self._started = time.perf_counter()
+
+    @property
+    def per_second(self) -> float:
+        elapsed = time.perf_counter() - self._started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def advance(self, count: int = 1) -> None:
+        self.count += count
+        if self.count >= self._next:
+            self._next = self.count + self.every
+            if self.callback:
+                self.callback(self.count, self.per_second)
+
+    def finish(self) -> None:
+        if self.callback:
+            self.callback(self.count, self.per_second)
+
+
+def _compression_for(path: str) -> Optional[str]:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".gz":
+        return "gzip"
+    if suffix == ".kmz":
+        return "kmz"
+    return None
+
+
+@contextmanager
+def open_output(path: str, compression: Optional[str] = None,
+                member: str = "doc.kml") -> Iterator[TextIO]:
+    """
+    Open a buffered UTF-8 text stream to write an export to
+
+    The export is written to a temporary file next to ``path``, which
+    replaces ``path`` once the stream is closed without an error, so an
+    export that fails part way leaves any earlier file untouched.
+
+    Args:
+        path: File to create
+        compression: ``"gzip"``, ``"kmz"`` (a zip archive holding one
+            ``member``), ``"none"``, or None to go by the extension of
+            ``path`` (``.gz`` or ``.kmz``)
+        member: Name of the file inside a KMZ archive
+
+    Yields:
+        A text stream; newlines are written as given
+    """
+    if compression is None:
+        compression = _compression_for(path)
+    if compression not in ("gzip", "kmz", "none", None):
+        raise ValueError(f"Unknown compression: {compression}")
+    directory, name = os.path.split(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+    try:
+        with ExitStack() as stack:
+            # Created like open(path, "wb") would, with the usual permissions
+            output = stack.enter_context(open(temp_path, "xb", buffering=WRITE_BUFFER))
+            if compression == "gzip":
+                # Named after path, not the temporary file, in the gzip header
+                raw = stack.enter_context(gzip.GzipFile(path, "wb", compresslevel=6, fileobj=output))
+                binary = stack.enter_context(io.BufferedWriter(raw, WRITE_BUFFER))
+            elif compression == "kmz":
+                archive = stack.enter_context(zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED))
+                raw = stack.enter_context(archive.open(member, "w", force_zip64=True))
+                binary = stack.enter_context(io.BufferedWriter(raw, WRITE_BUFFER))
+            else:
+                binary = output
+            stream = stack.enter_context(io.TextIOWrapper(binary, encoding="utf-8", newline=""))
+            yield stream
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_element(stream: TextIO, element: ET.Element, level: int, pretty_print: bool) -> None:
+    """
+    Serialise one XML element on its own
+
+    Args:
+        stream: Output stream
+        element: Element to write; it can be dropped afterwards
+        level: Nesting depth of the element in the document
+        pretty_print: Put the element on its own indented line
+    """
+    if pretty_print:
+        ET.indent(element, XML_INDENT, level)
+        stream.write("\n" + XML_INDENT * level)
+    stream.write(ET.tostring(element, encoding="unicode"))
+
+
+def utc_time(timestamp: Optional[datetime]) -> Optional[str]:
+    """ISO 8601 UTC time for GPX and KML; naive timestamps are taken as UTC"""
+    if timestamp is None:
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def write_json_array(items: Iterable[Any], stream: TextIO,
+                     default: Optional[Callable[[Any], Any]] = None,
+                     progress: Optional[ProgressMeter] = None,
+                     chunk_size: int = JSON_CHUNK) -> int:
+    """
+    Write a JSON array, serialising ``chunk_size`` items per write
+
+    Args:
+        items: Items to write; consumed lazily
+        stream: Output stream
+        default: ``json.dumps`` fallback for values it cannot serialise
+        progress: Advanced per item
+        chunk_size: Items serialised per write
+
+    Returns:
+        Number of items written
+    """
+    encoder = json.JSONEncoder(default=default, ensure_ascii=False)
+    written = 0
+    chunk = []
+    stream.write("[")
+    for item in items:
+        chunk.append(encoder.encode(item))
+        if len(chunk) >= chunk_size:
+            stream.write((",\n" if written else "\n") + ",\n".join(chunk))
+            written += len(chunk)
+            if progress:
+                progress.advance(len(chunk))
+            chunk = []
+    if chunk:
+        stream.write((",\n" if written else "\n") + ",\n".join(chunk))
+        written += len(chunk)
+        if progress:
+            progress.advance(len(chunk))
+    if written:
+        stream.write("\n")
+    stream.write("]")
+    return written
+
+
+def geojson_feature(record: ExportRecord) -> Dict[str, Any]:
+    """GeoJSON feature of a location, as ``Location.to_geojson`` builds it"""
+    properties = {
+        "id": record.id,
+        "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+        "source": record.source,
+        "context": record.context,
+        "address": record.address,
+    }
+    for key, value in record.metadata.items():
+        if value is not None and key not in properties:
+            properties[key] = value
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [record.longitude, record.latitude],  # GeoJSON uses [lng, lat]
+        },
+        "properties": properties,
+    }
+
+
+def write_geojson(locations: Any, stream: TextIO,
+                  progress: Optional[ProgressMeter] = None) -> int:
+    """
+    Write a GeoJSON FeatureCollection one feature at a time
+
+    Returns:
+        Number of features written
+    """
+    stream.write('{"type": "FeatureCollection", "features": ')
+    written = write_json_array((geojson_feature(record) for record in iter_records(locations)),
+                               stream, default=str, progress=progress)
+    stream.write("}\n")
+    return written
+
+
+def write_csv(rows: Iterable[Sequence[Any]], stream: TextIO, header: Sequence[str],
+              progress: Optional[ProgressMeter] = None, **writer_options: Any) -> int:
+    """
+    Write CSV rows through the stream's buffer
+
+    Args:
+        rows: Rows to write; consumed lazily
+        stream: Output stream
+        header: Column names written first
+        progress: Advanced per row
+        **writer_options: Passed on to ``csv.writer``
+
+    Returns:
+        Number of rows written, not counting the header
+    """
+    writer = csv.writer(stream, **writer_options)
+    writer.writerow(header)
+    written = 0
+    for row in rows:
+        writer.writerow(row)
+        written += 1
+        if progress:
+            progress.advance()
+    return written
+
+
+def location_csv_rows(locations: Any) -> Iterator[Sequence[Any]]:
+    """Rows of the plain location CSV export, ordered like ``LOCATION_CSV_COLUMNS``"""
+    for record in iter_records(locations):
+        yield (
+            record.id, record.latitude, record.longitude,
+            record.timestamp.isoformat() if record.timestamp else "",
+            record.source, record.context, record.address,
+        )
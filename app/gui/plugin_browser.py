@@ -153,15 +153,13 @@ class PluginBrowserWidget(QWidget):
             
         self.plugin_list.clear()
         
-        plugins = self.plugin_manager.get_all_plugins()
-        
-        # Group plugins by category
+        # Listing reads catalog metadata; plugins are only loaded when run
         by_category = {}
-        for name, plugin in plugins.items():
+        for name in self.plugin_manager.get_all_plugins():
             category = self.plugin_manager.get_category(name)
             if category not in by_category:
                 by_category[category] = []
-            by_category[category].append((name, plugin))
+            by_category[category].append(name)
         
         # Add plugins by category
         for category in sorted(by_category.keys()):
@@ -174,7 +172,7 @@ class PluginBrowserWidget(QWidget):
             self.plugin_list.addItem(category_item)
             
             # Add plugins in this category
-            for name, plugin in sorted(by_category[category]):
+            for name in sorted(by_category[category]):
                 # Create list widget item
                 item = QListWidgetItem(f"  {name}")
                 item.setData(Qt.UserRole, name)  # Store actual plugin name
@@ -184,8 +182,8 @@ class PluginBrowserWidget(QWidget):
                 item.setIcon(icon)
                 
                 # Add plugin info as tooltip
-                if hasattr(plugin, 'get_info'):
-                    info = plugin.get_info()
+                info = self.plugin_manager.get_plugin_info(name)
+                if info is not None:
                     tooltip = f"{info.get('name', name)} v{info.get('version', '1.0')}\n"
                     tooltip += f"Category: {category}\n"
                     tooltip += f"Author: {info.get('author', 'Unknown')}\n"
@@ -215,10 +213,11 @@ class PluginBrowserWidget(QWidget):
         
         self.plugin_list.clear()
         
-        plugins = self.plugin_manager.get_plugins_by_category(category)
+        names = [name for name in self.plugin_manager.get_all_plugins()
+                 if self.plugin_manager.get_category(name) == category]
         
         # Add plugins in this category
-        for name, plugin in sorted(plugins.items()):
+        for name in sorted(names):
             # Create list widget item
             item = QListWidgetItem(name)
             item.setData(Qt.UserRole, name)  # Store actual plugin name
@@ -228,8 +227,8 @@ class PluginBrowserWidget(QWidget):
             item.setIcon(icon)
             
             # Add plugin info as tooltip
-            if hasattr(plugin, 'get_info'):
-                info = plugin.get_info()
+            info = self.plugin_manager.get_plugin_info(name)
+            if info is not None:
                 tooltip = f"{info.get('name', name)} v{info.get('version', '1.0')}\n"
                 tooltip += f"Category: {category}\n"
                 tooltip += f"Author: {info.get('author', 'Unknown')}\n"
@@ -8,11 +8,12 @@ from typing import Optional
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QListWidget, QListWidgetItem, QComboBox, QGroupBox, QFormLayout
+    QTreeView, QComboBox, QGroupBox, QFormLayout
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QModelIndex
 
 from app.models.location_data import LocationDataModel, Location
+from app.models.location_table_model import LocationTableModel
 
 logger = logging.getLogger(__name__)
 
@@ -49,9 +50,15 @@ class LocationListView(QWidget):
         
         layout.addWidget(filter_group)
         
-        # Location list
-        self.location_list = QListWidget()
-        self.location_list.itemClicked.connect(self.on_location_selected)
+        # Location list: a virtual model, so only the rows on screen are built
+        self.table_model = LocationTableModel(parent=self)
+        self.location_list = QTreeView()
+        self.location_list.setRootIsDecorated(False)
+        self.location_list.setUniformRowHeights(True)
+        self.location_list.setSortingEnabled(True)
+        self.location_list.setModel(self.table_model)
+        self.location_list.sortByColumn(0, Qt.AscendingOrder)
+        self.location_list.clicked.connect(self.on_location_selected)
         layout.addWidget(self.location_list)
         
         # Add stretching space
@@ -66,10 +73,7 @@ class LocationListView(QWidget):
         """
         self.location_model = model
         
-        # Connect to model signals
         if model:
-            model.dataChanged.connect(self.update_location_list)
-            
             # Update filters
             self.source_filter_combo.clear()
             self.source_filter_combo.addItem("All Sources")
@@ -79,7 +83,8 @@ class LocationListView(QWidget):
             self.tag_filter_combo.addItem("All Tags")
             self.tag_filter_combo.addItems(model.get_all_tags())
         
-        # Update UI
+        # The table model follows the location model's changes itself
+        self.table_model.set_location_model(model)
         self.update_location_list()
     
     def update_location_list(self):
@@ -90,34 +95,17 @@ class LocationListView(QWidget):
         # Get filter values
         selected_source = self.source_filter_combo.currentText()
         selected_tag = self.tag_filter_combo.currentText()
-        search_text = self.search_edit.text().lower()
-        
-        # Filter locations
-        locations = self.location_model.get_all_locations()
-        
-        if selected_source != "All Sources":
-            locations = [loc for loc in locations if loc.source == selected_source]
-        
-        if selected_tag != "All Tags":
-            locations = [loc for loc in locations if selected_tag in loc.metadata.tags]
-        
-        if search_text:
-            locations = [
-                loc for loc in locations 
-                if search_text in (loc.context or "").lower() or search_text in (loc.address or "").lower()
-            ]
-        
-        # Update list widget
-        self.location_list.clear()
         
-        for location in locations:
-            item = QListWidgetItem(f"{location.timestamp.strftime('%Y-%m-%d %H:%M:%S')} - {location.source}: {location.context}")
-            item.setData(Qt.UserRole, location.id)
-            self.location_list.addItem(item)
+        # Filtering and sorting run on the table model's worker thread
+        self.table_model.set_filter(
+            source=selected_source if selected_source != "All Sources" else None,
+            tag=selected_tag if selected_tag != "All Tags" else None,
+            search=self.search_edit.text(),
+        )
     
-    def on_location_selected(self, item: QListWidgetItem):
+    def on_location_selected(self, index: QModelIndex):
         """Handle location selection"""
-        location_id = item.data(Qt.UserRole)
+        location_id = index.data(Qt.UserRole)
         location = self.location_model.get_location(location_id)
         
         if location:
@@ -3,24 +3,44 @@ Timeline View for CreepyAI
 Visualizes location data chronologically
 """
 
+import bisect
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QHBoxLayout, QComboBox, QPushButton, QFrame
+    QWidget, QVBoxLayout, QLabel, QHBoxLayout, QComboBox, QPushButton, QListWidget, QListWidgetItem
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFontDatabase
 
+from app.core.data.timeline import CYCLIC_BINS, bin_label
 from app.models.location_data import LocationDataModel
 
 logger = logging.getLogger(__name__)
 
+# Combo box text -> (timeline grouping, heading)
+GROUPINGS = {
+    "Day": ("day", "Daily Location Count:"),
+    "Week": ("week", "Weekly Location Count:"),
+    "Month": ("month", "Monthly Location Count:"),
+    "Year": ("year", "Yearly Location Count:"),
+    "Hour of Day": ("hour", "Distribution by Hour of Day:"),
+    "Day of Week": ("weekday", "Distribution by Day of Week:"),
+}
+
 class TimelineView(QWidget):
     """Widget for visualizing location data chronologically"""
     
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
         self.location_model = None
+        
+        # What is currently drawn, so a refresh only touches changed bins
+        self._shown_grouping: Optional[str] = None
+        self._shown_version: Optional[int] = None
+        self._shown_max = 0
+        self._shown_bins: List[int] = []  # Bin of each list row, ascending
+        self._shown_counts: Dict[int, int] = {}
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -33,25 +53,26 @@ class TimelineView(QWidget):
         controls_layout.addWidget(QLabel("Group By:"))
         
         self.group_by_combo = QComboBox()
-        self.group_by_combo.addItems(["Day", "Week", "Month", "Year", "Hour of Day", "Day of Week"])
+        self.group_by_combo.addItems(list(GROUPINGS))
         self.group_by_combo.currentIndexChanged.connect(self.update_timeline)
         controls_layout.addWidget(self.group_by_combo)
         
         controls_layout.addStretch()
         
         refresh_btn = QPushButton("Refresh")
-        refresh_btn.clicked.connect(self.update_timeline)
+        refresh_btn.clicked.connect(self.refresh)
         controls_layout.addWidget(refresh_btn)
         
         layout.addLayout(controls_layout)
         
-        # Timeline visualization
+        # Timeline visualization: a heading and one row per time bin
         self.timeline_view = QLabel("Timeline visualization will be here")
-        self.timeline_view.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.timeline_view)
         
-        # Add stretching space
-        layout.addStretch()
+        self.bin_list = QListWidget()
+        self.bin_list.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.bin_list.setUniformItemSizes(True)
+        layout.addWidget(self.bin_list)
     
     def set_location_model(self, model: LocationDataModel):
         """
@@ -60,7 +81,10 @@ class TimelineView(QWidget):
         Args:
             model: Location data model
         """
+        if self.location_model:
+            self.location_model.dataChanged.disconnect(self.update_timeline)
         self.location_model = model
+        self._shown_grouping = None
         
         # Connect to model signals
         if model:
@@ -69,91 +93,80 @@ class TimelineView(QWidget):
         # Update UI
         self.update_timeline()
     
+    def refresh(self):
+        """Redraw the whole timeline"""
+        self._shown_grouping = None
+        self.update_timeline()
+    
     def update_timeline(self):
         """Update the timeline visualization"""
         if not self.location_model:
             return
         
-        # Get locations
-        locations = self.location_model.get_all_locations()
-        
-        if not locations:
-            self.timeline_view.setText("No locations available for timeline")
+        grouping, heading = GROUPINGS[self.group_by_combo.currentText()]
+        version = self.location_model.version
+        if grouping == self._shown_grouping and version == self._shown_version:
             return
         
-        # Extract timestamps
-        timestamps = [loc.timestamp for loc in locations if loc.timestamp]
-        
-        if not timestamps:
-            self.timeline_view.setText("No timestamps available for timeline")
+        bins, counts = self.location_model.get_timeline_histogram(grouping)
+        if not self.location_model.get_location_count():
+            self._show_message("No locations available for timeline")
+            return
+        if not counts.any():
+            self._show_message("No timestamps available for timeline")
             return
         
-        # Get grouping method
-        group_method = self.group_by_combo.currentText()
-        
-        # Create a simple text-based timeline
-        data = {}
-        
-        if group_method == "Hour of Day":
-            for ts in timestamps:
-                hour = ts.hour
-                data[hour] = data.get(hour, 0) + 1
-            text = "Distribution by Hour of Day:\n\n"
-            for hour in range(24):
-                count = data.get(hour, 0)
-                bar = "#" * int(count / max(data.values(), 1) * 20)
-                text += f"{hour:02d}:00 | {bar} ({count})\n"
-        
-        elif group_method == "Day of Week":
-            day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-            for ts in timestamps:
-                day = ts.weekday()
-                data[day] = data.get(day, 0) + 1
-            text = "Distribution by Day of Week:\n\n"
-            for day in range(7):
-                count = data.get(day, 0)
-                bar = "#" * int(count / max(data.values(), 1) * 20)
-                text += f"{day_names[day]:<10} | {bar} ({count})\n"
-        
-        elif group_method == "Day":
-            for ts in timestamps:
-                day = ts.date()
-                data[day] = data.get(day, 0) + 1
-            text = "Daily Location Count:\n\n"
-            for day in sorted(data.keys()):
-                count = data[day]
-                bar = "#" * min(count, 50)
-                text += f"{day.strftime('%Y-%m-%d')}: {bar} ({count})\n"
-        
-        elif group_method == "Week":
-            for ts in timestamps:
-                year, week, _ = ts.isocalendar()
-                key = f"{year}-W{week:02d}"
-                data[key] = data.get(key, 0) + 1
-            text = "Weekly Location Count:\n\n"
-            for week_key in sorted(data.keys()):
-                count = data[week_key]
-                bar = "#" * min(count, 50)
-                text += f"{week_key}: {bar} ({count})\n"
-        
-        elif group_method == "Month":
-            for ts in timestamps:
-                month_key = ts.strftime("%Y-%m")
-                data[month_key] = data.get(month_key, 0) + 1
-            text = "Monthly Location Count:\n\n"
-            for month_key in sorted(data.keys()):
-                count = data[month_key]
-                bar = "#" * min(count, 50)
-                text += f"{month_key}: {bar} ({count})\n"
-        
-        elif group_method == "Year":
-            for ts in timestamps:
-                year = ts.year
-                data[year] = data.get(year, 0) + 1
-            text = "Yearly Location Count:\n\n"
-            for year in sorted(data.keys()):
-                count = data[year]
-                bar = "#" * min(count, 50)
-                text += f"{year}: {bar} ({count})\n"
-        
+        self.timeline_view.setText(heading)
+        new_counts = dict(zip(bins.tolist(), counts.tolist()))
+        max_count = max(new_counts.values())
+        
+        if (grouping != self._shown_grouping
+                or (grouping in CYCLIC_BINS and max_count != self._shown_max)):
+            # Bars are relative to the largest bin, or the layout changed: redraw everything
+            self.bin_list.clear()
+            self._shown_bins = []
+            self._shown_counts = {}
+        
+        self._shown_grouping = grouping
+        self._shown_version = version
+        self._shown_max = max_count
+        self._apply_counts(grouping, new_counts)
+    
+    def _apply_counts(self, grouping: str, new_counts: Dict[int, int]) -> None:
+        """Add, update and remove rows so the list matches the new counts"""
+        old_counts = self._shown_counts
+        
+        for value in [value for value in old_counts if value not in new_counts]:
+            row = bisect.bisect_left(self._shown_bins, value)
+            self.bin_list.takeItem(row)
+            del self._shown_bins[row]
+        
+        for value, count in new_counts.items():
+            if old_counts.get(value) == count:
+                continue
+            text = self._format_row(grouping, value, count)
+            row = bisect.bisect_left(self._shown_bins, value)
+            if value in old_counts:
+                self.bin_list.item(row).setText(text)
+            else:
+                self.bin_list.insertItem(row, QListWidgetItem(text))
+                self._shown_bins.insert(row, value)
+        
+        self._shown_counts = new_counts
+    
+    def _format_row(self, grouping: str, value: int, count: int) -> str:
+        label = bin_label(grouping, value)
+        if grouping == "hour":
+            bar = "#" * int(count / max(self._shown_max, 1) * 20)
+            return f"{label} | {bar} ({count})"
+        if grouping == "weekday":
+            bar = "#" * int(count / max(self._shown_max, 1) * 20)
+            return f"{label:<10} | {bar} ({count})"
+        return f"{label}: {'#' * min(count, 50)} ({count})"
+    
+    def _show_message(self, text: str) -> None:
         self.timeline_view.setText(text)
+        self.bin_list.clear()
+        self._shown_grouping = None
+        self._shown_bins = []
+        self._shown_counts = {}
@@ -21,7 +21,7 @@ from PyQt5.QtWebEngineWidgets import QWebEngineView
 from app.ui.plugin_selector import PluginSelector
 from app.controllers.map_controller import MapController
 from app.plugins.plugin_manager import PluginManager
-from app.plugins.base_plugin import LocationPoint
+from app.plugins.base_plugin import LocationPoint, iter_plugin_locations
 from app.models.location_data import Location
 from app.plugin_registry import instantiate_plugins
 
@@ -950,10 +950,15 @@ class CreepyAIGUI(QMainWindow):
         total = 0
         seen = set()
         for plugin in self._get_enabled_plugins():
+            if not hasattr(plugin, 'collect_locations'):
+                continue
+            # Read in batches and close the generator once enough points are
+            # plotted, so the plugin stops parsing the rest of its data
+            batches = None
             try:
-                if hasattr(plugin, 'collect_locations'):
-                    points = plugin.collect_locations(term, None, None) or []
-                    for pt in points:
+                batches = iter_plugin_locations(plugin, term, batch_size=max_points)
+                for batch in batches:
+                    for pt in batch:
                         # Deduplicate by rounded coordinates and context
                         key = (round(getattr(pt, 'latitude', 0.0), 6),
                                round(getattr(pt, 'longitude', 0.0), 6),
@@ -966,8 +971,14 @@ class CreepyAIGUI(QMainWindow):
                         total += 1
                         if total >= max_points:
                             break
+                    if total >= max_points:
+                        break
             except Exception as e:
                 logger.warning(f"Plugin {getattr(plugin, 'name', plugin)} collect error: {e}")
+            finally:
+                close = getattr(batches, 'close', None)
+                if close:
+                    close()
             if total >= max_points:
                 break
         try:
@@ -103,10 +103,13 @@ class MainWindow(QMainWindow):
             "map", "toggle_heatmap", "Toggle Heatmap", self.toggle_heatmap,
             icon_name="heatmap-icon.png", status_tip="Toggle heatmap display", checkable=True
         )
-        self.toolbar_manager.add_action(
+        clustering_action = self.toolbar_manager.add_action(
             "map", "toggle_clustering", "Toggle Clustering", self.toggle_clustering,
             icon_name="clustering-icon.png", status_tip="Toggle marker clustering", checkable=True
         )
+        if clustering_action:
+            # The map starts with clustering on
+            clustering_action.setChecked(True)
         
         self.toolbar_manager.add_action(
             "plugin", "manage_plugins", "Manage Plugins", self.manage_plugins,
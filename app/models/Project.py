@@ -282,50 +282,23 @@ class Project(QObject):
         try:
             if format_type.lower() == 'json':
                 # Export as GeoJSON
-                geojson_data = self.locations.to_geojson()
-                
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(geojson_data, f, indent=2)
-                
-                return True
+                from app.exporters.geojson_exporter import export_geojson
+                return export_geojson(self.locations, path)
                 
             elif format_type.lower() == 'csv':
                 # Export as CSV
-                import csv
+                from app.exporters.csv_exporter import export_csv
+                return export_csv(self.locations, path)
                 
-                with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    
-                    # Write header
-                    writer.writerow(['id', 'latitude', 'longitude', 'timestamp', 'source', 'context', 'address'])
-                    
-                    # Write data
-                    for location in self.locations.get_all_locations():
-                        timestamp_str = ""
-                        if location.timestamp:
-                            timestamp_str = location.timestamp.isoformat()
-                            
-                        writer.writerow([
-                            location.id,
-                            location.latitude,
-                            location.longitude,
-                            timestamp_str,
-                            location.source,
-                            location.context,
-                            location.address
-                        ])
-                
-                return True
-                
-            elif format_type.lower() == 'kml':
-                # Export as KML
+            elif format_type.lower() in ('kml', 'kmz'):
+                # Export as KML (a .kmz path is written as a KMZ archive)
                 from app.exporters.kml_exporter import export_kml
-                return export_kml(self.locations.get_all_locations(), path)
+                return export_kml(self.locations, path)
                 
             elif format_type.lower() == 'gpx':
                 # Export as GPX
                 from app.exporters.gpx_exporter import export_gpx
-                return export_gpx(self.locations.get_all_locations(), path)
+                return export_gpx(self.locations, path)
                 
             else:
                 logger.error(f"Unsupported export format: {format_type}")
@@ -411,9 +384,9 @@ class Project(QObject):
             
             # Load locations
             if 'locations' in project_data:
-                for loc_data in project_data['locations']:
-                    location = Location.from_dict(loc_data)
-                    project.locations.add_location(location)
+                project.locations.add_locations(
+                    [Location.from_dict(loc_data) for loc_data in project_data['locations']]
+                )
             
             # Mark as not modified (since we just loaded it)
             project.is_modified = False
@@ -478,6 +451,7 @@ class Project(QObject):
             
             # Load locations
             if 'locations' in project_data:
+                locations = []
                 for loc_data in project_data['locations']:
                     location = Location.from_dict(loc_data)
                     
@@ -497,7 +471,8 @@ class Project(QObject):
                         
                         location.photos = updated_photos
                     
-                    project.locations.add_location(location)
+                    locations.append(location)
+                project.locations.add_locations(locations)
             
             # Mark as not modified (since we just loaded it)
             project.is_modified = False
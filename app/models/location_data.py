@@ -6,13 +6,20 @@ Defines the data structures for location information
 import uuid
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union, Set
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Union, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 
+import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal
 
 from app.plugins.base_plugin import LocationPoint
+from app.core.data.location_index import LocationIndex
+from app.core.data.location_store import CORE_FIELDS, LocationStore
+from app.core.geo import geodesy
+from app.exporters.streaming import open_output, write_json_array
+from app.core.geo.location_clustering import IncrementalClusterer, LocationCluster
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +69,79 @@ class LocationMetadata:
         """Create from dictionary"""
         return cls(**data)
 
+def _field(name: str, default: Any = None) -> property:
+    """Attribute kept in a location's record, or in its store row for a view"""
+    def fget(self):
+        value = self._get(name)
+        return default if value is None else value
+    
+    def fset(self, value):
+        # Values equal to the default are not stored at all
+        self._set(name, None if default is not None and value == default else value)
+    
+    return property(fget, fset)
+
+
+def _lazy_field(name: str, factory) -> property:
+    """Mutable attribute that is only allocated when first used"""
+    def fget(self):
+        value = self._get(name)
+        if value is None:
+            value = factory()
+            self._set(name, value)
+        return value
+    
+    def fset(self, value):
+        self._set(name, value)
+    
+    return property(fget, fset)
+
+
+def _location_from_record(record: Dict[str, Any]) -> 'Location':
+    location = Location.__new__(Location)
+    location._detach(record)
+    return location
+
+
+def _record_to_dict(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The saved form of a location's fields (see ``Location.to_dict``)"""
+    timestamp = record.get('timestamp')
+    result = {
+        'id': record.get('id'),
+        'latitude': record.get('latitude'),
+        'longitude': record.get('longitude'),
+        'timestamp': timestamp.isoformat() if timestamp else None,
+        'source': record.get('source') or "",
+        'context': record.get('context') or "",
+        'address': record.get('address') or "",
+        'verified': record.get('verified') or False,
+        'notes': record.get('notes') or "",
+        'photos': list(record.get('photos') or []),
+        'metadata': (record.get('metadata') or LocationMetadata()).to_dict()
+    }
+    
+    # Add geocoded info if available
+    geocoded = record.get('geocoded')
+    if geocoded:
+        result['geocoded'] = geocoded.to_dict()
+        
+    return result
+
+
 class Location:
-    """Represents a geographic location with metadata"""
+    """
+    Represents a geographic location with metadata
+    
+    A location is either detached, holding its own fields, or a view of a
+    row in a ``LocationStore`` (which is what ``LocationDataModel`` hands
+    out). Both behave the same and writes to a view go straight to the
+    store. Optional fields take no space until they are set.
+    
+    Locations are equal when their IDs are; ``is_near`` compares position
+    and time.
+    """
+    
+    __slots__ = ('_store', '_row', '__weakref__')
     
     def __init__(self, 
                 latitude: float, 
@@ -83,33 +161,100 @@ class Location:
             context: Context information about this location
             location_id: Optional unique ID (generated if not provided)
         """
-        self.id = location_id or str(uuid.uuid4())
-        self.latitude = latitude
-        self.longitude = longitude
-        self.timestamp = timestamp or datetime.now()
-        self.source = source
-        self.context = context
-        self.geocoded: Optional[GeocodedInfo] = None
-        self.metadata = LocationMetadata()
-        self.address = ""  # Cached address string
-        self.photos: List[str] = []  # Paths to related photos
-        self.notes: str = ""  # User notes about this location
-        self.verified: bool = False  # Whether this location has been verified
-        self._nearby_locations: List['Location'] = []  # Cached nearby locations
-        
+        self._store: Optional[LocationStore] = None
+        self._row: Any = {
+            'id': location_id or str(uuid.uuid4()),
+            'latitude': latitude,
+            'longitude': longitude,
+            'timestamp': timestamp or datetime.now(),
+            'source': source,
+            'context': context,
+        }
+    
+    id = _field('id')
+    latitude = _field('latitude')
+    longitude = _field('longitude')
+    timestamp = _field('timestamp')
+    source = _field('source', "")
+    context = _field('context', "")
+    geocoded = _field('geocoded')
+    address = _field('address', "")  # Cached address string
+    notes = _field('notes', "")  # User notes about this location
+    verified = _field('verified', False)  # Whether this location has been verified
+    metadata = _lazy_field('metadata', LocationMetadata)
+    photos = _lazy_field('photos', list)  # Paths to related photos
+    _nearby_locations = _lazy_field('nearby_locations', list)  # Cached nearby locations
+    
+    @classmethod
+    def _view(cls, store: LocationStore, row: int) -> 'Location':
+        """Create the view of a store row (used as the store's view factory)"""
+        location = cls.__new__(cls)
+        location._store = store
+        location._row = row
+        return location
+    
+    def _detach(self, record: Dict[str, Any]) -> None:
+        """Stop being a view, keeping a copy of the row's fields"""
+        self._store = None
+        self._row = record
+    
+    def _get(self, name: str) -> Any:
+        store = self._store
+        if store is None:
+            return self._row.get(name)
+        return store.get(self._row, name)
+    
+    def _set(self, name: str, value: Any) -> None:
+        store = self._store
+        if store is None:
+            if value is None and name not in CORE_FIELDS:
+                self._row.pop(name, None)
+            else:
+                self._row[name] = value
+        else:
+            store.set(self._row, name, value)
+    
+    def _record(self) -> Dict[str, Any]:
+        """All fields as a plain dictionary"""
+        if self._store is None:
+            return dict(self._row)
+        return self._store.record(self._row)
+    
+    def __reduce__(self):
+        # Copies and pickles are detached, whatever the original was
+        return (_location_from_record, (self._record(),))
+    
     def __eq__(self, other):
-        """Check if locations are equal"""
+        """Check if two objects describe the same location"""
         if not isinstance(other, Location):
-            return False
-        
-        return (self.id == other.id or 
-                (abs(self.latitude - other.latitude) < 0.00001 and 
-                 abs(self.longitude - other.longitude) < 0.00001 and
-                 abs((self.timestamp - other.timestamp).total_seconds()) < 60))
+            return NotImplemented
+        return self.id == other.id
     
     def __hash__(self):
         """Hash the location"""
-        return hash((self.id, self.latitude, self.longitude, self.timestamp))
+        return hash(self.id)
+    
+    def is_near(self, other: 'Location', 
+               max_degrees: float = 0.00001, 
+               max_seconds: float = 60) -> bool:
+        """
+        Check whether another location is at practically the same place and time
+        
+        Args:
+            other: Location to compare with
+            max_degrees: Largest latitude/longitude difference
+            max_seconds: Largest timestamp difference
+            
+        Returns:
+            True if both positions and times are within the tolerances
+        """
+        if abs(self.latitude - other.latitude) >= max_degrees:
+            return False
+        if abs(self.longitude - other.longitude) >= max_degrees:
+            return False
+        if self.timestamp is None or other.timestamp is None:
+            return self.timestamp is other.timestamp
+        return abs((self.timestamp - other.timestamp).total_seconds()) < max_seconds
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -118,25 +263,7 @@ class Location:
         Returns:
             Dictionary representation of the location
         """
-        result = {
-            'id': self.id,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'source': self.source,
-            'context': self.context,
-            'address': self.address,
-            'verified': self.verified,
-            'notes': self.notes,
-            'photos': self.photos,
-            'metadata': self.metadata.to_dict()
-        }
-        
-        # Add geocoded info if available
-        if self.geocoded:
-            result['geocoded'] = self.geocoded.to_dict()
-            
-        return result
+        return _record_to_dict(self._record())
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Location':
@@ -175,11 +302,14 @@ class Location:
         location.address = data.get('address', '')
         location.notes = data.get('notes', '')
         location.verified = data.get('verified', False)
-        location.photos = data.get('photos', [])
+        if data.get('photos'):
+            location.photos = data['photos']
         
-        # Set metadata
-        if 'metadata' in data:
-            location.metadata = LocationMetadata.from_dict(data['metadata'])
+        # Set metadata, unless it is all defaults
+        if data.get('metadata'):
+            metadata = LocationMetadata.from_dict(data['metadata'])
+            if metadata != LocationMetadata():
+                location.metadata = metadata
             
         # Set geocoded info
         if 'geocoded' in data:
@@ -222,8 +352,9 @@ class Location:
         }
         
         # Add metadata properties
-        if self.metadata:
-            for k, v in self.metadata.to_dict().items():
+        metadata = self._get('metadata') or LocationMetadata()
+        if metadata:
+            for k, v in metadata.to_dict().items():
                 if v is not None and k not in properties:
                     properties[k] = v
         
@@ -276,44 +407,152 @@ class LocationDataModel(QObject):
     """
     Model for managing location data
     
-    Emits signals when the data changes to update the UI
+    Emits signals when the data changes to update the UI. Changes made
+    between ``begin_batch`` and ``end_batch`` (or inside ``with model.batch()``)
+    are coalesced: subscribers receive one ``locationsRemoved``,
+    ``locationsAdded`` and ``locationsUpdated`` list and a single
+    ``dataChanged`` when the outermost batch ends. The per-location signals
+    are only emitted for changes made outside a batch.
     """
     
     # Signals for data changes
     locationAdded = pyqtSignal(Location)
     locationRemoved = pyqtSignal(str)  # Location ID
     locationUpdated = pyqtSignal(Location)
+    locationsAdded = pyqtSignal(list)  # List of Location
+    locationsRemoved = pyqtSignal(list)  # List of location IDs
+    locationsUpdated = pyqtSignal(list)  # List of Location
     locationsCleared = pyqtSignal()
     dataChanged = pyqtSignal()
     
     def __init__(self):
         """Initialize the location data model"""
         super().__init__()
-        self._locations: Dict[str, Location] = {}  # ID -> Location
-        self._tags: Set[str] = set()  # All tags used
-        self._sources: Set[str] = set()  # All sources used
-        
+        # Columnar storage; callers get Location views of its rows
+        self._store = LocationStore(Location._view)
+        # Time, source, tag and bounding-box indexes, kept in step with the store
+        self._index = LocationIndex()
+        
+        # Pending batch notifications
+        self._batch_depth = 0
+        self._pending_cleared = False
+        self._pending_added: Dict[str, Location] = {}
+        self._pending_removed: Dict[str, None] = {}
+        self._pending_updated: Dict[str, Location] = {}
+        
+        # DBSCAN over the locations, and the IDs added since it last ran
+        self._clusterer: Optional[IncrementalClusterer] = None
+        self._unclustered: Dict[str, None] = {}
+    
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+    def begin_batch(self) -> None:
+        """Start collecting change notifications; batches may be nested"""
+        self._batch_depth += 1
+    
+    def end_batch(self) -> None:
+        """Finish a batch, emitting the coalesced notifications if outermost"""
+        if self._batch_depth == 0:
+            raise RuntimeError("end_batch() called without begin_batch()")
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._flush_notifications()
+    
+    @contextmanager
+    def batch(self) -> Iterator['LocationDataModel']:
+        """Context manager wrapping ``begin_batch`` / ``end_batch``"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+    
+    @property
+    def in_batch(self) -> bool:
+        """Whether change notifications are currently being collected"""
+        return self._batch_depth > 0
+    
+    def _flush_notifications(self) -> None:
+        cleared = self._pending_cleared
+        added = list(self._pending_added.values())
+        removed = list(self._pending_removed)
+        updated = list(self._pending_updated.values())
+        
+        self._pending_cleared = False
+        self._pending_added = {}
+        self._pending_removed = {}
+        self._pending_updated = {}
+        
+        if cleared:
+            self.locationsCleared.emit()
+        if removed:
+            self.locationsRemoved.emit(removed)
+        if added:
+            self.locationsAdded.emit(added)
+        if updated:
+            self.locationsUpdated.emit(updated)
+        if cleared or added or removed or updated:
+            self.dataChanged.emit()
+    
+    # ------------------------------------------------------------------
+    # Secondary indexes
+    # ------------------------------------------------------------------
+    def _index_location(self, location: Location) -> None:
+        metadata = location._get('metadata')  # Don't allocate metadata just to index it
+        tags = metadata.tags if metadata and metadata.tags else ()
+        self._index.add(location.id, location.latitude, location.longitude,
+                        location.timestamp, location.source, tags)
+    
+    def _reset_clusters(self) -> None:
+        # DBSCAN cannot take points back, so edits and removals start it over
+        self._clusterer = None
+        self._unclustered = {}
+    
+    def _locations_for(self, location_ids: List[str]) -> List[Location]:
+        store = self._store
+        return [store.view(store.row_of(location_id)) for location_id in location_ids]
+    
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
     def add_location(self, location: Location) -> str:
         """
         Add a location to the model
         
+        Adding a location whose ID is already present replaces it and is
+        reported as an update. The location's fields are copied into the
+        model's storage and the object becomes a view of them, so later
+        changes to it are seen by the model.
+        
         Args:
             location: Location to add
             
         Returns:
             ID of the added location
         """
-        self._locations[location.id] = location
-        
-        # Update tags and sources
-        if location.metadata and location.metadata.tags:
-            self._tags.update(location.metadata.tags)
-        
-        if location.source:
-            self._sources.add(location.source)
-            
-        # Emit signal
+        if location.id in self._store:
+            self._replace(location)
+            return location.id
+        
+        row = self._store.append(location._record())
+        self._store.bind(row, location)
+        self._index_location(location)
+        if self._clusterer is not None:
+            self._unclustered[location.id] = None
+        
+        if self.in_batch:
+            if location.id in self._pending_removed:
+                # Removed and re-added within the batch
+                del self._pending_removed[location.id]
+                self._pending_updated[location.id] = location
+            else:
+                self._pending_added[location.id] = location
+            return location.id
+        
+        # Emit signals
         self.locationAdded.emit(location)
+        self.locationsAdded.emit([location])
         self.dataChanged.emit()
         
         return location.id
@@ -322,19 +561,16 @@ class LocationDataModel(QObject):
         """
         Add multiple locations to the model
         
+        Subscribers are notified once for the whole list.
+        
         Args:
             locations: Locations to add
             
         Returns:
             List of added location IDs
         """
-        added_ids = []
-        
-        for location in locations:
-            loc_id = self.add_location(location)
-            added_ids.append(loc_id)
-            
-        return added_ids
+        with self.batch():
+            return [self.add_location(location) for location in locations]
     
     def get_location(self, location_id: str) -> Optional[Location]:
         """
@@ -346,7 +582,8 @@ class LocationDataModel(QObject):
         Returns:
             Location object or None if not found
         """
-        return self._locations.get(location_id)
+        row = self._store.row_of(location_id)
+        return self._store.view(row) if row is not None else None
     
     def update_location(self, location: Location) -> bool:
         """
@@ -358,19 +595,35 @@ class LocationDataModel(QObject):
         Returns:
             True if location was updated, False if not found
         """
-        if location.id in self._locations:
-            self._locations[location.id] = location
-            
-            # Update tags and sources
-            self._refresh_tags_and_sources()
-            
-            # Emit signal
-            self.locationUpdated.emit(location)
-            self.dataChanged.emit()
-            
-            return True
-            
-        return False
+        if location.id not in self._store:
+            return False
+        
+        self._replace(location)
+        return True
+    
+    def _replace(self, location: Location) -> None:
+        row = self._store.row_of(location.id)
+        if location._store is not self._store or location._row != row:
+            # A different object: it takes over the row, the old view keeps the old fields
+            record = location._record()
+            self._store.bind(row, location)
+            self._store.write(row, record)
+        # Re-indexing by ID also picks up changes made to the object in place
+        self._index_location(location)
+        if location.id not in self._unclustered:
+            self._reset_clusters()
+        
+        if self.in_batch:
+            if location.id in self._pending_added:
+                self._pending_added[location.id] = location
+            else:
+                self._pending_updated[location.id] = location
+            return
+        
+        # Emit signals
+        self.locationUpdated.emit(location)
+        self.locationsUpdated.emit([location])
+        self.dataChanged.emit()
     
     def remove_location(self, location_id: str) -> bool:
         """
@@ -382,25 +635,55 @@ class LocationDataModel(QObject):
         Returns:
             True if location was removed, False if not found
         """
-        if location_id in self._locations:
-            location = self._locations.pop(location_id)
-            
-            # Update tags and sources
-            self._refresh_tags_and_sources()
-            
-            # Emit signal
-            self.locationRemoved.emit(location_id)
-            self.dataChanged.emit()
-            
+        row = self._store.row_of(location_id)
+        if row is None:
+            return False
+        
+        self._store.delete(row)
+        self._index.remove(location_id)
+        if location_id in self._unclustered:
+            del self._unclustered[location_id]
+        else:
+            self._reset_clusters()
+        
+        if self.in_batch:
+            if self._pending_added.pop(location_id, None) is None:
+                self._pending_updated.pop(location_id, None)
+                self._pending_removed[location_id] = None
             return True
+        
+        # Emit signals
+        self.locationRemoved.emit(location_id)
+        self.locationsRemoved.emit([location_id])
+        self.dataChanged.emit()
+        
+        return True
+    
+    def remove_locations(self, location_ids: List[str]) -> List[str]:
+        """
+        Remove multiple locations, notifying subscribers once
+        
+        Args:
+            location_ids: IDs of locations to remove
             
-        return False
+        Returns:
+            IDs that were found and removed
+        """
+        with self.batch():
+            return [loc_id for loc_id in location_ids if self.remove_location(loc_id)]
     
     def clear_locations(self) -> None:
         """Clear all locations"""
-        self._locations.clear()
-        self._tags.clear()
-        self._sources.clear()
+        self._store.clear()
+        self._index.clear()
+        self._reset_clusters()
+        
+        if self.in_batch:
+            self._pending_cleared = True
+            self._pending_added = {}
+            self._pending_removed = {}
+            self._pending_updated = {}
+            return
         
         # Emit signal
         self.locationsCleared.emit()
@@ -413,7 +696,36 @@ class LocationDataModel(QObject):
         Returns:
             List of all locations
         """
-        return list(self._locations.values())
+        store = self._store
+        return [store.view(row) for row in store.rows()]
+    
+    def iter_records(self, oldest_first: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every location as a plain record dictionary
+        
+        Unlike ``get_all_locations`` this neither builds a list of locations
+        nor creates views, so it is what exporters read from. Locations
+        removed while the generator runs are skipped.
+        
+        Args:
+            oldest_first: Order by timestamp, untimed locations first,
+                instead of insertion order
+            
+        Yields:
+            The fields of one location (as ``Location._record`` returns them)
+        """
+        store = self._store
+        location_ids = store.ids()
+        if oldest_first:
+            timed = self._index.ids_in_time_range()
+            if len(timed) < len(location_ids):
+                timed_set = set(timed)
+                timed = [location_id for location_id in location_ids if location_id not in timed_set] + timed
+            location_ids = timed
+        for location_id in location_ids:
+            row = store.row_of(location_id)
+            if row is not None:
+                yield store.record(row)
     
     def get_location_count(self) -> int:
         """
@@ -422,7 +734,7 @@ class LocationDataModel(QObject):
         Returns:
             Number of locations
         """
-        return len(self._locations)
+        return len(self._store)
     
     def get_all_tags(self) -> List[str]:
         """
@@ -431,7 +743,7 @@ class LocationDataModel(QObject):
         Returns:
             List of all tags
         """
-        return sorted(list(self._tags))
+        return sorted(self._index.tags())
     
     def get_all_sources(self) -> List[str]:
         """
@@ -440,7 +752,55 @@ class LocationDataModel(QObject):
         Returns:
             List of all sources
         """
-        return sorted(list(self._sources))
+        return sorted(self._index.sources())
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever a location is added, updated or removed"""
+        return self._index.version
+    
+    def get_timeline_histogram(self, grouping: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count locations per time bin
+        
+        Results are cached until the model changes; changes since the last
+        call are folded in rather than recounted.
+        
+        Args:
+            grouping: "day", "week", "month", "year", "hour" (of day) or
+                "weekday"; see ``app.core.data.timeline``
+            
+        Returns:
+            Tuple of (bins, counts) arrays in bin order
+        """
+        return self._index.timeline.histogram(grouping)
+    
+    def get_clusters(self, eps: float = 100, min_samples: int = 5) -> List[LocationCluster]:
+        """
+        Group the locations with DBSCAN
+        
+        The clustering is kept between calls: locations added since the
+        last call are folded into it, while updates, removals and new
+        parameters cluster everything again.
+        
+        Args:
+            eps: Maximum distance (meters) between neighbouring locations
+            min_samples: Locations within ``eps`` (including itself) that
+                make a location a core point
+            
+        Returns:
+            Clusters whose locations are record dictionaries
+        """
+        clusterer = self._clusterer
+        if clusterer is None or (clusterer.eps, clusterer.min_samples) != (eps, min_samples):
+            clusterer = self._clusterer = IncrementalClusterer(eps=eps, min_samples=min_samples)
+            records = self.iter_records()
+        else:
+            store = self._store
+            records = (store.record(store.row_of(location_id)) for location_id in self._unclustered)
+        self._unclustered = {}
+        clusterer.add_locations(records)
+        return clusterer.clusters()
     
     def find_locations_by_source(self, source: str) -> List[Location]:
         """
@@ -452,7 +812,7 @@ class LocationDataModel(QObject):
         Returns:
             List of matching locations
         """
-        return [loc for loc in self._locations.values() if loc.source == source]
+        return self._locations_for(self._index.ids_for_source(source))
     
     def find_locations_by_tag(self, tag: str) -> List[Location]:
         """
@@ -464,10 +824,7 @@ class LocationDataModel(QObject):
         Returns:
             List of matching locations
         """
-        return [
-            loc for loc in self._locations.values() 
-            if loc.metadata and loc.metadata.tags and tag in loc.metadata.tags
-        ]
+        return self._locations_for(self._index.ids_for_tag(tag))
     
     def find_locations_by_date_range(self, 
                                     start_date: Optional[datetime] = None, 
@@ -480,23 +837,9 @@ class LocationDataModel(QObject):
             end_date: End date (inclusive)
             
         Returns:
-            List of matching locations
+            List of matching locations, oldest first
         """
-        result = []
-        
-        for loc in self._locations.values():
-            if not loc.timestamp:
-                continue
-                
-            if start_date and loc.timestamp < start_date:
-                continue
-                
-            if end_date and loc.timestamp > end_date:
-                continue
-                
-            result.append(loc)
-            
-        return result
+        return self._locations_for(self._index.ids_in_time_range(start_date, end_date))
     
     def find_locations_by_bounding_box(self, 
                                       min_lat: float, 
@@ -515,10 +858,60 @@ class LocationDataModel(QObject):
         Returns:
             List of matching locations
         """
-        return [
-            loc for loc in self._locations.values()
-            if min_lat <= loc.latitude <= max_lat and min_lon <= loc.longitude <= max_lon
-        ]
+        return self._locations_for(self._index.ids_in_bounds(min_lat, min_lon, max_lat, max_lon))
+    
+    def filter_locations(self, 
+                        source: Optional[str] = None,
+                        tag: Optional[str] = None,
+                        start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None,
+                        bounds: Optional[Tuple[float, float, float, float]] = None) -> List[Location]:
+        """
+        Find locations matching several criteria at once
+        
+        Args:
+            source: Source to filter by
+            tag: Tag to filter by
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            bounds: (min_lat, min_lon, max_lat, max_lon)
+            
+        Returns:
+            List of matching locations, oldest first when a date is given
+        """
+        return self._locations_for(self.filter_location_ids(source, tag, start_date, end_date, bounds))
+    
+    def filter_location_ids(self, 
+                           source: Optional[str] = None,
+                           tag: Optional[str] = None,
+                           start_date: Optional[datetime] = None,
+                           end_date: Optional[datetime] = None,
+                           bounds: Optional[Tuple[float, float, float, float]] = None) -> List[str]:
+        """
+        IDs of the locations ``filter_locations`` would return, in the same order
+        
+        Cheaper than ``filter_locations`` when only IDs are needed, since no
+        Location views are created.
+        """
+        if source is None and tag is None and start_date is None and end_date is None and bounds is None:
+            return self._store.ids()
+        return self._index.query(source, tag, start_date, end_date, bounds)
+    
+    def location_column(self, location_ids: List[str], field_name: str) -> np.ndarray:
+        """
+        One field of several locations as an array, e.g. to sort by it
+        
+        May be called from a worker thread; it reads the storage as it was
+        when the call started. See ``LocationStore.column`` for the types.
+        
+        Args:
+            location_ids: Location IDs; unknown ones read as missing
+            field_name: "timestamp", "latitude", "source", "context", "address", ...
+            
+        Returns:
+            Array with one value per ID
+        """
+        return self._store.column(location_ids, field_name)
     
     def find_nearest_locations(self, 
                              lat: float, 
@@ -537,33 +930,29 @@ class LocationDataModel(QObject):
         Returns:
             List of nearest locations
         """
-        # Create a reference point
-        from geopy.distance import geodesic
-        
-        # Calculate distances
-        locations_with_distance = []
-        for loc in self._locations.values():
-            dist = geodesic((lat, lon), (loc.latitude, loc.longitude)).kilometers
+        if not len(self._store):
+            return []
             
-            if max_distance is not None and dist > max_distance:
-                continue
-                
-            locations_with_distance.append((loc, dist))
+        rows = self._store.live_rows()
+        lats, lons = self._store.coordinates(rows)
         
-        # Sort by distance
-        locations_with_distance.sort(key=lambda x: x[1])
+        max_distance_m = max_distance * 1000.0 if max_distance is not None else None
+        indices, _ = geodesy.nearest(lat, lon, lats, lons, max_count, max_distance_m=max_distance_m)
         
         # Return the nearest locations
-        return [loc for loc, _ in locations_with_distance[:max_count]]
+        return [self._store.view(row) for row in rows[indices].tolist()]
     
     def to_geojson(self) -> Dict[str, Any]:
         """
         Convert all locations to a GeoJSON FeatureCollection
         
+        This builds every feature in memory; ``export_geojson`` in
+        ``app.exporters.geojson_exporter`` streams them to a file instead.
+        
         Returns:
             GeoJSON FeatureCollection dictionary
         """
-        features = [loc.to_geojson() for loc in self._locations.values()]
+        features = [loc.to_geojson() for loc in self.get_all_locations()]
         
         return {
             'type': 'FeatureCollection',
@@ -581,12 +970,11 @@ class LocationDataModel(QObject):
             True if successful, False otherwise
         """
         try:
-            # Convert locations to dictionaries
-            locations_data = [loc.to_dict() for loc in self._locations.values()]
+            # Convert records to dictionaries one at a time as they are written
+            locations_data = (_record_to_dict(record) for record in self.iter_records())
             
-            # Save to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(locations_data, f, indent=2)
+            with open_output(file_path, 'none') as f:
+                write_json_array(locations_data, f)
                 
             return True
         except Exception as e:
@@ -611,23 +999,9 @@ class LocationDataModel(QObject):
                 locations_data = json.load(f)
             
             # Convert dictionaries to Location objects
-            for loc_data in locations_data:
-                location = Location.from_dict(loc_data)
-                model.add_location(location)
+            model.add_locations([Location.from_dict(loc_data) for loc_data in locations_data])
                 
             return model
         except Exception as e:
             logger.error(f"Error loading locations from {file_path}: {e}")
             return model
-    
-    def _refresh_tags_and_sources(self) -> None:
-        """Refresh the sets of tags and sources"""
-        self._tags.clear()
-        self._sources.clear()
-        
-        for loc in self._locations.values():
-            if loc.metadata and loc.metadata.tags:
-                self._tags.update(loc.metadata.tags)
-            
-            if loc.source:
-                self._sources.add(loc.source)
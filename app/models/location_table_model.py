@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Virtual table model over a LocationDataModel
+Rows are not materialised: the model holds the filtered, sorted location IDs
+and creates Location views only for the rows a view asks about. Filtering
+and sorting run on a worker thread, and additions, removals and updates in
+the location model become row insertions and removals at their sorted
+positions instead of a reset of the whole table.
+"""
+
+import logging
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt
+
+from app.core.data.location_index import timestamp_key
+from app.core.data.row_order import RowOrder
+from app.core.models.row_order_model import RowOrderModel
+from app.models.location_data import Location, LocationDataModel
+
+logger = logging.getLogger(__name__)
+
+# (header, location field sorted by)
+COLUMNS = (("Date", "timestamp"), ("Source", "source"), ("Context", "context"))
+
+
+def _text_key(value: Any) -> str:
+    return (value or "").casefold()
+
+
+def _same_key(a: Any, b: Any) -> bool:
+    return a == b or (a != a and b != b)  # NaN (no timestamp) equals itself here
+
+
+class LocationTableModel(RowOrderModel):
+    """Filterable, sortable table of the locations in a LocationDataModel"""
+
+    def __init__(self, location_model: Optional[LocationDataModel] = None, parent=None):
+        super(LocationTableModel, self).__init__(parent)
+        self.location_model: Optional[LocationDataModel] = None
+        self._sequence = 0  # Natural-order key for the next new row
+        self._sort_column = -1
+        self._descending = False
+        self._source: Optional[str] = None
+        self._tag: Optional[str] = None
+        self._search = ""
+
+        if location_model is not None:
+            self.set_location_model(location_model)
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def set_location_model(self, model: Optional[LocationDataModel]) -> None:
+        """Show the locations of another model"""
+        if self.location_model is not None:
+            self.location_model.locationsAdded.disconnect(self._on_locations_added)
+            self.location_model.locationsRemoved.disconnect(self._on_locations_removed)
+            self.location_model.locationsUpdated.disconnect(self._on_locations_updated)
+            self.location_model.locationsCleared.disconnect(self._on_locations_cleared)
+        self.location_model = model
+        if model is not None:
+            model.locationsAdded.connect(self._on_locations_added)
+            model.locationsRemoved.connect(self._on_locations_removed)
+            model.locationsUpdated.connect(self._on_locations_updated)
+            model.locationsCleared.connect(self._on_locations_cleared)
+        self.refresh()
+
+    def set_filter(self, source: Optional[str] = None, tag: Optional[str] = None,
+                   search: str = "") -> None:
+        """
+        Only show some locations
+
+        Args:
+            source: Source name, or None for all
+            tag: Tag, or None for all
+            search: Text the context or address must contain (case-insensitive)
+        """
+        search = search.lower()
+        if (source, tag, search) == (self._source, self._tag, self._search):
+            return
+        self._source, self._tag, self._search = source, tag, search
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Rebuild the rows from scratch on the worker thread"""
+        model = self.location_model
+        if model is None:
+            self._reset(RowOrder())
+            return
+
+        ids = model.filter_location_ids(source=self._source, tag=self._tag)
+        self._sequence = len(ids)
+        field = COLUMNS[self._sort_column][1] if self._sort_column >= 0 else None
+        search, descending = self._search, self._descending
+        self._build(lambda: self._build_order(model, ids, field, search, descending))
+
+    @staticmethod
+    def _build_order(model: LocationDataModel, ids: List[str], field: Optional[str],
+                     search: str, descending: bool) -> RowOrder:
+        """Filter and sort on the worker thread"""
+        ids_array = np.empty(len(ids), dtype=object)
+        ids_array[:] = ids
+        natural = np.arange(len(ids), dtype=np.float64)
+        if search:
+            contexts = model.location_column(ids, "context")
+            addresses = model.location_column(ids, "address")
+            keep = np.fromiter(
+                (search in (context or "").lower() or search in (address or "").lower()
+                 for context, address in zip(contexts.tolist(), addresses.tolist())),
+                dtype=bool, count=len(ids),
+            )
+            ids_array, natural = ids_array[keep], natural[keep]
+
+        if field is None:
+            keys = natural
+        elif field == "timestamp":
+            keys = model.location_column(ids_array.tolist(), field)
+        else:
+            values = model.location_column(ids_array.tolist(), field)
+            keys = np.empty(len(values), dtype=object)
+            keys[:] = [_text_key(value) for value in values.tolist()]
+        return RowOrder(ids_array, keys, descending)
+
+    # ------------------------------------------------------------------
+    # Qt model interface
+    # ------------------------------------------------------------------
+    def columnCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < self._fetched):
+            return None
+
+        location_id = self._order.id_at(index.row())
+        if role == Qt.UserRole:
+            return location_id
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+
+        location = self.location_model.get_location(location_id) if self.location_model else None
+        if location is None:
+            return None
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return location.timestamp.strftime("%Y-%m-%d %H:%M:%S") if location.timestamp else ""
+            if column == 1:
+                return location.source
+            return location.context
+
+        # Tooltips carry a little more detail
+        if column == 0:
+            return location.timestamp.strftime("%Y-%m-%d %H:%M:%S %z") if location.timestamp else ""
+        if column == 1:
+            return f"Source: {location.source}"
+        return location.address or location.context
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(COLUMNS):
+            return COLUMNS[section][0]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort by a column; reversing the current sort does not rebuild the rows"""
+        descending = order == Qt.DescendingOrder
+        if column == self._sort_column and descending == self._descending:
+            return
+        self._descending = descending
+        if column == self._sort_column and not self.is_loading:
+            self._reverse(descending)
+            return
+        self._sort_column = column
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def _accepts(self, location: Location) -> bool:
+        if self._source is not None and location.source != self._source:
+            return False
+        if self._tag is not None and self._tag not in (location.metadata.tags or []):
+            return False
+        if self._search:
+            return (self._search in (location.context or "").lower()
+                    or self._search in (location.address or "").lower())
+        return True
+
+    def _key(self, location: Location) -> Any:
+        if self._sort_column < 0:
+            self._sequence += 1
+            return float(self._sequence - 1)
+        field = COLUMNS[self._sort_column][1]
+        if field == "timestamp":
+            return timestamp_key(location.timestamp)
+        return _text_key(getattr(location, field))
+
+    def _entries(self, locations: Iterable[Location]) -> Tuple[List[str], List[Any]]:
+        """IDs and sort keys of the locations that pass the filter"""
+        ids, keys = [], []
+        for location in locations:
+            if self._accepts(location):
+                ids.append(location.id)
+                keys.append(self._key(location))
+        return ids, keys
+
+    def _current_keys(self, location_ids: List[str]):
+        """location ID -> (row, sort key) for the IDs that are shown"""
+        return {
+            self._order.id_at(row): (row, self._order.key_at(row))
+            for row in self._order.rows_of(location_ids).tolist()
+        }
+
+    def _on_locations_added(self, locations: List[Location]) -> None:
+        if not self._defer("added", locations):
+            self._insert(*self._entries(locations))
+
+    def _on_locations_removed(self, location_ids: List[str]) -> None:
+        if not self._defer("removed", location_ids):
+            self._remove(location_ids)
+
+    def _on_locations_updated(self, locations: List[Location]) -> None:
+        if self._defer("updated", locations):
+            return
+
+        current = self._current_keys([location.id for location in locations])
+        moved, changed_rows = set(), []
+        for location in locations:
+            if location.id not in current:
+                continue
+            row, key = current[location.id]
+            if self._accepts(location) and (self._sort_column < 0 or _same_key(key, self._key(location))):
+                changed_rows.append(row)
+            else:
+                moved.add(location.id)
+
+        # Rows that keep their place just repaint; the rest move or leave
+        changed_rows = [row for row in changed_rows if row < self._fetched]
+        if changed_rows:
+            self.dataChanged.emit(self.index(min(changed_rows), 0),
+                                  self.index(max(changed_rows), len(COLUMNS) - 1))
+        self._remove(list(moved))
+        self._insert(*self._entries(
+            location for location in locations
+            if location.id in moved or location.id not in current
+        ))
+
+    def _on_locations_cleared(self) -> None:
+        if not self._defer("cleared", None):
+            self._sequence = 0
+            self._reset(RowOrder(descending=self._descending))
+
+    def _replay(self, kind: str, payload: Any) -> None:
+        if kind == "cleared":
+            self._order = RowOrder(descending=self._descending)
+            self._sequence = 0
+        elif kind == "removed":
+            self._order.remove(payload)
+        elif kind == "updated":
+            current = self._current_keys([location.id for location in payload])
+            self._order.remove(list(current))
+            ids, keys = self._entries(payload)
+            if self._sort_column < 0:
+                # Updates keep their place in the natural order
+                keys = [current[location_id][1] if location_id in current else key
+                        for location_id, key in zip(ids, keys)]
+            self._order.insert(ids, keys)
+        else:
+            self._order.insert(*self._entries(payload))
@@ -129,8 +129,6 @@ class PluginRegistry:
                 results.append((plugin_name, None))
         return results
 
-# Create global registry instance
-registry = PluginRegistry.instance()
 
 # Load plugins automatically
 def load_plugin_categories():
@@ -152,19 +150,30 @@ def load_plugin_categories():
                         if hasattr(module, 'Plugin'):
                             plugin_class = getattr(module, 'Plugin')
                             plugin_instance = plugin_class()
-                            registry.register_plugin(plugin_name, plugin_instance, category)
+                            PluginRegistry.instance().register_plugin(plugin_name, plugin_instance, category)
                             logger.info(f"Loaded plugin {plugin_name} from {category}")
                         elif hasattr(module, plugin_name):
                             plugin_class = getattr(module, plugin_name)
                             if callable(plugin_class):
                                 plugin_instance = plugin_class()
-                                registry.register_plugin(plugin_name, plugin_instance, category)
+                                PluginRegistry.instance().register_plugin(plugin_name, plugin_instance, category)
                                 logger.info(f"Loaded plugin {plugin_name} from {category}")
                     except Exception as e:
                         logger.error(f"Error loading plugin {plugin_name} from {category}: {e}", exc_info=True)
 
-# Load all plugins when this module is imported
-try:
-    load_plugin_categories()
-except Exception as e:
-    logger.error(f"Error loading plugin categories: {e}", exc_info=True)
+def __getattr__(name):
+    """Create the global registry on first access.
+
+    Plugins used to be imported and instantiated whenever any ``app.plugins``
+    submodule was imported; they are now only loaded when the registry is
+    actually used.
+    """
+    if name == "registry":
+        global registry
+        registry = PluginRegistry.instance()
+        try:
+            load_plugin_categories()
+        except Exception as e:
+            logger.error(f"Error loading plugin categories: {e}", exc_info=True)
+        return registry
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
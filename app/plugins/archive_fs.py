@@ -0,0 +1,399 @@
+"""Read the files of a zipped export without extracting it.
+
+Social media exports arrive as zip archives that can run to tens of
+gigabytes, and extracting one before reading it doubles the disk space
+it takes and writes every byte again.  :class:`ZipArchive` presents an
+archive as a read-only file tree instead: :class:`ArchivePath` behaves
+like a :class:`pathlib.Path` for the parts plugins use (``name``,
+``suffix``, ``glob``, ``open``, ``read_text`` …), and members are
+decompressed as they are read.
+
+Glob patterns follow :meth:`pathlib.Path.glob`: ``*`` and ``?`` match
+within one path component and ``**`` matches any number of directories,
+all against member names from the archive's central directory.  As with
+pathlib, a pattern ending in ``**`` or ``/`` matches directories only.
+
+Formats that need random access to a real file, such as SQLite
+databases, can be extracted one member at a time with
+:func:`local_path`; an extracted member is reused until the archive
+holding it changes.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import posixpath
+import re
+import shutil
+import threading
+import zipfile
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MemberStat(NamedTuple):
+    """The ``stat`` fields of an archive member that ingestion relies on."""
+
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+
+
+def _segment_regex(segment: str) -> str:
+    """Translate one glob path component; nothing in it matches ``/``."""
+    parts: List[str] = []
+    index, length = 0, len(segment)
+    while index < length:
+        char = segment[index]
+        index += 1
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = index
+            if end < length and segment[end] in "!^":
+                end += 1
+            if end < length and segment[end] == "]":
+                end += 1
+            end = segment.find("]", end)
+            if end < 0:
+                parts.append(re.escape(char))
+                continue
+            body = segment[index:end].replace("\\", "\\\\")
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            parts.append(f"(?!/)[{body}]")
+            index = end + 1
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def glob_regex(pattern: str) -> Pattern[str]:
+    """Compile a relative glob pattern to a regex over ``/``-separated names.
+
+    A trailing ``**`` also matches the empty name, standing for the
+    directory the pattern is matched below, as pathlib yields it too.
+    """
+    if not pattern or pattern.startswith("/"):
+        raise ValueError(f"Non-relative patterns are unsupported: {pattern!r}")
+    segments = [segment for segment in pattern.split("/") if segment not in ("", ".")]
+    regex = []
+    for position, segment in enumerate(segments):
+        last = position == len(segments) - 1
+        if segment == "**" and last:
+            if regex and regex[-1].endswith("/"):
+                regex[-1] = regex[-1][:-1]
+                regex.append("(?:/[^/]+)*")
+            else:
+                regex.append("(?:[^/]+(?:/[^/]+)*)?")
+        elif segment == "**":
+            regex.append("(?:[^/]+/)*")
+        else:
+            regex.append(_segment_regex(segment) + ("" if last else "/"))
+    return re.compile("".join(regex) + r"\Z")
+
+
+def _matches_directories_only(pattern: str) -> bool:
+    return pattern.endswith("/") or pattern.rsplit("/", 1)[-1] == "**"
+
+
+class ZipArchive:
+    """A zip file opened for reading as a tree of :class:`ArchivePath`."""
+
+    def __init__(self, path: Union[str, Path], extract_dir: Optional[Union[str, Path]] = None) -> None:
+        """
+        Parameters
+        ----------
+        path:
+            The zip file.
+        extract_dir:
+            Where :func:`local_path` extracts members to; without it
+            members can only be streamed.
+        """
+        self.path = os.path.realpath(path)
+        self.extract_dir = str(extract_dir) if extract_dir is not None else None
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._files: Optional[Dict[str, zipfile.ZipInfo]] = None
+        self._dirs: Optional[set] = None
+        self._lock = threading.Lock()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Worker processes reopen the archive rather than receive its handle
+        return (_reopen, (self.path, self.extract_dir))
+
+    def __repr__(self) -> str:
+        return f"ZipArchive({self.path!r})"
+
+    def __enter__(self) -> "ZipArchive":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def zipfile(self) -> zipfile.ZipFile:
+        with self._lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path, "r")
+            return self._zip
+
+    @property
+    def root(self) -> "ArchivePath":
+        return ArchivePath(self, "")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+    def glob(self, pattern: str) -> Iterator["ArchivePath"]:
+        return self.root.glob(pattern)
+
+    # ------------------------------------------------------------------
+    # Central directory
+    # ------------------------------------------------------------------
+    def _index(self) -> Tuple[Dict[str, zipfile.ZipInfo], set]:
+        if self._files is None:
+            files: Dict[str, zipfile.ZipInfo] = {}
+            dirs = {""}
+            for info in self.zipfile.infolist():
+                name = info.filename.replace("\\", "/").strip("/")
+                if not name or ".." in name.split("/"):
+                    continue
+                parent = posixpath.dirname(name)
+                while parent not in dirs:
+                    dirs.add(parent)
+                    parent = posixpath.dirname(parent)
+                if info.is_dir():
+                    dirs.add(name)
+                else:
+                    files[name] = info
+            self._files, self._dirs = files, dirs
+        return self._files, self._dirs
+
+    @property
+    def files(self) -> Dict[str, zipfile.ZipInfo]:
+        """Member files by ``/``-separated name, in archive order."""
+        return self._index()[0]
+
+    @property
+    def directories(self) -> set:
+        """Directory names, including ones only implied by member names."""
+        return self._index()[1]
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+    def extract(self, name: str) -> Path:
+        """Extract one member to :attr:`extract_dir` and return its path.
+
+        The extracted file is given the archive's modification time, so
+        it is reused until the archive changes.
+        """
+        if self.extract_dir is None:
+            raise ValueError(f"{self} has no extraction directory")
+        info = self.files[name]
+        target = Path(self.extract_dir, *name.split("/"))
+        try:
+            stat = target.stat()
+            if stat.st_size == info.file_size and stat.st_mtime_ns == self.mtime_ns:
+                return target
+        except OSError:
+            pass
+
+        LOGGER.debug("Extracting %s from %s", name, self.path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        with self.zipfile.open(info) as source, open(partial, "wb") as destination:
+            shutil.copyfileobj(source, destination, 1 << 20)
+        os.utime(partial, ns=(self.mtime_ns, self.mtime_ns))
+        os.replace(partial, target)
+        return target
+
+
+# Archives reopened in this process, see ``ZipArchive.__reduce__``
+_REOPENED: Dict[Tuple[str, Optional[str], int, int], ZipArchive] = {}
+
+
+def _reopen(path: str, extract_dir: Optional[str]) -> ZipArchive:
+    stat = os.stat(path)
+    key = (path, extract_dir, stat.st_size, stat.st_mtime_ns)
+    archive = _REOPENED.get(key)
+    if archive is None:
+        if len(_REOPENED) >= 8:
+            _REOPENED.pop(next(iter(_REOPENED))).close()
+        archive = _REOPENED[key] = ZipArchive(path, extract_dir)
+    return archive
+
+
+class ArchivePath:
+    """A file or directory inside a :class:`ZipArchive`."""
+
+    __slots__ = ("archive", "member")
+
+    def __init__(self, archive: ZipArchive, member: str = "") -> None:
+        self.archive = archive
+        self.member = member.strip("/")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (ArchivePath, (self.archive, self.member))
+
+    def __str__(self) -> str:
+        return posixpath.join(self.archive.path, self.member) if self.member else self.archive.path
+
+    def __repr__(self) -> str:
+        return f"ArchivePath({self.archive.path!r}, {self.member!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ArchivePath):
+            return NotImplemented
+        return (self.archive.path, self.member) == (other.archive.path, other.member)
+
+    def __lt__(self, other: "ArchivePath") -> bool:
+        return (self.archive.path, self.member) < (other.archive.path, other.member)
+
+    def __hash__(self) -> int:
+        return hash((self.archive.path, self.member))
+
+    def __truediv__(self, name: str) -> "ArchivePath":
+        return self.joinpath(name)
+
+    # ------------------------------------------------------------------
+    # Pure path parts
+    # ------------------------------------------------------------------
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.member).suffix
+
+    @property
+    def suffixes(self) -> List[str]:
+        return PurePosixPath(self.member).suffixes
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.member).stem
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        return PurePosixPath(self.member).parts
+
+    @property
+    def parent(self) -> "ArchivePath":
+        return ArchivePath(self.archive, posixpath.dirname(self.member))
+
+    def joinpath(self, *names: str) -> "ArchivePath":
+        member = posixpath.normpath(posixpath.join(self.member, *names))
+        return ArchivePath(self.archive, "" if member == "." else member)
+
+    # ------------------------------------------------------------------
+    # Tree
+    # ------------------------------------------------------------------
+    def exists(self) -> bool:
+        return self.is_file() or self.is_dir()
+
+    def is_file(self) -> bool:
+        return self.member in self.archive.files
+
+    def is_dir(self) -> bool:
+        return self.member in self.archive.directories
+
+    def iterdir(self) -> Iterator["ArchivePath"]:
+        if not self.is_dir():
+            raise NotADirectoryError(str(self))
+        names = list(self.archive.files) + sorted(self.archive.directories)
+        for name in names:
+            if name and posixpath.dirname(name) == self.member:
+                yield ArchivePath(self.archive, name)
+
+    def glob(self, pattern: str) -> Iterator["ArchivePath"]:
+        """Yield the members below this directory whose names match ``pattern``.
+
+        Like :meth:`pathlib.Path.glob`, a pattern ending in ``**`` or
+        ``/`` yields directories only, and a trailing ``**`` yields this
+        directory itself as well.
+        """
+        regex = glob_regex(pattern)
+        prefix = self.member + "/" if self.member else ""
+        directories = sorted(self.archive.directories)
+        if _matches_directories_only(pattern):
+            if pattern.rsplit("/", 1)[-1] == "**" and self.is_dir() and regex.match(""):
+                yield self
+            groups: Tuple[Any, ...] = (directories,)
+        else:
+            groups = (self.archive.files, directories)
+        for names in groups:
+            for name in names:
+                if len(name) > len(prefix) and name.startswith(prefix) and regex.match(name, len(prefix)):
+                    yield ArchivePath(self.archive, name)
+
+    def rglob(self, pattern: str) -> Iterator["ArchivePath"]:
+        return self.glob("**/" + pattern)
+
+    # ------------------------------------------------------------------
+    # Contents
+    # ------------------------------------------------------------------
+    def _info(self) -> zipfile.ZipInfo:
+        try:
+            return self.archive.files[self.member]
+        except KeyError:
+            if self.is_dir():
+                raise IsADirectoryError(str(self)) from None
+            raise FileNotFoundError(str(self)) from None
+
+    def open(self, mode: str = "r", buffering: int = -1, encoding: Optional[str] = None,
+             errors: Optional[str] = None, newline: Optional[str] = None) -> IO[Any]:
+        """Open the member for streaming; only reading is supported."""
+        if mode not in ("r", "rt", "rb"):
+            raise ValueError(f"Archive members are read-only; invalid mode {mode!r}")
+        handle = self.archive.zipfile.open(self._info())
+        if mode == "rb":
+            return handle
+        return io.TextIOWrapper(handle, encoding=encoding, errors=errors, newline=newline)
+
+    def read_bytes(self) -> bytes:
+        with self.open("rb") as handle:
+            return handle.read()
+
+    def read_text(self, encoding: Optional[str] = None, errors: Optional[str] = None) -> str:
+        with self.open("r", encoding=encoding, errors=errors) as handle:
+            return handle.read()
+
+    def stat(self) -> MemberStat:
+        """Uncompressed size; the modification time is the archive's, since a
+        member can only change when the archive file is replaced."""
+        info = self._info()
+        return MemberStat(info.file_size, self.archive.mtime_ns / 1e9, self.archive.mtime_ns)
+
+    def digest(self) -> str:
+        """Content checksum from the central directory, without reading the member."""
+        info = self._info()
+        return f"crc32:{info.CRC:08x}:{info.file_size}"
+
+
+def local_path(path: Union[Path, ArchivePath]) -> Path:
+    """Return a real file for ``path``, extracting it if it is an archive member.
+
+    For formats that need to seek around a file or hand its path to
+    another library; everything else should be read with
+    :meth:`ArchivePath.open`.
+    """
+    if isinstance(path, ArchivePath):
+        path._info()
+        return path.archive.extract(path.member)
+    return Path(path)
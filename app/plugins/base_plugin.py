@@ -17,14 +17,22 @@ import shutil
 import zipfile
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Iterable
+from typing import Any, Callable, Dict, List, Optional, Tuple, Iterable, Iterator, Union
 
 from app.core.path_utils import get_user_data_dir, get_app_root
+from app.plugins.archive_fs import ArchivePath, ZipArchive
 
 
 logger = logging.getLogger("creepyai.base_plugin")
 
+#: Points per batch yielded by :meth:`BasePlugin.iter_locations`
+DEFAULT_LOCATION_BATCH_SIZE = 1000
+
+#: Marker left in an extraction folder naming the archive it holds
+EXTRACTION_STAMP = ".creepyai-extracted"
+
 
 @dataclass
 class LocationPoint:
@@ -36,6 +44,39 @@ class LocationPoint:
     context: str
 
 
+def batch_locations(points: Iterable[LocationPoint], batch_size: int) -> Iterator[List[LocationPoint]]:
+    """Group an iterable of points into lists of at most ``batch_size``."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    iterator = iter(points)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_plugin_locations(
+    plugin: Any,
+    target: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    *,
+    batch_size: int = DEFAULT_LOCATION_BATCH_SIZE,
+) -> Iterator[List[LocationPoint]]:
+    """Yield the points of any plugin in batches.
+
+    Uses :meth:`BasePlugin.iter_locations` when the plugin has it and falls
+    back to batching the result of ``collect_locations`` for plugins that
+    do not derive from :class:`BasePlugin`.
+    """
+    iter_locations = getattr(plugin, "iter_locations", None)
+    if callable(iter_locations):
+        return iter_locations(target, date_from, date_to, batch_size=batch_size)
+    return batch_locations(plugin.collect_locations(target, date_from=date_from, date_to=date_to) or [],
+                           batch_size)
+
+
 class BasePlugin:
     """Base class for all CreepyAI plugins.
 
@@ -62,6 +103,9 @@ class BasePlugin:
 
         self.config: Dict[str, Any] = {"data_directory": str(self._default_input_dir)}
 
+        # File reports of the last ingest_files run
+        self.ingest_reports: List[Any] = []
+
     # ------------------------------------------------------------------
     # Configuration helpers
     # ------------------------------------------------------------------
@@ -133,19 +177,43 @@ class BasePlugin:
             path.mkdir(parents=True, exist_ok=True)
             return str(path)
 
-    def prepare_data_directory(self, temp_folder: str) -> str:
-        """Return a directory ready for processing, extracting ZIP archives if needed."""
+    def find_data_archive(self) -> Optional[Path]:
+        """Return the ZIP archive holding this plugin's input, if there is one."""
         data_path = Path(self.get_data_directory())
         if data_path.is_file() and data_path.suffix.lower() == ".zip":
-            return self._extract_zipfile(data_path, temp_folder)
+            return data_path
         if data_path.is_dir():
             zip_candidates = sorted(
                 candidate for candidate in data_path.glob("*.zip") if zipfile.is_zipfile(candidate)
             )
             if zip_candidates:
-                return self._extract_zipfile(zip_candidates[0], temp_folder)
-            return str(data_path)
-        return str(data_path)
+                return zip_candidates[0]
+        return None
+
+    def prepare_data_directory(self, temp_folder: str) -> str:
+        """Return a directory ready for processing, extracting ZIP archives if needed.
+
+        Prefer :meth:`open_data_root`, which reads archives in place.
+        """
+        archive = self.find_data_archive()
+        if archive is not None:
+            return self._extract_zipfile(archive, temp_folder)
+        return self.get_data_directory()
+
+    def open_data_root(self, temp_folder: str) -> Union[Path, ArchivePath]:
+        """Return the root of this plugin's input without extracting it.
+
+        A ZIP archive is opened as an :class:`~app.plugins.archive_fs.ArchivePath`
+        whose members are streamed straight out of the archive and
+        matched with ``glob`` like files on disk.  Members that need
+        random access can be extracted one at a time into
+        ``temp_folder`` with :func:`~app.plugins.archive_fs.local_path`.
+        Any other input is returned as a directory path.
+        """
+        archive = self.find_data_archive()
+        if archive is not None:
+            return ZipArchive(archive, extract_dir=self.data_dir / temp_folder).root
+        return Path(self.get_data_directory())
 
     def has_input_data(self) -> bool:
         """Return ``True`` if the managed input directory contains data."""
@@ -169,12 +237,79 @@ class BasePlugin:
     ) -> List[LocationPoint]:
         """Collect location data for the specified target.
 
-        Concrete plugins must override this method to implement their data
-        collection logic. The default implementation returns an empty
-        list.
+        Concrete plugins override either this method or
+        :meth:`generate_locations`.  When only ``generate_locations`` is
+        overridden the generated points are gathered into a list; otherwise
+        the default implementation returns an empty list.
         """
+        if type(self).generate_locations is not BasePlugin.generate_locations:
+            return list(self.generate_locations(target, date_from, date_to))
         return []
 
+    def generate_locations(
+        self, target: str, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None
+    ) -> Iterator[LocationPoint]:
+        """Yield location data for the specified target one point at a time.
+
+        Plugins that parse large archives should override this method so
+        points reach callers while the archive is still being read.  The
+        default implementation is a compatibility shim that yields the
+        points of a list-returning :meth:`collect_locations`.
+        """
+        if type(self).collect_locations is not BasePlugin.collect_locations:
+            yield from self.collect_locations(target, date_from, date_to) or []
+
+    def iter_locations(
+        self,
+        target: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        *,
+        batch_size: int = DEFAULT_LOCATION_BATCH_SIZE,
+    ) -> Iterator[List[LocationPoint]]:
+        """Yield location data for the specified target in batches.
+
+        This is the entry point callers should prefer over
+        :meth:`collect_locations`: only one batch needs to be in memory at
+        a time, and closing the generator early stops the plugin from
+        reading further.
+
+        Parameters
+        ----------
+        batch_size:
+            Maximum number of points per batch.
+        """
+        return batch_locations(self.generate_locations(target, date_from, date_to), batch_size)
+
+    def ingest_files(
+        self, parse: Callable[..., Iterable[LocationPoint]], files: Iterable[Path], *args: Any
+    ) -> Iterator[LocationPoint]:
+        """Parse export files across worker processes.
+
+        ``parse`` is a method of this plugin called as ``parse(path,
+        *args)`` for every file, where ``path`` is a path on disk or a
+        member of a zipped export from :meth:`open_data_root`; workers call it on a copy of the plugin
+        built from its class and ``config``.  Points are yielded in
+        timestamp order, the largest file's as it is parsed.  The ``ingest_workers`` and
+        ``ingest_memory_budget_mb`` configuration values size the pool,
+        and the throughput of every file is kept in ``ingest_reports``.
+
+        Parsed files are recorded in an ingestion manifest in
+        :attr:`data_dir`; a rerun only parses files that are new or have
+        changed since.  Set ``ingest_cache`` to ``False`` in the
+        configuration to always parse everything.  See
+        :mod:`app.plugins.file_ingest` and :mod:`app.plugins.ingest_manifest`.
+        """
+        from app.plugins.file_ingest import FileIngestExecutor
+        from app.plugins.ingest_manifest import MANIFEST_FILENAME, IngestManifest
+
+        manifest = None
+        if self.config.get("ingest_cache", True):
+            manifest = IngestManifest(self.data_dir / MANIFEST_FILENAME)
+        executor = FileIngestExecutor.from_config(self.config, manifest=manifest)
+        self.ingest_reports = executor.reports
+        return executor.run(self, parse, files, *args)
+
     def search_for_targets(self, search_term: str) -> List[Dict[str, Any]]:
         """Search for potential targets matching the search term.
 
@@ -203,10 +338,25 @@ class BasePlugin:
         return value
 
     def _extract_zipfile(self, zip_path: Path, temp_folder: str) -> str:
+        """Extract ``zip_path`` into ``temp_folder`` unless it already holds it.
+
+        A stamp in the folder records the archive's path, size and
+        modification time; only a different archive is extracted again.
+        """
         target_dir = self.data_dir / temp_folder
+        stamp_path = target_dir / EXTRACTION_STAMP
+        stat = zip_path.stat()
+        stamp = {"archive": str(zip_path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        try:
+            if json.loads(stamp_path.read_text(encoding="utf-8")) == stamp:
+                return str(target_dir)
+        except (OSError, ValueError):
+            pass
+
         if target_dir.exists():
             shutil.rmtree(target_dir)
         target_dir.mkdir(parents=True, exist_ok=True)
         with zipfile.ZipFile(zip_path, "r") as zip_ref:
             zip_ref.extractall(target_dir)
+        stamp_path.write_text(json.dumps(stamp), encoding="utf-8")
         return str(target_dir)
\ No newline at end of file
@@ -17,12 +17,17 @@ import importlib.util
 import inspect
 import json
 import logging
+import multiprocessing
+import os
 import sys
+import threading
 import types
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 
 LOGGER = logging.getLogger(__name__)
@@ -126,6 +131,159 @@ class PluginDescriptor:
         return target
 
 
+class LazyPluginMap(MutableMapping):
+    """Plugin registry whose entries are instantiated on first access.
+
+    Deferred plugins are listed (``in``, ``len``, iteration over keys) and
+    described by :meth:`info` without being imported.  Looking one up
+    instantiates it, so values are always real plugin instances, and
+    :meth:`items` and :meth:`values` load every plugin.  A plugin that fails
+    to instantiate is dropped from the map and reported to ``on_error``.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_load: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self._entries: Dict[str, Any] = {}
+        self._descriptors: Dict[str, PluginDescriptor] = {}
+        self._deferred: set = set()
+        self._on_load = on_load
+        self._on_error = on_error
+        self._lock = threading.RLock()
+
+    def defer(self, identifier: str, descriptor: PluginDescriptor) -> None:
+        """Register ``descriptor`` to be instantiated when first looked up."""
+
+        with self._lock:
+            self._entries[identifier] = None
+            self._descriptors[identifier] = descriptor
+            self._deferred.add(identifier)
+
+    def descriptor(self, identifier: str) -> Optional[PluginDescriptor]:
+        """Return the descriptor a plugin was registered from, if any."""
+
+        return self._descriptors.get(identifier)
+
+    def is_loaded(self, identifier: str) -> bool:
+        return identifier in self._entries and identifier not in self._deferred
+
+    def info(self, identifier: str) -> Dict[str, Any]:
+        """Return a plugin's metadata, from its descriptor until it is loaded."""
+
+        with self._lock:
+            if identifier in self._deferred:
+                return dict(self._descriptors[identifier].info)
+            plugin = self._entries[identifier]
+        get_info = getattr(plugin, "get_info", None)
+        return get_info() if callable(get_info) else {"name": identifier}
+
+    def peek(self, identifier: str) -> Any:
+        """Return the instance if loaded, otherwise its descriptor, without loading."""
+
+        with self._lock:
+            if identifier in self._deferred:
+                return self._descriptors[identifier]
+            return self._entries[identifier]
+
+    def load_all(self) -> None:
+        """Instantiate every deferred plugin."""
+
+        for identifier in list(self._deferred):
+            self.get(identifier)
+
+    def __getitem__(self, identifier: str) -> Any:
+        with self._lock:
+            if identifier not in self._deferred:
+                return self._entries[identifier]
+            try:
+                instance = self._descriptors[identifier].instantiate()
+                if self._on_load is not None:
+                    self._on_load(instance)
+            except Exception as exc:
+                self._discard(identifier)
+                if self._on_error is not None:
+                    self._on_error(identifier, f"{type(exc).__name__}: {exc}")
+                raise KeyError(identifier) from exc
+            self._entries[identifier] = instance
+            self._deferred.discard(identifier)
+            return instance
+
+    def __setitem__(self, identifier: str, instance: Any) -> None:
+        with self._lock:
+            self._entries[identifier] = instance
+            self._deferred.discard(identifier)
+
+    def __delitem__(self, identifier: str) -> None:
+        with self._lock:
+            if identifier not in self._entries:
+                raise KeyError(identifier)
+            self._discard(identifier)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._entries
+
+    def items(self):  # type: ignore[override]
+        self.load_all()
+        return dict(self._entries).items()
+
+    def values(self):  # type: ignore[override]
+        self.load_all()
+        return list(self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._descriptors.clear()
+            self._deferred.clear()
+
+    def _discard(self, identifier: str) -> None:
+        self._entries.pop(identifier, None)
+        self._descriptors.pop(identifier, None)
+        self._deferred.discard(identifier)
+
+    def __repr__(self) -> str:
+        return f"<LazyPluginMap {len(self._entries)} plugins ({len(self._deferred)} deferred)>"
+
+
+def _probe_plugin(module_name: str, path: str, is_package: bool) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """Import a plugin module and read its metadata.
+
+    Module level so that it can run inside a worker process.
+    """
+
+    info: Dict[str, Any] = {}
+    load_error: Optional[str] = None
+    class_name = ""
+
+    try:
+        module = PluginCatalog._import_probe(module_name, Path(path), is_package)
+        plugin_class = PluginCatalog._locate_plugin_class(module)
+        if plugin_class is None:
+            raise RuntimeError("No plugin class found")
+
+        class_name = plugin_class.__qualname__
+        info, load_error = PluginCatalog._extract_metadata(plugin_class)
+    except Exception as exc:  # pragma: no cover - exercised in integration tests
+        load_error = f"{type(exc).__name__}: {exc}"
+        class_name = class_name or "Plugin"
+
+    # Values must survive the trip back from a worker process
+    try:
+        json.dumps(info)
+    except (TypeError, ValueError):
+        info = json.loads(json.dumps(info, default=str))
+    return class_name, info, load_error
+
+
 class PluginCatalog:
     """Builds, caches and exposes ``PluginDescriptor`` instances."""
 
@@ -135,7 +293,21 @@ class PluginCatalog:
         *,
         base_package: str = "app.plugins",
         cache_path: Optional[str | Path] = None,
+        max_workers: Optional[int] = None,
     ) -> None:
+        """
+        Parameters
+        ----------
+        roots:
+            Directories scanned for plugin modules.
+        base_package:
+            Package that modules below its directory are imported from.
+        cache_path:
+            Location of the JSON manifest cache.
+        max_workers:
+            Worker processes used to probe plugins; ``1`` probes everything
+            in this process.
+        """
         self.roots: List[Path] = []
         for root in roots:
             path = Path(root).resolve()
@@ -146,8 +318,12 @@ class PluginCatalog:
             raise ValueError("At least one plugin root must exist")
 
         self.base_package = base_package
-        package_module = importlib.import_module(base_package)
-        self.package_root = Path(package_module.__file__).resolve().parent
+        # Locate the package without executing its ``__init__``
+        spec = importlib.util.find_spec(base_package)
+        if spec is None or not spec.submodule_search_locations:
+            raise ImportError(f"Cannot locate package {base_package!r}")
+        self.package_root = Path(list(spec.submodule_search_locations)[0]).resolve()
+        self.max_workers = max_workers
 
         if cache_path is None:
             cache_dir = Path.home() / ".creepyai" / "cache"
@@ -217,17 +393,51 @@ class PluginCatalog:
     # Descriptor construction
     # ------------------------------------------------------------------
     def _build_descriptors(self) -> Iterator[PluginDescriptor]:
-        discovered: Dict[str, PluginDescriptor] = {}
+        """Describe every plugin file, in discovery order.
 
+        Plugins are imported in a pool of worker processes so that slow
+        imports overlap and do not pollute this one.
+        """
+
+        pending: List[Tuple[Path, str, str, bool]] = []
+        seen = set()
         for path in self._iter_plugin_files():
             identifier = self._identifier_from_path(path)
-            if identifier in discovered:
+            if identifier in seen:
                 LOGGER.debug("Duplicate plugin identifier %s for %s", identifier, path)
                 continue
-
-            descriptor = self._build_descriptor(path, identifier)
-            discovered[identifier] = descriptor
-            yield descriptor
+            seen.add(identifier)
+            module_name, is_package = self._module_name_for_path(path)
+            pending.append((path, identifier, module_name, is_package))
+
+        results = self._probe_many(pending)
+        for (path, identifier, module_name, is_package), (class_name, info, load_error) in zip(pending, results):
+            yield PluginDescriptor(
+                identifier=identifier,
+                module=module_name,
+                class_name=class_name,
+                category=self._category_from_path(path),
+                path=str(path),
+                fingerprint=self._fingerprint(path),
+                info=info,
+                load_error=load_error,
+                is_package_module=is_package,
+            )
+
+    def _probe_many(self, entries: Sequence[Tuple[Path, str, str, bool]]) -> List[Tuple[str, Dict[str, Any], Optional[str]]]:
+        arguments = [(module_name, str(path), is_package) for path, _, module_name, is_package in entries]
+        workers = self.max_workers if self.max_workers is not None else min(len(arguments), os.cpu_count() or 1, 8)
+
+        if len(arguments) > 1 and workers > 1:
+            try:
+                # ``spawn`` keeps workers independent of this process's threads
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                    return list(executor.map(_probe_plugin, *zip(*arguments)))
+            except Exception as exc:
+                LOGGER.warning("Parallel plugin probing failed, probing serially: %s", exc)
+
+        return [_probe_plugin(*argument) for argument in arguments]
 
     def _iter_plugin_files(self) -> Iterator[Path]:
         for root in self.roots:
@@ -236,40 +446,8 @@ class PluginCatalog:
                     continue
                 yield candidate
 
-    def _build_descriptor(self, path: Path, identifier: str) -> PluginDescriptor:
-        module_name, is_package = self._module_name_for_path(path)
-        fingerprint = self._fingerprint(path)
-        category = self._category_from_path(path)
-
-        info: Dict[str, Any] = {}
-        load_error: Optional[str] = None
-        class_name = ""
-
-        try:
-            module = self._import_probe(module_name, path, is_package)
-            plugin_class = self._locate_plugin_class(module)
-            if plugin_class is None:
-                raise RuntimeError("No plugin class found")
-
-            class_name = plugin_class.__qualname__
-            info, load_error = self._extract_metadata(plugin_class)
-        except Exception as exc:  # pragma: no cover - exercised in integration tests
-            load_error = f"{type(exc).__name__}: {exc}"
-            class_name = class_name or "Plugin"
-
-        return PluginDescriptor(
-            identifier=identifier,
-            module=module_name,
-            class_name=class_name,
-            category=category,
-            path=str(path),
-            fingerprint=fingerprint,
-            info=info,
-            load_error=load_error,
-            is_package_module=is_package,
-        )
-
-    def _import_probe(self, module_name: str, path: Path, is_package: bool) -> types.ModuleType:
+    @staticmethod
+    def _import_probe(module_name: str, path: Path, is_package: bool) -> types.ModuleType:
         if is_package:
             return importlib.import_module(module_name)
 
@@ -283,7 +461,8 @@ class PluginCatalog:
         loader.exec_module(module)
         return module
 
-    def _locate_plugin_class(self, module: types.ModuleType) -> Optional[type]:
+    @staticmethod
+    def _locate_plugin_class(module: types.ModuleType) -> Optional[type]:
         from app.plugins.base_plugin import BasePlugin  # Lazy import to avoid cycles
 
         # Prioritise a top-level ``Plugin`` symbol.
@@ -304,11 +483,12 @@ class PluginCatalog:
         candidates.sort(key=lambda cls: getattr(cls, "__qualname__", cls.__name__))
         return candidates[0]
 
-    def _extract_metadata(self, plugin_class: type) -> tuple[Dict[str, Any], Optional[str]]:
+    @staticmethod
+    def _extract_metadata(plugin_class: type) -> tuple[Dict[str, Any], Optional[str]]:
         info: Dict[str, Any] = {}
         load_error: Optional[str] = None
 
-        instance = self._instantiate_safely(plugin_class)
+        instance = PluginCatalog._instantiate_safely(plugin_class)
         if isinstance(instance, Exception):
             return info, f"{type(instance).__name__}: {instance}"
 
@@ -335,7 +515,8 @@ class PluginCatalog:
 
         return info, load_error
 
-    def _instantiate_safely(self, plugin_class: type) -> Any | Exception:
+    @staticmethod
+    def _instantiate_safely(plugin_class: type) -> Any | Exception:
         try:
             signature = inspect.signature(plugin_class)
             for parameter in signature.parameters.values():
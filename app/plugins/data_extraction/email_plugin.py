@@ -10,10 +10,11 @@ import logging
 import mailbox
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
 from app.plugins.geocoding_helper import GeocodingHelper
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ class EmailPlugin(BasePlugin):
             description="Extract location references from email headers",
         )
         self.geocoder = GeocodingHelper()
+        self._timestamps = TimestampParser()
 
     def get_configuration_options(self) -> List[dict]:
         return [
@@ -47,25 +49,23 @@ class EmailPlugin(BasePlugin):
         directory = self.get_data_directory()
         return False, f"Add email archives to {directory}"
 
-    def collect_locations(
+    def generate_locations(
         self,
         target: str | None = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> List[LocationPoint]:
+    ) -> Iterator[LocationPoint]:
         configured, message = self.is_configured()
         if not configured:
             logger.warning("EmailPlugin not configured: %s", message)
-            return []
+            return
 
         directory = Path(self.get_data_directory()).expanduser()
         target_email = (self.config.get("target_email") or target or "").lower()
 
-        points: List[LocationPoint] = []
-        points.extend(self._process_maildir(directory, target_email, date_from, date_to))
-        points.extend(self._process_mbox(directory, target_email, date_from, date_to))
-        points.extend(self._process_eml(directory, target_email, date_from, date_to))
-        return points
+        yield from self._process_maildir(directory, target_email, date_from, date_to)
+        yield from self._process_mbox(directory, target_email, date_from, date_to)
+        yield from self._process_eml(directory, target_email, date_from, date_to)
 
     def run(self, target: str | None = None) -> List[LocationPoint]:
         return self.collect_locations(target)
@@ -79,21 +79,17 @@ class EmailPlugin(BasePlugin):
         target_email: str,
         date_from: Optional[datetime],
         date_to: Optional[datetime],
-    ) -> Iterable[LocationPoint]:
+    ) -> Iterator[LocationPoint]:
         maildir = directory / "cur"
         if not maildir.exists():
-            return []
-        results: List[LocationPoint] = []
+            return
         try:
             mdir = mailbox.Maildir(str(directory), factory=None)
         except Exception as exc:  # pragma: no cover - fallback path
             logger.error("Failed to open maildir %s: %s", directory, exc)
-            return results
+            return
         for _, message in mdir.iteritems():
-            results.extend(
-                self._extract_locations(message, target_email, date_from, date_to)
-            )
-        return results
+            yield from self._extract_locations(message, target_email, date_from, date_to)
 
     def _process_mbox(
         self,
@@ -101,8 +97,7 @@ class EmailPlugin(BasePlugin):
         target_email: str,
         date_from: Optional[datetime],
         date_to: Optional[datetime],
-    ) -> Iterable[LocationPoint]:
-        results: List[LocationPoint] = []
+    ) -> Iterator[LocationPoint]:
         for path in directory.glob("*.mbox"):
             try:
                 mbox = mailbox.mbox(path)
@@ -110,10 +105,7 @@ class EmailPlugin(BasePlugin):
                 logger.error("Failed to open mbox %s: %s", path, exc)
                 continue
             for message in mbox:
-                results.extend(
-                    self._extract_locations(message, target_email, date_from, date_to)
-                )
-        return results
+                yield from self._extract_locations(message, target_email, date_from, date_to)
 
     def _process_eml(
         self,
@@ -121,8 +113,7 @@ class EmailPlugin(BasePlugin):
         target_email: str,
         date_from: Optional[datetime],
         date_to: Optional[datetime],
-    ) -> Iterable[LocationPoint]:
-        results: List[LocationPoint] = []
+    ) -> Iterator[LocationPoint]:
         for path in directory.rglob("*.eml"):
             try:
                 with path.open("r", encoding="utf-8", errors="ignore") as handle:
@@ -130,10 +121,7 @@ class EmailPlugin(BasePlugin):
             except Exception as exc:  # pragma: no cover - fallback path
                 logger.error("Failed to parse %s: %s", path, exc)
                 continue
-            results.extend(
-                self._extract_locations(message, target_email, date_from, date_to)
-            )
-        return results
+            yield from self._extract_locations(message, target_email, date_from, date_to)
 
     def _extract_locations(
         self,
@@ -192,17 +180,11 @@ class EmailPlugin(BasePlugin):
 
         return points
 
-    @staticmethod
-    def _parse_date(value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-        try:
-            parsed = email.utils.parsedate_to_datetime(value)
-            if parsed and parsed.tzinfo:
-                return parsed.astimezone(datetime.utcnow().tzinfo)  # type: ignore[arg-type]
-            return parsed
-        except (TypeError, ValueError):
-            return None
+    def _parse_date(self, value: Optional[str]) -> Optional[datetime]:
+        parsed = self._timestamps(value, "Date")
+        if parsed and parsed.tzinfo:
+            return parsed.astimezone(datetime.utcnow().tzinfo)  # type: ignore[arg-type]
+        return parsed
 
     @staticmethod
     def _extract_ip(header: str) -> Optional[str]:
@@ -2,16 +2,23 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable, Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.json_stream import iter_json_array
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
+# Top-level keys of the exports that hold the location entries
+ENTRY_KEYS = ("locations", "timelineObjects", "items")
+
+# Entry keys that may hold the time of a location, in order of preference
+TIMESTAMP_KEYS = ("timestamp", "timestampMs", "time", "date")
+
 
 class GoogleTakeoutPlugin(BasePlugin):
     """Parse a subset of Google Takeout archives for location information."""
@@ -21,6 +28,7 @@ class GoogleTakeoutPlugin(BasePlugin):
             name="Google Takeout",
             description="Extract location data from Google Takeout exports",
         )
+        self._timestamps = TimestampParser(units={"timestampMs": "ms"})
 
     def get_configuration_options(self) -> List[dict]:
         return []
@@ -36,28 +44,22 @@ class GoogleTakeoutPlugin(BasePlugin):
         managed_dir = self.get_data_directory()
         return False, f"Add Google Takeout exports to {managed_dir}"
 
-    def collect_locations(
+    def generate_locations(
         self,
         target: str | None = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> List[LocationPoint]:
+    ) -> Iterator[LocationPoint]:
         directory_setting = self.config.get("archive_directory")
         if directory_setting and Path(directory_setting).expanduser().exists():
             directory = Path(directory_setting).expanduser()
         else:
             if not self.has_input_data():
                 logger.warning("GoogleTakeoutPlugin has no data to process")
-                return []
+                return
             directory = Path(self.get_data_directory()).expanduser()
 
-        samples: List[LocationPoint] = []
-        for path in self._iter_json_files(directory):
-            try:
-                samples.extend(self._parse_file(path, date_from, date_to))
-            except Exception as exc:  # pragma: no cover - defensive guard
-                logger.error("Failed to parse %s: %s", path, exc)
-        return samples
+        yield from self.ingest_files(self._parse_file, self._iter_json_files(directory), date_from, date_to)
 
     def run(self, target: str | None = None) -> List[LocationPoint]:
         return self.collect_locations(target)
@@ -72,28 +74,18 @@ class GoogleTakeoutPlugin(BasePlugin):
         date_from: Optional[datetime],
         date_to: Optional[datetime],
     ) -> Iterable[LocationPoint]:
+        # Entries are decoded one at a time so a multi-gigabyte Records.json
+        # is read in constant memory
         with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-
-        if isinstance(payload, dict):
-            for key in ("locations", "timelineObjects", "items"):
-                if key in payload and isinstance(payload[key], list):
-                    entries = payload[key]
-                    break
-            else:
-                entries = []
-        else:
-            entries = payload
-
-        for entry in entries:
-            point = self._parse_entry(entry)
-            if not point:
-                continue
-            if date_from and point.timestamp < date_from:
-                continue
-            if date_to and point.timestamp > date_to:
-                continue
-            yield point
+            for entry in iter_json_array(handle, ENTRY_KEYS):
+                point = self._parse_entry(entry)
+                if not point:
+                    continue
+                if date_from and point.timestamp < date_from:
+                    continue
+                if date_to and point.timestamp > date_to:
+                    continue
+                yield point
 
     def _parse_entry(self, entry: object) -> Optional[LocationPoint]:
         if not isinstance(entry, dict):
@@ -114,13 +106,7 @@ class GoogleTakeoutPlugin(BasePlugin):
         if lat is None or lon is None:
             return None
 
-        timestamp = (
-            entry.get("timestamp")
-            or entry.get("timestampMs")
-            or entry.get("time")
-            or entry.get("date")
-        )
-        parsed_time = self._parse_timestamp(timestamp)
+        parsed_time = self._timestamps.first(entry, TIMESTAMP_KEYS)
         if not parsed_time:
             return None
 
@@ -139,26 +125,5 @@ class GoogleTakeoutPlugin(BasePlugin):
             context=str(context),
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            try:
-                return datetime.fromisoformat(value.replace("Z", "+00:00"))
-            except ValueError:
-                try:
-                    return datetime.fromtimestamp(int(value) / 1000)
-                except (ValueError, TypeError):
-                    return None
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(float(value) / (1000 if value > 10**12 else 1))
-            except ValueError:
-                return None
-        return None
-
 
 Plugin = GoogleTakeoutPlugin
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class IDCrawlPlugin(BasePlugin):
             name="IDCrawl",
             description="Read cached IDCrawl search results",
         )
+        self._timestamps = TimestampParser()
 
     def get_configuration_options(self) -> List[dict]:
         return [
@@ -82,8 +84,7 @@ class IDCrawlPlugin(BasePlugin):
     def run(self, target: str | None = None) -> List[LocationPoint]:
         return self.collect_locations(target)
 
-    @staticmethod
-    def _parse_entry(entry: object) -> Optional[LocationPoint]:
+    def _parse_entry(self, entry: object) -> Optional[LocationPoint]:
         if not isinstance(entry, dict):
             return None
 
@@ -92,8 +93,7 @@ class IDCrawlPlugin(BasePlugin):
         if lat is None or lon is None:
             return None
 
-        timestamp_value = entry.get("timestamp") or entry.get("date")
-        parsed_time = IDCrawlPlugin._parse_timestamp(timestamp_value)
+        parsed_time = self._timestamps.first(entry, ("timestamp", "date"))
 
         context = entry.get("name") or entry.get("label") or "IDCrawl"
         return LocationPoint(
@@ -104,24 +104,5 @@ class IDCrawlPlugin(BasePlugin):
             context=str(context),
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(float(value))
-            except ValueError:
-                return None
-        if isinstance(value, str):
-            for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-                try:
-                    return datetime.strptime(value, fmt)
-                except ValueError:
-                    continue
-        return None
-
 
 Plugin = IDCrawlPlugin
@@ -66,26 +66,11 @@ class EnhancedGeocodingHelper(GeocodingHelper):
             except Exception as e:
                 logger.error(f"Error loading postal codes database: {e}")
     
-    def geocode(self, location: str) -> Tuple[Optional[float], Optional[float]]:
-        """
-        Enhanced geocoding with offline database support and better parsing
-        
-        Args:
-            location: Location string to geocode
-            
-        Returns:
-            Tuple of (latitude, longitude) or (None, None) if geocoding failed
-        """
-        if not location:
-            return None, None
-            
-        # Normalize location string
-        location = location.strip()
-        
-        # First try standard geocoding (includes cache check)
-        lat, lon = super().geocode(location)
-        if lat is not None and lon is not None:
-            return lat, lon
+    def _offline_lookup(self, location: str) -> Optional[Tuple[float, float]]:
+        """Resolve explicit coordinates, postal codes and US cities locally"""
+        coords = super()._offline_lookup(location)
+        if coords:
+            return coords
             
         # Try to extract postal/zip code
         zip_match = re.search(r'\b(\d{5}(-\d{4})?)\b', location)
@@ -105,5 +90,4 @@ class EnhancedGeocodingHelper(GeocodingHelper):
                 city_data = self.us_cities[city_key]
                 return city_data['lat'], city_data['lon']
                 
-        # Fall back to online geocoding
-        return super().geocode(location)
+        return None
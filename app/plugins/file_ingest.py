@@ -0,0 +1,393 @@
+"""Parse the files of an export across worker processes.
+
+Plugins that read exports walk a directory and parse each file in turn,
+which keeps one core busy while the others idle on a large Takeout or
+social media archive.  :class:`FileIngestExecutor` shards the files over
+a process pool instead:
+
+* the largest file, typically a ``Records.json``, is streamed in this
+  process as ``parse`` yields it, so its first points do not wait for
+  the whole export to be parsed, and closing the iterator stops it;
+* the other files are parsed largest first; a memory budget caps how
+  many bytes of input are being parsed at once;
+* each of those is sorted by time and spilled to a temporary file, and
+  the spilled runs are merged lazily with the streamed file, so the
+  points come out in timestamp order without the export being held in
+  memory;
+* every file gets a :class:`FileParseReport` with its parse throughput.
+
+Plugins opt in through :meth:`BasePlugin.ingest_files
+<app.plugins.base_plugin.BasePlugin.ingest_files>`, passing one of their
+own parse methods.  Workers rebuild the plugin from its class and
+``config`` and call that method by name, so the plugin itself never has
+to be pickled.  Files may be members of a zipped export
+(:class:`~app.plugins.archive_fs.ArchivePath`); workers reopen the
+archive and stream the member out of it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.plugins.archive_fs import ArchivePath
+from app.plugins.base_plugin import LocationPoint
+from app.plugins.ingest_manifest import IngestManifest, file_digest, scope_key, time_key
+
+LOGGER = logging.getLogger(__name__)
+
+#: Memory the input files being parsed at one time may use, in megabytes
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+#: Peak memory of parsing a file, as a multiple of its size on disk
+MEMORY_PER_BYTE = 8
+
+# Points per pickle in a spilled run
+_SPILL_CHUNK = 10000
+
+ReportCallback = Callable[["FileParseReport"], None]
+
+
+@dataclass
+class FileParseReport:
+    """How parsing one file went."""
+
+    path: str
+    size: int  # Bytes
+    points: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    cached: bool = False  # Points came from the manifest; the file was not parsed
+    digest: Optional[str] = None  # Content hash, when the file was hashed
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["bytes_per_second"] = self.bytes_per_second
+        result["points_per_second"] = self.points_per_second
+        return result
+
+
+def _time_key(point: LocationPoint) -> float:
+    return time_key(point.timestamp)
+
+
+class _Job(NamedTuple):
+    path: str  # Key in the manifest and reports
+    size: int
+    mtime_ns: int
+    file: Any  # What ``parse`` is called with: a Path or an ArchivePath
+    digest: Optional[str] = None  # Known without reading the file, for archive members
+
+
+def _spill(points: List[LocationPoint], spill: str) -> None:
+    with open(spill, "wb") as handle:
+        for start in range(0, len(points), _SPILL_CHUNK):
+            pickle.dump(points[start:start + _SPILL_CHUNK], handle, pickle.HIGHEST_PROTOCOL)
+
+
+def _read_spill(spill: str) -> Iterator[LocationPoint]:
+    with open(spill, "rb") as handle:
+        while True:
+            try:
+                chunk = pickle.load(handle)
+            except EOFError:
+                return
+            yield from chunk
+
+
+def _parse(plugin: Any, method: str, job: _Job, args: tuple, digest: bool,
+           spill: str) -> FileParseReport:
+    """Parse one file and write its points, sorted by time, to ``spill``."""
+    report = FileParseReport(job.path, job.size)
+    started = time.perf_counter()
+    try:
+        points = list(getattr(plugin, method)(job.file, *args) or [])
+        points.sort(key=_time_key)
+        report.points = len(points)
+        _spill(points, spill)
+        del points
+        if digest:
+            report.digest = job.digest or file_digest(job.path)
+    except Exception as exc:
+        report.error = f"{type(exc).__name__}: {exc}"
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# Plugin of a worker process, rebuilt once by ``_init_worker``
+_WORKER_PLUGIN: Any = None
+
+
+def _init_worker(factory: type, config: Optional[Dict[str, Any]]) -> None:
+    global _WORKER_PLUGIN
+    _WORKER_PLUGIN = factory()
+    if config and hasattr(_WORKER_PLUGIN, "update_config"):
+        _WORKER_PLUGIN.update_config(config)
+
+
+def _parse_in_worker(method: str, job: _Job, args: tuple, digest: bool, spill: str) -> FileParseReport:
+    return _parse(_WORKER_PLUGIN, method, job, args, digest, spill)
+
+
+class FileIngestExecutor:
+    """Parse files with a plugin method, several files at once."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        report_callback: Optional[ReportCallback] = None,
+        manifest: Optional[IngestManifest] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_workers:
+            Worker processes; defaults to the number of CPUs.  With one
+            worker the files are parsed in this process.
+        memory_budget_mb:
+            Estimated memory the files being parsed at once may need; a
+            file larger than the budget is still parsed, on its own.
+        report_callback:
+            Called with the :class:`FileParseReport` of every file as it
+            finishes.
+        manifest:
+            Where to record parsed files and reuse earlier parses from;
+            it is closed at the end of every run.
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.memory_budget = max(0.0, memory_budget_mb) * 1024 * 1024
+        self.report_callback = report_callback
+        self.manifest = manifest
+        self.reports: List[FileParseReport] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> "FileIngestExecutor":
+        """Build an executor from the ``ingest_workers`` and
+        ``ingest_memory_budget_mb`` values of a plugin configuration."""
+
+        workers = config.get("ingest_workers")
+        budget = config.get("ingest_memory_budget_mb")
+        return cls(
+            max_workers=int(workers) if workers else None,
+            memory_budget_mb=float(budget) if budget else DEFAULT_MEMORY_BUDGET_MB,
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+    def run(self, plugin: Any, parse: Callable[..., Iterable[LocationPoint]],
+            files: Iterable[Path], *args: Any) -> Iterator[LocationPoint]:
+        """Yield the points of ``files`` in timestamp order.
+
+        Parameters
+        ----------
+        plugin:
+            The plugin ``parse`` belongs to.
+        parse:
+            A method of ``plugin`` called as ``parse(path, *args)``.  It
+            must not rely on state other than the plugin's class and
+            ``config``, which is all a worker process gets.
+        files:
+            Files to parse, as paths or archive members
+            (:class:`~app.plugins.archive_fs.ArchivePath`); a file
+            listed twice is parsed once.
+        args:
+            Further arguments for ``parse``; they must be picklable.
+
+        The largest file is streamed as ``parse`` yields, keeping its
+        own order, once the others are parsed and spilled to disk.  A
+        file that fails to parse is logged and reported, and the others
+        carry on.  With a manifest, files it holds a valid parse of are
+        not read again.
+        """
+        if getattr(parse, "__self__", None) is not plugin:
+            raise ValueError("parse must be a method of plugin")
+        method = parse.__name__
+
+        jobs = self._schedule(files)
+        self.reports.clear()
+        scope = scope_key(plugin, method, args)
+        try:
+            cached: List[Tuple[int, int]] = []
+            if self.manifest is not None:
+                self.manifest.retain(scope, [job.path for job in jobs])
+                jobs = self._reuse(scope, jobs, cached)
+            if not jobs and len(cached) == 1:
+                yield from self.manifest.points(cached[0][0])
+                return
+
+            with tempfile.TemporaryDirectory(prefix="creepyai-ingest-") as spill_dir:
+                runs: List[Iterable[LocationPoint]] = []
+                if jobs:
+                    runs.append(self._stream(plugin, method, jobs[0], args, scope))
+                runs.extend(self._parse_all(plugin, method, jobs[1:], args, scope, spill_dir))
+                runs.extend(self.manifest.points(file_id, ordered=True) for file_id, _ in cached)
+                if len(runs) == 1:
+                    yield from runs[0]
+                else:
+                    yield from heapq.merge(*runs, key=_time_key)
+        finally:
+            if self.manifest is not None:
+                self.manifest.close()
+
+    def _schedule(self, files: Iterable[Path]) -> List[_Job]:
+        """Distinct existing files with their sizes, largest first."""
+
+        jobs: Dict[str, _Job] = {}
+        for path in files:
+            member = isinstance(path, ArchivePath)
+            key = str(path) if member else os.path.realpath(path)
+            if key in jobs:
+                continue
+            try:
+                if member:
+                    stat = path.stat()
+                    jobs[key] = _Job(key, stat.st_size, stat.st_mtime_ns, path, path.digest())
+                else:
+                    stat = os.stat(key)
+                    jobs[key] = _Job(key, stat.st_size, stat.st_mtime_ns, Path(key))
+            except OSError as exc:
+                LOGGER.warning("Skipping %s: %s", path, exc)
+        return sorted(jobs.values(), key=lambda job: job.size, reverse=True)
+
+    def _reuse(self, scope: str, jobs: List[_Job], cached: List[Tuple[int, int]]) -> List[_Job]:
+        """Move the jobs the manifest has a valid parse of to ``cached``; return the rest."""
+
+        remaining = []
+        for job in jobs:
+            entry = self.manifest.lookup(scope, job.path, job.size, job.mtime_ns, job.digest)
+            if entry is None:
+                remaining.append(job)
+                continue
+            cached.append(entry)
+            self._record(FileParseReport(job.path, job.size, entry[1], cached=True))
+        return remaining
+
+    def _stream(self, plugin: Any, method: str, job: _Job, args: tuple,
+                scope: str) -> Iterator[LocationPoint]:
+        report = FileParseReport(job.path, job.size)
+        writer = None
+        if self.manifest is not None:
+            writer = self.manifest.writer(scope, job.path, job.size, job.mtime_ns)
+        started = time.perf_counter()
+        try:
+            for point in getattr(plugin, method)(job.file, *args) or []:
+                report.points += 1
+                if writer is not None:
+                    writer.add(point)
+                yield point
+        except GeneratorExit:
+            # Abandoned part way: nothing worth keeping
+            if writer is not None:
+                writer.abort()
+            raise
+        except Exception as exc:
+            report.error = f"{type(exc).__name__}: {exc}"
+        report.seconds = time.perf_counter() - started
+        if writer is not None:
+            if report.error:
+                writer.abort()
+            else:
+                writer.finish(job.digest)
+        self._record(report)
+
+    def _parse_all(self, plugin: Any, method: str, jobs: List[_Job], args: tuple,
+                   scope: str, spill_dir: str) -> List[Iterable[LocationPoint]]:
+        """Parse ``jobs`` to sorted runs spilled to ``spill_dir``; return lazy readers of them."""
+        if not jobs:
+            return []
+        spills = {job.path: os.path.join(spill_dir, f"{index}.pickle") for index, job in enumerate(jobs)}
+        workers = min(self.max_workers, len(jobs))
+        if workers > 1 and multiprocessing.current_process().daemon:
+            # Daemonic processes, such as orchestrator workers, cannot
+            # start a pool of their own
+            workers = 1
+        if workers == 1:
+            digest = self.manifest is not None
+            return [self._finish(scope, job, spills[job.path],
+                                 _parse(plugin, method, job, args, digest, spills[job.path]))
+                    for job in jobs]
+        return self._run_pool(plugin, method, jobs, args, workers, scope, spills)
+
+    def _run_pool(self, plugin: Any, method: str, jobs: List[_Job], args: tuple,
+                  workers: int, scope: str, spills: Dict[str, str]) -> List[Iterable[LocationPoint]]:
+        runs: List[Iterable[LocationPoint]] = []
+        pending = list(reversed(jobs))  # Largest file at the end, popped first
+        in_flight: Dict[Future, Tuple[_Job, float]] = {}
+        in_use = 0.0
+        digest = self.manifest is not None
+        config = dict(getattr(plugin, "config", {}) or {})
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(type(plugin), config)) as pool:
+                while pending or in_flight:
+                    while pending and len(in_flight) < workers:
+                        job = pending[-1]
+                        cost = job.size * MEMORY_PER_BYTE
+                        if in_flight and in_use + cost > self.memory_budget:
+                            break
+                        future = pool.submit(_parse_in_worker, method, job, args, digest, spills[job.path])
+                        in_flight[future] = (job, cost)
+                        pending.pop()
+                        in_use += cost
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report = future.result()
+                        job, cost = in_flight.pop(future)
+                        in_use -= cost
+                        runs.append(self._finish(scope, job, spills[job.path], report))
+        except BrokenProcessPool as exc:
+            # A worker died (or could not start); parse what is left here
+            leftover = [job for job, _ in in_flight.values()] + pending[::-1]
+            LOGGER.warning("File ingest pool failed (%s); parsing %d files in process", exc, len(leftover))
+            runs.extend(self._finish(scope, job, spills[job.path],
+                                     _parse(plugin, method, job, args, digest, spills[job.path]))
+                        for job in leftover)
+        return runs
+
+    def _finish(self, scope: str, job: _Job, spill: str,
+                report: FileParseReport) -> Iterable[LocationPoint]:
+        """Report a parsed file, record it in the manifest and return a reader of its run."""
+
+        self._record(report)
+        if report.error is not None:
+            return []
+        if self.manifest is not None:
+            writer = self.manifest.writer(scope, job.path, job.size, job.mtime_ns)
+            writer.extend(_read_spill(spill))
+            writer.finish(report.digest)
+        return _read_spill(spill)
+
+    def _record(self, report: FileParseReport) -> None:
+        self.reports.append(report)
+        if report.error:
+            LOGGER.error("Failed to parse %s: %s", report.path, report.error)
+        elif report.cached:
+            LOGGER.debug("Unchanged %s: %d points from the manifest", report.path, report.points)
+        else:
+            LOGGER.debug("Parsed %s: %d points in %.2fs (%.1f MB/s, %.0f points/s)",
+                         report.path, report.points, report.seconds,
+                         report.bytes_per_second / (1024 * 1024), report.points_per_second)
+        if self.report_callback:
+            self.report_callback(report)
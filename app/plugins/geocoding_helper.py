@@ -5,12 +5,13 @@ Geocoding helper for CreepyAI plugins
 import os
 import json
 import logging
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Iterable
 import re
-import time
 import urllib.request
 import urllib.parse
 
+from app.core.geo.batch_geocoder import BatchGeocoder, GeocodeProvider, normalize_address
+
 logger = logging.getLogger(__name__)
 
 class GeocodingHelper:
@@ -22,7 +23,9 @@ class GeocodingHelper:
         os.makedirs(self.cache_dir, exist_ok=True)
         self.cache_file = os.path.join(self.cache_dir, "geocode_cache.json")
         self.cache = self._load_cache()
+        self._cache_dirty = False
         self.rate_limit_sleep = 1.0  # Sleep time between API requests to avoid rate limiting
+        self._batch_geocoder: Optional[BatchGeocoder] = None
     
     def _load_cache(self) -> Dict[str, Any]:
         """Load geocoding cache from file"""
@@ -43,23 +46,70 @@ class GeocodingHelper:
         except Exception as e:
             logger.error(f"Error saving geocoding cache: {e}")
     
+    def get_forward(self, query: str) -> Optional[Tuple[float, float]]:
+        """Return cached coordinates for a query (cache protocol used by ``BatchGeocoder``)"""
+        coords = self.cache.get(normalize_address(query))
+        if coords:
+            return coords['lat'], coords['lon']
+        return None
+    
+    def set_forward(self, query: str, lat: float, lon: float) -> None:
+        """Cache coordinates for a query; written to disk by ``geocode_many``"""
+        self.cache[normalize_address(query)] = {'lat': lat, 'lon': lon}
+        self._cache_dirty = True
+    
     def geocode(self, location: str) -> Tuple[Optional[float], Optional[float]]:
         """
         Convert a location string to coordinates
         
+        A single-location ``geocode_many``, so both share the cache keys
+        and the rate limit.
+        
         Args:
             location: Location string to geocode
             
         Returns:
             Tuple of (latitude, longitude) or (None, None) if geocoding failed
         """
-        if not location:
-            return None, None
+        return self.geocode_many([location]).get(location, (None, None))
+    
+    def geocode_many(self, locations: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """
+        Geocode many location strings, querying each unique location once
         
-        # Normalize location string
-        location = location.strip()
+        Locations are normalised and deduplicated, answered from the cache and
+        offline lookups where possible, and only the remaining misses are sent
+        to Nominatim under its rate limit. The cache file is written once.
         
-        # Check for direct coordinates in the string like "40.7128, -74.0060"
+        Args:
+            locations: Location strings to geocode
+            
+        Returns:
+            Mapping of each location string to (latitude, longitude), or
+            (None, None) where geocoding failed
+        """
+        if self._batch_geocoder is None:
+            self._batch_geocoder = BatchGeocoder(self._geocode_providers(), cache=self,
+                                                 offline_lookup=self._offline_lookup)
+        try:
+            return self._batch_geocoder.geocode_many(locations)
+        finally:
+            if self._cache_dirty:
+                self._save_cache()
+                self._cache_dirty = False
+    
+    def _geocode_providers(self):
+        """Online providers used by ``geocode_many``"""
+        rate = 1.0 / self.rate_limit_sleep if self.rate_limit_sleep > 0 else 100.0
+        return [GeocodeProvider('nominatim', self._query_nominatim, rate_per_second=rate)]
+    
+    def _offline_lookup(self, location: str) -> Optional[Tuple[float, float]]:
+        """Resolve a location without network access"""
+        return self._parse_coordinates(location)
+    
+    @staticmethod
+    def _parse_coordinates(location: str) -> Optional[Tuple[float, float]]:
+        """Extract explicit coordinates such as "40.7128, -74.0060" from a string"""
         coord_match = re.search(r'(-?\d+\.\d+)[,\s]+(-?\d+\.\d+)', location)
         if coord_match:
             try:
@@ -71,18 +121,11 @@ class GeocodingHelper:
                     return lat, lon
             except (ValueError, IndexError):
                 pass
-        
-        # Check cache
-        cache_key = location.lower()
-        if cache_key in self.cache:
-            coords = self.cache[cache_key]
-            return coords['lat'], coords['lon']
-        
-        # Use Nominatim (OpenStreetMap) API as a fallback
+        return None
+    
+    def _query_nominatim(self, location: str) -> Optional[Tuple[float, float]]:
+        """Look a location up with the Nominatim (OpenStreetMap) API"""
         try:
-            # Be gentle with the API - add a delay
-            time.sleep(self.rate_limit_sleep)
-            
             encoded_location = urllib.parse.quote(location)
             user_agent = "CreepyAI/1.0"
             url = f"https://nominatim.openstreetmap.org/search?q={encoded_location}&format=json&limit=1"
@@ -94,15 +137,8 @@ class GeocodingHelper:
                 data = json.loads(response.read().decode())
                 
                 if data and len(data) > 0:
-                    lat = float(data[0]['lat'])
-                    lon = float(data[0]['lon'])
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {'lat': lat, 'lon': lon}
-                    self._save_cache()
-                    
-                    return lat, lon
+                    return float(data[0]['lat']), float(data[0]['lon'])
         except Exception as e:
             logger.error(f"Error geocoding {location}: {e}")
         
-        return None, None
+        return None
@@ -0,0 +1,308 @@
+"""Remember which export files a plugin has parsed, and what they held.
+
+Rerunning a plugin over an archive that has not changed should not parse
+it again.  :class:`IngestManifest` is a SQLite file in the plugin's data
+directory that records, for every parsed file, its path, size,
+modification time and content hash together with the points parsed from
+it.  On the next run a file whose size and modification time are
+unchanged is served from the manifest without being read; one whose
+modification time moved but whose hash still matches (a re-extracted
+archive, a ``touch``) is only hashed.  Everything else is parsed again.
+
+Entries are kept per *scope*: the plugin class, the parse method and its
+arguments, so different date filters or plugin versions never share
+points.  The scope also carries a digest of the parsing code (the
+modules of the plugin's classes and the shared parsing helpers) and
+:data:`PARSER_VERSION`, so points parsed by older code are never served.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.plugins.base_plugin import LocationPoint
+
+LOGGER = logging.getLogger(__name__)
+
+#: Name of the manifest file within a plugin data directory
+MANIFEST_FILENAME = "ingest_manifest.sqlite3"
+
+#: Bump when parsed points change in a way the source digests cannot see
+PARSER_VERSION = 1
+
+# Modules besides the plugin's own whose code decides what a parse yields
+_SHARED_PARSER_MODULES = ("app.plugins.base_plugin", "app.plugins.timestamps", "app.plugins.json_stream")
+
+# Bytes hashed per read
+_HASH_CHUNK = 1 << 20
+
+# Points inserted per executemany call
+_INSERT_BATCH = 10000
+
+
+def file_digest(path: str) -> str:
+    """BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def time_key(timestamp: Optional[datetime]) -> float:
+    """Seconds since the epoch to order points by; naive and aware timestamps
+    cannot be compared directly."""
+    try:
+        return timestamp.timestamp()
+    except (AttributeError, OverflowError, OSError, ValueError):
+        return float("-inf")
+
+
+@lru_cache(maxsize=None)
+def _module_digest(module_name: str) -> str:
+    try:
+        spec = importlib.util.find_spec(module_name)
+        with open(spec.origin, "rb") as handle:
+            return hashlib.blake2b(handle.read(), digest_size=8).hexdigest()
+    except (AttributeError, ImportError, OSError, TypeError, ValueError):
+        return ""
+
+
+def parser_digest(cls: type) -> str:
+    """Digest of the code a parse by an instance of ``cls`` runs."""
+    modules = [klass.__module__ for klass in cls.__mro__ if klass.__module__.startswith("app.")]
+    modules.extend(_SHARED_PARSER_MODULES)
+    digest = hashlib.blake2b(str(PARSER_VERSION).encode(), digest_size=8)
+    for name in dict.fromkeys(modules):
+        digest.update(f"{name}:{_module_digest(name)};".encode())
+    return digest.hexdigest()
+
+
+def scope_key(plugin: Any, method: str, args: Sequence[Any]) -> str:
+    """Identify what a parse produced: plugin class, version and code, method and arguments."""
+    cls = type(plugin)
+    version = getattr(plugin, "version", "")
+    return f"{cls.__module__}.{cls.__qualname__}.{method}@{version}#{parser_digest(cls)}{tuple(args)!r}"
+
+
+class ManifestWriter:
+    """Records the points of one file as they are parsed.
+
+    Nothing is visible to lookups until :meth:`finish`; :meth:`abort`
+    drops what was written.
+    """
+
+    def __init__(self, manifest: "IngestManifest", scope: str, path: str,
+                 size: int, mtime_ns: int) -> None:
+        self._conn = manifest.connection
+        self._path = path
+        self._pending: List[tuple] = []
+        self._last_key = float("-inf")
+        self._in_order = True
+        self.count = 0
+        manifest.forget(scope, [path], commit=False)
+        cursor = self._conn.execute(
+            "INSERT INTO ingest_files (scope, path, size, mtime_ns, digest, points, parsed_at)"
+            " VALUES (?, ?, ?, ?, NULL, 0, ?)",
+            (scope, path, size, mtime_ns, time.time()),
+        )
+        self._file_id = cursor.lastrowid
+
+    def add(self, point: LocationPoint) -> None:
+        timestamp = point.timestamp
+        if isinstance(timestamp, datetime):
+            iso, sort_key = timestamp.isoformat(), time_key(timestamp)
+        else:
+            iso, sort_key = None, float("-inf")
+        if sort_key < self._last_key:
+            self._in_order = False
+        self._last_key = sort_key
+        self._pending.append((
+            self._file_id, self.count, point.latitude, point.longitude,
+            iso, sort_key, point.source, point.context,
+        ))
+        self.count += 1
+        if len(self._pending) >= _INSERT_BATCH:
+            self._flush()
+
+    def extend(self, points: Iterable[LocationPoint]) -> None:
+        for point in points:
+            self.add(point)
+
+    def finish(self, digest: Optional[str] = None) -> None:
+        self._flush()
+        if digest is None:
+            digest = file_digest(self._path)
+        self._conn.execute(
+            "UPDATE ingest_files SET digest = ?, points = ?, in_order = ? WHERE id = ?",
+            (digest, self.count, self._in_order, self._file_id),
+        )
+        self._conn.commit()
+
+    def abort(self) -> None:
+        self._pending.clear()
+        self._conn.rollback()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._conn.executemany(
+                "INSERT INTO ingest_points"
+                " (file_id, seq, latitude, longitude, timestamp, sort_key, source, context)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._pending.clear()
+
+
+class IngestManifest:
+    """Parsed files and their points, for one plugin data directory."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Parameters
+        ----------
+        path:
+            SQLite file to keep the manifest in; created on first use.
+        """
+        self.path = str(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ingest_files (
+                    id INTEGER PRIMARY KEY,
+                    scope TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT,
+                    points INTEGER NOT NULL,
+                    in_order INTEGER NOT NULL DEFAULT 0,  -- points were added oldest first
+                    parsed_at REAL NOT NULL,
+                    UNIQUE (scope, path)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ingest_points (
+                    file_id INTEGER NOT NULL REFERENCES ingest_files(id) ON DELETE CASCADE,
+                    seq INTEGER NOT NULL,
+                    latitude REAL NOT NULL,
+                    longitude REAL NOT NULL,
+                    timestamp TEXT,
+                    sort_key REAL NOT NULL,
+                    source TEXT,
+                    context TEXT,
+                    PRIMARY KEY (file_id, seq)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def lookup(self, scope: str, path: str, size: int, mtime_ns: int,
+               digest: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Return ``(file_id, points)`` if the recorded parse of ``path`` is still valid.
+
+        ``size`` and ``mtime_ns`` are the file's current ``stat`` values.
+        The file is hashed only when its size matches but its
+        modification time does not.  A ``digest`` known without reading
+        the file, such as an archive member's checksum, is compared
+        instead.
+        """
+        row = self.connection.execute(
+            "SELECT id, size, mtime_ns, digest, points FROM ingest_files"
+            " WHERE scope = ? AND path = ? AND digest IS NOT NULL",
+            (scope, path),
+        ).fetchone()
+        if row is None:
+            return None
+        file_id, recorded_size, recorded_mtime, recorded_digest, points = row
+        if recorded_size != size:
+            return None
+        if digest is not None:
+            if digest != recorded_digest:
+                return None
+        elif recorded_mtime != mtime_ns:
+            try:
+                if file_digest(path) != recorded_digest:
+                    return None
+            except OSError:
+                return None
+        if recorded_mtime != mtime_ns:
+            self.connection.execute(
+                "UPDATE ingest_files SET mtime_ns = ? WHERE id = ?", (mtime_ns, file_id)
+            )
+            self.connection.commit()
+        return file_id, points
+
+    def points(self, file_id: int, ordered: bool = False) -> Iterator[LocationPoint]:
+        """Yield the points recorded for a file.
+
+        Points come in the order they were added, or by time if
+        ``ordered``.
+        """
+        order = "seq"
+        if ordered:
+            (in_order,) = self.connection.execute(
+                "SELECT in_order FROM ingest_files WHERE id = ?", (file_id,)
+            ).fetchone()
+            if not in_order:
+                order = "sort_key, seq"
+        cursor = self.connection.execute(
+            "SELECT latitude, longitude, timestamp, source, context FROM ingest_points"
+            f" WHERE file_id = ? ORDER BY {order}",
+            (file_id,),
+        )
+        from_iso = datetime.fromisoformat
+        for latitude, longitude, timestamp, source, context in cursor:
+            yield LocationPoint(latitude, longitude, from_iso(timestamp) if timestamp else None,
+                                source, context)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def writer(self, scope: str, path: str, size: int, mtime_ns: int) -> ManifestWriter:
+        """Start recording a fresh parse of ``path``, replacing any earlier one."""
+        return ManifestWriter(self, scope, path, size, mtime_ns)
+
+    def forget(self, scope: str, paths: Iterable[str], commit: bool = True) -> None:
+        """Drop the entries of ``paths`` in ``scope``."""
+        self.connection.executemany(
+            "DELETE FROM ingest_files WHERE scope = ? AND path = ?",
+            ((scope, path) for path in paths),
+        )
+        if commit:
+            self.connection.commit()
+
+    def retain(self, scope: str, paths: Iterable[str]) -> None:
+        """Drop the entries in ``scope`` for files other than ``paths``."""
+        keep = set(paths)
+        stale = [path for (path,) in self.connection.execute(
+            "SELECT path FROM ingest_files WHERE scope = ?", (scope,)
+        ) if path not in keep]
+        if stale:
+            LOGGER.debug("Forgetting %d files no longer in %s", len(stale), scope)
+            self.forget(scope, stale)
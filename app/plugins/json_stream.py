@@ -0,0 +1,205 @@
+"""Read the elements of a JSON array without loading the whole document.
+
+Takeout style exports keep everything in one array, either at the top of
+the document or under a top-level key::
+
+    {"locations": [{"latitudeE7": ..., "timestamp": ...}, ...]}
+
+:func:`iter_json_array` walks such a document with a small incremental
+tokenizer: text is read in chunks, the values of other top-level keys are
+skipped by scanning their brackets and strings, and each array element is
+decoded on its own with the C accelerated :class:`json.JSONDecoder`.  Only
+the current chunk and the element being decoded are held in memory, so a
+multi-gigabyte ``Records.json`` is read in constant space.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Collection, Iterator, Optional, TextIO
+
+#: Characters read from the file at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_DECODER = json.JSONDecoder()
+_NON_SPACE = re.compile(r"\S")
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r"[^\s,\]}]*")
+
+
+class _Reader:
+    """A window over a text stream that grows only as far as one value."""
+
+    def __init__(self, handle: TextIO, chunk_size: int) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, at_least: int = 0) -> bool:
+        """Drop the consumed text and read more; ``False`` at end of file."""
+        if self.eof:
+            return False
+        chunk = self.handle.read(max(self.chunk_size, at_least))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            match = _NON_SPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self.fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the value at the current position."""
+        char = self.peek()
+        if char is not None and char not in '"[{':
+            # A number or literal must not be cut off by the window's end
+            while _SCALAR.match(self.buffer, self.pos).end() == len(self.buffer) and self.fill():
+                pass
+        while True:
+            try:
+                value, self.pos = _DECODER.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # Most likely the value runs past the window; widen it by
+                # at least its current size so long values stay linear
+                if not self.fill(len(self.buffer) - self.pos):
+                    raise
+
+    def skip(self) -> None:
+        """Move past the value at the current position without decoding it."""
+        char = self.peek()
+        if char is None:
+            raise ValueError("Unexpected end of JSON document")
+        if char == '"':
+            self.pos += 1
+            self._skip_string_tail()
+        elif char in "[{":
+            self._skip_container()
+        else:
+            while True:
+                end = _SCALAR.match(self.buffer, self.pos).end()
+                if end < len(self.buffer) or not self.fill():
+                    self.pos = end
+                    return
+
+    def _skip_string_tail(self) -> None:
+        while True:
+            match = _STRING_TAIL.match(self.buffer, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            if not self.fill(len(self.buffer) - self.pos):
+                raise ValueError("Unterminated string in JSON document")
+
+    def _skip_container(self) -> None:
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buffer, self.pos)
+            if not match:
+                self.pos = len(self.buffer)
+                if not self.fill():
+                    raise ValueError("Unexpected end of JSON document")
+                continue
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string_tail()
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def elements(self) -> Iterator[Any]:
+        """Decode the elements of the array at the current position one by one."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array but found {char!r}")
+
+
+def iter_json_array(
+    handle: TextIO,
+    keys: Collection[str] = (),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """Yield the elements of the array a JSON document holds.
+
+    Parameters
+    ----------
+    handle:
+        Text stream positioned at the start of the document.
+    keys:
+        Top-level keys that may hold the array when the document is an
+        object.  The first of them found whose value is an array is
+        read; the values of all other keys are skipped without being
+        decoded.
+    chunk_size:
+        Characters read from ``handle`` at a time.
+
+    Yields
+    ------
+    Each element of the array, decoded on its own.  Nothing is yielded
+    when the document is neither an array nor an object holding one under
+    ``keys``.
+
+    Raises
+    ------
+    ValueError
+        If the document is not valid JSON (``json.JSONDecodeError`` is a
+        subclass).
+    """
+    reader = _Reader(handle, chunk_size)
+    char = reader.peek()
+    if char == "[":
+        yield from reader.elements()
+        return
+    if char != "{":
+        return
+
+    reader.pos += 1
+    while True:
+        char = reader.peek()
+        if char == "}":
+            return
+        if char == ",":
+            reader.pos += 1
+            continue
+        key = reader.decode()
+        reader.expect(":")
+        if key in keys and reader.peek() == "[":
+            yield from reader.elements()
+            return
+        reader.skip()
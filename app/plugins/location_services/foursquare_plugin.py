@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Iterable, Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class FoursquarePlugin(BasePlugin):
             name="Foursquare",
             description="Parse Foursquare/Swarm check-in exports",
         )
+        self._timestamps = TimestampParser()
 
     def get_configuration_options(self) -> List[dict]:
         return []
@@ -94,8 +96,7 @@ class FoursquarePlugin(BasePlugin):
         if lat is None or lon is None:
             return None
 
-        timestamp = entry.get("createdAt") or entry.get("timestamp")
-        parsed_time = self._parse_timestamp(timestamp)
+        parsed_time = self._timestamps.first(entry, ("createdAt", "timestamp"))
         if not parsed_time:
             return None
 
@@ -108,18 +109,5 @@ class FoursquarePlugin(BasePlugin):
             context=str(context),
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        try:
-            if isinstance(value, (int, float)):
-                return datetime.fromtimestamp(float(value))
-            return datetime.fromisoformat(str(value))
-        except ValueError:
-            return None
-
 
 Plugin = FoursquarePlugin
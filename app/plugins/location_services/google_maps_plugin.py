@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Iterable, Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class GoogleMapsPlugin(BasePlugin):
             name="Google Maps",
             description="Read Google Maps location history exports",
         )
+        self._timestamps = TimestampParser(units={"timestampMs": "ms", "createTimestampMs": "ms"})
 
     def get_configuration_options(self) -> List[dict]:
         return [
@@ -117,14 +119,9 @@ class GoogleMapsPlugin(BasePlugin):
         if isinstance(longitude, (int, float)) and abs(longitude) > 180:
             longitude = float(longitude) / 1e7
 
-        timestamp = (
-            entry.get("timestamp")
-            or entry.get("timestampMs")
-            or entry.get("time")
-            or entry.get("createTimestampMs")
+        parsed_time = self._timestamps.first(
+            entry, ("timestamp", "timestampMs", "time", "createTimestampMs")
         )
-
-        parsed_time = self._parse_timestamp(timestamp)
         if not parsed_time:
             return None
 
@@ -137,27 +134,5 @@ class GoogleMapsPlugin(BasePlugin):
             context=str(context),
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            try:
-                return datetime.fromisoformat(value.replace("Z", "+00:00"))
-            except ValueError:
-                pass
-            try:
-                return datetime.fromtimestamp(int(value) / 1000)
-            except (ValueError, TypeError):
-                return None
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(float(value) / (1000 if value > 10**12 else 1))
-            except ValueError:
-                return None
-        return None
-
 
 Plugin = GoogleMapsPlugin
@@ -16,9 +16,19 @@ from pathlib import Path
 from typing import Iterable, Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
+# Keys that may hold the time of a sample, in order of preference
+TIMESTAMP_KEYS = ("timestamp", "time", "date", "created_at")
+
+
+def _timestamp_value(data: object) -> object:
+    if not isinstance(data, dict):
+        return None
+    return next((data[key] for key in TIMESTAMP_KEYS if data.get(key)), None)
+
 
 class LocationHistoryPlugin(BasePlugin):
     """Load location samples from a directory of lightweight exports."""
@@ -28,6 +38,7 @@ class LocationHistoryPlugin(BasePlugin):
             name="Location History",
             description="Parse lightweight JSON/CSV location history exports",
         )
+        self._timestamps = TimestampParser()
 
     # ------------------------------------------------------------------
     # Metadata helpers
@@ -45,33 +56,30 @@ class LocationHistoryPlugin(BasePlugin):
     # ------------------------------------------------------------------
     # Public behaviour
     # ------------------------------------------------------------------
-    def collect_locations(
+    def generate_locations(
         self,
         target: str | None = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> List[LocationPoint]:
-        """Read all known location files and return matching samples."""
+    ) -> Iterator[LocationPoint]:
+        """Read all known location files and yield matching samples."""
 
         configured, message = self.is_configured()
         if not configured:
             logger.warning("LocationHistoryPlugin not configured: %s", message)
-            return []
+            return
 
         directory = Path(self.get_data_directory()).expanduser()
-        samples: List[LocationPoint] = []
-        for path in self._iter_location_files(directory):
-            try:
-                samples.extend(self._load_file(path, date_from, date_to))
-            except Exception as exc:  # pragma: no cover - defensive guard
-                logger.error("Failed to load %s: %s", path, exc)
+        count = 0
+        for point in self.ingest_files(self._load_file, self._iter_location_files(directory), date_from, date_to):
+            count += 1
+            yield point
 
         logger.debug(
             "LocationHistoryPlugin returned %d samples from %s",
-            len(samples),
+            count,
             directory,
         )
-        return samples
 
     def run(self, target: str | None = None) -> List[LocationPoint]:
         return self.collect_locations(target)
@@ -91,9 +99,9 @@ class LocationHistoryPlugin(BasePlugin):
         date_to: Optional[datetime],
     ) -> Iterable[LocationPoint]:
         if path.suffix.lower() == ".json":
-            return list(self._load_json(path, date_from, date_to))
+            return self._load_json(path, date_from, date_to)
         if path.suffix.lower() == ".csv":
-            return list(self._load_csv(path, date_from, date_to))
+            return self._load_csv(path, date_from, date_to)
         return []
 
     def _load_json(
@@ -110,8 +118,12 @@ class LocationHistoryPlugin(BasePlugin):
         else:
             candidates = payload
 
-        for item in candidates:
-            point = self._build_location_point(item)
+        # The whole file is in memory, so convert its timestamps as one column
+        timestamps = self._timestamps.parse_column(
+            [_timestamp_value(item) for item in candidates], "timestamp"
+        )
+        for item, parsed_time in zip(candidates, timestamps):
+            point = self._build_location_point(item, parsed_time)
             if not point:
                 continue
             if date_from and point.timestamp < date_from:
@@ -129,7 +141,7 @@ class LocationHistoryPlugin(BasePlugin):
         with path.open("r", encoding="utf-8") as handle:
             reader = csv.DictReader(handle)
             for row in reader:
-                point = self._build_location_point(row)
+                point = self._build_location_point(row, self._timestamps.first(row, TIMESTAMP_KEYS))
                 if not point:
                     continue
                 if date_from and point.timestamp < date_from:
@@ -138,24 +150,15 @@ class LocationHistoryPlugin(BasePlugin):
                     continue
                 yield point
 
-    def _build_location_point(self, data: object) -> Optional[LocationPoint]:
-        if not isinstance(data, dict):
+    def _build_location_point(
+        self, data: object, parsed_time: Optional[datetime]
+    ) -> Optional[LocationPoint]:
+        if not isinstance(data, dict) or parsed_time is None:
             return None
 
         latitude = data.get("lat") or data.get("latitude")
         longitude = data.get("lon") or data.get("lng") or data.get("longitude")
-        timestamp = (
-            data.get("timestamp")
-            or data.get("time")
-            or data.get("date")
-            or data.get("created_at")
-        )
-
-        if latitude is None or longitude is None or timestamp is None:
-            return None
-
-        parsed_time = self._parse_timestamp(timestamp)
-        if not parsed_time:
+        if latitude is None or longitude is None:
             return None
 
         context = str(data.get("name") or data.get("context") or "Location")
@@ -167,28 +170,6 @@ class LocationHistoryPlugin(BasePlugin):
             context=context,
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(float(value))
-            except ValueError:
-                return None
-        if isinstance(value, str):
-            for fmt in (
-                "%Y-%m-%dT%H:%M:%S%z",
-                "%Y-%m-%dT%H:%M:%S",
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%d",
-            ):
-                try:
-                    return datetime.strptime(value, fmt)
-                except ValueError:
-                    continue
-        return None
-
 
 # Backwards compatibility with legacy imports
 Plugin = LocationHistoryPlugin
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ class WifiAnalysisPlugin(BasePlugin):
             description="Summarise Wi-Fi survey data and highlight hotspots",
         )
         self._summary: Dict[str, object] = {}
+        self._timestamps = TimestampParser()
 
     def get_configuration_options(self) -> List[dict]:
         return [
@@ -89,19 +91,14 @@ class WifiAnalysisPlugin(BasePlugin):
                 continue
             yield point
 
-    @staticmethod
-    def _parse_row(row: object) -> Optional[LocationPoint]:
+    def _parse_row(self, row: object) -> Optional[LocationPoint]:
         if not isinstance(row, dict):
             return None
         lat = row.get("lat") or row.get("latitude")
         lon = row.get("lon") or row.get("lng") or row.get("longitude")
         if lat is None or lon is None:
             return None
-        timestamp = row.get("timestamp")
-        try:
-            parsed_time = datetime.fromtimestamp(float(timestamp)) if timestamp else datetime.utcnow()
-        except (TypeError, ValueError):
-            parsed_time = datetime.utcnow()
+        parsed_time = self._timestamps(row.get("timestamp"), "timestamp") or datetime.utcnow()
         context = row.get("ssid") or row.get("name") or "Wi-Fi network"
         return LocationPoint(
             latitude=float(lat),
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Iterable, Iterator, List, Optional
 
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class WifiMapperPlugin(BasePlugin):
             name="Wi-Fi Mapper",
             description="Load coordinates from Wi-Fi survey exports",
         )
+        self._timestamps = TimestampParser()
 
     def get_configuration_options(self) -> List[dict]:
         return [
@@ -53,29 +55,23 @@ class WifiMapperPlugin(BasePlugin):
             return False, f"Wi-Fi export path does not exist: {path}"
         return True, "WifiMapperPlugin is configured"
 
-    def collect_locations(
+    def generate_locations(
         self,
         target: str | None = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> List[LocationPoint]:
+    ) -> Iterator[LocationPoint]:
         configured, message = self.is_configured()
         if not configured:
             logger.warning("WifiMapperPlugin not configured: %s", message)
-            return []
+            return
 
         base_path = Path(self.config["export_path"]).expanduser()
         ssid_filter = (self.config.get("filter_ssid") or "").lower()
 
-        samples: List[LocationPoint] = []
-        for path in self._iter_files(base_path):
-            try:
-                samples.extend(
-                    self._parse_file(path, ssid_filter, date_from, date_to)
-                )
-            except Exception as exc:  # pragma: no cover - defensive guard
-                logger.error("Failed to parse %s: %s", path, exc)
-        return samples
+        yield from self.ingest_files(
+            self._parse_file, self._iter_files(base_path), ssid_filter, date_from, date_to
+        )
 
     def run(self, target: str | None = None) -> List[LocationPoint]:
         return self.collect_locations(target)
@@ -130,8 +126,7 @@ class WifiMapperPlugin(BasePlugin):
         if lat is None or lon is None:
             return None
 
-        timestamp = row.get("timestamp") or row.get("last_seen")
-        parsed_time = self._parse_timestamp(timestamp)
+        parsed_time = self._timestamps.first(row, ("timestamp", "last_seen"))
 
         return LocationPoint(
             latitude=float(lat),
@@ -141,18 +136,5 @@ class WifiMapperPlugin(BasePlugin):
             context=ssid or "Wi-Fi access point",
         )
 
-    @staticmethod
-    def _parse_timestamp(value: object) -> Optional[datetime]:
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        try:
-            if isinstance(value, (int, float)):
-                return datetime.fromtimestamp(float(value))
-            return datetime.fromisoformat(str(value))
-        except ValueError:
-            return None
-
 
 Plugin = WifiMapperPlugin
@@ -0,0 +1,482 @@
+"""Run the ``collect_locations`` calls of several plugins at once.
+
+Building a case usually means asking every configured plugin for the same
+target.  :class:`CollectionOrchestrator` runs those calls concurrently:
+plugins that mostly wait on the network run in threads, archive parsers
+that keep a core busy run in worker processes.  Points are handed to
+subscribers in batches as they arrive, each plugin can be given a timeout
+or cancelled, and every run ends with a :class:`PluginRunReport` giving
+its wall time and point count.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.plugins.base_plugin import LocationPoint, iter_plugin_locations
+from app.plugins.catalog import PluginDescriptor
+
+LOGGER = logging.getLogger(__name__)
+
+#: Points per batch handed to subscribers
+DEFAULT_BATCH_SIZE = 500
+
+#: Plugin categories whose collection is CPU bound and runs in a process
+PROCESS_CATEGORIES = frozenset({"data_extraction"})
+
+# How often the coordinator wakes up to check timeouts and cancellations
+_POLL_INTERVAL = 0.1
+
+# Seconds a worker process has to stop by itself before it is terminated
+_STOP_GRACE = 1.0
+
+BatchCallback = Callable[[str, List[LocationPoint]], None]
+
+
+@dataclass
+class CollectionJob:
+    """One plugin to collect from.
+
+    ``plugin`` is a plugin instance, a :class:`PluginDescriptor` or a
+    plugin class.  Process jobs need something that can be rebuilt in the
+    worker: a descriptor or an importable class (an instance is rebuilt
+    from ``descriptor`` when given, otherwise from its class, and its
+    ``config``).
+    """
+
+    identifier: str
+    plugin: Any
+    mode: Optional[str] = None  # "thread", "process" or None to decide by category
+    timeout: Optional[float] = None  # Seconds; None uses the orchestrator default
+    descriptor: Optional[PluginDescriptor] = None  # Catalog entry an instance was built from
+
+    def resolved_mode(self) -> str:
+        if self.mode in ("thread", "process"):
+            return self.mode
+        if self.mode is not None:
+            raise ValueError(f"Unknown collection mode: {self.mode}")
+        descriptor = _descriptor_of(self.plugin) or self.descriptor
+        if descriptor is not None and descriptor.category in PROCESS_CATEGORIES:
+            return "process"
+        return "thread"
+
+
+@dataclass
+class PluginRunReport:
+    """Outcome of one plugin's collection."""
+
+    identifier: str
+    mode: str
+    status: str = "pending"  # pending, running, completed, failed, timed_out, cancelled
+    points: int = 0
+    batches: int = 0
+    wall_time: float = 0.0
+    error: Optional[str] = None
+    started_at: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ("pending", "running")
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON friendly representation."""
+
+        return {
+            "identifier": self.identifier,
+            "mode": self.mode,
+            "status": self.status,
+            "points": self.points,
+            "batches": self.batches,
+            "wall_time": self.wall_time,
+            "error": self.error,
+        }
+
+
+def _descriptor_of(plugin: Any) -> Optional[PluginDescriptor]:
+    if isinstance(plugin, PluginDescriptor):
+        return plugin
+    return None
+
+
+def _instantiate(plugin: Any) -> Any:
+    if isinstance(plugin, PluginDescriptor):
+        return plugin.instantiate()
+    if isinstance(plugin, type):
+        return plugin()
+    return plugin
+
+
+def _process_spec(plugin: Any, descriptor: Optional[PluginDescriptor] = None) -> tuple:
+    """What a worker process needs to rebuild a plugin: (factory, config)."""
+
+    if isinstance(plugin, PluginDescriptor):
+        return plugin, None
+    if isinstance(plugin, type):
+        return plugin, None
+    config = dict(getattr(plugin, "config", {}) or {})
+    return (descriptor or type(plugin)), config
+
+
+def _collect_in_process(identifier: str, spec: tuple, target: str, date_from: Optional[datetime],
+                        date_to: Optional[datetime], batch_size: int, events: Any, stop: Any) -> None:
+    """Worker process body; module level so that it can be spawned.
+
+    ``events`` is the sending end of a pipe of this worker's own, so
+    terminating it part way through a send can only break that pipe.
+    ``stop`` asks it to finish at the next batch boundary.
+    """
+
+    factory, config = spec
+    try:
+        plugin = _instantiate(factory)
+        if config and hasattr(plugin, "update_config"):
+            plugin.update_config(config)
+        batches = iter_plugin_locations(plugin, target, date_from, date_to, batch_size=batch_size)
+        for batch in batches:
+            if stop.is_set():
+                batches.close()
+                return
+            events.send(("batch", identifier, batch))
+    except BaseException as exc:  # Reported to the coordinator, not raised in the worker
+        events.send(("error", identifier, f"{type(exc).__name__}: {exc}"))
+    else:
+        events.send(("done", identifier, None))
+    finally:
+        events.close()
+
+
+class _Run:
+    """State of one job while the orchestrator runs it."""
+
+    def __init__(self, job: CollectionJob, report: PluginRunReport, timeout: Optional[float]) -> None:
+        self.job = job
+        self.report = report
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.stop: Any = None  # Event asking the worker process to stop
+
+    def deadline(self) -> Optional[float]:
+        if self.timeout is None or self.report.started_at is None:
+            return None
+        return self.report.started_at + self.timeout
+
+
+class CollectionOrchestrator:
+    """Collect locations from several plugins concurrently.
+
+    Subscribers registered with :meth:`subscribe` are called on the thread
+    that called :meth:`run`, once per batch, with the plugin identifier and
+    a list of :class:`LocationPoint`.  Batches of a plugin that timed out or
+    was cancelled are dropped from that moment on.
+
+    A process job is asked to stop at its next batch boundary and is
+    terminated if it has not stopped within a short grace period; every
+    worker sends its batches over a pipe of its own, so terminating one
+    cannot affect the others.  A thread cannot be stopped from outside, so
+    a thread job stops at its next batch boundary; a plugin that returns
+    one big list finishes in the background and its result is discarded.
+    """
+
+    def __init__(self, *, max_threads: Optional[int] = None, max_processes: Optional[int] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, default_timeout: Optional[float] = None) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.max_threads = max_threads or 8
+        self.max_processes = max_processes or max(1, min(os.cpu_count() or 1, 4))
+        self.batch_size = batch_size
+        self.default_timeout = default_timeout
+        self._subscribers: List[BatchCallback] = []
+        self._lock = threading.Lock()
+        self._runs: Dict[str, _Run] = {}
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        # Receiving ends of the worker processes' pipes, read by the relay
+        self._pipes: Dict[Any, str] = {}
+
+    # ------------------------------------------------------------------
+    # Subscribers and control
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: BatchCallback) -> Callable[[], None]:
+        """Call ``callback(identifier, points)`` for every batch; returns an unsubscribe function."""
+
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def cancel(self, identifier: Optional[str] = None) -> None:
+        """Cancel one running or pending plugin, or all of them.
+
+        Safe to call from any thread, including from a subscriber.
+        """
+
+        with self._lock:
+            runs = list(self._runs.values()) if identifier is None else [self._runs.get(identifier)]
+        for run in runs:
+            if run is not None:
+                run.cancelled.set()
+        self._events.put(("wake", identifier, None))
+
+    def reports(self) -> Dict[str, PluginRunReport]:
+        """Reports of the current (or last) run, including unfinished plugins."""
+
+        with self._lock:
+            return {identifier: run.report for identifier, run in self._runs.items()}
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+    def run(self, jobs: Iterable[CollectionJob], target: str, date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None) -> Dict[str, PluginRunReport]:
+        """Run the jobs and block until each has finished, failed, timed out or been cancelled.
+
+        Returns
+        -------
+        dict
+            A :class:`PluginRunReport` per job identifier.
+        """
+
+        jobs = list(jobs)
+        identifiers = [job.identifier for job in jobs]
+        if len(set(identifiers)) != len(identifiers):
+            raise ValueError("job identifiers must be unique")
+
+        with self._lock:
+            self._runs = {}
+            for job in jobs:
+                timeout = job.timeout if job.timeout is not None else self.default_timeout
+                self._runs[job.identifier] = _Run(job, PluginRunReport(job.identifier, job.resolved_mode()), timeout)
+            runs = list(self._runs.values())
+            self._pipes = {}
+        self._events = queue.Queue()
+
+        thread_runs = [run for run in runs if run.report.mode == "thread"]
+        waiting = [run for run in runs if run.report.mode == "process"]
+        executor = ThreadPoolExecutor(max_workers=min(self.max_threads, max(1, len(thread_runs))),
+                                      thread_name_prefix="collect")
+        context = multiprocessing.get_context("spawn") if waiting else None
+        relay: Optional[threading.Thread] = None
+        relay_stop = threading.Event()
+        if context is not None:
+            relay = threading.Thread(target=self._relay, args=(relay_stop,),
+                                     name="collect-relay", daemon=True)
+            relay.start()
+
+        LOGGER.info("Collecting from %d plugins for %s", len(runs), target)
+        try:
+            for run in thread_runs:
+                executor.submit(self._run_in_thread, run, target, date_from, date_to)
+
+            while True:
+                self._start_processes(waiting, context, target, date_from, date_to)
+                self._enforce_limits(runs)
+                if all(run.report.finished for run in runs):
+                    break
+                try:
+                    event = self._events.get(timeout=self._next_wait(runs))
+                except queue.Empty:
+                    continue
+                self._handle(event)
+                # Drain whatever else has arrived before checking limits again
+                while True:
+                    try:
+                        self._handle(self._events.get_nowait())
+                    except queue.Empty:
+                        break
+        finally:
+            for run in runs:
+                if not run.report.finished:
+                    run.cancelled.set()
+                    self._finish(run, "cancelled")
+            relay_stop.set()
+            if relay is not None:
+                relay.join(timeout=1.0)
+            with self._lock:
+                pipes, self._pipes = list(self._pipes), {}
+            for connection in pipes:
+                connection.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for run in runs:
+            report = run.report
+            LOGGER.info("Plugin %s %s: %d points in %.2fs (%s)", report.identifier, report.status,
+                        report.points, report.wall_time, report.mode)
+        return {run.job.identifier: run.report for run in runs}
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _run_in_thread(self, run: _Run, target: str, date_from: Optional[datetime],
+                       date_to: Optional[datetime]) -> None:
+        identifier = run.job.identifier
+        if run.cancelled.is_set():
+            return
+        self._events.put(("started", identifier, time.perf_counter()))
+        try:
+            plugin = _instantiate(run.job.plugin)
+            batches = iter_plugin_locations(plugin, target, date_from, date_to, batch_size=self.batch_size)
+            for batch in batches:
+                if run.cancelled.is_set():
+                    return
+                self._events.put(("batch", identifier, batch))
+        except Exception as exc:
+            LOGGER.exception("Plugin %s failed while collecting", identifier)
+            self._events.put(("error", identifier, f"{type(exc).__name__}: {exc}"))
+        else:
+            self._events.put(("done", identifier, None))
+
+    def _start_processes(self, waiting: List[_Run], context: Any, target: str,
+                         date_from: Optional[datetime], date_to: Optional[datetime]) -> None:
+        running = sum(1 for run in self._runs.values()
+                      if run.process is not None and not run.report.finished)
+        while waiting and running < self.max_processes:
+            run = waiting.pop(0)
+            if run.report.finished:
+                continue
+            identifier = run.job.identifier
+            receiver, sender = context.Pipe(duplex=False)
+            stop = context.Event()
+            try:
+                spec = _process_spec(run.job.plugin, run.job.descriptor)
+                process = context.Process(
+                    target=_collect_in_process,
+                    args=(identifier, spec, target, date_from, date_to, self.batch_size, sender, stop),
+                    name=f"collect-{identifier}", daemon=True,
+                )
+                process.start()
+            except Exception as exc:
+                LOGGER.exception("Could not start a worker process for %s", identifier)
+                receiver.close()
+                run.report.started_at = time.perf_counter()
+                run.report.error = f"{type(exc).__name__}: {exc}"
+                self._finish(run, "failed")
+                continue
+            finally:
+                # Only the worker holds the sending end, so its exit ends the pipe
+                sender.close()
+            run.process = process
+            run.stop = stop
+            with self._lock:
+                self._pipes[receiver] = identifier
+            self._handle(("started", identifier, time.perf_counter()))
+            running += 1
+
+    def _relay(self, stop: threading.Event) -> None:
+        """Move events from the worker processes' pipes onto the coordinator's queue.
+
+        Once a worker has exited and everything it sent has been read, an
+        ``exited`` event follows its last batch.
+        """
+
+        while not stop.is_set():
+            with self._lock:
+                pipes = dict(self._pipes)
+            if not pipes:
+                stop.wait(_POLL_INTERVAL)
+                continue
+            for connection in multiprocessing.connection.wait(list(pipes), timeout=_POLL_INTERVAL):
+                identifier = pipes[connection]
+                try:
+                    event = connection.recv()
+                except Exception:  # EOF, or a message cut short by a terminated worker
+                    with self._lock:
+                        self._pipes.pop(connection, None)
+                    connection.close()
+                    self._events.put(("exited", identifier, None))
+                    continue
+                self._events.put(event)
+
+    # ------------------------------------------------------------------
+    # Coordination
+    # ------------------------------------------------------------------
+    def _handle(self, event: tuple) -> None:
+        kind, identifier, payload = event
+        run = self._runs.get(identifier) if identifier is not None else None
+        if run is None or run.report.finished:
+            return
+        report = run.report
+        if kind == "started":
+            report.status = "running"
+            report.started_at = payload
+        elif kind == "batch":
+            report.points += len(payload)
+            report.batches += 1
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(identifier, payload)
+                except Exception:
+                    LOGGER.exception("Location batch subscriber failed for %s", identifier)
+        elif kind == "done":
+            self._finish(run, "completed")
+        elif kind == "error":
+            report.error = payload
+            self._finish(run, "failed")
+        elif kind == "exited":
+            # Everything the worker sent has been handled and it never
+            # reported an outcome: it died (killed, out of memory...)
+            process = run.process
+            process.join(timeout=_STOP_GRACE)
+            report.error = f"Worker process exited with code {process.exitcode}"
+            self._finish(run, "failed")
+
+    def _enforce_limits(self, runs: Sequence[_Run]) -> None:
+        now = time.perf_counter()
+        for run in runs:
+            if run.report.finished:
+                continue
+            if run.cancelled.is_set():
+                self._finish(run, "cancelled")
+                continue
+            deadline = run.deadline()
+            if deadline is not None and now >= deadline:
+                run.report.error = f"Timed out after {run.timeout:g}s"
+                self._finish(run, "timed_out")
+
+    def _next_wait(self, runs: Sequence[_Run]) -> float:
+        now = time.perf_counter()
+        wait = _POLL_INTERVAL
+        for run in runs:
+            deadline = run.deadline()
+            if deadline is not None and not run.report.finished:
+                wait = min(wait, max(0.0, deadline - now))
+        return wait
+
+    def _finish(self, run: _Run, status: str) -> None:
+        report = run.report
+        report.status = status
+        if report.started_at is not None:
+            report.wall_time = time.perf_counter() - report.started_at
+        if status in ("cancelled", "timed_out"):
+            run.cancelled.set()
+        process = run.process
+        if process is None:
+            return
+        if status in ("cancelled", "timed_out") and run.stop is not None:
+            run.stop.set()
+        # A worker that reported its outcome is exiting; one that was asked
+        # to stop gets a grace period to do so before it is terminated
+        process.join(timeout=_STOP_GRACE)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=_STOP_GRACE)
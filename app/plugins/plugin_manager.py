@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
-from app.plugins.catalog import PluginCatalog
+from app.plugins.catalog import LazyPluginMap, PluginCatalog
+from app.plugins.orchestrator import CollectionJob, CollectionOrchestrator, PluginRunReport
 
 logger = logging.getLogger("creepyai.plugin_manager")
 
@@ -18,7 +20,7 @@ class PluginManager:
         directory = Path(plugin_dir) if plugin_dir else Path(__file__).resolve().parent
         self.plugin_dir: Path = directory
         self.plugin_dir.mkdir(parents=True, exist_ok=True)
-        self.plugins: Dict[str, Any] = {}
+        self.plugins: LazyPluginMap = LazyPluginMap(on_error=self._record_failure)
         self.failed_plugins: Dict[str, str] = {}
         self._aliases: Dict[str, str] = {}
         self._catalog = PluginCatalog([self.plugin_dir])
@@ -37,7 +39,11 @@ class PluginManager:
         return self.plugins
 
     def load_plugins(self, *, force_refresh: bool = False) -> Dict[str, Any]:
-        """Discover and instantiate plugins from the configured directory."""
+        """Discover plugins from the configured directory.
+
+        Plugins are listed in :attr:`plugins` straight away but only
+        instantiated when first looked up there or through :meth:`get_plugin`.
+        """
 
         self.plugins.clear()
         self.failed_plugins.clear()
@@ -50,15 +56,8 @@ class PluginManager:
                 self.failed_plugins[key] = descriptor.load_error
                 logger.error("Failed to prepare plugin %s: %s", key, descriptor.load_error)
                 continue
-            try:
-                instance = descriptor.instantiate()
-            except Exception as exc:  # pragma: no cover - defensive guard
-                message = f"{type(exc).__name__}: {exc}"
-                self.failed_plugins[key] = message
-                logger.error("Failed to instantiate plugin %s: %s", key, message)
-                continue
-            info = descriptor.info
-            self._register_instance(key, instance, info)
+            self.plugins.defer(key, descriptor)
+            self._register_alias(key, descriptor.info)
         return self.plugins
 
     # ------------------------------------------------------------------
@@ -92,21 +91,18 @@ class PluginManager:
         """Return a structured manifest describing loaded plugins."""
 
         manifest: Dict[str, Dict[str, Any]] = {}
-        for identifier, plugin in self.plugins.items():
-            info = getattr(plugin, "get_info", lambda: {"name": identifier})()
-            manifest[identifier] = {"info": info}
+        for identifier in self.plugins:
+            # Served from the catalog so listing does not load the plugin
+            manifest[identifier] = {"info": self.plugins.info(identifier)}
         return manifest
 
     def get_plugin(self, name: str) -> Optional[Any]:
         """Retrieve a plugin by identifier or human readable name."""
 
-        candidate = self.plugins.get(name)
-        if candidate:
-            return candidate
-        alias = self._aliases.get(name.lower())
-        if alias:
-            return self.plugins.get(alias)
-        return None
+        key = self._resolve_key(name)
+        if key is None:
+            return None
+        return self.plugins.get(key)
 
     # ------------------------------------------------------------------
     # Execution
@@ -128,13 +124,66 @@ class PluginManager:
             logger.exception("Error executing plugin %s: %s", name, exc)
             return None
 
+    def collect_from_plugins(
+        self,
+        names: Iterable[str],
+        target: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        *,
+        on_batch: Optional[Callable[[str, List[Any]], None]] = None,
+        timeout: Optional[float] = None,
+        orchestrator: Optional[CollectionOrchestrator] = None,
+    ) -> Dict[str, PluginRunReport]:
+        """Collect locations from several plugins concurrently.
+
+        ``on_batch(identifier, points)`` receives the points as they arrive.
+        Data extraction plugins run in worker processes, the rest in threads
+        (see :class:`CollectionOrchestrator`).  Unknown names are logged and
+        skipped.
+        """
+
+        jobs = []
+        for name in names:
+            key = self._resolve_key(name)
+            if key is None:
+                logger.error("Plugin %s not found", name)
+                continue
+            # Unloaded plugins are passed as descriptors so a worker process can build its own instance
+            jobs.append(CollectionJob(key, self.plugins.peek(key), timeout=timeout,
+                                      descriptor=self.plugins.descriptor(key)))
+
+        orchestrator = orchestrator or CollectionOrchestrator()
+        unsubscribe = orchestrator.subscribe(on_batch) if on_batch else None
+        try:
+            return orchestrator.run(jobs, target, date_from, date_to)
+        finally:
+            if unsubscribe:
+                unsubscribe()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _resolve_key(self, name: str) -> Optional[str]:
+        """Map an identifier or display name to a registry key."""
+
+        return name if name in self.plugins else self._aliases.get(name.lower())
+
+    def _record_failure(self, identifier: str, message: str) -> None:
+        """Note a plugin that failed to instantiate on first use."""
+
+        self.failed_plugins[identifier] = message
+        logger.error("Failed to instantiate plugin %s: %s", identifier, message)
+
     def _register_instance(self, identifier: str, instance: Any, info: Dict[str, Any]) -> None:
         """Add a plugin instance to the registry and record its alias."""
 
         self.plugins[identifier] = instance
+        self._register_alias(identifier, info)
+
+    def _register_alias(self, identifier: str, info: Dict[str, Any]) -> None:
+        """Record the display name of a plugin as an alias of its identifier."""
+
         display_name = info.get("name") if isinstance(info, dict) else None
         if isinstance(display_name, str):
             self._aliases[display_name.lower()] = identifier
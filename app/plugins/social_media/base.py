@@ -6,13 +6,18 @@ import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from urllib.parse import urlparse
 
+from app.plugins.archive_fs import ArchivePath
 from app.plugins.base_plugin import BasePlugin, LocationPoint
+from app.plugins.timestamps import TimestampParser
 
 logger = logging.getLogger(__name__)
 
+#: A file or directory of an export, on disk or inside its zip archive
+DataPath = Union[Path, ArchivePath]
+
 
 class ArchiveSocialMediaPlugin(BasePlugin):
     """Base class for plugins that ingest exported social media archives."""
@@ -29,6 +34,7 @@ class ArchiveSocialMediaPlugin(BasePlugin):
             data_directory_name=directory_name,
         )
         self._temp_subdir = temp_subdir
+        self._timestamps = TimestampParser(tz=timezone.utc)
 
     # ------------------------------------------------------------------
     # BasePlugin overrides
@@ -57,23 +63,34 @@ class ArchiveSocialMediaPlugin(BasePlugin):
                 return host
         return cls.__name__.replace("Plugin", "").lower()
 
-    def resolve_archive_root(self) -> Optional[Path]:
-        """Return the prepared archive directory if data is available."""
+    def resolve_archive_root(self) -> Optional[DataPath]:
+        """Return the root of the export if data is available.
+
+        A zipped export is read in place: the root is an
+        :class:`~app.plugins.archive_fs.ArchivePath` and nothing is
+        extracted.
+        """
 
         if not self.has_input_data():
             return None
 
-        archive_path = Path(self.prepare_data_directory(self._temp_subdir))
+        archive_path = self.open_data_root(self._temp_subdir)
         return archive_path if archive_path.exists() else None
 
     def iter_data_files(
-        self, archive_root: Path, patterns: Iterable[str]
-    ) -> Iterator[Path]:
-        """Yield all files that match ``patterns`` within ``archive_root``."""
+        self, archive_root: Union[DataPath, str], patterns: Iterable[str]
+    ) -> Iterator[DataPath]:
+        """Yield all files that match ``patterns`` within ``archive_root``.
 
-        root = archive_root if isinstance(archive_root, Path) else Path(archive_root)
+        Files are yielded as paths on disk or, for a zipped export,
+        archive members to be read with ``open`` or ``read_text``.
+        """
+
+        root = archive_root if isinstance(archive_root, (Path, ArchivePath)) else Path(archive_root)
         for pattern in patterns:
-            yield from root.glob(pattern)
+            for path in root.glob(pattern):
+                if path.is_file():
+                    yield path
 
     # ------------------------------------------------------------------
     # Managed dataset helpers
@@ -152,26 +169,7 @@ class ArchiveSocialMediaPlugin(BasePlugin):
         return points
 
     def _parse_timestamp(self, value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-
-        candidates = [value]
-        if isinstance(value, str) and value.endswith("Z"):
-            candidates.append(value[:-1] + "+00:00")
-
-        for candidate in candidates:
-            try:
-                parsed = datetime.fromisoformat(candidate)
-                if parsed.tzinfo is None:
-                    parsed = parsed.replace(tzinfo=timezone.utc)
-                return parsed
-            except ValueError:
-                continue
-
-        try:
-            timestamp_float = float(value)  # type: ignore[arg-type]
-        except (TypeError, ValueError):
-            return None
+        """Parse a timestamp as UTC unless it names its own offset."""
 
-        return datetime.fromtimestamp(timestamp_float, tz=timezone.utc)
+        return self._timestamps(value, "timestamp")
 
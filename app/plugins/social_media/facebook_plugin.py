@@ -2,17 +2,34 @@ import json
 import logging
 import re
 import traceback
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import codecs
 
 from app.plugins.base_plugin import LocationPoint
-from app.plugins.social_media.base import ArchiveSocialMediaPlugin
+from app.plugins.social_media.base import ArchiveSocialMediaPlugin, DataPath
+from app.plugins.timestamps import TimestampParser
 from app.plugins.enhanced_geocoding_helper import EnhancedGeocodingHelper
 
 logger = logging.getLogger(__name__)
 
+LOCATION_PATTERNS = [
+    "**/location_history.json",
+    "**/your_location_history.json",
+    "**/location_history*.json",
+    "**/places_visited.json",
+    "**/check-ins.json",
+]
+POST_PATTERNS = ["**/posts*.json", "**/your_posts*.json"]
+
+# Keys that may hold the time of a location item or post, in order of preference
+LOCATION_TIME_KEYS = ("timestamp", "time", "date", "creation_timestamp")
+POST_TIME_KEYS = ("timestamp", "time", "created_time")
+
+
 class FacebookPlugin(ArchiveSocialMediaPlugin):
     data_source_url = "https://www.facebook.com"
     collection_terms = (
@@ -29,215 +46,192 @@ class FacebookPlugin(ArchiveSocialMediaPlugin):
         )
         self.geocoder = EnhancedGeocodingHelper()
 
-    def collect_locations(self, target: str, date_from: Optional[datetime] = None,
-                         date_to: Optional[datetime] = None) -> List[LocationPoint]:
+    def generate_locations(self, target: str, date_from: Optional[datetime] = None,
+                           date_to: Optional[datetime] = None) -> Iterator[LocationPoint]:
         collected = self.load_collected_locations(
             target=target, date_from=date_from, date_to=date_to
         )
         if collected is not None:
-            return collected
-
-        locations: List[LocationPoint] = []
+            yield from collected
+            return
 
         archive_root = self.resolve_archive_root()
         if archive_root is None:
-            return locations
+            return
 
-        location_patterns = [
-            "**/location_history.json",
-            "**/your_location_history.json",
-            "**/location_history*.json",
-            "**/places_visited.json",
-            "**/check-ins.json",
-        ]
-        location_files = list(self.iter_data_files(archive_root, location_patterns))
+        data_files = self.iter_data_files(archive_root, LOCATION_PATTERNS + POST_PATTERNS)
+        points = self.ingest_files(self._parse_archive_file, data_files, date_from, date_to)
+        yield from self._stamp_undated(points, date_from, date_to)
 
-        post_patterns = ["**/posts*.json", "**/your_posts*.json"]
-        post_files = list(self.iter_data_files(archive_root, post_patterns))
+    @staticmethod
+    def _stamp_undated(points: Iterator[LocationPoint], date_from: Optional[datetime],
+                       date_to: Optional[datetime]) -> Iterator[LocationPoint]:
+        """Give items without a time the time of this run, after the others.
 
-        for location_file in location_files:
-            try:
-                with location_file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                
-                location_items = []
-                
-                if isinstance(data, list):
-                    location_items = data
-                elif isinstance(data, dict):
-                    for key in ["location_history", "locations", "history", "visits", "places_visited", "check_ins"]:
-                        if key in data and isinstance(data[key], list):
-                            location_items = data[key]
-                            break
-                
-                for item in location_items:
-                    timestamp = None
-                    latitude = None
-                    longitude = None
-                    name = ""
-                    
-                    if isinstance(item, dict):
-                        for time_key in ["timestamp", "time", "date", "creation_timestamp"]:
-                            if time_key in item:
-                                try:
-                                    if isinstance(item[time_key], int):
-                                        timestamp = datetime.fromtimestamp(item[time_key])
-                                    elif isinstance(item[time_key], str):
-                                        for fmt in ["%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]:
-                                            try:
-                                                timestamp = datetime.strptime(item[time_key], fmt)
-                                                break
-                                            except ValueError:
-                                                pass
-                                        
-                                        if not timestamp:
-                                            try:
-                                                timestamp = datetime.fromisoformat(item[time_key].replace("Z", "+00:00"))
-                                            except ValueError:
-                                                pass
-                                    break
-                                except (ValueError, TypeError):
-                                    pass
-                        
-                        if "latitude" in item and "longitude" in item:
-                            latitude = item["latitude"]
-                            longitude = item["longitude"]
-                        elif "coordinate" in item and isinstance(item["coordinate"], dict):
-                            coord = item["coordinate"]
-                            latitude = coord.get("latitude")
-                            longitude = coord.get("longitude")
-                        elif "place" in item and isinstance(item["place"], dict):
-                            place = item["place"]
-                            if "coordinate" in place:
-                                coord = place["coordinate"]
-                                latitude = coord.get("latitude")
-                                longitude = coord.get("longitude")
-                            elif "location" in place and isinstance(place["location"], dict):
-                                loc = place["location"]
-                                latitude = loc.get("latitude")
-                                longitude = loc.get("longitude")
-                        elif "location" in item and isinstance(item["location"], dict):
-                            loc = item["location"]
-                            latitude = loc.get("latitude")
-                            longitude = loc.get("longitude")
-                        
-                        for name_key in ["name", "place_name", "address", "city"]:
-                            if name_key in item and item[name_key]:
-                                name = str(item[name_key])
-                                break
-                            elif "place" in item and isinstance(item["place"], dict) and name_key in item["place"]:
-                                name = str(item["place"][name_key])
-                                break
-                    
-                    if latitude is not None and longitude is not None:
-                        if not timestamp:
-                            timestamp = datetime.now()
-                        
-                        if date_from and timestamp < date_from:
-                            continue
-                        if date_to and timestamp > date_to:
-                            continue
-                        
-                        locations.append(
-                            LocationPoint(
-                                latitude=float(latitude),
-                                longitude=float(longitude),
-                                timestamp=timestamp,
-                                source="Facebook Location",
-                                context=name[:200] if name else "Location"
-                            )
-                        )
-            except Exception as e:
-                logger.error(f"Error processing Facebook location file {location_file}: {e}")
-                logger.debug(traceback.format_exc())
-        
-        for post_file in post_files:
-            try:
-                with post_file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                
-                posts = []
-                if isinstance(data, list):
-                    posts = data
-                elif isinstance(data, dict):
-                    for key in ["posts", "your_posts", "activity"]:
-                        if key in data and isinstance(data[key], list):
-                            posts = data[key]
-                            break
-                
-                for post in posts:
-                    if not isinstance(post, dict):
-                        continue
-                        
-                    timestamp = None
-                    latitude = None
-                    longitude = None
-                    context = ""
-                    
-                    for content_key in ["post", "content", "message", "text"]:
-                        if content_key in post and post[content_key]:
-                            context = str(post[content_key])
-                            break
-                    
-                    for time_key in ["timestamp", "time", "created_time"]:
-                        if time_key in post:
-                            try:
-                                if isinstance(post[time_key], int):
-                                    timestamp = datetime.fromtimestamp(post[time_key])
-                                elif isinstance(post[time_key], str):
-                                    timestamp = datetime.fromisoformat(post[time_key].replace("Z", "+00:00"))
-                                break
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    location_found = False
-                    
-                    if "latitude" in post and "longitude" in post:
-                        latitude = post["latitude"]
-                        longitude = post["longitude"]
-                        location_found = True
-                    elif "place" in post and isinstance(post["place"], dict):
-                        place = post["place"]
-                        if "coordinate" in place and isinstance(place["coordinate"], dict):
-                            coord = place["coordinate"]
-                            latitude = coord.get("latitude")
-                            longitude = coord.get("longitude")
-                            location_found = True
-                        elif "location" in place and isinstance(place["location"], dict):
-                            loc = place["location"]
-                            latitude = loc.get("latitude")
-                            longitude = loc.get("longitude")
-                            location_found = True
-                    elif "location" in post and isinstance(post["location"], dict):
-                        loc = post["location"]
+        The parsers leave them undated so that the ingest manifest does not
+        keep the time of the run that first parsed them.
+        """
+        undated = []
+        for point in points:
+            if point.timestamp is None:
+                undated.append(point)
+            else:
+                yield point
+        if not undated:
+            return
+        now = datetime.now()
+        if (date_from and now < date_from) or (date_to and now > date_to):
+            return
+        for point in undated:
+            yield replace(point, timestamp=now)
+
+    def _parse_archive_file(self, path: DataPath, date_from: Optional[datetime],
+                            date_to: Optional[datetime]) -> Iterator[LocationPoint]:
+        if any(fnmatch(path.name, pattern.rsplit("/", 1)[-1]) for pattern in POST_PATTERNS):
+            return self._parse_post_file(path, date_from, date_to)
+        return self._parse_location_file(path, date_from, date_to)
+
+    def _parse_location_file(self, location_file: DataPath, date_from: Optional[datetime],
+                             date_to: Optional[datetime]) -> Iterator[LocationPoint]:
+        with location_file.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        location_items = []
+
+        if isinstance(data, list):
+            location_items = data
+        elif isinstance(data, dict):
+            for key in ["location_history", "locations", "history", "visits", "places_visited", "check_ins"]:
+                if key in data and isinstance(data[key], list):
+                    location_items = data[key]
+                    break
+
+        timestamps = TimestampParser()
+        for item in location_items:
+            timestamp = None
+            latitude = None
+            longitude = None
+            name = ""
+
+            if isinstance(item, dict):
+                timestamp = timestamps.first(item, LOCATION_TIME_KEYS)
+
+                if "latitude" in item and "longitude" in item:
+                    latitude = item["latitude"]
+                    longitude = item["longitude"]
+                elif "coordinate" in item and isinstance(item["coordinate"], dict):
+                    coord = item["coordinate"]
+                    latitude = coord.get("latitude")
+                    longitude = coord.get("longitude")
+                elif "place" in item and isinstance(item["place"], dict):
+                    place = item["place"]
+                    if "coordinate" in place:
+                        coord = place["coordinate"]
+                        latitude = coord.get("latitude")
+                        longitude = coord.get("longitude")
+                    elif "location" in place and isinstance(place["location"], dict):
+                        loc = place["location"]
                         latitude = loc.get("latitude")
                         longitude = loc.get("longitude")
-                        location_found = True
-                    
-                    if location_found and latitude is not None and longitude is not None:
-                        if not timestamp:
-                            timestamp = datetime.now()
-                            
-                        if date_from and timestamp < date_from:
-                            continue
-                        if date_to and timestamp > date_to:
-                            continue
-                            
-                        locations.append(
-                            LocationPoint(
-                                latitude=float(latitude),
-                                longitude=float(longitude),
-                                timestamp=timestamp,
-                                source="Facebook Post",
-                                context=context[:200]
-                            )
-                        )
-            except Exception as e:
-                logger.error(f"Error processing Facebook posts file {post_file}: {e}")
-                logger.debug(traceback.format_exc())
-        
-        return locations
-    
+                elif "location" in item and isinstance(item["location"], dict):
+                    loc = item["location"]
+                    latitude = loc.get("latitude")
+                    longitude = loc.get("longitude")
+
+                for name_key in ["name", "place_name", "address", "city"]:
+                    if name_key in item and item[name_key]:
+                        name = str(item[name_key])
+                        break
+                    elif "place" in item and isinstance(item["place"], dict) and name_key in item["place"]:
+                        name = str(item["place"][name_key])
+                        break
+
+            if latitude is not None and longitude is not None:
+                # Undated points are stamped and filtered in _stamp_undated
+                if timestamp is not None:
+                    if date_from and timestamp < date_from:
+                        continue
+                    if date_to and timestamp > date_to:
+                        continue
+
+                yield LocationPoint(
+                    latitude=float(latitude),
+                    longitude=float(longitude),
+                    timestamp=timestamp,
+                    source="Facebook Location",
+                    context=name[:200] if name else "Location"
+                )
+
+    def _parse_post_file(self, post_file: DataPath, date_from: Optional[datetime],
+                         date_to: Optional[datetime]) -> Iterator[LocationPoint]:
+        with post_file.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        posts = []
+        if isinstance(data, list):
+            posts = data
+        elif isinstance(data, dict):
+            for key in ["posts", "your_posts", "activity"]:
+                if key in data and isinstance(data[key], list):
+                    posts = data[key]
+                    break
+
+        timestamps = TimestampParser()
+        for post in posts:
+            if not isinstance(post, dict):
+                continue
+
+            latitude = None
+            longitude = None
+            context = ""
+
+            for content_key in ["post", "content", "message", "text"]:
+                if content_key in post and post[content_key]:
+                    context = str(post[content_key])
+                    break
+
+            timestamp = timestamps.first(post, POST_TIME_KEYS)
+
+            location_found = False
+
+            if "latitude" in post and "longitude" in post:
+                latitude = post["latitude"]
+                longitude = post["longitude"]
+                location_found = True
+            elif "place" in post and isinstance(post["place"], dict):
+                place = post["place"]
+                if "coordinate" in place and isinstance(place["coordinate"], dict):
+                    coord = place["coordinate"]
+                    latitude = coord.get("latitude")
+                    longitude = coord.get("longitude")
+                    location_found = True
+                elif "location" in place and isinstance(place["location"], dict):
+                    loc = place["location"]
+                    latitude = loc.get("latitude")
+                    longitude = loc.get("longitude")
+                    location_found = True
+            elif "location" in post and isinstance(post["location"], dict):
+                loc = post["location"]
+                latitude = loc.get("latitude")
+                longitude = loc.get("longitude")
+                location_found = True
+
+            if location_found and latitude is not None and longitude is not None:
+                # Undated points are stamped and filtered in _stamp_undated
+                if timestamp is not None:
+                    if date_from and timestamp < date_from:
+                        continue
+                    if date_to and timestamp > date_to:
+                        continue
+
+                yield LocationPoint(
+                    latitude=float(latitude),
+                    longitude=float(longitude),
+                    timestamp=timestamp,
+                    source="Facebook Post",
+                    context=context[:200]
+                )
+
     def search_for_targets(self, search_term: str) -> List[Dict[str, Any]]:
         targets = []
 
@@ -245,17 +239,8 @@ class FacebookPlugin(ArchiveSocialMediaPlugin):
         if archive_root is None:
             return targets
 
-        location_patterns = [
-            "**/location_history.json",
-            "**/your_location_history.json",
-            "**/location_history*.json",
-            "**/places_visited.json",
-            "**/check-ins.json",
-        ]
-        location_files = list(self.iter_data_files(archive_root, location_patterns))
-
-        post_patterns = ["**/posts*.json", "**/your_posts*.json"]
-        post_files = list(self.iter_data_files(archive_root, post_patterns))
+        location_files = list(self.iter_data_files(archive_root, LOCATION_PATTERNS))
+        post_files = list(self.iter_data_files(archive_root, POST_PATTERNS))
         
         for location_file in location_files:
             try:
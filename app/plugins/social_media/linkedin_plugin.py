@@ -15,7 +15,7 @@ import logging
 
 from app.plugins.base_plugin import LocationPoint
 from app.plugins.geocoding_helper import GeocodingHelper
-from app.plugins.social_media.base import ArchiveSocialMediaPlugin
+from app.plugins.social_media.base import ArchiveSocialMediaPlugin, DataPath
 
 logger = logging.getLogger(__name__)
 
@@ -89,7 +89,7 @@ class LinkedInPlugin(ArchiveSocialMediaPlugin):
 
         locations: List[LocationPoint] = []
 
-        data_root: Optional[Path] = None
+        data_root: Optional[DataPath] = None
         if target:
             candidate = Path(target).expanduser()
             if candidate.exists():
@@ -127,7 +127,7 @@ class LinkedInPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_profile(self, data_dir: Path) -> List[LocationPoint]:
+    def _process_profile(self, data_dir: DataPath) -> List[LocationPoint]:
         """Extract locations from user's profile data"""
         locations: List[LocationPoint] = []
 
@@ -161,7 +161,7 @@ class LinkedInPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_connections(self, data_dir: Path) -> List[LocationPoint]:
+    def _process_connections(self, data_dir: DataPath) -> List[LocationPoint]:
         """Extract locations from user's connections"""
         locations: List[LocationPoint] = []
 
@@ -232,12 +232,12 @@ class LinkedInPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_jobs(self, data_dir: Path) -> List[LocationPoint]:
+    def _process_jobs(self, data_dir: DataPath) -> List[LocationPoint]:
         """Extract locations from user's job history"""
         locations: List[LocationPoint] = []
 
         # Look for positions.json or work_experience.json
-        jobs_file: Optional[Path] = None
+        jobs_file: Optional[DataPath] = None
         for filename in ["positions.json", "work_experience.json", "Jobs.json"]:
             potential_file = data_dir / filename
             if potential_file.exists():
@@ -340,7 +340,7 @@ class LinkedInPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_education(self, data_dir: Path) -> List[LocationPoint]:
+    def _process_education(self, data_dir: DataPath) -> List[LocationPoint]:
         """Extract locations from user's education history"""
         locations: List[LocationPoint] = []
 
@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from app.plugins.base_plugin import LocationPoint
 from app.plugins.geocoding_helper import GeocodingHelper
-from app.plugins.social_media.base import ArchiveSocialMediaPlugin
+from app.plugins.social_media.base import ArchiveSocialMediaPlugin, DataPath
 
 logger = logging.getLogger(__name__)
 
@@ -98,7 +98,7 @@ class SnapchatPlugin(ArchiveSocialMediaPlugin):
 
         # Process Snapchat Memories
         if process_memories:
-            memories_files: List[Path] = []
+            memories_files: List[DataPath] = []
             if configured_memories is not None:
                 memories_files.append(configured_memories)
             if archive_root is not None:
@@ -123,7 +123,7 @@ class SnapchatPlugin(ArchiveSocialMediaPlugin):
         logger.info(f"Total Snapchat locations found: {len(locations)}")
         return locations
     
-    def _extract_memories_locations(self, file_path: Path, date_from: Optional[datetime],
+    def _extract_memories_locations(self, file_path: DataPath, date_from: Optional[datetime],
                                    date_to: Optional[datetime]) -> List[LocationPoint]:
         """
         Extract location data from Snapchat memories file
@@ -257,7 +257,7 @@ class SnapchatPlugin(ArchiveSocialMediaPlugin):
             
         return locations
     
-    def _extract_story_locations(self, data_dir: Path, date_from: Optional[datetime],
+    def _extract_story_locations(self, data_dir: DataPath, date_from: Optional[datetime],
                                 date_to: Optional[datetime]) -> List[LocationPoint]:
         """
         Extract location data from Snapchat stories
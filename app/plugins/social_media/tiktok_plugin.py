@@ -1,7 +1,5 @@
-import glob
 import json
 import logging
-import os
 import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
@@ -56,15 +54,14 @@ class TikTokPlugin(ArchiveSocialMediaPlugin):
             logger.warning("TikTok data directory not found")
             return locations
 
-        data_dir = str(archive_root)
         attempt_geocoding = self.config.get("attempt_geocoding", True)
         
         # Look for different types of TikTok data files that might contain location data
         
         # 1. Video data - newer exports
-        video_files = []
-        for pattern in ["**/videos*.json", "**/video_list.json", "**/Videos/*.json"]:
-            video_files.extend(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+        video_files = list(self.iter_data_files(
+            archive_root, ["**/videos*.json", "**/video_list.json", "**/Videos/*.json"]
+        ))
         
         logger.info(f"Found {len(video_files)} TikTok video files")
         
@@ -72,7 +69,7 @@ class TikTokPlugin(ArchiveSocialMediaPlugin):
         for video_file in video_files:
             try:
                 logger.debug(f"Processing TikTok video file: {video_file}")
-                with open(video_file, 'r', encoding='utf-8') as f:
+                with video_file.open('r', encoding='utf-8') as f:
                     data = json.load(f)
                 
                 # Handle different possible structures
@@ -235,16 +232,16 @@ class TikTokPlugin(ArchiveSocialMediaPlugin):
                 logger.error(f"Error processing TikTok video file {video_file}: {e}")
         
         # 2. Look for user activity data that might have location info
-        activity_files = []
-        for pattern in ["**/user_data.json", "**/activity.json", "**/UserActivity/*.json"]:
-            activity_files.extend(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+        activity_files = list(self.iter_data_files(
+            archive_root, ["**/user_data.json", "**/activity.json", "**/UserActivity/*.json"]
+        ))
         
         logger.info(f"Found {len(activity_files)} TikTok activity files")
         
         for activity_file in activity_files:
             try:
                 logger.debug(f"Processing TikTok activity file: {activity_file}")
-                with open(activity_file, 'r', encoding='utf-8') as f:
+                with activity_file.open('r', encoding='utf-8') as f:
                     data = json.load(f)
                 
                 # Different possible data structures
@@ -1,12 +1,12 @@
-import glob
 import json
 import logging
 import os
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from app.plugins.base_plugin import LocationPoint
-from app.plugins.social_media.base import ArchiveSocialMediaPlugin
+from app.plugins.social_media.base import ArchiveSocialMediaPlugin, DataPath
 
 logger = logging.getLogger(__name__)
 
@@ -50,26 +50,25 @@ class TwitterPlugin(ArchiveSocialMediaPlugin):
         locations: List[LocationPoint] = []
         configured_archive = self.config.get("archive_location", "")
 
-        archive_location: Optional[str] = None
+        archive_location: Optional[DataPath] = None
         if configured_archive:
             candidate = os.path.expanduser(configured_archive)
             if os.path.exists(candidate):
-                archive_location = candidate
+                archive_location = Path(candidate)
 
         if archive_location is None:
-            archive_root = self.resolve_archive_root()
-            if archive_root is None:
+            archive_location = self.resolve_archive_root()
+            if archive_location is None:
                 return locations
-            archive_location = str(archive_root)
 
         # Look for tweet.js or tweets.json files
-        tweet_files = []
-        for pattern in ["**/tweet.js", "**/tweets.json", "**/tweet_*.js"]:
-            tweet_files.extend(glob.glob(os.path.join(archive_location, pattern), recursive=True))
+        tweet_files = list(self.iter_data_files(
+            archive_location, ["**/tweet.js", "**/tweets.json", "**/tweet_*.js"]
+        ))
         
         for tweet_file in tweet_files:
             try:
-                with open(tweet_file, 'r', encoding='utf-8') as f:
+                with tweet_file.open('r', encoding='utf-8') as f:
                     content = f.read()
                     # Twitter archives often prefix JSON with a variable assignment
                     if content.startswith("window.YTD.tweet"):
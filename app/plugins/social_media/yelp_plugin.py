@@ -1,14 +1,23 @@
 import csv
-import glob
 import json
-import os
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.plugins.base_plugin import LocationPoint
 from app.plugins.geocoding_helper import GeocodingHelper
-from app.plugins.social_media.base import ArchiveSocialMediaPlugin
+from app.plugins.social_media.base import ArchiveSocialMediaPlugin, DataPath
+
+
+@dataclass
+class _PendingGeocode:
+    """A business whose coordinates must be geocoded, best query first."""
+    queries: Tuple[str, ...]
+    timestamp: datetime
+    source: str
+    context: str
+
 
 class YelpPlugin(ArchiveSocialMediaPlugin):
     data_source_url = "https://www.yelp.com"
@@ -58,41 +67,81 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
         if archive_root is None:
             return locations
 
-        data_dir = str(archive_root)
-        attempt_geocoding = self.config.get("attempt_geocoding", True)
+        data_dir = archive_root
+        # Businesses without coordinates are collected here and geocoded in
+        # one batch, so repeated businesses cost a single lookup
+        pending: Optional[List[_PendingGeocode]] = (
+            [] if self.config.get("attempt_geocoding", True) else None
+        )
 
         # Process JSON files (Yelp user data exports)
         json_locations = self._process_json_files(
-            data_dir, target, attempt_geocoding, date_from, date_to
+            data_dir, target, pending, date_from, date_to
         )
         locations.extend(json_locations)
 
         # Process CSV files (saved business lists, reviews)
         csv_locations = self._process_csv_files(
-            data_dir, target, attempt_geocoding, date_from, date_to
+            data_dir, target, pending, date_from, date_to
         )
         locations.extend(csv_locations)
 
         # Process bookmarks HTML files (saved from Yelp bookmarks page)
         html_locations = self._process_html_files(
-            data_dir, target, attempt_geocoding, date_from, date_to
+            data_dir, target, pending, date_from, date_to
         )
         locations.extend(html_locations)
 
+        if pending:
+            locations.extend(self._geocode_pending(pending))
+
+        return locations
+
+    def _geocode_pending(self, pending: List[_PendingGeocode]) -> List[LocationPoint]:
+        """Geocode deferred businesses, falling back to later queries for misses."""
+        locations: List[LocationPoint] = []
+        remaining = pending
+        depth = 0
+        while remaining:
+            queries = [entry.queries[depth] for entry in remaining]
+            results = self.geocoder.geocode_many(queries)
+            unresolved = []
+            for entry, query in zip(remaining, queries):
+                lat, lon = results.get(query, (None, None))
+                if lat is not None and lon is not None:
+                    locations.append(
+                        LocationPoint(
+                            latitude=lat,
+                            longitude=lon,
+                            timestamp=entry.timestamp,
+                            source=entry.source,
+                            context=entry.context,
+                        )
+                    )
+                elif len(entry.queries) > depth + 1:
+                    unresolved.append(entry)
+            remaining = unresolved
+            depth += 1
         return locations
+
+    @staticmethod
+    def _geocode_queries(business_name: str, address: Optional[str]) -> Tuple[str, ...]:
+        if address:
+            return (f"{business_name}, {address}", business_name)
+        return (business_name,)
     
-    def _process_json_files(self, data_dir: str, target: str, attempt_geocoding: bool, 
+    def _process_json_files(self, data_dir: DataPath, target: str, pending: Optional[List[_PendingGeocode]],
                            date_from: Optional[datetime], date_to: Optional[datetime]) -> List[LocationPoint]:
         """Process JSON files containing Yelp data."""
         locations = []
         
-        json_files = []
-        for pattern in ["**/reviews.json", "**/bookmarks.json", "**/user_data.json", "*.json"]:
-            json_files.extend(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+        json_files = list(self.iter_data_files(
+            data_dir, ["**/reviews.json", "**/bookmarks.json", "**/user_data.json", "*.json"]
+        ))
         
         for json_file in json_files:
             try:
-                with open(json_file, 'r', encoding='utf-8', errors='ignore') as f:
+                with json_file.open('r', encoding='utf-8', errors='ignore') as f:
                     data = json.load(f)
                     
                 # Format 1: Direct list of reviews/bookmarks
@@ -104,7 +153,7 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                         # Process business info
                         business = item.get('business')
                         if business and isinstance(business, dict):
-                            loc = self._extract_business_location(business, item, attempt_geocoding, date_from, date_to)
+                            loc = self._extract_business_location(business, item, pending, date_from, date_to)
                             if loc:
                                 locations.append(loc)
                 
@@ -120,7 +169,7 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                                 # Process business info
                                 business = item.get('business')
                                 if business and isinstance(business, dict):
-                                    loc = self._extract_business_location(business, item, attempt_geocoding, date_from, date_to)
+                                    loc = self._extract_business_location(business, item, pending, date_from, date_to)
                                     if loc:
                                         locations.append(loc)
             except Exception as e:
@@ -128,18 +177,16 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_csv_files(self, data_dir: str, target: str, attempt_geocoding: bool,
+    def _process_csv_files(self, data_dir: DataPath, target: str, pending: Optional[List[_PendingGeocode]],
                           date_from: Optional[datetime], date_to: Optional[datetime]) -> List[LocationPoint]:
         """Process CSV files containing Yelp data."""
         locations = []
         
-        csv_files = []
-        for pattern in ["*.csv"]:
-            csv_files.extend(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+        csv_files = list(self.iter_data_files(data_dir, ["*.csv"]))
         
         for csv_file in csv_files:
             try:
-                with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
+                with csv_file.open('r', encoding='utf-8', errors='ignore') as f:
                     reader = csv.reader(f)
                     headers = next(reader, None)
                     
@@ -196,16 +243,8 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                             if address_col is not None and len(row) > address_col:
                                 address = row[address_col]
                             
-                            # Try geocoding if we don't have coordinates but have an address
-                            if (lat is None or lon is None) and address and attempt_geocoding:
-                                lat, lon = self.geocoder.geocode(f"{business_name}, {address}")
-                            
-                            # If we still don't have coordinates but have a business name, try geocoding just the name
-                            if (lat is None or lon is None) and attempt_geocoding:
-                                lat, lon = self.geocoder.geocode(business_name)
-                            
-                            # Skip if we couldn't determine coordinates
-                            if lat is None or lon is None:
+                            # Skip if we can't determine coordinates now or by geocoding later
+                            if (lat is None or lon is None) and pending is None:
                                 continue
                             
                             # Get date if available
@@ -232,6 +271,17 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                             if address:
                                 context += f" at {address}"
                             
+                            if lat is None or lon is None:
+                                pending.append(
+                                    _PendingGeocode(
+                                        queries=self._geocode_queries(business_name, address),
+                                        timestamp=timestamp,
+                                        source="Yelp Business",
+                                        context=context,
+                                    )
+                                )
+                                continue
+                            
                             locations.append(
                                 LocationPoint(
                                     latitude=lat,
@@ -248,18 +298,16 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
         
         return locations
     
-    def _process_html_files(self, data_dir: str, target: str, attempt_geocoding: bool,
+    def _process_html_files(self, data_dir: DataPath, target: str, pending: Optional[List[_PendingGeocode]],
                            date_from: Optional[datetime], date_to: Optional[datetime]) -> List[LocationPoint]:
         """Process HTML files containing Yelp bookmarks or reviews."""
         locations = []
         
-        html_files = []
-        for pattern in ["*.html", "*.htm"]:
-            html_files.extend(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+        html_files = list(self.iter_data_files(data_dir, ["*.html", "*.htm"]))
         
         for html_file in html_files:
             try:
-                with open(html_file, 'r', encoding='utf-8', errors='ignore') as f:
+                with html_file.open('r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
                 
                 # Look for Yelp business name patterns
@@ -297,29 +345,18 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                         if date_to and timestamp > date_to:
                             continue
                         
-                        # Try geocoding the business
-                        lat = None
-                        lon = None
-                        if attempt_geocoding:
-                            if address:
-                                lat, lon = self.geocoder.geocode(f"{business_name}, {address}")
-                            
-                            # If we still don't have coordinates, try just the business name
-                            if lat is None or lon is None:
-                                lat, lon = self.geocoder.geocode(business_name)
-                        
-                        if lat is not None and lon is not None:
+                        # Queue the business for batch geocoding
+                        if pending is not None:
                             context = business_name
                             if address:
                                 context += f" at {address}"
                             
-                            locations.append(
-                                LocationPoint(
-                                    latitude=lat,
-                                    longitude=lon,
+                            pending.append(
+                                _PendingGeocode(
+                                    queries=self._geocode_queries(business_name, address),
                                     timestamp=timestamp,
                                     source="Yelp HTML Export",
-                                    context=context
+                                    context=context,
                                 )
                             )
                     except Exception as e:
@@ -329,7 +366,7 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                 
         return locations
     
-    def _extract_business_location(self, business: Dict, item: Dict, attempt_geocoding: bool,
+    def _extract_business_location(self, business: Dict, item: Dict, pending: Optional[List[_PendingGeocode]],
                                  date_from: Optional[datetime], date_to: Optional[datetime]) -> Optional[LocationPoint]:
         """Extract location data from a business object."""
         try:
@@ -354,16 +391,8 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                 if address_parts:
                     address = ", ".join(address_parts)
             
-            # Try geocoding if we don't have coordinates but have an address
-            if (lat is None or lon is None) and address and attempt_geocoding:
-                lat, lon = self.geocoder.geocode(f"{business_name}, {address}")
-            
-            # If we still don't have coordinates, try just the business name
-            if (lat is None or lon is None) and attempt_geocoding:
-                lat, lon = self.geocoder.geocode(business_name)
-            
-            # Skip if we couldn't determine coordinates
-            if lat is None or lon is None:
+            # Skip if we can't determine coordinates now or by geocoding later
+            if (lat is None or lon is None) and pending is None:
                 return None
             
             # Get timestamp from item (review date or visit date)
@@ -402,6 +431,18 @@ class YelpPlugin(ArchiveSocialMediaPlugin):
                 stars = "★" * int(rating) + "☆" * (5 - int(rating))
                 context += f" | Rating: {stars} ({rating}/5)"
             
+            # Defer geocoding to the batch pass
+            if lat is None or lon is None:
+                pending.append(
+                    _PendingGeocode(
+                        queries=self._geocode_queries(business_name, address),
+                        timestamp=timestamp,
+                        source="Yelp Business",
+                        context=context,
+                    )
+                )
+                return None
+            
             # Create location point
             return LocationPoint(
                 latitude=float(lat),
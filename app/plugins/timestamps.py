@@ -0,0 +1,272 @@
+"""Turn the timestamps found in exports into datetimes.
+
+Exports store times as ISO 8601 strings, epoch seconds or milliseconds
+(as numbers or as digit strings), RFC 2822 mail dates or some fixed
+``strptime`` format, and one field of one export almost always sticks to
+one of them.  :class:`TimestampParser` works out the format of a field
+from its first value and keeps converting with it while it fits, instead
+of trying every format on every value; only a value that does not fit
+makes it detect again.
+
+Digit strings are where formats overlap: ``"20240101"`` is both an ISO
+8601 date and an epoch value.  A format detected from a digit string is
+therefore only reused for digit strings of the same length, and eight
+digit strings, which ``datetime.fromisoformat`` reads as ``YYYYMMDD``,
+are detected afresh every time, so a value parses the same whatever came
+before it.  Fields given an epoch unit read digit strings as epoch values
+only.
+
+Numbers take a fast path: their unit (seconds, milliseconds,
+microseconds or nanoseconds) follows from their magnitude, unless the
+field's unit is given.  :meth:`TimestampParser.parse_column` converts a
+whole column of one field at once: numbers are scaled in a single numpy
+pass and strings go through the detected converter in one ``map``.
+
+Results follow :func:`datetime.fromtimestamp` and
+:func:`datetime.fromisoformat`: epoch values become naive local times
+and strings keep whatever offset they carry, unless the parser is given
+a ``tz`` that naive results are placed in.
+"""
+
+from __future__ import annotations
+
+import email.utils
+from datetime import datetime, tzinfo
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+#: Divisor turning an epoch value in each unit into seconds
+EPOCH_UNITS = {"s": 1.0, "ms": 1e3, "us": 1e6, "ns": 1e9}
+
+# Errors a converter raises for a value it does not fit
+_MISFIT = (ValueError, TypeError, OverflowError, OSError)
+
+_NUMBERS = (int, float, np.integer, np.floating)
+
+# Digit count of a ``YYYYMMDD`` date, which is also a valid epoch value
+_AMBIGUOUS_DIGITS = 8
+
+Converter = Callable[[str], datetime]
+
+
+def epoch_unit(value: float) -> str:
+    """Guess the unit of an epoch value from its magnitude.
+
+    Seconds stay below 1e11 until the year 5138, so anything larger is
+    taken to be milliseconds, microseconds or nanoseconds.
+    """
+    magnitude = abs(value)
+    if magnitude >= 1e17:
+        return "ns"
+    if magnitude >= 1e14:
+        return "us"
+    if magnitude >= 1e11:
+        return "ms"
+    return "s"
+
+
+def _is_number_string(value: str) -> bool:
+    digits = value[1:] if value[:1] in "+-" else value
+    return digits.replace(".", "", 1).isdigit()
+
+
+def _shape(value: str) -> Optional[int]:
+    """Number of integer digits of a digit string, ``None`` for other strings."""
+    if not _is_number_string(value):
+        return None
+    return len(value.lstrip("+-").partition(".")[0])
+
+
+def _from_iso_zulu(value: str) -> datetime:
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11
+    if value[-1:] in "Zz":
+        return datetime.fromisoformat(value[:-1] + "+00:00")
+    raise ValueError(f"Not an ISO 8601 timestamp: {value!r}")
+
+
+def _from_rfc2822(value: str) -> datetime:
+    parsed = email.utils.parsedate_to_datetime(value)
+    if parsed is None:  # Python < 3.10 returns None instead of raising
+        raise ValueError(f"Not an RFC 2822 date: {value!r}")
+    return parsed
+
+
+class TimestampParser:
+    """Converts the timestamps of one or more fields, detecting each field's format once.
+
+    Parameters
+    ----------
+    tz:
+        Time zone for naive results and epoch values; by default epoch
+        values become naive local times and naive strings stay naive.
+    units:
+        Epoch unit of fields whose values are not to be told apart by
+        magnitude, e.g. ``{"timestampMs": "ms"}``.
+    formats:
+        ``strptime`` formats to try after ISO 8601, epoch values and
+        RFC 2822 dates.
+    """
+
+    def __init__(
+        self,
+        *,
+        tz: Optional[tzinfo] = None,
+        units: Optional[Mapping[Hashable, str]] = None,
+        formats: Sequence[str] = (),
+    ) -> None:
+        self.tz = tz
+        self.units = dict(units or {})
+        for unit in self.units.values():
+            if unit not in EPOCH_UNITS:
+                raise ValueError(f"Unknown epoch unit {unit!r}")
+        self.formats = tuple(formats)
+        # Per field: the detected converter and the shape it was detected from
+        self._converters: Dict[Hashable, Tuple[Converter, Optional[int]]] = {}
+
+    # ------------------------------------------------------------------
+    # Single values
+    # ------------------------------------------------------------------
+    def __call__(self, value: Any, field: Hashable = None) -> Optional[datetime]:
+        """Return ``value`` as a datetime, or ``None`` if it is not a timestamp.
+
+        ``field`` names where the value came from; formats are detected
+        and cached per field, and a cached format is only applied to
+        values of the shape it was detected from.
+        """
+        if isinstance(value, str):
+            cached = self._converters.get(field)
+            if cached is not None and cached[1] == _shape(value):
+                try:
+                    return self._localise(cached[0](value))
+                except _MISFIT:
+                    pass
+            return self._detect(value, field)
+        if isinstance(value, bool) or value is None:
+            return None
+        if isinstance(value, _NUMBERS):
+            try:
+                return self._from_epoch(value, field)
+            except _MISFIT:
+                return None
+        if isinstance(value, datetime):
+            return self._localise(value)
+        return None
+
+    def first(self, record: Mapping[str, Any], keys: Iterable[str]) -> Optional[datetime]:
+        """Parse the first of ``keys`` that ``record`` has a non-empty value for."""
+        for key in keys:
+            value = record.get(key)
+            if value is not None and value != "":
+                return self(value, key)
+        return None
+
+    def _from_epoch(self, value: float, field: Hashable) -> datetime:
+        unit = self.units.get(field) or epoch_unit(value)
+        if unit != "s":
+            value = value / EPOCH_UNITS[unit]
+        return datetime.fromtimestamp(value, self.tz)
+
+    def _localise(self, value: datetime) -> datetime:
+        if self.tz is not None and value.tzinfo is None:
+            return value.replace(tzinfo=self.tz)
+        return value
+
+    def _detect(self, value: str, field: Hashable) -> Optional[datetime]:
+        text = value.strip()
+        if not text:
+            return None
+        for converter in self._candidates(text, field):
+            try:
+                parsed = converter(text)
+            except _MISFIT:
+                continue
+            shape = _shape(text)
+            if shape != _AMBIGUOUS_DIGITS:
+                self._converters[field] = (converter, shape)
+            return self._localise(parsed)
+        return None
+
+    def _candidates(self, text: str, field: Hashable) -> Iterable[Converter]:
+        number = _is_number_string(text)
+        if number and field in self.units:
+            yield lambda item: self._from_epoch(float(item), field)
+            number = False
+        yield datetime.fromisoformat
+        yield _from_iso_zulu
+        if number:
+            yield lambda item: self._from_epoch(float(item), field)
+        for fmt in self.formats:
+            yield lambda item, fmt=fmt: datetime.strptime(item, fmt)
+        yield _from_rfc2822
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    def parse_column(self, values: Iterable[Any], field: Hashable = None) -> List[Optional[datetime]]:
+        """Parse many values of one field at once.
+
+        A column of numbers is scaled to seconds in one numpy pass; a
+        column of strings of one shape is converted with the field's
+        detected format in a single ``map``.  If any value does not fit,
+        the column is parsed value by value instead.
+        """
+        column = values.tolist() if isinstance(values, np.ndarray) else list(values)
+        if not column:
+            return []
+
+        if isinstance(column[0], _NUMBERS) and not isinstance(column[0], bool):
+            array = np.asarray(column)
+            if array.ndim == 1 and array.dtype.kind in "iuf":
+                try:
+                    return self._epoch_column(array.astype(np.float64), field)
+                except _MISFIT:
+                    pass
+            return [self(value, field) for value in column]
+
+        cached = self._column_converter(column, field)
+        if cached is not None:
+            converter, shape = cached
+            try:
+                if set(map(_shape, column)) != {shape}:
+                    raise ValueError("Values of more than one shape")
+                parsed = list(map(converter, column))
+            except _MISFIT:
+                pass
+            else:
+                if self.tz is not None:
+                    parsed = [self._localise(value) for value in parsed]
+                return parsed
+        return [self(value, field) for value in column]
+
+    def _epoch_column(self, values: np.ndarray, field: Hashable) -> List[Optional[datetime]]:
+        unit = self.units.get(field)
+        if unit is not None:
+            seconds = values / EPOCH_UNITS[unit]
+        else:
+            magnitude = np.abs(values)
+            seconds = values / np.select(
+                [magnitude >= 1e17, magnitude >= 1e14, magnitude >= 1e11], [1e9, 1e6, 1e3], 1.0
+            )
+        fromtimestamp, tz = datetime.fromtimestamp, self.tz
+        return [fromtimestamp(value, tz) for value in seconds.tolist()]
+
+    def _column_converter(
+        self, column: List[Any], field: Hashable
+    ) -> Optional[Tuple[Converter, Optional[int]]]:
+        """The converter for a column of strings, detected from its first value,
+        and the shape of value it applies to."""
+        first = column[0]
+        if not isinstance(first, str):
+            return None
+        cached = self._converters.get(field)
+        if cached is None or cached[1] != _shape(first):
+            self._converters.pop(field, None)
+            if self._detect(first, field) is None:
+                return None
+        return self._converters.get(field)
+
+
+def parse_timestamps(values: Iterable[Any], **kwargs: Any) -> List[Optional[datetime]]:
+    """Parse a column of timestamps with a fresh :class:`TimestampParser`."""
+    return TimestampParser(**kwargs).parse_column(values)
@@ -10,6 +10,7 @@ import datetime
 from xml.dom import minidom
 from PyQt5.QtCore import QObject
 from .error_handling import ErrorTracker  # Fixed import path
+from app.exporters.streaming import open_output, write_csv, write_json_array
 
 # Handle simplekml import gracefully
 try:
@@ -182,29 +183,27 @@ class ExportManager(QObject):
         placemark.style.iconstyle.icon.href = f"http://maps.google.com/mapfiles/kml/pushpin/{color[0]}.png"
     
     def export_to_csv(self, locations_list, file_path):
-        """Export locations to CSV format"""
+        """Export locations to CSV format, streaming rows through a buffered writer"""
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Latitude', 'Longitude', 'Date/Time', 'Source', 'Title', 'Description', 'Accuracy']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                
-                for location in locations_list.locations:
-                    if not location.is_valid():
-                        continue
-                        
-                    writer.writerow({
-                        'Latitude': location.latitude,
-                        'Longitude': location.longitude,
-                        'Date/Time': location.datetime.isoformat() if location.datetime else '',
-                        'Source': location.source,
-                        'Title': location.get_context('title', ''),
-                        'Description': location.get_context('description', ''),
-                        'Accuracy': location.accuracy
-                    })
+            fieldnames = ['Latitude', 'Longitude', 'Date/Time', 'Source', 'Title', 'Description', 'Accuracy']
+            rows = (
+                (
+                    location.latitude,
+                    location.longitude,
+                    location.datetime.isoformat() if location.datetime else '',
+                    location.source,
+                    location.get_context('title', ''),
+                    location.get_context('description', ''),
+                    location.accuracy
+                )
+                for location in locations_list.locations
+                if location.is_valid()
+            )
+            
+            with open_output(file_path) as csvfile:
+                written = write_csv(rows, csvfile, fieldnames)
             
-            logger.info(f"Exported {locations_list.count()} locations to CSV file: {file_path}")
+            logger.info(f"Exported {written} locations to CSV file: {file_path}")
             return True
         except Exception as e:
             logger.error(f"CSV export failed: {e}")
@@ -262,23 +261,18 @@ class ExportManager(QObject):
             return False
     
     def export_to_json(self, locations_list, file_path):
-        """Export locations to JSON format"""
+        """Export locations to JSON format, serialising them in chunks"""
         try:
-            locations_data = []
-            
-            for location in locations_list.locations:
-                if not location.is_valid():
-                    continue
-                    
-                # Convert location to dictionary
-                loc_dict = location.to_dict()
-                locations_data.append(loc_dict)
+            locations_data = (
+                location.to_dict()
+                for location in locations_list.locations
+                if location.is_valid()
+            )
             
-            # Write to JSON file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(locations_data, f, indent=4, default=self._json_serializer)
+            with open_output(file_path) as f:
+                written = write_json_array(locations_data, f, default=self._json_serializer)
             
-            logger.info(f"Exported {len(locations_data)} locations to JSON file: {file_path}")
+            logger.info(f"Exported {written} locations to JSON file: {file_path}")
             return True
         except Exception as e:
             logger.error(f"JSON export failed: {e}")
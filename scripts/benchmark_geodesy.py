@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark the vectorised geodesy kernels against the scalar haversine loop."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from app.core.geo import geodesy
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare scalar and NumPy distance computations over random points."
+    )
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=1_000_000,
+        help="Number of random points (default: 1000000)",
+    )
+    parser.add_argument(
+        "--scalar-points",
+        type=int,
+        default=100_000,
+        help="Points timed for the scalar loop; its rate is extrapolated (default: 100000)",
+    )
+    parser.add_argument(
+        "--radius",
+        type=float,
+        default=5000.0,
+        help="Radius in metres for the within_radius query (default: 5000)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    return parser.parse_args(argv)
+
+
+def _time(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _report(label: str, count: int, seconds: float) -> None:
+    rate = count / seconds if seconds else float("inf")
+    print(f"{label:<28} {seconds * 1000:10.1f} ms  {rate / 1e6:8.2f} M points/s")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+
+    # Points scattered around a city-sized area so radius queries return something
+    lats = geodesy.as_coordinate_array(51.5 + rng.normal(scale=0.5, size=args.points))
+    lons = geodesy.as_coordinate_array(-0.1 + rng.normal(scale=0.5, size=args.points))
+    lat, lon = 51.5, -0.1
+
+    scalar_count = min(args.scalar_points, args.points)
+    scalar_lats = lats[:scalar_count].tolist()
+    scalar_lons = lons[:scalar_count].tolist()
+    scalar = _time(lambda: [geodesy.haversine_scalar(lat, lon, a, b) for a, b in zip(scalar_lats, scalar_lons)])
+
+    print(f"{args.points} points, radius {args.radius:.0f} m")
+    _report("scalar haversine loop", scalar_count, scalar)
+    _report("haversine (broadcast)", args.points, _time(lambda: geodesy.haversine(lat, lon, lats, lons)))
+    _report("haversine_to_point", args.points, _time(lambda: geodesy.haversine_to_point(lat, lon, lats, lons)))
+    _report("equirectangular", args.points, _time(lambda: geodesy.equirectangular(lat, lon, lats, lons)))
+    _report("within_radius", args.points, _time(lambda: geodesy.within_radius(lat, lon, lats, lons, args.radius)))
+    _report("nearest (k=10)", args.points, _time(lambda: geodesy.nearest(lat, lon, lats, lons, 10)))
+
+    extrapolated = scalar * args.points / scalar_count if scalar_count else 0.0
+    vectorised = _time(lambda: geodesy.haversine_to_point(lat, lon, lats, lons))
+    if vectorised:
+        print(f"speed-up over scalar loop: {extrapolated / vectorised:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
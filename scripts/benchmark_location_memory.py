@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Measure the per-point memory cost of location storage.
+
+Compares the old one-object-per-location layout (an instance ``__dict__``
+with a metadata dataclass and empty lists) with ``LocationDataModel``'s
+columnar store, with and without its secondary indexes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from app.core.data.location_store import LocationStore
+from app.models.location_data import Location, LocationDataModel, LocationMetadata
+
+
+class _DictLocation:
+    """The attribute layout locations used before the columnar store"""
+
+    def __init__(self, latitude, longitude, timestamp, source, context):
+        self.id = str(uuid.uuid4())
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timestamp = timestamp
+        self.source = source
+        self.context = context
+        self.geocoded = None
+        self.metadata = LocationMetadata()
+        self.address = ""
+        self.photos = []
+        self.notes = ""
+        self.verified = False
+        self._nearby_locations = []
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare per-point memory of location storage layouts.")
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=200_000,
+        help="Number of random points (default: 200000)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    return parser.parse_args(argv)
+
+
+def _measure(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    lats = rng.uniform(-60, 60, args.points).tolist()
+    lons = rng.uniform(-180, 180, args.points).tolist()
+    start = datetime(2020, 1, 1)
+    times = [start + timedelta(seconds=int(s)) for s in rng.integers(0, 10 ** 8, args.points)]
+    sources = ["twitter", "instagram", "exif", "google_takeout"]
+    contexts = [f"Check-in #{i}" for i in range(args.points)]
+
+    def rows():
+        for i in range(args.points):
+            yield lats[i], lons[i], times[i], sources[i % len(sources)], contexts[i]
+
+    def dict_objects():
+        return [_DictLocation(*row) for row in rows()]
+
+    def store_only():
+        store = LocationStore(Location._view)
+        for row in rows():
+            store.append(Location(*row)._record())
+        return store
+
+    def model():
+        model = LocationDataModel()
+        with model.batch():
+            for row in rows():
+                model.add_location(Location(*row))
+        return model
+
+    print(f"{args.points} points (input lists excluded)")
+    baseline = None
+    for label, build in (
+        ("object per location (old layout)", dict_objects),
+        ("LocationStore only", store_only),
+        ("LocationDataModel (store + indexes)", model),
+    ):
+        size = _measure(build)
+        baseline = baseline or size
+        print(f"{label:<40} {size / args.points:8.0f} B/point  {size / 2 ** 20:8.1f} MiB  {baseline / size:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Benchmark plugin catalog construction and lazy plugin loading.
+
+Every measurement runs in a fresh interpreter so module import caches from a
+previous step do not flatter the next one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_SNIPPET = """
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from app.plugins.catalog import PluginCatalog
+from app.plugins.plugin_manager import PluginManager
+mode = {mode!r}
+result = {{}}
+if mode == "import-all":
+    from app.plugins import registry
+    result["plugins"] = len(registry.plugins)
+elif mode in ("serial", "parallel"):
+    catalog = PluginCatalog(
+        [{plugin_dir!r}],
+        cache_path={cache!r},
+        max_workers={workers} if mode == "parallel" else 1,
+    )
+    result["plugins"] = len(catalog.load(force_refresh=True))
+else:
+    manager = PluginManager({plugin_dir!r})
+    manager._catalog.cache_path = __import__("pathlib").Path({cache!r})
+    result["plugins"] = len(manager.load_plugins())
+    result["load_plugins"] = time.perf_counter() - start
+    first = next(iter(manager.plugins), None)
+    if first is not None:
+        manager.get_plugin(first)
+result["seconds"] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time plugin discovery strategies in fresh interpreters.")
+    parser.add_argument(
+        "--plugin-dir",
+        default=str(ROOT / "app" / "plugins"),
+        help="Plugin directory to catalog (default: app/plugins)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for probing (default: the catalog's choice)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per strategy; the best is reported (default: 3)")
+    return parser.parse_args(argv)
+
+
+def _run(mode: str, args: argparse.Namespace, cache: str) -> dict:
+    code = _SNIPPET.format(root=str(ROOT), mode=mode, plugin_dir=args.plugin_dir, cache=cache, workers=args.workers)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=str(ROOT)
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as scratch:
+        cache = str(Path(scratch) / "plugin_catalog.json")
+        strategies = [
+            ("import-all", "import every plugin (legacy registry)"),
+            ("serial", "catalog build, serial probe"),
+            ("parallel", "catalog build, process pool"),
+            ("lazy", "load_plugins from warm cache + first get_plugin"),
+        ]
+        for mode, label in strategies:
+            try:
+                runs = [_run(mode, args, cache) for _ in range(max(1, args.repeat))]
+            except subprocess.CalledProcessError as exc:
+                print(f"{label:<50} failed: {exc.stderr.strip().splitlines()[-1:]}")
+                continue
+            best = min(runs, key=lambda run: run["seconds"])
+            extra = f"  (load_plugins {best['load_plugins'] * 1000:.1f} ms)" if "load_plugins" in best else ""
+            print(f"{label:<50} {best['seconds'] * 1000:8.1f} ms  {best['plugins']:4d} plugins{extra}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
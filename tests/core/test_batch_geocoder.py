@@ -0,0 +1,98 @@
+"""Tests for batch geocoding against local stub providers."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from app.core.geo.batch_geocoder import BatchGeocoder, GeocodeProvider, TokenBucket, normalize_address
+from app.core.geo.geocode_cache import GeocodeCache
+
+
+class StubProvider:
+    def __init__(self, known: dict[str, tuple[float, float]]) -> None:
+        self.known = known
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str):
+        with self._lock:
+            self.calls.append(query)
+        return self.known.get(query)
+
+
+def test_geocode_many_queries_each_unique_address_once() -> None:
+    stub = StubProvider({f"street {i}": (float(i), float(i)) for i in range(100)})
+    geocoder = BatchGeocoder([GeocodeProvider("stub", stub, rate_per_second=10000, burst=100)])
+    addresses = [f"  Street   {i % 100} " for i in range(10000)]
+
+    results = geocoder.geocode_many(addresses)
+
+    assert len(stub.calls) == 100
+    assert results["  Street   7 "] == (7.0, 7.0)
+    assert geocoder.stats["unique"] == 100
+    assert geocoder.stats["online_hits"] == 100
+
+
+def test_misses_fall_through_to_other_providers(tmp_path: Path) -> None:
+    primary = StubProvider({"a": (1.0, 1.0)})
+    fallback = StubProvider({"b": (2.0, 2.0)})
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"))
+    geocoder = BatchGeocoder(
+        [
+            GeocodeProvider("primary", primary, rate_per_second=1000),
+            GeocodeProvider("fallback", fallback, rate_per_second=1000),
+        ],
+        cache=cache,
+    )
+
+    results = geocoder.geocode_many(["a", "b", "c"])
+
+    assert results == {"a": (1.0, 1.0), "b": (2.0, 2.0), "c": (None, None)}
+    assert sorted(primary.calls + fallback.calls).count("c") == 2
+    assert geocoder.stats["failures"] == 1
+
+    again = geocoder.geocode_many(["A", "b"])
+    assert again == {"A": (1.0, 1.0), "b": (2.0, 2.0)}
+    assert geocoder.stats["cache_hits"] == 2
+
+
+def test_entries_keyed_by_the_raw_query_are_found(tmp_path: Path) -> None:
+    stub = StubProvider({})
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"))
+    # As migrated from the old per-file cache, which hashed the query as typed
+    cache.set_forward("New York, NY", 40.7, -74.0)
+    cache.set_forward("Paris,", 48.9, 2.35)
+    geocoder = BatchGeocoder([GeocodeProvider("stub", stub, rate_per_second=1000)], cache=cache)
+
+    results = geocoder.geocode_many(["new york, ny", "New York, NY", "Paris,"])
+
+    assert results == {"new york, ny": (40.7, -74.0), "New York, NY": (40.7, -74.0), "Paris,": (48.9, 2.35)}
+    assert stub.calls == []
+    assert cache.get_forward("new york, ny") == (40.7, -74.0)
+    assert cache.get_forward("paris") == (48.9, 2.35)
+
+
+def test_offline_lookup_short_circuits_providers() -> None:
+    stub = StubProvider({})
+    geocoder = BatchGeocoder(
+        [GeocodeProvider("stub", stub, rate_per_second=1000)],
+        offline_lookup=lambda query: (5.0, 6.0) if query == "home" else None,
+    )
+
+    assert geocoder.geocode_many(["Home"]) == {"Home": (5.0, 6.0)}
+    assert stub.calls == []
+
+
+def test_token_bucket_limits_rate() -> None:
+    bucket = TokenBucket(rate=1000, capacity=1)
+    stop = threading.Event()
+    assert bucket.acquire(stop)
+    stop.set()
+    slow = TokenBucket(rate=0.001, capacity=1)
+    assert slow.acquire(stop)
+    assert not slow.acquire(stop)
+
+
+def test_normalize_address() -> None:
+    assert normalize_address("  10 Downing   St,  London, ") == "10 downing st, london"
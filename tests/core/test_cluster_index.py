@@ -0,0 +1,104 @@
+import numpy as np
+
+from app.core.geo.cluster_index import ClusterIndex
+
+
+def _world(index, zoom):
+    return index.query(-85, -180, 85, 180, zoom)
+
+
+def test_every_zoom_level_accounts_for_all_points():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-80, 80, 5000)
+    lons = rng.uniform(-180, 180, 5000)
+
+    index = ClusterIndex(max_zoom=10)
+    index.add(range(5000), lats, lons)
+
+    for zoom in (0, 4, 10):
+        result = _world(index, zoom)
+        assert result.cluster_counts.sum() + len(result.point_ids) == 5000
+    assert len(_world(index, 0).cluster_keys) <= index.cells_per_axis(0) ** 2
+
+    # Too many points to show one by one: the deepest level answers
+    deep = _world(index, 11)
+    assert deep.zoom == 10
+    assert deep.cluster_counts.sum() + len(deep.point_ids) == 5000
+    index.max_points = 5000
+    assert len(_world(index, 11).point_ids) == 5000
+
+
+def test_points_at_one_position_stay_clustered_beyond_max_zoom():
+    index = ClusterIndex(max_zoom=12)
+    index.add(["a", "b", "c", "d"], [10.0, 10.0, 10.0, 10.001], [20.0, 20.0, 20.0, 20.0])
+
+    result = index.query(9.9, 19.9, 10.1, 20.1, 18)
+    assert result.zoom == 18
+    assert result.cluster_counts.tolist() == [3]
+    assert result.point_ids == ["d"]
+    key = int(result.cluster_keys[0])
+    assert sorted(index.cluster_members(18, key)) == ["a", "b", "c"]
+    assert index.expansion_zoom(18, key) == 18
+
+
+def test_incremental_updates_match_bulk_build():
+    rng = np.random.default_rng(1)
+    lats = 51.5 + rng.normal(scale=0.05, size=2000)
+    lons = -0.1 + rng.normal(scale=0.05, size=2000)
+
+    bulk = ClusterIndex(max_zoom=14)
+    bulk.add(range(1500), lats[:1500], lons[:1500])
+
+    incremental = ClusterIndex(max_zoom=14)
+    incremental.add(range(2000), lats, lons)
+    incremental.remove(range(1500, 2000))
+
+    for zoom in (6, 14):
+        expected = bulk.query(51, -1, 52, 1, zoom)
+        actual = incremental.query(51, -1, 52, 1, zoom)
+        np.testing.assert_array_equal(expected.cluster_keys, actual.cluster_keys)
+        np.testing.assert_array_equal(expected.cluster_counts, actual.cluster_counts)
+        np.testing.assert_allclose(expected.cluster_lats, actual.cluster_lats)
+        assert sorted(expected.point_ids) == sorted(actual.point_ids)
+
+    incremental.remove(range(1500))
+    assert len(incremental) == 0
+    assert len(_world(incremental, 6).cluster_keys) == 0
+
+
+def test_appending_batches_matches_one_add():
+    rng = np.random.default_rng(2)
+    lats = rng.uniform(40, 60, 3000)
+    lons = rng.uniform(-10, 30, 3000)
+
+    bulk = ClusterIndex(max_zoom=12)
+    bulk.add(range(3000), lats, lons)
+    batched = ClusterIndex(max_zoom=12)
+    for start in range(0, 3000, 250):
+        batched.add(range(start, start + 250), lats[start:start + 250], lons[start:start + 250])
+    batched.remove(range(0, 3000, 7))
+    batched.add(range(0, 3000, 7), lats[::7], lons[::7])
+
+    # Slots are reallocated in a different order, so compare all but the slot sums
+    for zoom in range(13):
+        for expected, actual in zip(bulk._levels[zoom][:4], batched._levels[zoom][:4]):
+            np.testing.assert_allclose(expected, actual)
+    assert sorted(_world(bulk, 12).point_ids) == sorted(_world(batched, 12).point_ids)
+
+
+def test_viewport_antimeridian_and_expansion():
+    index = ClusterIndex(max_zoom=12)
+    index.add(["a", "b", "c", "d"], [10.0, 10.001, 10.0, -40.0], [179.5, 179.501, 0.0, 179.5])
+
+    result = index.query(5.0, 170.0, 15.0, 190.0, 3)
+    assert result.cluster_counts.tolist() == [2]
+    assert result.point_ids == []
+
+    key = int(result.cluster_keys[0])
+    assert sorted(index.cluster_members(3, key)) == ["a", "b"]
+    zoom = index.expansion_zoom(3, key)
+    assert sorted(index.query(5.0, 170.0, 15.0, 190.0, zoom).point_ids) == ["a", "b"]
+
+    # Moving a point re-clusters it
+    index.add(["b"], [-40.0], [179.5])
+    assert sorted(index.query(-45.0, 170.0, -35.0, 190.0, 3).cluster_counts.tolist()) == [2]
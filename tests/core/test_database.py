@@ -0,0 +1,245 @@
+"""Tests for the SQLite-backed ``Database`` model."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.core.models.Database import LOCATION_ROW_FIELDS, Database
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> Database:
+    db = Database(str(tmp_path / "creepyai.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture()
+def target_id(database: Database) -> int:
+    project_id = database.create_project("Case")
+    return database.add_target(project_id, "Subject")
+
+
+def test_bulk_insert_streams_rows_in_chunks(database: Database, target_id: int) -> None:
+    rows = (
+        (target_id, 51.0 + i * 1e-4, -0.1, f"2024-01-01T00:{i % 60:02d}:00", "takeout", "history", 0.9, None)
+        for i in range(2500)
+    )
+    progress = []
+
+    stats = database.bulk_insert_locations(
+        rows, chunk_size=1000, drop_indexes=True, progress_callback=lambda n, rate: progress.append(n)
+    )
+
+    assert stats["rows"] == 2500
+    assert stats["chunks"] == 3
+    assert stats["rows_per_second"] > 0
+    assert progress == [1000, 2000, 2500]
+    assert len(database.get_locations(target_id)) == 2500
+
+    with database._get_connection() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'locations'")
+        indexes = {row["name"] for row in cursor.fetchall()}
+    assert {"idx_locations_target_id", "idx_locations_coordinates", "idx_locations_date"} <= indexes
+
+
+def test_add_batch_locations_encodes_context(database: Database, target_id: int) -> None:
+    added = database.add_batch_locations(
+        [
+            {"target_id": target_id, "latitude": 1.0, "longitude": 2.0, "context": {"note": "a"}},
+            {"target_id": target_id, "latitude": 3.0, "longitude": 4.0, "context": json.dumps({"note": "b"})},
+        ]
+    )
+
+    assert added == 2
+    notes = sorted(location["context"]["note"] for location in database.get_locations(target_id))
+    assert notes == ["a", "b"]
+
+
+def test_add_batch_locations_is_atomic(database: Database, target_id: int) -> None:
+    added = database.add_batch_locations(
+        [
+            {"target_id": target_id, "latitude": 1.0, "longitude": 2.0},
+            {"target_id": target_id, "latitude": None, "longitude": 4.0},
+        ]
+    )
+
+    assert added == 0
+    assert database.get_locations(target_id) == []
+
+
+@pytest.fixture()
+def city_points(database: Database, target_id: int) -> dict[str, int]:
+    points = {
+        "london": (51.5074, -0.1278),
+        "greenwich": (51.4769, 0.0005),
+        "paris": (48.8566, 2.3522),
+        "fiji": (-17.7134, 178.0650),
+        "samoa": (-13.7590, -172.1046),
+    }
+    ids = {}
+    for name, (lat, lon) in points.items():
+        ids[name] = database.add_location(target_id, lat, lon, source=name)
+    return ids
+
+
+def test_spatial_index_tracks_location_changes(database: Database, city_points: dict[str, int]) -> None:
+    with database._get_connection() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM locations_rtree")
+        assert cursor.fetchone()[0] == len(city_points)
+        cursor.execute("UPDATE locations SET latitude = 10.0, longitude = 10.0 WHERE id = ?", (city_points["paris"],))
+        cursor.execute("DELETE FROM locations WHERE id = ?", (city_points["fiji"],))
+
+    assert [loc["source"] for loc in database.query_bbox(9.5, 9.5, 10.5, 10.5)] == ["paris"]
+    assert database.query_bbox(-20, 170, -10, 180) == []
+
+
+def test_query_bbox_handles_antimeridian(database: Database, city_points: dict[str, int]) -> None:
+    found = {loc["source"] for loc in database.query_bbox(-20.0, 170.0, -10.0, -170.0)}
+    assert found == {"fiji", "samoa"}
+
+
+def test_query_radius_orders_by_distance(database: Database, city_points: dict[str, int]) -> None:
+    found = database.query_radius(51.5, -0.12, 20000)
+
+    assert [loc["source"] for loc in found] == ["london", "greenwich"]
+    assert found[0]["distance_m"] < found[1]["distance_m"] <= 20000
+
+
+def test_query_k_nearest_expands_radius(database: Database, city_points: dict[str, int]) -> None:
+    found = database.query_k_nearest(51.5, -0.12, 3, initial_radius_m=10)
+
+    assert [loc["source"] for loc in found] == ["london", "greenwich", "paris"]
+
+
+def test_bulk_insert_rebuilds_spatial_index(database: Database, target_id: int) -> None:
+    database.bulk_insert_locations(
+        ((target_id, 40.0 + i * 0.001, -74.0, None, "bulk") for i in range(50)), drop_indexes=True
+    )
+    database.add_location(target_id, 40.01, -74.0, source="after")
+
+    assert len(database.query_bbox(39.9, -74.1, 41.0, -73.9)) == 51
+
+
+def _index_names(database: Database) -> set[str]:
+    with database._read_connection() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def test_failed_bulk_insert_restores_indexes(database: Database, target_id: int) -> None:
+    before = _index_names(database)
+    rows = [(target_id, 1.0, 1.0)] * 5 + [(target_id + 100, 1.0, 1.0)]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.bulk_insert_locations(rows, drop_indexes=True, atomic=True)
+
+    assert _index_names(database) == before
+    assert database.get_locations(target_id) == []
+
+
+def test_index_rebuild_errors_do_not_mask_the_load_error(
+    database: Database, target_id: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.core.models import Database as database_module
+
+    monkeypatch.setitem(database_module._LOCATION_INDEXES, "idx_missing", "CREATE INDEX idx_missing ON missing(x)")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.bulk_insert_locations([(target_id + 100, 1.0, 1.0)], drop_indexes=True)
+    with pytest.raises(sqlite3.OperationalError):
+        database.bulk_insert_locations([(target_id, 1.0, 1.0)], drop_indexes=True)
+
+
+def test_search_locations_rejects_unknown_order_field(database: Database, target_id: int) -> None:
+    with pytest.raises(ValueError):
+        database.search_locations({"target_id": target_id, "order_by": "date; DROP TABLE locations"})
+
+
+def test_reads_do_not_wait_for_bulk_writer(database: Database, target_id: int) -> None:
+    visible = []
+
+    def on_progress(inserted: int, rate: float) -> None:
+        # Runs while the writer connection is held by the bulk load.
+        visible.append(len(database.get_locations(target_id)))
+
+    database.bulk_insert_locations(
+        ((target_id, 1.0, 1.0) for _ in range(300)), chunk_size=100, progress_callback=on_progress
+    )
+
+    assert visible == [100, 200, 300]
+
+
+def test_reader_pool_is_bounded_and_reports_waits(tmp_path: Path) -> None:
+    database = Database(str(tmp_path / "pool.db"), max_readers=2)
+    try:
+        for _ in range(5):
+            database.get_projects()
+        database.create_project("Case")
+
+        metrics = database.get_lock_metrics()
+        assert metrics["reader"]["acquisitions"] == 5
+        assert metrics["reader"]["open_connections"] == 1
+        assert metrics["reader"]["max_connections"] == 2
+        assert metrics["writer"]["acquisitions"] >= 1
+        assert metrics["writer"]["max_wait_seconds"] >= 0.0
+    finally:
+        database.close()
+
+
+def test_unfinished_page_generators_do_not_starve_readers(tmp_path: Path) -> None:
+    database = Database(str(tmp_path / "pool.db"), max_readers=1, reader_timeout=0.05)
+    try:
+        target_id = database.add_target(database.create_project("Case"), "Subject")
+        database.bulk_insert_locations((target_id, 1.0, float(i)) for i in range(10))
+
+        held = [database.iter_location_pages(target_id, page_size=2) for _ in range(3)]
+        assert [len(next(pages)) for pages in held] == [2, 2, 2]
+        assert len(database.get_locations(target_id)) == 10
+
+        for pages in held:
+            pages.close()
+        assert database._readers.qsize() == 1
+        assert database.get_lock_metrics()["reader"]["open_connections"] == 1
+    finally:
+        database.close()
+
+
+def test_read_connections_are_read_only(database: Database) -> None:
+    with pytest.raises(sqlite3.OperationalError):
+        with database._read_connection() as cursor:
+            cursor.execute("DELETE FROM projects")
+
+
+def test_iter_location_pages_streams_tuples(database: Database, target_id: int) -> None:
+    database.bulk_insert_locations(
+        (target_id, 1.0, float(i), f"2024-01-{i + 1:02d}", "s", None, None, {"i": i}) for i in range(25)
+    )
+
+    pages = list(database.iter_location_pages(target_id, page_size=10, as_tuples=True))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    first = dict(zip(LOCATION_ROW_FIELDS, pages[0][0]))
+    assert first["date"] == "2024-01-25"
+    assert first["context"] == '{"i": 24}'
+
+
+def test_iter_search_pages_decodes_context_on_request(database: Database, target_id: int) -> None:
+    database.add_location(target_id, 1.0, 2.0, source="a", context={"k": "v"})
+
+    raw = next(database.iter_search_pages({"target_id": target_id}))
+    decoded = next(database.iter_search_pages({"target_id": target_id}, decode_context=True))
+
+    assert raw[0]["context"] == '{"k": "v"}'
+    assert decoded[0]["context"] == {"k": "v"}
+
+
+def test_page_size_is_checked_when_the_pages_are_requested(database: Database, target_id: int) -> None:
+    with pytest.raises(ValueError):
+        database.iter_location_pages(target_id, page_size=0)
+    with pytest.raises(ValueError):
+        database.iter_search_pages({"target_id": target_id}, page_size=-1)
@@ -0,0 +1,64 @@
+"""Tests for the SQLite geocoding cache."""
+
+from __future__ import annotations
+
+import json
+from hashlib import md5
+from pathlib import Path
+
+from app.core.geo.geocode_cache import FORWARD, GeocodeCache
+
+
+def test_forward_and_reverse_round_trip(tmp_path: Path) -> None:
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"))
+    cache.set_forward("London", 51.5, -0.12)
+    cache.set_reverse(51.5, -0.12, "London, UK")
+    cache.close()
+
+    reopened = GeocodeCache(str(tmp_path / "geo.sqlite3"))
+    assert reopened.get_forward("London") == (51.5, -0.12)
+    assert reopened.get_reverse(51.5000000001, -0.12) == "London, UK"
+    assert reopened.get_forward("Paris") is None
+
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["disk_entries"] == 2
+
+    reopened.get_forward("London")
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_ttl_expires_entries(tmp_path: Path) -> None:
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"), ttl=-1)
+    cache.set_forward("London", 51.5, -0.12)
+
+    assert cache.get_forward("London") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"), memory_size=0, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.set_forward(name, 1.0, 1.0)
+    cache.get_forward("a")
+
+    assert cache.evict() == 1
+    assert cache.get_forward("b") is None
+    assert cache.get_forward("a") == (1.0, 1.0)
+
+
+def test_migrates_legacy_file_cache_once(tmp_path: Path) -> None:
+    legacy = tmp_path / "geocache"
+    legacy.mkdir()
+    (legacy / (md5(b"Berlin").hexdigest() + ".json")).write_text(json.dumps({"lat": 52.5, "lon": 13.4}))
+    (legacy / "notes.json").write_text("{}")
+
+    cache = GeocodeCache(str(legacy / "geo.sqlite3"))
+
+    assert cache.migrate_file_cache(str(legacy)) == 1
+    assert cache.get_forward("Berlin") == (52.5, 13.4)
+    assert sorted(p.name for p in legacy.glob("*.json")) == ["notes.json"]
+    assert cache.migrate_file_cache(str(legacy)) == 0
+    assert cache.stats()["disk_entries"] == 1
+    assert cache.get(FORWARD, md5(b"Berlin").hexdigest()) == {"lat": 52.5, "lon": 13.4}
@@ -0,0 +1,40 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.core.geo import geodesy
+
+
+def test_vectorised_haversine_matches_scalar():
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(-80, 80, 200)
+    lons = rng.uniform(-180, 180, 200)
+
+    expected = [geodesy.haversine_scalar(10.0, 20.0, a, b) for a, b in zip(lats, lons)]
+
+    np.testing.assert_allclose(geodesy.haversine_to_point(10.0, 20.0, lats, lons), expected, rtol=1e-9)
+    np.testing.assert_allclose(geodesy.haversine(10.0, 20.0, lats, lons), expected, rtol=1e-9)
+    assert geodesy.haversine(0.0, 0.0, 0.0, 1.0) == pytest.approx(2 * math.pi * geodesy.EARTH_RADIUS_M / 360)
+
+
+def test_within_radius_crosses_antimeridian():
+    lats = np.array([0.0, 0.0, 0.0, 10.0])
+    lons = np.array([179.99, -179.99, 170.0, 180.0])
+
+    indices, distances = geodesy.within_radius(0.0, 180.0, lats, lons, 5000.0)
+
+    assert indices.tolist() == [0, 1]
+    assert np.all(distances <= 5000.0)
+
+
+def test_nearest_orders_and_limits():
+    lats = np.array([0.0, 0.0, 0.0, 0.0])
+    lons = np.array([0.3, 0.1, 0.2, 5.0])
+
+    indices, distances = geodesy.nearest(0.0, 0.0, lats, lons, 2)
+    assert indices.tolist() == [1, 2]
+    assert distances[0] < distances[1]
+
+    indices, _ = geodesy.nearest(0.0, 0.0, lats, lons, 10, max_distance_m=50000.0)
+    assert indices.tolist() == [1, 2, 0]
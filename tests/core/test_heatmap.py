@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.core.geo.heatmap import HeatmapPyramid
+
+
+def _tile_total(pyramid, zoom):
+    return sum(int(pyramid.tile(z, x, y).sum()) for z, x, y in pyramid.tiles_in_bounds(-85, -180, 85, 180, zoom))
+
+
+def test_every_zoom_level_holds_all_points():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-80, 80, 5000)
+    lons = rng.uniform(-180, 180, 5000)
+
+    pyramid = HeatmapPyramid(max_zoom=8)
+    pyramid.add_points(lats, lons)
+
+    for zoom in (0, 3, 8):
+        assert _tile_total(pyramid, zoom) == 5000
+    assert pyramid.tile(0, 0, 0).shape == (32, 32)
+
+
+def test_incremental_updates_match_bulk_build():
+    rng = np.random.default_rng(1)
+    lats = 51.5 + rng.normal(scale=0.05, size=2000)
+    lons = -0.1 + rng.normal(scale=0.05, size=2000)
+
+    bulk = HeatmapPyramid(max_zoom=12)
+    bulk.add_points(lats, lons)
+
+    incremental = HeatmapPyramid(max_zoom=12)
+    incremental.add_points(lats[:1500], lons[:1500])
+    changed = incremental.add_points(lats[1500:], lons[1500:])
+    assert all(zoom <= 12 for zoom, _, _ in changed)
+
+    for zoom in (5, 12):
+        expected = bulk.tiles_in_bounds(51, -1, 52, 1, zoom)
+        actual = incremental.tiles_in_bounds(51, -1, 52, 1, zoom)
+        assert expected.keys() == actual.keys()
+        for key in expected:
+            np.testing.assert_array_equal(expected[key], actual[key])
+
+    incremental.remove_points(lats[1500:], lons[1500:])
+    incremental.remove_points(lats[:1500], lons[:1500])
+    assert incremental.tiles_in_bounds(-85, -180, 85, 180, 12) == {}
+
+
+def test_viewport_cells_respect_bounds_and_antimeridian():
+    pyramid = HeatmapPyramid(max_zoom=10)
+    pyramid.add_points([10.0, 10.0, 10.0, -40.0], [179.5, -179.5, 0.0, 179.5])
+
+    lats, lons, counts = pyramid.cells_in_bounds(5.0, 170.0, 15.0, 190.0, 6)
+
+    assert counts.sum() == 2
+    assert np.all((lats > 5.0) & (lats < 15.0))
+    assert np.all(np.abs(lons) > 179.0)
+
+    _, _, counts = pyramid.cells_in_bounds(-85, -180, 85, 180, 18)
+    assert counts.sum() == 4
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.geo import geodesy
+from app.core.geo.location_clustering import IncrementalClusterer, cluster_locations_dbscan
+
+EPS = 100
+MIN_SAMPLES = 5
+
+
+def _locations(count, seed):
+    """Blobs a few hundred metres across around Brussels, plus scattered noise"""
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform((50.80, 4.30), (50.90, 4.40), (6, 2))
+    which = rng.integers(0, len(centres) + 1, count)
+    spread = rng.normal(0.0, 0.0006, (count, 2))
+    coords = np.where((which < len(centres))[:, None], centres[np.minimum(which, len(centres) - 1)] + spread,
+                      rng.uniform((50.80, 4.30), (50.90, 4.40), (count, 2)))
+    start = datetime(2024, 1, 1)
+    return [
+        {'id': f"id{i}", 'latitude': lat, 'longitude': lng, 'timestamp': start + timedelta(minutes=i)}
+        for i, (lat, lng) in enumerate(coords.tolist())
+    ]
+
+
+def _neighbours(locations):
+    lats = np.array([loc['latitude'] for loc in locations])
+    lngs = np.array([loc['longitude'] for loc in locations])
+    return geodesy.haversine(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :]) <= EPS
+
+
+def _assert_same_clustering(labels, expected, neighbours):
+    """Equal core-point partitions and noise; border points join a neighbouring core's cluster"""
+    core = neighbours.sum(axis=1) >= MIN_SAMPLES
+    assert np.array_equal(labels == -1, expected == -1)
+
+    pairs = set(zip(labels[core].tolist(), expected[core].tolist()))
+    assert len(pairs) == len({a for a, _ in pairs}) == len({b for _, b in pairs})
+
+    for i in np.flatnonzero(~core & (labels >= 0)).tolist():
+        core_neighbours = np.flatnonzero(neighbours[i] & core)
+        assert labels[i] in labels[core_neighbours]
+
+
+def _reference_labels(locations):
+    DBSCAN = pytest.importorskip("sklearn.cluster").DBSCAN
+    coords = np.radians([(loc['latitude'], loc['longitude']) for loc in locations])
+    return DBSCAN(eps=EPS / geodesy.EARTH_RADIUS_M, min_samples=MIN_SAMPLES,
+                  algorithm='ball_tree', metric='haversine').fit_predict(coords)
+
+
+def _assert_matches_reference(clusters, locations):
+    """Same number of clusters and the same noise as batch DBSCAN"""
+    expected = _reference_labels(locations)
+    clustered = {loc['id'] for cluster in clusters for loc in cluster.locations}
+    assert len(clusters) == expected.max() + 1
+    assert clustered == {loc['id'] for loc, label in zip(locations, expected.tolist()) if label >= 0}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_inserts_match_batch_dbscan(seed):
+    locations = _locations(600, seed)
+    rng = np.random.default_rng(seed + 100)
+    order = rng.permutation(len(locations))
+    shuffled = [locations[i] for i in order]
+    expected = _reference_labels(shuffled)
+    neighbours = _neighbours(shuffled)
+
+    clusterer = IncrementalClusterer(eps=EPS, min_samples=MIN_SAMPLES)
+    cuts = np.sort(rng.choice(np.arange(1, len(shuffled)), 12, replace=False)).tolist()
+    for first, last in zip([0] + cuts, cuts + [len(shuffled)]):
+        changed = clusterer.add_locations(shuffled[first:last])
+        assert all(any(cluster is current for current in clusterer.clusters()) for cluster in changed)
+
+    labels = clusterer.labels()
+    _assert_same_clustering(labels, expected, neighbours)
+
+    clusters = clusterer.clusters()
+    assert len(clusters) == labels.max() + 1
+    assert sorted(len(cluster.locations) for cluster in clusters) == sorted(np.bincount(labels[labels >= 0]))
+    for cluster in clusters:
+        members = [loc['id'] for loc in cluster.locations]
+        assert cluster.start_time == min(loc['timestamp'] for loc in cluster.locations)
+        assert len(set(members)) == len(members)
+
+
+def test_one_batch_matches_point_by_point_inserts():
+    locations = _locations(300, 7)
+    batch = IncrementalClusterer(eps=EPS, min_samples=MIN_SAMPLES)
+    batch.add_locations(locations)
+    single = IncrementalClusterer(eps=EPS, min_samples=MIN_SAMPLES)
+    for location in locations:
+        single.add_locations([location])
+
+    _assert_same_clustering(single.labels(), batch.labels(), _neighbours(locations))
+
+
+def test_dbscan_clusters_cover_the_labelled_points():
+    locations = _locations(300, 3)
+    expected = _reference_labels(locations)
+
+    clusters = cluster_locations_dbscan(locations, eps=EPS, min_samples=MIN_SAMPLES)
+
+    assert sorted(len(cluster.locations) for cluster in clusters) == sorted(np.bincount(expected[expected >= 0]))
+    for cluster in clusters:
+        assert cluster.radius == pytest.approx(max(
+            geodesy.haversine_scalar(cluster.center[0], cluster.center[1], loc['latitude'], loc['longitude'])
+            for loc in cluster.locations))
+
+
+def test_location_model_folds_new_locations_into_its_clusters():
+    pytest.importorskip("PyQt5")
+    from app.models.location_data import Location, LocationDataModel
+
+    locations = _locations(400, 5)
+    model = LocationDataModel()
+    model.add_locations([Location(loc['latitude'], loc['longitude'], loc['timestamp'], location_id=loc['id'])
+                         for loc in locations[:250]])
+    model.get_clusters(eps=EPS, min_samples=MIN_SAMPLES)
+    clusterer = model._clusterer
+
+    model.add_locations([Location(loc['latitude'], loc['longitude'], loc['timestamp'], location_id=loc['id'])
+                         for loc in locations[250:]])
+    clusters = model.get_clusters(eps=EPS, min_samples=MIN_SAMPLES)
+    assert model._clusterer is clusterer
+    _assert_matches_reference(clusters, locations)
+
+    # Removing a clustered location starts over from the remaining ones
+    model.remove_location(locations[0]['id'])
+    clusters = model.get_clusters(eps=EPS, min_samples=MIN_SAMPLES)
+    assert model._clusterer is not clusterer
+    _assert_matches_reference(clusters, locations[1:])
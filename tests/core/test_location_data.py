@@ -0,0 +1,141 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+from app.models.location_data import Location, LocationDataModel
+
+SIGNALS = ("locationAdded", "locationRemoved", "locationUpdated", "locationsAdded",
+           "locationsRemoved", "locationsUpdated", "locationsCleared", "dataChanged")
+
+
+def _location(index, source="gps"):
+    return Location(50.0 + index, 4.0, datetime(2024, 1, 1), source, location_id=f"id{index}")
+
+
+def _record(model):
+    events = []
+    for name in SIGNALS:
+        getattr(model, name).connect(lambda *args, name=name: events.append((name, _ids(args))))
+    return events
+
+
+def _ids(args):
+    """Signal arguments with locations replaced by their IDs"""
+    if not args:
+        return None
+    value = args[0]
+    if isinstance(value, list):
+        return [item.id if isinstance(item, Location) else item for item in value]
+    return value.id if isinstance(value, Location) else value
+
+
+def test_changes_outside_a_batch_are_announced_one_by_one():
+    model = LocationDataModel()
+    events = _record(model)
+
+    model.add_location(_location(0))
+    model.remove_location("id0")
+
+    assert events == [
+        ("locationAdded", "id0"), ("locationsAdded", ["id0"]), ("dataChanged", None),
+        ("locationRemoved", "id0"), ("locationsRemoved", ["id0"]), ("dataChanged", None),
+    ]
+
+
+def test_nested_batches_flush_once_when_the_outermost_ends():
+    model = LocationDataModel()
+    model.add_locations([_location(0), _location(1)])
+    events = _record(model)
+
+    model.begin_batch()
+    model.add_location(_location(2))
+    with model.batch():
+        model.remove_location("id0")
+        model.update_location(_location(1, "wifi"))
+        assert model.in_batch
+    assert events == [] and model.in_batch
+    model.end_batch()
+
+    assert not model.in_batch
+    assert events == [
+        ("locationsRemoved", ["id0"]), ("locationsAdded", ["id2"]),
+        ("locationsUpdated", ["id1"]), ("dataChanged", None),
+    ]
+
+
+def test_batched_changes_to_one_location_are_coalesced():
+    model = LocationDataModel()
+    model.add_locations([_location(0), _location(1)])
+    events = _record(model)
+
+    with model.batch():
+        # Added and then removed: nothing to report
+        model.add_location(_location(2))
+        model.remove_location("id2")
+        # Added and then updated: one addition with the latest fields
+        model.add_location(_location(3))
+        model.update_location(_location(3, "wifi"))
+        # Removed and then added again: an update
+        model.remove_location("id0")
+        model.add_location(_location(0, "wifi"))
+        # Updated and then removed: a removal
+        model.update_location(_location(1, "wifi"))
+        model.remove_location("id1")
+
+    assert events == [
+        ("locationsRemoved", ["id1"]), ("locationsAdded", ["id3"]),
+        ("locationsUpdated", ["id0"]), ("dataChanged", None),
+    ]
+    assert model.get_location("id3").source == "wifi"
+
+
+def test_clearing_in_a_batch_drops_earlier_changes():
+    model = LocationDataModel()
+    model.add_locations([_location(0)])
+    events = _record(model)
+
+    with model.batch():
+        model.add_location(_location(1))
+        model.clear_locations()
+        model.add_location(_location(2))
+
+    assert events == [("locationsCleared", None), ("locationsAdded", ["id2"]), ("dataChanged", None)]
+    assert [location.id for location in model.get_all_locations()] == ["id2"]
+
+
+def test_an_empty_batch_emits_nothing():
+    model = LocationDataModel()
+    events = _record(model)
+
+    with model.batch():
+        model.remove_location("missing")
+
+    assert events == []
+
+
+def test_exceptions_inside_a_batch_still_flush_and_propagate():
+    model = LocationDataModel()
+    events = _record(model)
+
+    with pytest.raises(KeyError):
+        with model.batch():
+            model.add_location(_location(0))
+            with model.batch():
+                model.add_location(_location(1))
+                raise KeyError("boom")
+
+    assert not model.in_batch
+    assert events == [("locationsAdded", ["id0", "id1"]), ("dataChanged", None)]
+
+    model.add_location(_location(2))
+    assert events[-3:] == [("locationAdded", "id2"), ("locationsAdded", ["id2"]), ("dataChanged", None)]
+
+
+def test_end_batch_without_begin_batch_raises():
+    model = LocationDataModel()
+
+    with pytest.raises(RuntimeError):
+        model.end_batch()
+    assert not model.in_batch
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.data.location_index import LocationIndex, timestamp_key
+
+
+def _populate(count=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    rows = []
+    index = LocationIndex()
+    for i in range(count):
+        row = (
+            f"loc{i}",
+            float(rng.uniform(-60, 60)),
+            float(rng.uniform(-180, 180)),
+            start + timedelta(minutes=int(rng.integers(0, 500000))),
+            "abc"[i % 3],
+            ("home",) if i % 5 == 0 else (),
+        )
+        index.add(*row)
+        rows.append(row)
+    return index, rows
+
+
+def test_queries_match_linear_scan_after_updates():
+    index, rows = _populate()
+    removed = {row[0] for row in rows[::4]}
+    for location_id in removed:
+        assert index.remove(location_id)
+    # Replacing an entry moves it in every index
+    index.add("loc1", 1.0, 1.0, datetime(2019, 1, 1), "z", ("work",))
+    live = [row for row in rows if row[0] not in removed and row[0] != "loc1"]
+    live.append(("loc1", 1.0, 1.0, datetime(2019, 1, 1), "z", ("work",)))
+
+    low, high = datetime(2020, 3, 1), datetime(2020, 6, 1)
+    expected = sorted((row for row in live if low <= row[3] <= high), key=lambda row: row[3])
+    assert index.ids_in_time_range(low, high) == [row[0] for row in expected]
+    assert index.ids_in_time_range(end=datetime(2019, 6, 1)) == ["loc1"]
+
+    assert set(index.ids_for_source("b")) == {row[0] for row in live if row[4] == "b"}
+    assert set(index.ids_for_tag("home")) == {row[0] for row in live if "home" in row[5]}
+    assert index.sources()["z"] == 1 and "work" in index.tags()
+
+    box = (-10.0, -40.0, 30.0, 60.0)
+    assert set(index.ids_in_bounds(*box)) == {
+        row[0] for row in live if box[0] <= row[1] <= box[2] and box[1] <= row[2] <= box[3]
+    }
+    assert set(index.ids_in_bounds(-90, -180, 90, 180)) == {row[0] for row in live}
+
+    combined = index.query(source="a", tag="home", start=low, bounds=box)
+    assert set(combined) == {
+        row[0] for row in live
+        if row[4] == "a" and "home" in row[5] and row[3] >= low
+        and box[0] <= row[1] <= box[2] and box[1] <= row[2] <= box[3]
+    }
+
+
+def test_removed_slots_are_reused_after_compaction():
+    index, rows = _populate(count=2500)
+    for row in rows[:2000]:
+        index.remove(row[0])
+    for row in rows[:2000]:
+        index.add(*row)
+
+    assert len(index) == 2500
+    assert len(index.ids_in_time_range()) == 2500
+    assert index.sources() == {"a": 834, "b": 833, "c": 833}
+
+
+def test_timestamp_key_orders_naive_and_aware_values():
+    assert np.isnan(timestamp_key(None))
+    assert timestamp_key(datetime(1970, 1, 1, 0, 1)) == 60.0
+    assert timestamp_key(datetime(1970, 1, 1, 1, tzinfo=timezone(timedelta(hours=1)))) == 0.0
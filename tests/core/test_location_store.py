@@ -0,0 +1,137 @@
+import gc
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.data.location_store import LocationStore
+
+
+class _View:
+    __slots__ = ("_store", "_row", "__weakref__")
+
+    def _detach(self, record):
+        self._store = None
+        self._row = record
+
+    @property
+    def latitude(self):
+        if self._store is None:
+            return self._row["latitude"]
+        return self._store.get(self._row, "latitude")
+
+
+def _make_view(store, row):
+    view = _View()
+    view._store, view._row = store, row
+    return view
+
+
+def _record(i, **extras):
+    record = {
+        "id": f"loc{i}", "latitude": float(i), "longitude": -float(i),
+        "timestamp": datetime(2020, 1, 1) + timedelta(seconds=i),
+        "source": "ab"[i % 2], "context": "",
+    }
+    record.update(extras)
+    return record
+
+
+def test_round_trips_fields_and_only_stores_present_extras():
+    store = LocationStore(_make_view)
+    aware = datetime(2021, 6, 1, 12, 0, 0, 7, tzinfo=timezone(timedelta(hours=-5)))
+    row = store.append(dict(_record(1), timestamp=aware, context="cafe", notes="n"))
+    bare = store.append(dict(_record(2), timestamp=None))
+
+    record = store.record(row)
+    assert record["timestamp"] == aware and record["timestamp"].utcoffset() == timedelta(hours=-5)
+    assert record["context"] == "cafe" and record["notes"] == "n"
+    assert store.get(bare, "timestamp") is None and store.get(bare, "notes") is None
+    assert store._extras.keys() == {row}
+    assert store.source_names() == ["b", "a"]
+
+    store.set(row, "notes", None)
+    assert not store._extras
+
+
+def test_views_are_shared_and_detached_on_delete():
+    store = LocationStore(_make_view)
+    rows = [store.append(_record(i)) for i in range(3000)]
+
+    view = store.view(rows[2999])
+    assert store.view(rows[2999]) is view
+    for i in range(2000):
+        store.delete(store.row_of(f"loc{i}"))
+
+    # Deleting most rows compacts the columns; the live view follows its row
+    assert len(store) == 1000 and len(store._ids) < 3000
+    assert view._store is store and view.latitude == 2999.0
+    assert store.ids()[0] == "loc2000"
+    lats, lons = store.coordinates(store.live_rows())
+    np.testing.assert_array_equal(lats, np.arange(2000, 3000, dtype=float))
+
+    store.delete(store.row_of("loc2999"))
+    assert view._store is None and view.latitude == 2999.0
+
+
+def test_released_views_are_forgotten():
+    store = LocationStore(_make_view)
+    for i in range(2000):
+        store.append(_record(i))
+    views = [store.view(row) for row in store.rows()]
+    assert len(store._views) == 2000
+
+    del views
+    gc.collect()
+    assert not store._views
+
+
+def test_columns_survive_compaction_and_unknown_ids():
+    store = LocationStore(_make_view)
+    for i in range(3000):
+        store.append(_record(i, address=f"street {i}") if i % 2 else _record(i))
+    store.append(dict(_record(3000), timestamp=None, context="late"))
+    ids = ["loc2999", "nope", "loc3000", "loc10"]
+
+    # Columns captured before a compaction stay consistent with each other
+    before = store.column(ids, "timestamp")
+    for i in range(2000):
+        store.delete(store.row_of(f"loc{i}"))
+    after = store.column(ids, "timestamp")
+    np.testing.assert_array_equal(before[[0, 2]], after[[0, 2]])
+    assert after[0] == (datetime(2020, 1, 1) + timedelta(seconds=2999) - datetime(1970, 1, 1)).total_seconds()
+    assert np.isnan(after[1:]).all()
+
+    assert store.column(ids, "source").tolist() == ["b", None, "a", None]
+    assert store.column(ids, "context").tolist() == ["", None, "late", None]
+    assert store.column(ids, "address").tolist() == ["street 2999", None, None, None]
+    assert store.column(ids, "latitude")[0] == 2999.0
+
+
+def test_columns_read_on_another_thread_match_their_ids_during_compaction():
+    store = LocationStore(_make_view)
+    for i in range(1500):
+        store.append(_record(i))
+    ids = [f"loc{i}" for i in range(0, 9000, 3)]
+    mismatches, done = [], threading.Event()
+
+    def gather():
+        while not done.is_set():
+            lats = store.column(ids, "latitude")
+            found = ~np.isnan(lats)
+            expected = np.arange(0, 9000, 3, dtype=float)
+            if not np.array_equal(lats[found], expected[found]):
+                mismatches.append(lats)
+
+    worker = threading.Thread(target=gather)
+    worker.start()
+    try:
+        # Deleting as many rows as are kept compacts the store every so often
+        for i in range(1500, 9000):
+            store.append(_record(i))
+            store.delete(store.row_of(f"loc{i - 1500}"))
+    finally:
+        done.set()
+        worker.join()
+
+    assert not mismatches
@@ -0,0 +1,147 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from app.core.models.row_order_model import FETCH_BATCH
+from app.models.location_data import Location, LocationDataModel
+from app.models.location_table_model import LocationTableModel
+
+Qt = QtCore.Qt
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _location(index, source="gps", hours=None):
+    return Location(50.0, 4.0, START + timedelta(hours=index if hours is None else hours),
+                    source, f"place {index}", location_id=f"id{index}")
+
+
+def _settle(table):
+    deadline = time.monotonic() + 10
+    while table.is_loading and time.monotonic() < deadline:
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.001)
+    assert not table.is_loading
+
+
+def _shown(table):
+    return [table.row_id(row) for row in range(table.total_count())]
+
+
+def _record(table):
+    events = []
+    table.rowsInserted.connect(lambda parent, first, last: events.append(("inserted", first, last)))
+    table.rowsRemoved.connect(lambda parent, first, last: events.append(("removed", first, last)))
+    table.modelReset.connect(lambda: events.append(("reset",)))
+    return events
+
+
+def test_changes_become_row_insertions_and_removals(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index) for index in range(5)])
+    table = LocationTableModel(model)
+    _settle(table)
+    assert _shown(table) == [f"id{index}" for index in range(5)]
+    assert table.index(0, 0).data(Qt.UserRole) == "id0"
+    assert table.index(0, 1).data() == "gps"
+
+    events = _record(table)
+    model.add_location(_location(5))
+    model.remove_location("id1")
+
+    assert events == [("inserted", 5, 5), ("removed", 1, 1)]
+    assert _shown(table) == ["id0", "id2", "id3", "id4", "id5"]
+    assert table.rowCount() == 5
+
+
+def test_rows_are_fetched_in_batches(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index) for index in range(FETCH_BATCH + 10)])
+    table = LocationTableModel(model)
+    _settle(table)
+
+    assert table.rowCount() == FETCH_BATCH
+    assert table.total_count() == FETCH_BATCH + 10
+    assert table.canFetchMore(QtCore.QModelIndex())
+
+    # Rows added past the fetched ones wait for fetchMore()
+    events = _record(table)
+    model.add_location(_location(FETCH_BATCH + 10))
+    assert events == [] and table.rowCount() == FETCH_BATCH
+
+    table.fetchMore(QtCore.QModelIndex())
+    assert table.rowCount() == table.total_count() == FETCH_BATCH + 11
+    assert not table.canFetchMore(QtCore.QModelIndex())
+
+
+def test_sorting_by_date_and_reversing_it(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index, hours=hours) for index, hours in enumerate([3, 1, 4, 0, 2])])
+    table = LocationTableModel(model)
+    _settle(table)
+
+    table.sort(0, Qt.AscendingOrder)
+    _settle(table)
+    assert _shown(table) == ["id3", "id1", "id4", "id0", "id2"]
+
+    # Reversing the current sort flips the rows without a rebuild
+    table.sort(0, Qt.DescendingOrder)
+    assert not table.is_loading
+    assert _shown(table) == ["id2", "id0", "id4", "id1", "id3"]
+
+    # New rows land at their sorted position
+    model.add_location(_location(5, hours=2.5))
+    assert _shown(table) == ["id2", "id0", "id5", "id4", "id1", "id3"]
+
+
+def test_changes_during_a_build_are_replayed(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index) for index in range(5)])
+    table = LocationTableModel(model)
+    assert table.is_loading
+
+    # The built order is only installed once events are processed
+    model.remove_location("id0")
+    model.add_location(_location(5))
+    model.update_location(_location(2, "wifi"))
+    _settle(table)
+
+    assert _shown(table) == ["id1", "id2", "id3", "id4", "id5"]
+    assert table.index(1, 1).data() == "wifi"
+
+    model.clear_locations()
+    assert _shown(table) == [] and table.rowCount() == 0
+
+
+def test_filters_apply_to_new_rows(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index, "gps" if index % 2 else "wifi") for index in range(6)])
+    table = LocationTableModel(model)
+    table.set_filter(source="gps")
+    _settle(table)
+    assert _shown(table) == ["id1", "id3", "id5"]
+
+    model.add_locations([_location(6, "wifi"), _location(7, "gps")])
+    assert _shown(table) == ["id1", "id3", "id5", "id7"]
+
+    table.set_filter(search="PLACE 3")
+    _settle(table)
+    assert _shown(table) == ["id3"]
+
+
+def test_only_the_latest_build_is_installed(app):
+    model = LocationDataModel()
+    model.add_locations([_location(index) for index in range(3)])
+    table = LocationTableModel(model)
+    table.set_filter(source="none")
+    table.set_filter(source="gps")
+    _settle(table)
+
+    assert _shown(table) == ["id0", "id1", "id2"]
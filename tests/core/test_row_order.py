@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+
+from app.core.data.row_order import OrderBuilder, RowOrder
+
+
+def _entries(count, seed):
+    rng = np.random.default_rng(seed)
+    ids = [f"id{seed}-{i}" for i in range(count)]
+    keys = rng.integers(0, 50, count).astype(np.float64)
+    keys[::17] = np.nan  # Missing timestamps sort last
+    return ids, keys
+
+
+def _expected(ids, keys, descending):
+    order = np.argsort(keys, kind="stable")
+    ids = [ids[i] for i in order]
+    return ids[::-1] if descending else ids
+
+
+def test_runs_replay_to_the_bulk_result():
+    for descending in (False, True):
+        ids, keys = _entries(500, 0)
+        order = RowOrder(ids, keys, descending)
+        assert order.ids() == _expected(ids, keys, descending)
+
+        new_ids, new_keys = _entries(40, 1)
+        shown = order.ids()
+        for run in order.plan_insert(new_ids, new_keys):
+            # Each run is announced at rows that are valid at that moment
+            assert 0 <= run.first <= len(shown)
+            shown[run.first:run.first] = list(run.ids)
+            order.apply_insert(run)
+            assert order.ids() == shown
+
+        bulk = RowOrder(ids, keys, descending)
+        bulk.insert(new_ids, new_keys)
+        assert order.ids() == bulk.ids()
+
+        gone = ids[::7] + new_ids[::3] + ["missing"]
+        for run in order.plan_remove(gone):
+            assert shown[run.first:run.first + run.count] == list(run.ids)
+            del shown[run.first:run.first + run.count]
+            order.apply_remove(run)
+            assert order.ids() == shown
+        assert bulk.remove(gone) == len(gone) - 1
+        assert order.ids() == bulk.ids()
+
+
+def test_integer_ids_and_string_keys():
+    order = RowOrder([3, 1, 2], ["b", "c", "a"])
+    assert order.ids() == [2, 3, 1]
+    assert order.rows_of([1, 2]).tolist() == [0, 2]
+    order.insert([7], ["bb"])
+    assert order.ids() == [2, 3, 7, 1] and order.id_at(2) == 7
+
+    empty = RowOrder()
+    empty.insert(["x", "y"], ["z", "a"])
+    assert empty.ids() == ["y", "x"]
+
+
+def test_builder_delivers_only_the_latest_request():
+    delivered = []
+    done = threading.Event()
+    gate = threading.Event()
+
+    def deliver(request, order):
+        delivered.append((request, order.ids() if order else None))
+        done.set()
+
+    builder = OrderBuilder(deliver)
+    first = builder.submit(lambda: gate.wait() and RowOrder(["stale"]))
+    latest = builder.submit(lambda: RowOrder(["b", "a"], ["2", "1"]))
+    gate.set()
+    assert done.wait(5)
+    builder.shutdown()
+    assert first != latest
+    assert delivered == [(latest, ["a", "b"])]
@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.data.location_index import LocationIndex
+from app.core.data.timeline import GROUPINGS, TimelineAggregator, bin_label, wall_seconds
+
+
+def _reference(grouping, value):
+    if grouping == "day":
+        return value.strftime("%Y-%m-%d")
+    if grouping == "week":
+        year, week, _ = value.isocalendar()
+        return f"{year}-W{week:02d}"
+    if grouping == "month":
+        return value.strftime("%Y-%m")
+    if grouping == "year":
+        return str(value.year)
+    if grouping == "hour":
+        return f"{value.hour:02d}:00"
+    return value.strftime("%A")
+
+
+def _labelled(aggregator, grouping):
+    bins, counts = aggregator.histogram(grouping)
+    return {bin_label(grouping, b): c for b, c in zip(bins.tolist(), counts.tolist()) if c}
+
+
+def test_histograms_match_python_grouping():
+    rng = np.random.default_rng(0)
+    start = datetime(1965, 12, 25)
+    times = [start + timedelta(seconds=int(s)) for s in rng.integers(0, 60 * 365 * 86400, 5000)]
+    aggregator = TimelineAggregator()
+    for value in times:
+        aggregator.add(wall_seconds(value))
+
+    for grouping in GROUPINGS:
+        expected = Counter(_reference(grouping, value) for value in times)
+        assert _labelled(aggregator, grouping) == dict(expected), grouping
+
+    hours, counts = aggregator.histogram("hour")
+    assert hours.tolist() == list(range(24)) and counts.sum() == len(times)
+
+
+def test_incremental_updates_match_bulk():
+    rng = np.random.default_rng(1)
+    seconds = rng.integers(0, 10 ** 9, 3000).tolist()
+    aggregator = TimelineAggregator()
+    for value in seconds:
+        aggregator.add(value)
+    aggregator.histogram("day")  # Fold part of the way through
+    for value in seconds[::3]:
+        aggregator.remove(value)
+    aggregator.add(seconds[0])
+
+    bulk = TimelineAggregator()
+    for value in seconds[1::3] + seconds[2::3] + [seconds[0]]:
+        bulk.add(value)
+    assert len(aggregator) == len(bulk) == 2001
+    for grouping in GROUPINGS:
+        for ours, theirs in zip(aggregator.histogram(grouping), bulk.histogram(grouping)):
+            np.testing.assert_array_equal(ours, theirs)
+
+
+def test_index_feeds_timeline_by_wall_clock():
+    index = LocationIndex()
+    pacific = timezone(timedelta(hours=-7))
+    index.add("a", 0.0, 0.0, datetime(2021, 5, 5, 23, 30, tzinfo=pacific), "x", ())
+    index.add("b", 0.0, 0.0, datetime(2021, 5, 6, 1, 0), "x", ())
+    index.add("c", 0.0, 0.0, None, "x", ())
+    assert _labelled(index.timeline, "day") == {"2021-05-05": 1, "2021-05-06": 1}
+
+    first = index.timeline.histogram("day")
+    assert index.timeline.histogram("day") is first  # Cached until the data changes
+    version = index.version
+    index.add("b", 0.0, 0.0, datetime(2021, 5, 7), "x", ())
+    assert index.version > version
+    assert _labelled(index.timeline, "day") == {"2021-05-05": 1, "2021-05-07": 1}
+    index.remove("a")
+    index.clear()
+    assert index.timeline.total == 0 and not index.timeline.histogram("year")[1].any()
@@ -0,0 +1,122 @@
+import csv
+import gzip
+import json
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.exporters.csv_exporter import export_csv
+from app.exporters.geojson_exporter import export_geojson
+from app.exporters.gpx_exporter import export_gpx
+from app.exporters.kml_exporter import export_kml
+from app.exporters.streaming import ProgressMeter, open_output, write_json_array
+
+GPX = "{http://www.topografix.com/GPX/1/1}"
+KML = "{http://www.opengis.net/kml/2.2}"
+
+
+def _pages(count, page_size=7):
+    """Database-style pages, newest first as iter_location_pages yields them"""
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "id": i,
+            "latitude": 50.0 + i / 100,
+            "longitude": 4.0 - i / 100,
+            "date": (start + timedelta(hours=i)).isoformat(),
+            "source": "Twitter" if i % 3 else "Flickr",
+            "context": {"description": f"post <{i}> & more"} if i % 2 else f"text {i}",
+        }
+        for i in reversed(range(count))
+    ]
+    for first in range(0, count, page_size):
+        yield rows[first:first + page_size]
+
+
+def test_xml_exports_stream_pages_into_compressed_files(tmp_path):
+    reports = []
+    assert export_kml(_pages(30), str(tmp_path / "out.kmz"),
+                      progress_callback=lambda count, rate: reports.append(count))
+    assert reports[-1] == 30
+
+    with zipfile.ZipFile(tmp_path / "out.kmz") as archive:
+        document = ET.fromstring(archive.read("doc.kml"))
+    placemarks = document.findall(f"{KML}Document/{KML}Placemark")
+    assert len(placemarks) == 30
+    assert placemarks[0].find(f"{KML}Point/{KML}coordinates").text == "3.71,50.29,0"
+    assert "post <29> & more" in placemarks[0].find(f"{KML}description").text
+
+    for pretty in (True, False):
+        assert export_gpx(_pages(30), str(tmp_path / "out.gpx.gz"), pretty_print=pretty)
+        with gzip.open(tmp_path / "out.gpx.gz") as f:
+            gpx = ET.parse(f).getroot()
+        assert len(gpx.findall(f"{GPX}wpt")) == 30
+        segments = gpx.findall(f"{GPX}trk/{GPX}trkseg")
+        assert [len(segment) for segment in segments] == [20, 10]
+        # Track points come out oldest first whatever order the rows arrived in
+        times = [point.find(f"{GPX}time").text for point in segments[1]]
+        assert times == sorted(times) and times[0] == "2024-01-01T00:00:00Z"
+
+
+def test_json_and_csv_exports(tmp_path):
+    assert export_geojson(_pages(12), str(tmp_path / "out.geojson"))
+    collection = json.loads((tmp_path / "out.geojson").read_text(encoding="utf-8"))
+    assert collection["type"] == "FeatureCollection" and len(collection["features"]) == 12
+    assert collection["features"][-1]["geometry"]["coordinates"] == [4.0, 50.0]
+
+    assert export_csv(_pages(12), str(tmp_path / "out.csv"))
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ["id", "latitude", "longitude"] and len(rows) == 13
+    assert json.loads(rows[1][5]) == {"description": "post <11> & more"}
+
+    for count in (0, 1, 5, 6):
+        with open(tmp_path / "array.json", "w", encoding="utf-8") as f:
+            progress = ProgressMeter(every=2)
+            assert write_json_array(iter(range(count)), f, chunk_size=3, progress=progress) == count
+        assert json.loads((tmp_path / "array.json").read_text()) == list(range(count))
+        assert progress.count == count
+
+
+def test_failed_exports_leave_the_previous_file_in_place(tmp_path):
+    for name in ("out.csv", "out.csv.gz", "out.kmz"):
+        target = tmp_path / name
+        with open_output(str(target)) as stream:
+            stream.write("first")
+        previous = target.read_bytes()
+
+        with pytest.raises(RuntimeError):
+            with open_output(str(target)) as stream:
+                stream.write("second")
+                raise RuntimeError("boom")
+
+        assert target.read_bytes() == previous
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out.csv", "out.csv.gz", "out.kmz"]
+
+    # The gzip header names the export, not the file it was written to
+    with open(tmp_path / "out.csv.gz", "rb") as f:
+        header = f.read(64)
+    assert b"out.csv\x00" in header
+    with gzip.open(tmp_path / "out.csv.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == "first"
+
+
+def test_location_model_saves_and_loads_its_records(tmp_path):
+    pytest.importorskip("PyQt5.QtCore")
+    from app.models.location_data import Location, LocationDataModel
+
+    model = LocationDataModel()
+    locations = [Location(50.0 + i, 4.0, datetime(2024, 1, 1, i), "gps", f"seen {i}", location_id=f"id{i}")
+                 for i in range(3)]
+    locations[1].notes = "checked"
+    locations[1].metadata.accuracy = 5.0
+    model.add_locations(locations)
+
+    assert model.save_to_file(str(tmp_path / "saved.json"))
+    saved = json.loads((tmp_path / "saved.json").read_text(encoding="utf-8"))
+    assert saved == [location.to_dict() for location in model.get_all_locations()]
+
+    loaded = LocationDataModel.load_from_file(str(tmp_path / "saved.json"))
+    assert [location.to_dict() for location in loaded.get_all_locations()] == saved
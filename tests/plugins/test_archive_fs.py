@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.plugins.archive_fs import ArchivePath, ZipArchive, local_path
+
+MEMBERS = [
+    "top.json",
+    "notes.csv",
+    "your_posts/posts_1.json",
+    "your_posts/old/posts_2.json",
+    "a/b/c/b1.txt",
+    "a/bb.txt",
+    "Videos/list.json",
+    "media/photo.jpg",
+]
+
+
+@pytest.fixture()
+def export(tmp_path):
+    tree = tmp_path / "tree"
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as handle:
+        for name in MEMBERS:
+            content = f"content of {name}\n" * 50
+            handle.writestr(name, content)
+            path = tree.joinpath(*name.split("/"))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+    return tree, archive
+
+
+@pytest.mark.parametrize("pattern", [
+    "*.json", "**/*.json", "your_posts/*.json", "**/posts_*.json", "a/**/b?.txt",
+    "[nt]*", "[!t]*.csv", "**/Videos/*.json", "*", "a/*",
+    "**", "a/**", "your_posts/**", "**/old", "a/", "*/",
+])
+def test_glob_matches_pathlib(export, pattern):
+    tree, archive = export
+    expected = {path.relative_to(tree).as_posix() for path in tree.glob(pattern)}
+
+    with ZipArchive(archive) as zipped:
+        found = {path.member or "." for path in zipped.glob(pattern)}
+
+    assert found == expected
+
+
+def test_members_read_like_files(export):
+    _, archive = export
+    with ZipArchive(archive) as zipped:
+        posts = zipped.root / "your_posts"
+        member = posts / "posts_1.json"
+
+        assert posts.is_dir() and not posts.is_file()
+        assert member.is_file() and member.exists()
+        assert (member.name, member.suffix, member.stem) == ("posts_1.json", ".json", "posts_1")
+        assert member.parent == posts
+        assert sorted(path.name for path in posts.iterdir()) == ["old", "posts_1.json"]
+        assert [path.member for path in posts.glob("*.json")] == ["your_posts/posts_1.json"]
+
+        with member.open("r", encoding="utf-8") as handle:
+            assert handle.readline() == "content of your_posts/posts_1.json\n"
+        assert member.read_bytes() == member.read_text(encoding="utf-8").encode()
+        assert member.stat().st_size == len(member.read_bytes())
+        assert str(member) == os.path.join(os.path.realpath(archive), "your_posts", "posts_1.json")
+        assert pickle.loads(pickle.dumps(member)).read_text(encoding="utf-8") == member.read_text(encoding="utf-8")
+
+        with pytest.raises(FileNotFoundError):
+            (zipped.root / "missing.json").open()
+        with pytest.raises(ValueError):
+            member.open("w")
+
+
+def test_local_path_extracts_one_member_until_the_archive_changes(export, tmp_path):
+    _, archive = export
+    extract_dir = tmp_path / "extracted"
+
+    with ZipArchive(archive, extract_dir=extract_dir) as zipped:
+        photo = local_path(zipped.root / "media" / "photo.jpg")
+        assert photo == extract_dir / "media" / "photo.jpg"
+        assert [path.name for path in extract_dir.rglob("*") if path.is_file()] == ["photo.jpg"]
+        photo.write_text("x" * photo.stat().st_size, encoding="utf-8")
+        os.utime(photo, ns=(zipped.mtime_ns, zipped.mtime_ns))
+        assert local_path(zipped.root / "media" / "photo.jpg").read_text(encoding="utf-8").startswith("x")
+
+    os.utime(archive, ns=(0, os.stat(archive).st_mtime_ns + 10**9))
+    with ZipArchive(archive, extract_dir=extract_dir) as zipped:
+        assert local_path(zipped.root / "media" / "photo.jpg").read_text(encoding="utf-8").startswith("content")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_facebook_plugin_reads_a_zipped_export_in_place(tmp_path, monkeypatch, workers):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    from app.plugins.social_media.facebook_plugin import FacebookPlugin
+
+    inputs = tmp_path / "input"
+    inputs.mkdir()
+    with zipfile.ZipFile(inputs / "facebook-export.zip", "w", zipfile.ZIP_DEFLATED) as handle:
+        for index, name in enumerate(["location/location_history.json", "places/places_visited.json"]):
+            items = [
+                {"timestamp": int(datetime(2024, 1, day, index).timestamp()), "latitude": 50.0 + day,
+                 "longitude": 4.0, "name": name}
+                for day in range(1, 6)
+            ]
+            handle.writestr(name, json.dumps(items))
+
+    plugin = FacebookPlugin()
+    plugin.get_data_directory = lambda: str(inputs)
+    plugin.update_config({"ingest_workers": workers})
+
+    points = plugin.collect_locations("target")
+
+    assert len(points) == 10
+    assert [point.timestamp for point in points] == sorted(point.timestamp for point in points)
+    assert all(isinstance(report.path, str) and ".zip" in report.path for report in plugin.ingest_reports)
+    assert not (plugin.data_dir / plugin._temp_subdir).exists()
+
+    plugin.collect_locations("target")
+    assert all(report.cached for report in plugin.ingest_reports)
+    assert isinstance(plugin.resolve_archive_root(), ArchivePath)
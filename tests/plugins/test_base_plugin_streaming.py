@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.plugins.base_plugin import BasePlugin, LocationPoint, iter_plugin_locations
+
+
+def _point(index: int) -> LocationPoint:
+    return LocationPoint(
+        latitude=float(index),
+        longitude=float(index),
+        timestamp=datetime(2024, 1, 1),
+        source="test",
+        context=str(index),
+    )
+
+
+class ListPlugin(BasePlugin):
+    def collect_locations(self, target, date_from=None, date_to=None):
+        return [_point(index) for index in range(7)]
+
+
+class GeneratorPlugin(BasePlugin):
+    def __init__(self) -> None:
+        super().__init__(name="Generator", description="")
+        self.generated = 0
+
+    def generate_locations(self, target, date_from=None, date_to=None):
+        for index in range(10):
+            self.generated += 1
+            yield _point(index)
+
+
+@pytest.fixture(autouse=True)
+def _data_home(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+
+
+def test_list_plugin_is_batched_by_the_shim():
+    plugin = ListPlugin(name="List", description="")
+
+    batches = list(plugin.iter_locations("target", batch_size=3))
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [point.context for batch in batches for point in batch] == [str(i) for i in range(7)]
+
+
+def test_generator_plugin_streams_and_still_collects():
+    plugin = GeneratorPlugin()
+
+    batches = plugin.iter_locations("target", batch_size=4)
+    assert len(next(batches)) == 4
+    batches.close()
+    assert plugin.generated == 4
+
+    assert len(plugin.collect_locations("target")) == 10
+
+
+def test_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        list(GeneratorPlugin().iter_locations("target", batch_size=0))
+
+
+def test_iter_plugin_locations_accepts_plain_objects():
+    class Legacy:
+        def collect_locations(self, target, date_from=None, date_to=None):
+            return [_point(0), _point(1)]
+
+    assert [len(batch) for batch in iter_plugin_locations(Legacy(), "target", batch_size=1)] == [1, 1]
+
+
+def test_location_history_plugin_yields_points(tmp_path):
+    from app.plugins.location_services.location_history_plugin import LocationHistoryPlugin
+
+    plugin = LocationHistoryPlugin()
+    data_dir = tmp_path / "history"
+    data_dir.mkdir()
+    plugin.get_data_directory = lambda: str(data_dir)
+    history = [{"lat": 1.0, "lon": 2.0, "timestamp": "2024-05-01T10:00:00"}] * 5
+    (data_dir / "history.json").write_text(json.dumps(history), encoding="utf-8")
+
+    batches = list(plugin.iter_locations("target", batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert len(plugin.collect_locations("target")) == 5
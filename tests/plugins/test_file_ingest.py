@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from itertools import islice
+
+import pytest
+
+from app.plugins.base_plugin import LocationPoint
+from app.plugins.file_ingest import FileIngestExecutor
+
+
+@pytest.fixture()
+def history_plugin(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    from app.plugins.location_services.location_history_plugin import LocationHistoryPlugin
+
+    return LocationHistoryPlugin()
+
+
+def _write_history(path, start, count, step_hours):
+    entries = [
+        {
+            "lat": 10.0,
+            "lon": 20.0,
+            "timestamp": (start + timedelta(hours=step_hours * index)).strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        for index in range(count)
+    ]
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_files_are_merged_in_timestamp_order(tmp_path, history_plugin, workers):
+    start = datetime(2024, 1, 1)
+    files = [
+        _write_history(tmp_path / "a.json", start, 30, 3),
+        _write_history(tmp_path / "b.json", start + timedelta(hours=1), 5, 7),
+        _write_history(tmp_path / "c.json", start + timedelta(hours=2), 12, 2),
+    ]
+    (tmp_path / "broken.json").write_text("[{", encoding="utf-8")
+    reported = []
+    history_plugin.update_config({"ingest_workers": workers})
+
+    executor = FileIngestExecutor.from_config(history_plugin.config, report_callback=reported.append)
+    points = list(executor.run(
+        history_plugin, history_plugin._load_file,
+        files + [tmp_path / "broken.json", files[0]], None, None,
+    ))
+
+    timestamps = [point.timestamp for point in points]
+    assert len(points) == 47
+    assert timestamps == sorted(timestamps)
+    assert len(reported) == 4
+    failed = [report for report in reported if report.error]
+    assert [report.path.endswith("broken.json") for report in failed] == [True]
+    assert {report.points for report in reported} == {30, 5, 12, 0}
+
+
+def test_largest_file_is_streamed_after_the_others(tmp_path, history_plugin):
+    start = datetime(2024, 1, 1)
+    small = _write_history(tmp_path / "small.json", start, 2, 1)
+    large = _write_history(tmp_path / "large.json", start, 50, 1)
+
+    executor = FileIngestExecutor(max_workers=1)
+    points = executor.run(history_plugin, history_plugin._load_file, [small, large], None, None)
+    next(points)
+    assert [report.path for report in executor.reports] == [str(small)]
+
+    assert len(list(points)) == 51
+    assert [report.path for report in executor.reports] == [str(small), str(large)]
+    assert all(report.points_per_second > 0 for report in executor.reports)
+
+
+class _CountingPlugin:
+    config: dict = {}
+
+    def __init__(self):
+        self.parsed = 0
+
+    def parse(self, path):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            self.parsed += 1
+            yield LocationPoint(1.0, 2.0, datetime.fromisoformat(line), "test", path.name)
+
+
+def test_closing_the_iterator_stops_parsing(tmp_path):
+    start = datetime(2024, 1, 1)
+    large = tmp_path / "large.txt"
+    large.write_text("\n".join((start + timedelta(minutes=index)).isoformat() for index in range(1000)))
+    small = tmp_path / "small.txt"
+    small.write_text(start.isoformat())
+    plugin = _CountingPlugin()
+
+    points = FileIngestExecutor(max_workers=1).run(plugin, plugin.parse, [small, large])
+    assert [point.context for point in islice(points, 3)] == ["large.txt", "small.txt", "large.txt"]
+    points.close()
+
+    assert plugin.parsed < 10
+
+
+def test_parse_must_belong_to_plugin(history_plugin, tmp_path):
+    other = type(history_plugin)()
+    with pytest.raises(ValueError):
+        list(FileIngestExecutor().run(history_plugin, other._load_file, [tmp_path]))
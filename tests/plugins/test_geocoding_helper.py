@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.plugins.enhanced_geocoding_helper import EnhancedGeocodingHelper
+from app.plugins.geocoding_helper import GeocodingHelper
+
+
+@pytest.fixture()
+def helper(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    helper = GeocodingHelper()
+    helper.calls = []
+
+    def lookup(location):
+        helper.calls.append(location)
+        return (1.0, 2.0) if "street" in location else None
+
+    helper._query_nominatim = lookup
+    return helper
+
+
+def test_single_and_batch_lookups_share_cache_keys(helper):
+    assert helper.geocode("  Main   Street, ") == (1.0, 2.0)
+    assert helper.geocode_many(["main street", "MAIN STREET"]) == {
+        "main street": (1.0, 2.0), "MAIN STREET": (1.0, 2.0),
+    }
+    assert helper.geocode("Main Street") == (1.0, 2.0)
+    assert helper.calls == ["main street"]
+    assert helper.get_forward("Main  Street") == (1.0, 2.0)
+
+    assert helper.geocode("nowhere") == (None, None)
+    assert helper.geocode("") == (None, None)
+    assert helper.geocode("50.85, 4.35") == (50.85, 4.35)
+    assert helper.calls == ["main street", "nowhere"]
+
+
+def test_single_and_batch_lookups_share_the_rate_limit(helper):
+    helper.rate_limit_sleep = 0.2
+
+    started = time.monotonic()
+    helper.geocode("first street")
+    helper.geocode_many(["second street"])
+    helper.geocode("third street")
+
+    assert time.monotonic() - started >= 0.35
+    assert helper.calls == ["first street", "second street", "third street"]
+
+
+def test_enhanced_lookups_try_offline_tables_before_going_online(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    helper = EnhancedGeocodingHelper()
+    helper.postal_codes["10001"] = {'lat': 40.75, 'lon': -73.99, 'country': 'US'}
+    helper._query_nominatim = lambda location: pytest.fail(f"went online for {location!r}")
+
+    assert helper.geocode("New York 10001") == (40.75, -73.99)
+    assert helper.geocode_many(["new york  10001"]) == {"new york  10001": (40.75, -73.99)}
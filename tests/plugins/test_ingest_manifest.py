@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.plugins.file_ingest import FileIngestExecutor
+from app.plugins.ingest_manifest import IngestManifest
+
+
+@pytest.fixture()
+def history_plugin(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    from app.plugins.location_services.location_history_plugin import LocationHistoryPlugin
+
+    return LocationHistoryPlugin()
+
+
+def _write_history(path, day, count):
+    start = datetime(2024, 1, day)
+    entries = [
+        {"lat": float(day), "lon": 1.0, "timestamp": (start + timedelta(minutes=index)).isoformat()}
+        for index in range(count)
+    ]
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def _ingest(plugin, manifest_path, files, max_workers=1):
+    executor = FileIngestExecutor(max_workers=max_workers, manifest=IngestManifest(manifest_path))
+    points = list(executor.run(plugin, plugin._load_file, files, None, None))
+    return points, {os.path.basename(report.path): report.cached for report in executor.reports}
+
+
+def test_unchanged_files_come_from_the_manifest(tmp_path, history_plugin):
+    manifest = tmp_path / "manifest.sqlite3"
+    files = [_write_history(tmp_path / f"{day}.json", day, 20 + day) for day in (1, 2, 3)]
+
+    first, cached = _ingest(history_plugin, manifest, files)
+    assert cached == {"1.json": False, "2.json": False, "3.json": False}
+
+    second, cached = _ingest(history_plugin, manifest, files)
+    assert cached == {"1.json": True, "2.json": True, "3.json": True}
+    assert second == first
+
+    # Touched but unchanged: hashed, not parsed
+    os.utime(files[0], ns=(0, files[0].stat().st_mtime_ns + 10**9))
+    # Changed: parsed again
+    _write_history(files[1], 2, 5)
+    points, cached = _ingest(history_plugin, manifest, files)
+    assert cached == {"1.json": True, "2.json": False, "3.json": True}
+    assert len(points) == 21 + 5 + 23
+    assert [p.timestamp for p in points] == sorted(p.timestamp for p in points)
+
+    # Removed files are forgotten
+    points, cached = _ingest(history_plugin, manifest, files[:1])
+    assert cached == {"1.json": True}
+    assert len(points) == 21
+
+
+def test_abandoned_stream_is_not_recorded(tmp_path, history_plugin):
+    manifest = tmp_path / "manifest.sqlite3"
+    history = _write_history(tmp_path / "history.json", 1, 10)
+
+    executor = FileIngestExecutor(manifest=IngestManifest(manifest))
+    points = executor.run(history_plugin, history_plugin._load_file, [history], None, None)
+    next(points)
+    points.close()
+
+    assert _ingest(history_plugin, manifest, [history])[1] == {"history.json": False}
+    assert _ingest(history_plugin, manifest, [history])[1] == {"history.json": True}
+
+
+def test_date_filters_are_cached_separately(tmp_path, history_plugin):
+    manifest = tmp_path / "manifest.sqlite3"
+    history = _write_history(tmp_path / "history.json", 1, 10)
+    late = datetime(2024, 1, 1, 0, 5)
+
+    executor = FileIngestExecutor(manifest=IngestManifest(manifest))
+    filtered = list(executor.run(history_plugin, history_plugin._load_file, [history], late, None))
+
+    assert len(filtered) == 5
+    assert len(_ingest(history_plugin, manifest, [history])[0]) == 10
+
+
+def test_parser_changes_invalidate_cached_points(tmp_path, history_plugin, monkeypatch):
+    from app.plugins import ingest_manifest
+
+    manifest = tmp_path / "manifest.sqlite3"
+    history = _write_history(tmp_path / "history.json", 1, 10)
+    assert _ingest(history_plugin, manifest, [history])[1] == {"history.json": False}
+    assert _ingest(history_plugin, manifest, [history])[1] == {"history.json": True}
+
+    monkeypatch.setattr(ingest_manifest, "PARSER_VERSION", ingest_manifest.PARSER_VERSION + 1)
+    assert _ingest(history_plugin, manifest, [history])[1] == {"history.json": False}
+
+
+def test_undated_points_are_not_cached_with_a_time(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    from app.plugins.social_media.facebook_plugin import FacebookPlugin
+
+    inputs = tmp_path / "input"
+    (inputs / "posts").mkdir(parents=True)
+    posts = [
+        {"timestamp": int(datetime(2024, 1, 2).timestamp()), "latitude": 1.0, "longitude": 2.0, "post": "dated"},
+        {"latitude": 3.0, "longitude": 4.0, "post": "undated"},
+    ]
+    (inputs / "posts" / "your_posts_1.json").write_text(json.dumps(posts), encoding="utf-8")
+    plugin = FacebookPlugin()
+    plugin.get_data_directory = lambda: str(inputs)
+
+    first = plugin.collect_locations("target")
+    second = plugin.collect_locations("target")
+
+    assert all(report.cached for report in plugin.ingest_reports)
+    assert [point.context for point in second] == ["dated", "undated"]
+    assert second[0].timestamp == datetime(2024, 1, 2)
+    assert second[1].timestamp > first[1].timestamp
+    assert plugin.collect_locations("target", date_to=datetime(2025, 1, 1))[-1].context == "dated"
+
+
+def test_archives_are_extracted_once(tmp_path, history_plugin):
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w") as handle:
+        handle.writestr("history.json", "[]")
+
+    extracted = history_plugin._extract_zipfile(archive, "extract")
+    marker = os.path.join(extracted, "marker")
+    open(marker, "w").close()
+
+    assert history_plugin._extract_zipfile(archive, "extract") == extracted
+    assert os.path.exists(marker)
+
+    with zipfile.ZipFile(archive, "w") as handle:
+        handle.writestr("other.json", "[]")
+    history_plugin._extract_zipfile(archive, "extract")
+    assert not os.path.exists(marker)
+    assert os.path.exists(os.path.join(extracted, "other.json"))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.plugins.json_stream import iter_json_array
+
+KEYS = ("locations", "timelineObjects", "items")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1 << 20])
+def test_elements_match_json_load_across_chunk_boundaries(chunk_size):
+    document = {
+        "deviceTag": 12345,
+        "skipped": {"text": 'a "quoted" ] and } \\', "nested": [[1, {"x": "]"}], -2.5e3]},
+        "locations": [
+            {"latitudeE7": 515000000, "timestamp": "2024-01-01T00:00:00Z"},
+            [1, 2.25, -30000.0, None, True, False, "é\\n"],
+            "x" * 100,
+            1234567890123,
+        ],
+        "items": ["ignored"],
+    }
+
+    text = json.dumps(document)
+    elements = list(iter_json_array(io.StringIO(text), KEYS, chunk_size=chunk_size))
+
+    assert elements == document["locations"]
+
+
+def test_top_level_arrays_and_documents_without_entries():
+    assert list(iter_json_array(io.StringIO(' [ {"a": 1} , 2 ] '), chunk_size=2)) == [{"a": 1}, 2]
+    assert list(iter_json_array(io.StringIO("[]"))) == []
+    assert list(iter_json_array(io.StringIO('{"other": [1, 2]}'), KEYS)) == []
+    assert list(iter_json_array(io.StringIO('{"locations": {"a": 1}}'), KEYS)) == []
+
+
+@pytest.mark.parametrize("text", ['[1, 2', '{"locations": [1 2]}', '{"a": "unterminated'])
+def test_invalid_documents_raise(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), KEYS, chunk_size=4))
+
+
+def test_google_takeout_plugin_streams_and_filters(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    from app.plugins.data_extraction.google_takeout_plugin import GoogleTakeoutPlugin
+
+    archive = tmp_path / "takeout"
+    archive.mkdir()
+    entries = [
+        {"latitudeE7": 515000000 + day, "longitudeE7": -1000000, "timestamp": f"2024-01-{day:02d}T12:00:00"}
+        for day in range(1, 11)
+    ]
+    (archive / "Records.json").write_text(json.dumps({"locations": entries}), encoding="utf-8")
+
+    plugin = GoogleTakeoutPlugin()
+    plugin.config["archive_directory"] = str(archive)
+
+    batches = list(plugin.iter_locations(
+        "target", datetime(2024, 1, 3), datetime(2024, 1, 7, 23), batch_size=2
+    ))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [point.timestamp.day for batch in batches for point in batch] == [3, 4, 5, 6, 7]
+    assert batches[0][0].latitude == pytest.approx(51.5000003)
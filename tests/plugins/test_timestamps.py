@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.plugins.timestamps import TimestampParser, epoch_unit, parse_timestamps
+
+EPOCH = 1700000000
+LOCAL = datetime.fromtimestamp(EPOCH)
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-02T03:04:05Z", datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)),
+    ("2024-01-02T03:04:05+0000", datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)),
+    ("2024-01-02 03:04:05", datetime(2024, 1, 2, 3, 4, 5)),
+    ("2024-01-02", datetime(2024, 1, 2)),
+    ("Tue, 02 Jan 2024 03:04:05 +0100", datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=1)))),
+    (str(EPOCH), LOCAL),
+    (str(EPOCH * 1000), LOCAL),
+    (EPOCH, LOCAL),
+    (float(EPOCH), LOCAL),
+    (EPOCH * 1000, LOCAL),
+    (EPOCH * 10**6, LOCAL),
+    (np.int64(EPOCH * 10**9), LOCAL),
+    (LOCAL, LOCAL),
+    ("not a date", None),
+    ("", None),
+    (None, None),
+    (True, None),
+    ({"a": 1}, None),
+])
+def test_values_are_normalised(value, expected):
+    assert TimestampParser()(value) == expected
+
+
+def test_epoch_unit_follows_magnitude():
+    assert [epoch_unit(EPOCH * scale) for scale in (1, 10**3, 10**6, 10**9)] == ["s", "ms", "us", "ns"]
+
+
+def test_fields_keep_their_own_format_and_units():
+    parser = TimestampParser(units={"timestampMs": "ms"}, formats=["%d/%m/%Y %H:%M"])
+
+    assert parser("05/03/2024 10:00", "local") == datetime(2024, 3, 5, 10)
+    assert parser("2024-03-05T10:00:00", "iso") == datetime(2024, 3, 5, 10)
+    assert parser("06/03/2024 11:30", "local") == datetime(2024, 3, 6, 11, 30)
+    # A small millisecond value is not mistaken for seconds
+    assert parser("5000", "timestampMs") == datetime.fromtimestamp(5)
+    # A field that changes format is detected again
+    assert parser("2024-03-07T00:00:00", "local") == datetime(2024, 3, 7)
+    assert parser("08/03/2024 00:00", "local") == datetime(2024, 3, 8)
+
+
+@pytest.mark.parametrize("history", [[], ["1600000000"], ["12345678"], ["2024-01-05"], ["1600000000", "12345678"]])
+def test_digit_strings_parse_the_same_whatever_came_before(history):
+    parser = TimestampParser()
+    for value in history:
+        parser(value)
+
+    assert parser("20240101") == datetime(2024, 1, 1)
+    assert parser("12345678") == datetime.fromtimestamp(12345678)
+    assert parser("1700000000") == LOCAL
+
+
+def test_fields_with_an_epoch_unit_never_read_digit_strings_as_dates():
+    parser = TimestampParser(units={"timestampMs": "ms"})
+
+    assert parser("20240101", "timestampMs") == datetime.fromtimestamp(20240.101)
+    assert parser("20240101") == datetime(2024, 1, 1)
+
+
+def test_first_skips_missing_and_empty_keys():
+    parser = TimestampParser()
+    record = {"timestamp": "", "time": None, "date": "2024-01-02"}
+
+    assert parser.first(record, ("timestamp", "time", "date")) == datetime(2024, 1, 2)
+    assert parser.first(record, ("timestamp", "other")) is None
+
+
+def test_tz_applies_to_naive_results():
+    parser = TimestampParser(tz=UTC)
+
+    assert parser("2024-01-02T03:04:05") == datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+    assert parser(EPOCH) == datetime.fromtimestamp(EPOCH, UTC)
+    assert parser("2024-01-02T03:04:05+02:00").utcoffset() == timedelta(hours=2)
+
+
+@pytest.mark.parametrize("column", [
+    [EPOCH + day * 86400 for day in range(5)],
+    [float(EPOCH * 1000 + day) for day in range(5)],
+    np.array([EPOCH * 10**6, EPOCH * 1000, EPOCH], dtype=np.int64),
+    [f"2024-01-{day:02d}T12:00:00Z" for day in range(1, 6)],
+    [str(EPOCH * 1000 + day) for day in range(5)],
+    [str(EPOCH), "20240101", "12345678", "20240102", str(EPOCH * 1000)],
+    ["20240101", "20240102", "12345678"],
+    ["2024-01-01", "bad", None, EPOCH, "", "2024-01-02 10:00:00", True],
+    [],
+])
+@pytest.mark.parametrize("tz", [None, UTC])
+def test_columns_match_value_by_value_parsing(column, tz):
+    values = list(column)
+    expected = [TimestampParser(tz=tz)(value) for value in values]
+
+    assert TimestampParser(tz=tz).parse_column(column) == expected
+    assert parse_timestamps(column, tz=tz) == expected
+
+
+def test_location_history_converts_timestamp_columns(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    from app.plugins.location_services.location_history_plugin import LocationHistoryPlugin
+
+    entries = [
+        {"lat": 1.0, "lon": 2.0, "timestamp": (EPOCH + index) * 1000} for index in range(3)
+    ] + [
+        {"lat": 1.0, "lon": 2.0, "time": "2024-01-02T03:04:05"},
+        {"lat": 1.0, "lon": 2.0, "timestamp": "garbage"},
+    ]
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+
+    points = list(LocationHistoryPlugin()._load_file(path, None, None))
+
+    assert [point.timestamp for point in points] == [
+        datetime.fromtimestamp(EPOCH), datetime.fromtimestamp(EPOCH + 1),
+        datetime.fromtimestamp(EPOCH + 2), datetime(2024, 1, 2, 3, 4, 5),
+    ]
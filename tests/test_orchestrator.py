@@ -0,0 +1,129 @@
+"""Unit tests for the concurrent collection orchestrator."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.plugins.base_plugin import LocationPoint
+from app.plugins.orchestrator import CollectionJob, CollectionOrchestrator
+
+
+def _points(count: int, source: str) -> list[LocationPoint]:
+    return [LocationPoint(1.0, 2.0, datetime(2024, 1, 1), source, str(i)) for i in range(count)]
+
+
+class ListPlugin:
+    def collect_locations(self, target, date_from=None, date_to=None):
+        return _points(25, target)
+
+
+class BrokenPlugin:
+    def collect_locations(self, target, date_from=None, date_to=None):
+        raise RuntimeError("no archive")
+
+
+class SlowPlugin:
+    """Yields a point every few milliseconds, forever."""
+
+    def collect_locations(self, target, date_from=None, date_to=None):
+        while True:
+            time.sleep(0.005)
+            yield from _points(1, "slow")
+
+
+class StuckParser:
+    """Blocks inside a single call, as a big parse would."""
+
+    def collect_locations(self, target, date_from=None, date_to=None):
+        time.sleep(60)
+        return []
+
+
+class DyingParser:
+    """Sends one batch, then its process dies without reporting."""
+
+    def collect_locations(self, target, date_from=None, date_to=None):
+        yield from _points(5, "dying")
+        os._exit(3)
+
+
+def test_batches_stream_and_runs_are_reported() -> None:
+    orchestrator = CollectionOrchestrator(batch_size=10)
+    received: dict[str, int] = {}
+    orchestrator.subscribe(lambda identifier, batch: received.__setitem__(
+        identifier, received.get(identifier, 0) + len(batch)))
+
+    reports = orchestrator.run(
+        [
+            CollectionJob("list", ListPlugin()),
+            CollectionJob("broken", BrokenPlugin),
+            CollectionJob("parser", ListPlugin, mode="process"),
+        ],
+        "target",
+    )
+
+    assert received == {"list": 25, "parser": 25}
+    assert reports["parser"].status == "completed" and reports["parser"].batches == 3
+    assert reports["list"].status == "completed"
+    assert (reports["list"].points, reports["list"].batches) == (25, 3)
+    assert reports["broken"].status == "failed"
+    assert reports["broken"].error == "RuntimeError: no archive"
+
+
+def test_timeouts_stop_threads_and_processes() -> None:
+    orchestrator = CollectionOrchestrator(batch_size=1)
+    started = time.perf_counter()
+    reports = orchestrator.run(
+        [
+            CollectionJob("slow", SlowPlugin(), timeout=0.3),
+            CollectionJob("stuck", StuckParser, mode="process", timeout=0.3),
+            CollectionJob("slow-process", SlowPlugin, mode="process", timeout=0.3),
+        ],
+        "target",
+    )
+
+    assert time.perf_counter() - started < 20
+    assert reports["slow"].status == "timed_out" and reports["slow"].points > 0
+    assert reports["stuck"].status == "timed_out" and reports["stuck"].mode == "process"
+    assert reports["slow-process"].status == "timed_out"
+    # A worker between batches stops by itself; one stuck in a call is terminated
+    assert orchestrator._runs["slow-process"].process.exitcode == 0
+    assert orchestrator._runs["stuck"].process.exitcode != 0
+
+
+def test_cancel_from_a_subscriber() -> None:
+    orchestrator = CollectionOrchestrator(batch_size=1)
+    orchestrator.subscribe(lambda identifier, batch: orchestrator.cancel(identifier))
+
+    reports = orchestrator.run([CollectionJob("slow", SlowPlugin())], "target")
+
+    assert reports["slow"].status == "cancelled"
+    assert reports["slow"].points == 1
+
+
+def test_dead_worker_is_judged_after_its_batches_arrive() -> None:
+    orchestrator = CollectionOrchestrator(batch_size=5)
+    received: dict[str, int] = {}
+    orchestrator.subscribe(lambda identifier, batch: received.__setitem__(
+        identifier, received.get(identifier, 0) + len(batch)))
+
+    reports = orchestrator.run(
+        [
+            CollectionJob("dying", DyingParser, mode="process"),
+            CollectionJob("parser", ListPlugin, mode="process"),
+        ],
+        "target",
+    )
+
+    assert reports["dying"].status == "failed"
+    assert reports["dying"].error == "Worker process exited with code 3"
+    assert received == {"dying": 5, "parser": 25}
+    assert reports["parser"].status == "completed"
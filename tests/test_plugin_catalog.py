@@ -60,3 +60,59 @@ def test_core_plugin_manager_uses_catalog(tmp_path: Path, sample_plugin_dir: Pat
     for key, value in failed.items():
         assert key
         assert value
+
+
+def test_core_plugin_manager_instantiates_on_first_use(tmp_path: Path, sample_plugin_dir: Path) -> None:
+    # Imported here: other tests may reload the module
+    from app.plugins.base_plugin import BasePlugin
+
+    manager = PluginManager()
+    manager.add_plugin_directory(str(sample_plugin_dir))
+    manager.discover_plugins(force_refresh=True)
+
+    assert "sample_plugin" in manager.plugins
+    assert manager.get_plugin_info("sample_plugin")["name"] == "Sample"
+    assert not manager.plugins.is_loaded("sample_plugin")
+
+    plugin = manager.get_plugin("sample_plugin")
+    assert isinstance(plugin, BasePlugin)
+    assert plugin.name == "Sample"
+    assert manager.plugins["sample_plugin"] is plugin
+    assert manager.plugins.is_loaded("sample_plugin")
+    assert manager.get_plugins_by_category("uncategorized")["sample_plugin"] is plugin
+
+
+def test_plugins_that_fail_on_first_use_are_dropped(
+    tmp_path: Path, sample_plugin_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (sample_plugin_dir / "fragile_plugin.py").write_text(
+        """
+import os
+
+from app.plugins.base_plugin import BasePlugin
+
+
+class FragilePlugin(BasePlugin):
+    def __init__(self) -> None:
+        if os.environ.get("FRAGILE_PLUGIN_FAIL"):
+            raise RuntimeError("broken")
+        super().__init__("Fragile", "Fails when asked to")
+
+    def collect_locations(self, target, date_from=None, date_to=None):
+        return []
+""",
+        encoding="utf-8",
+    )
+    manager = PluginManager()
+    manager.add_plugin_directory(str(sample_plugin_dir))
+    manager.discover_plugins(force_refresh=True)
+    assert "fragile_plugin" in manager.plugins
+
+    monkeypatch.setenv("FRAGILE_PLUGIN_FAIL", "1")
+    plugins = dict(manager.plugins.items())
+
+    assert plugins["sample_plugin"].name == "Sample"
+    assert "fragile_plugin" not in plugins
+    assert "fragile_plugin" not in manager.plugins
+    assert manager.get_plugin("fragile_plugin") is None
+    assert manager.get_failed_plugins()["fragile_plugin"] == "RuntimeError: broken"
@@ -53,3 +53,37 @@ def test_failed_plugin_registration(caplog: pytest.LogCaptureFixture) -> None:
     assert "BadPlugin" in failures
     assert failures["BadPlugin"].startswith("RuntimeError")
     assert any("Failed to instantiate plugin" in message for message in caplog.messages)
+
+
+def test_loaded_plugins_are_listed_without_instantiating(tmp_path: Path) -> None:
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    (plugin_dir / "counted_plugin.py").write_text(
+        """
+from app.plugins.base_plugin import BasePlugin
+
+CREATED = []
+
+
+class CountedPlugin(BasePlugin):
+    def __init__(self) -> None:
+        super().__init__("Counted", "Counts its instances")
+        CREATED.append(self)
+
+    def collect_locations(self, target, date_from=None, date_to=None):
+        return []
+""",
+        encoding="utf-8",
+    )
+    pm = PluginManager(plugin_dir)
+    pm._catalog.cache_path = tmp_path / "catalog.json"
+    pm.load_plugins(force_refresh=True)
+
+    assert "counted_plugin" in pm.plugins
+    assert pm.get_manifest()["counted_plugin"]["info"]["name"] == "Counted"
+    assert not pm.plugins.is_loaded("counted_plugin")
+
+    plugin = pm.get_plugin("counted")
+    assert type(plugin).__name__ == "CountedPlugin"
+    assert list(pm.plugins.values()) == [plugin]
+    assert len(sys.modules[type(plugin).__module__].CREATED) == 1